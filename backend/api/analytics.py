@@ -7,10 +7,10 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import io
 
 from core.analytics import AnalyticsEngine, AnalyticsTimeframe, get_analytics_engine
-from services.report_pdf import get_pdf_builder
+from services.report_jobs import get_report_job_manager
+from services.report_pdf import DEFAULT_TRADE_LOG_LIMIT, trade_rows_from_metrics
 from utils.logging_config import get_logger
 
 logger = get_logger("api.analytics")
@@ -18,7 +18,7 @@ analytics_router = APIRouter()
 
 # Global analytics engine
 analytics_engine = get_analytics_engine()
-pdf_builder = get_pdf_builder()
+report_jobs = get_report_job_manager()
 
 
 class AnalyticsRequest(BaseModel):
@@ -27,6 +27,7 @@ class AnalyticsRequest(BaseModel):
     timeframe: str = "all_time"
     symbol: Optional[str] = None
     provider_id: Optional[str] = None
+    trade_log_limit: Optional[int] = DEFAULT_TRADE_LOG_LIMIT  # Reports only; None lists every trade
 
 
 class SummaryResponse(BaseModel):
@@ -243,47 +244,83 @@ async def get_chart_data(request: Request,
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _require_requester(request: Request) -> str:
+    """Authenticated user id from the auth middleware, or 401"""
+    requester = getattr(request.state, 'user_id', None)
+    if not requester:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    return requester
+
+
+async def _submit_report_job(request: Request, analytics_request: AnalyticsRequest,
+                             owner: Optional[str] = None):
+    """Gather report inputs and queue the render; the trade log is streamed by the worker"""
+    # Get user ID from auth middleware if not provided
+    user_id = analytics_request.user_id or getattr(request.state, 'user_id', None)
+    
+    # Parse timeframe
+    try:
+        timeframe_enum = AnalyticsTimeframe(analytics_request.timeframe)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timeframe: {analytics_request.timeframe}")
+    
+    # Get analytics data
+    summary = await analytics_engine.get_summary_analytics(user_id, timeframe_enum)
+    providers = await analytics_engine.get_provider_analytics(analytics_request.provider_id)
+    chart_data = await analytics_engine.get_performance_chart_data(user_id, timeframe_enum)
+    
+    report_request = {
+        "summary": summary,
+        "providers": providers,
+        "chart_data": chart_data,
+        "user_name": f"User {user_id}" if user_id else "All Users",
+        "trade_log_limit": analytics_request.trade_log_limit
+    }
+    store = analytics_engine.data_store
+    if store is not None and analytics_engine.store_populated:
+        report_request["trade_query"] = {
+            "database_url": store.engine.url.render_as_string(hide_password=False),
+            "user_id": user_id,
+            "since": analytics_engine.period_start(timeframe_enum, datetime.utcnow())
+        }
+    else:
+        report_request["trade_rows"] = trade_rows_from_metrics(
+            await analytics_engine._get_trades_data(user_id, timeframe_enum))
+    
+    return await report_jobs.submit(report_request, owner)
+
+
+def _get_owned_job(request: Request, job_id: str):
+    """Report job owned by the authenticated requester, or 404"""
+    requester = _require_requester(request)
+    job = report_jobs.get_job(job_id)
+    if job is None or job.user_id != requester:
+        raise HTTPException(status_code=404, detail=f"Report job not found: {job_id}")
+    return job
+
+
+def _stream_report(job, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        report_jobs.stream(job.job_id),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}",
+                 "X-Report-Job-Id": job.job_id}
+    )
+
+
 @analytics_router.post("/report/pdf")
 async def generate_pdf_report(request: Request, 
                              analytics_request: AnalyticsRequest):
     """Generate and download PDF analytics report"""
     try:
-        # Get user ID from auth middleware if not provided
-        user_id = analytics_request.user_id or getattr(request.state, 'user_id', None)
-        
-        # Parse timeframe
-        try:
-            timeframe_enum = AnalyticsTimeframe(analytics_request.timeframe)
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Invalid timeframe: {analytics_request.timeframe}")
-        
-        # Get analytics data
-        summary = await analytics_engine.get_summary_analytics(user_id, timeframe_enum)
-        providers = await analytics_engine.get_provider_analytics(analytics_request.provider_id)
-        chart_data = await analytics_engine.get_performance_chart_data(user_id, timeframe_enum)
-        
-        # Generate PDF report
-        user_name = f"User {user_id}" if user_id else "All Users"
-        pdf_bytes = pdf_builder.generate_analytics_report(
-            summary=summary,
-            providers=providers,
-            chart_data=chart_data,
-            user_name=user_name
-        )
+        job = await _submit_report_job(request, analytics_request, getattr(request.state, 'user_id', None))
         
-        # Create response
+        # Create response; bytes are sent as soon as the worker writes them
         filename = f"analytics_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         
-        def generate():
-            yield pdf_bytes
+        logger.info(f"PDF report job {job.job_id} streaming for user {job.user_id or 'all'}")
         
-        logger.info(f"PDF report generated for user {user_id or 'all'}")
-        
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return _stream_report(job, filename)
         
     except HTTPException:
         raise
@@ -292,6 +329,38 @@ async def generate_pdf_report(request: Request,
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@analytics_router.post("/report/jobs", status_code=202)
+async def create_report_job(request: Request, analytics_request: AnalyticsRequest):
+    """Queue a PDF report render and return its job for polling"""
+    # Jobs are polled and downloaded by their owner, so queueing one needs a user
+    requester = _require_requester(request)
+    try:
+        job = await _submit_report_job(request, analytics_request, requester)
+        return job.to_dict()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing PDF report: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@analytics_router.get("/report/jobs/{job_id}")
+async def get_report_job(request: Request, job_id: str):
+    """Poll a report job's status"""
+    return _get_owned_job(request, job_id).to_dict()
+
+
+@analytics_router.get("/report/jobs/{job_id}/download")
+async def download_report_job(request: Request, job_id: str):
+    """Stream a report job's PDF, following it while it is still being written"""
+    job = _get_owned_job(request, job_id)
+    if job.error:
+        raise HTTPException(status_code=409, detail=f"Report job failed: {job.error}")
+    
+    return _stream_report(job, f"analytics_report_{job.job_id}.pdf")
+
+
 @analytics_router.get("/performance-metrics")
 async def get_performance_metrics(request: Request, 
                                  timeframe: str = "all_time",
@@ -6,12 +6,12 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
-from core.auth import AuthService, UserCredentials, TokenData, LicenseValidator, DeviceBinding
+from core.auth import UserCredentials, TokenData, LicenseValidator, DeviceBinding, get_auth_service
 from utils.logging_config import get_logger
 
 logger = get_logger("api.auth")
 auth_router = APIRouter()
-auth_service = AuthService()
+auth_service = get_auth_service()
 license_validator = LicenseValidator()
 
 
@@ -25,6 +25,7 @@ class LoginRequest(BaseModel):
 class LoginResponse(BaseModel):
     """Login response model"""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     expires_in: int
     user_id: str
@@ -69,13 +70,14 @@ async def login(request: LoginRequest):
                 detail="Invalid username or password"
             )
         
-        # Create access token
-        access_token = auth_service.create_access_token(token_data)
+        # Create access token bound to a refresh token, so revoking the refresh token ends the session
+        access_token, refresh_token = auth_service.create_session_tokens(token_data)
         
         logger.info(f"User {request.username} logged in successfully")
         
         return LoginResponse(
             access_token=access_token,
+            refresh_token=refresh_token,
             expires_in=auth_service.expiration_hours * 3600,
             user_id=token_data.user_id,
             license_key=token_data.license_key
@@ -117,13 +119,14 @@ async def register(request: RegisterRequest):
                 detail="Registration failed"
             )
         
-        # Create access token
-        access_token = auth_service.create_access_token(token_data)
+        # Create access token bound to a refresh token, so revoking the refresh token ends the session
+        access_token, refresh_token = auth_service.create_session_tokens(token_data)
         
         logger.info(f"User {request.username} registered successfully")
         
         return LoginResponse(
             access_token=access_token,
+            refresh_token=refresh_token,
             expires_in=auth_service.expiration_hours * 3600,
             user_id=token_data.user_id,
             license_key=token_data.license_key
@@ -166,17 +169,19 @@ async def refresh_token(request: Request):
         user_id = getattr(request.state, 'user_id', None)
         device_id = getattr(request.state, 'device_id', None)
         license_key = getattr(request.state, 'license_key', None)
+        claims = getattr(request.state, 'token_claims', None)
         
         if not all([user_id, device_id, license_key]):
             raise HTTPException(status_code=401, detail="Invalid token data")
         
-        # Create new token data
+        # Create new token data, keeping the refresh token the session was issued under
         from datetime import datetime, timedelta
         new_token_data = TokenData(
             user_id=user_id,
             device_id=device_id,
             license_key=license_key,
-            expires_at=datetime.utcnow() + timedelta(hours=auth_service.expiration_hours)
+            expires_at=datetime.utcnow() + timedelta(hours=auth_service.expiration_hours),
+            refresh_token_id=claims.refresh_token_id if claims else None
         )
         
         # Create new access token
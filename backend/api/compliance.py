@@ -8,7 +8,7 @@ from typing import Dict, Any, Optional
 from pydantic import BaseModel
 import logging
 
-from core.compliance import ComplianceEngine
+from core.compliance import get_compliance_engine
 from middleware.auth import verify_token
 from utils.logging_config import get_logger
 
@@ -43,8 +43,7 @@ async def get_available_profiles(
 ):
     """Get available compliance profiles"""
     try:
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         result = await compliance.get_available_profiles()
         
@@ -62,8 +61,7 @@ async def get_profile_details(
 ):
     """Get detailed profile information"""
     try:
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         result = await compliance.get_profile_details(profile_id)
         
@@ -83,8 +81,7 @@ async def activate_compliance_mode(
     try:
         user_id = current_user["user_id"]
         
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         result = await compliance.activate_compliance_mode(
             user_id, request.profile_name, request.custom_restrictions
@@ -105,8 +102,7 @@ async def deactivate_compliance_mode(
     try:
         user_id = current_user["user_id"]
         
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         result = await compliance.deactivate_compliance_mode(user_id)
         
@@ -126,8 +122,7 @@ async def validate_trade(
     try:
         user_id = current_user["user_id"]
         
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         trade_params = {
             "symbol": request.symbol,
@@ -158,8 +153,7 @@ async def get_compliance_status(
     try:
         user_id = current_user["user_id"]
         
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         status = await compliance.get_compliance_status(user_id)
         
@@ -182,8 +176,7 @@ async def create_custom_profile(
     try:
         user_id = current_user["user_id"]
         
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         profile_data = {
             "name": request.name,
@@ -209,8 +202,7 @@ async def generate_compliance_report(
     try:
         user_id = current_user["user_id"]
         
-        compliance = ComplianceEngine()
-        await compliance.initialize()
+        compliance = await get_compliance_engine()
         
         result = await compliance.generate_compliance_report(user_id, days)
         
@@ -3,9 +3,11 @@ Offline Operations API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
+import json
 import logging
 
 from core.offline import OfflineOperationEngine
@@ -141,6 +143,36 @@ async def sync_offline_actions(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sync/stream")
+async def stream_offline_sync(
+    current_user: dict = Depends(verify_token)
+):
+    """Sync offline actions, streaming one NDJSON progress line per batch"""
+    try:
+        user_id = current_user["user_id"]
+        
+        # Initialize offline engine
+        offline_engine = OfflineOperationEngine(user_id)
+        await offline_engine.initialize()
+        offline_engine.is_online = True
+        
+    except Exception as e:
+        logger.error(f"Offline sync stream failed to start: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def progress_lines():
+        try:
+            async for snapshot in offline_engine.stream_sync():
+                yield json.dumps(snapshot) + "\n"
+        except Exception as e:
+            logger.error(f"Offline sync stream failed: {e}")
+            yield json.dumps({"done": True, "error": str(e)}) + "\n"
+        finally:
+            offline_engine.close()
+    
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+
 @router.get("/status")
 async def get_offline_status(
     current_user: dict = Depends(verify_token)
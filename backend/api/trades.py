@@ -8,6 +8,7 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from enum import Enum
 
+from core.analytics import TradeMetrics, get_analytics_engine
 from core.trade import TradeExecutor, TradeOrder, OrderStatus, OrderType
 from services.mt5_bridge import MT5Bridge, MT5TradeRequest, MT5OrderType, MT5TradeAction, get_mt5_bridge
 from services.parser_ai import ParsedSignal, SignalType
@@ -160,6 +161,31 @@ async def open_trade(request: OpenTradeRequest, bg_request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _closed_trade_metrics(position: Dict[str, Any], ticket: int, close_time: datetime) -> TradeMetrics:
+    """Analytics record for a position that was just closed"""
+    entry_price = position.get('price_open', 0.0)
+    exit_price = position.get('price_current', entry_price)
+    open_time = datetime.fromisoformat(position.get('time', close_time.isoformat()))
+    
+    move_percentage = ((exit_price - entry_price) / entry_price * 100) if entry_price else 0.0
+    if 'SELL' in str(position.get('type', '')).upper():
+        move_percentage = -move_percentage
+    
+    return TradeMetrics(
+        trade_id=str(ticket),
+        symbol=position.get('symbol', ''),
+        entry_price=entry_price,
+        exit_price=exit_price,
+        volume=position.get('volume', 0.0),
+        profit_loss=position.get('profit', 0.0),
+        profit_loss_percentage=move_percentage,
+        duration_seconds=max(0, int((close_time - open_time).total_seconds())),
+        signal_provider=position.get('provider'),
+        entry_time=open_time,
+        exit_time=close_time
+    )
+
+
 @trades_router.post("/close", response_model=TradeResponse)
 async def close_trade(request: CloseTradeRequest, bg_request: Request):
     """Close an existing trading position"""
@@ -205,13 +231,20 @@ async def close_trade(request: CloseTradeRequest, bg_request: Request):
         if result.retcode == 10009:  # TRADE_RETCODE_DONE
             logger.info(f"Trade closed successfully: ticket {ticket}")
             
+            close_time = datetime.utcnow()
+            try:
+                get_analytics_engine().record_closed_trade(
+                    _closed_trade_metrics(target_position, ticket, close_time), user_id)
+            except Exception as e:
+                logger.error(f"Failed to record closed trade {ticket} in analytics: {e}")
+            
             return TradeResponse(
                 success=True,
                 ticket=ticket,
                 message=f"Trade closed successfully: {request.reason}",
                 order_details={
                     "ticket": ticket,
-                    "close_time": datetime.utcnow().isoformat(),
+                    "close_time": close_time.isoformat(),
                     "reason": request.reason,
                     "user_id": user_id
                 }
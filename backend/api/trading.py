@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 
+from core.analytics import get_analytics_engine
 from core.trade import TradeExecutor, TradeOrder, OrderStatus
 from services.parser_ai import ParsedSignal, SignalType
 from utils.logging_config import get_logger
@@ -86,8 +87,20 @@ async def execute_signal(request: ExecuteSignalRequest, bg_request: Request):
             parsing_method=signal_data.get("parsing_method", "api")
         )
         
+        # Provider signals count towards provider analytics whether or not they execute
+        if signal_data.get("signal_id") and signal_data.get("provider_id"):
+            try:
+                await get_analytics_engine().record_provider_signal(
+                    signal_data["signal_id"], user_id, signal.symbol, signal.signal_type.value,
+                    signal_data["provider_id"], signal_data.get("provider_name"))
+            except Exception as e:
+                logger.error(f"Failed to record signal {signal_data['signal_id']} in analytics: {e}")
+        
         # Execute the signal
-        order = await trade_executor.execute_signal(signal)
+        order = await trade_executor.execute_signal(signal, user_id,
+                                                    signal_id=signal_data.get("signal_id"),
+                                                    provider_id=signal_data.get("provider_id"),
+                                                    provider_name=signal_data.get("provider_name"))
         
         if order.status == OrderStatus.EXECUTED:
             logger.info(f"Signal executed successfully for user {user_id}: {order.id}")
@@ -116,7 +129,7 @@ async def close_order(request: CloseOrderRequest, bg_request: Request):
     try:
         user_id = getattr(bg_request.state, 'user_id', 'unknown')
         
-        success = await trade_executor.close_order(request.order_id)
+        success = await trade_executor.close_order(request.order_id, user_id)
         
         if success:
             logger.info(f"Order {request.order_id} closed by user {user_id}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the columnar analytics path
+
+Times summary metrics (drawdown, streaks, Sharpe included), per-symbol
+group-by and chart bucketing at 1k/100k/1M closed trades. For sizes where
+building TradeMetrics objects is practical, the previous row-wise summary
+(one pass per metric, re-sorting for drawdown and streaks) is timed too.
+
+Usage: python benchmarks/bench_analytics.py [sizes...]
+"""
+
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.analytics import AnalyticsEngine, AnalyticsTimeframe, TradeColumns, TradeMetrics
+
+SYMBOLS = ["XAUUSD", "EURUSD", "GBPUSD", "USDJPY", "BTCUSD", "US30", "NAS100", "GBPJPY"]
+PROVIDERS = [f"provider_{i}" for i in range(20)]
+OBJECT_LIMIT = 100_000
+
+
+def make_columns(count: int, seed: int = 7) -> TradeColumns:
+    rng = np.random.default_rng(seed)
+    entry_ts = 1.7e9 + np.sort(rng.uniform(0, 3 * 365 * 86400, count))
+    duration = rng.integers(60, 86400, count)
+    return TradeColumns(
+        pnl=rng.normal(5, 120, count).round(2),
+        pnl_pct=rng.normal(0.05, 1.2, count),
+        volume=rng.choice([0.01, 0.1, 0.5, 1.0], count),
+        duration=duration,
+        entry_ts=entry_ts,
+        exit_ts=entry_ts + duration,
+        provider_codes=rng.integers(0, len(PROVIDERS), count),
+        symbol_codes=rng.integers(0, len(SYMBOLS), count),
+        providers=PROVIDERS,
+        symbols=SYMBOLS,
+        presorted=True
+    )
+
+
+def make_trades(columns: TradeColumns) -> List[TradeMetrics]:
+    return [
+        TradeMetrics(
+            trade_id=f"T{i}",
+            symbol=columns.symbols[columns.symbol_codes[i]],
+            entry_price=1.0,
+            exit_price=1.0,
+            volume=float(columns.volume[i]),
+            profit_loss=float(columns.pnl[i]),
+            profit_loss_percentage=float(columns.pnl_pct[i]),
+            duration_seconds=int(columns.duration[i]),
+            signal_provider=columns.providers[columns.provider_codes[i]],
+            entry_time=datetime(1970, 1, 1) + timedelta(seconds=float(columns.entry_ts[i])),
+            exit_time=datetime(1970, 1, 1) + timedelta(seconds=float(columns.exit_ts[i]))
+        )
+        for i in range(len(columns))
+    ]
+
+
+def legacy_summary(trades: List[TradeMetrics]) -> None:
+    """Previous row-wise implementation, reproduced for comparison"""
+    wins = [t.profit_loss for t in trades if t.profit_loss > 0]
+    losses = [t.profit_loss for t in trades if t.profit_loss < 0]
+    sum(t.profit_loss for t in trades)
+    sum(t.profit_loss_percentage for t in trades)
+    statistics.mean(wins), statistics.mean(losses)
+    statistics.mean([t.duration_seconds for t in trades])
+    max(t.profit_loss for t in trades), min(t.profit_loss for t in trades)
+    sum(t.volume for t in trades)
+    statistics.stdev([t.profit_loss_percentage for t in trades])
+
+    running = peak = max_drawdown = 0.0
+    for trade in sorted(trades, key=lambda t: t.entry_time):
+        running += trade.profit_loss
+        peak = max(peak, running)
+        max_drawdown = max(max_drawdown, peak - running)
+
+    streak = best = 0
+    for trade in sorted(trades, key=lambda t: t.entry_time):
+        streak = streak + 1 if trade.profit_loss > 0 else 0
+        best = max(best, streak)
+
+
+def timed(func: Callable[[], object], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000, 1_000_000]
+    engine = AnalyticsEngine()
+    print(f"{'trades':>10} {'summary':>10} {'symbols':>10} {'chart':>10} {'build':>10} {'row-wise':>10}  (ms)")
+
+    for count in sizes:
+        columns = make_columns(count)
+        summary_ms = timed(lambda: engine._calculate_summary_metrics(columns))
+        symbols_ms = timed(lambda: columns.group_metrics("symbol"))
+        chart_ms = timed(lambda: engine._calculate_chart_data(columns, AnalyticsTimeframe.DAILY))
+
+        build_ms = legacy_ms = float('nan')
+        if count <= OBJECT_LIMIT:
+            trades = make_trades(columns)
+            build_ms = timed(lambda: TradeColumns.from_trades(trades), repeat=1)
+            legacy_ms = timed(lambda: legacy_summary(trades), repeat=1)
+
+        print(f"{count:>10} {summary_ms:>10.2f} {symbols_ms:>10.2f} {chart_ms:>10.2f} "
+              f"{build_ms:>10.2f} {legacy_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
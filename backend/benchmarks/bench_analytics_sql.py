@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Seeded-SQLite benchmark for the analytics data access layer
+
+Seeds a temporary SQLite database with signals and closed trade orders, then
+times each analytics endpoint against it through AnalyticsDataStore, and the
+previous approach of materializing ORM objects for comparison.
+
+Usage: python benchmarks/bench_analytics_sql.py [trades] [users]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from core.analytics import AnalyticsEngine, AnalyticsTimeframe, TradeMetrics
+from core.analytics_store import AnalyticsDataStore
+from db.models import Signal, TradeOrder
+
+SYMBOLS = ["XAUUSD", "EURUSD", "GBPUSD", "USDJPY", "BTCUSD", "US30", "NAS100", "GBPJPY"]
+PROVIDERS = [f"provider_{i}" for i in range(20)]
+
+
+def seed(store: AnalyticsDataStore, trades: int, users: int, batch: int = 20000):
+    rng = random.Random(11)
+    start = datetime(2023, 1, 1)
+    with store.engine.begin() as conn:
+        for offset in range(0, trades, batch):
+            signals, orders = [], []
+            for i in range(offset, min(offset + batch, trades)):
+                provider = rng.choice(PROVIDERS)
+                symbol = rng.choice(SYMBOLS)
+                executed_at = start + timedelta(minutes=i * 5 + rng.randint(0, 4))
+                price = rng.uniform(1, 2000)
+                signals.append({
+                    "id": f"S{i}", "user_id": f"user_{i % users}", "symbol": symbol, "signal_type": "BUY",
+                    "confidence": "HIGH", "raw_text": "", "parsing_method": "regex",
+                    "processed_at": executed_at, "executed": True,
+                    "provider_id": provider, "provider_name": provider.title()
+                })
+                orders.append({
+                    "id": f"O{i}", "signal_id": f"S{i}", "user_id": f"user_{i % users}", "symbol": symbol,
+                    "order_type": rng.randint(0, 1), "volume": rng.choice([0.01, 0.1, 1.0]),
+                    "status": "EXECUTED", "executed_price": price, "executed_at": executed_at,
+                    "close_price": price * rng.uniform(0.99, 1.01),
+                    "closed_at": executed_at + timedelta(minutes=rng.randint(1, 600)),
+                    "profit_loss": round(rng.gauss(5, 100), 2)
+                })
+            conn.execute(insert(Signal.__table__), signals)
+            conn.execute(insert(TradeOrder.__table__), orders)
+
+
+def orm_trades(store: AnalyticsDataStore, user_id: str):
+    """Previous style: load full ORM objects, then build TradeMetrics per row"""
+    with Session(store.engine) as session:
+        rows = (session.query(TradeOrder, Signal)
+                .outerjoin(Signal, Signal.id == TradeOrder.signal_id)
+                .filter(TradeOrder.user_id == user_id, TradeOrder.closed_at.isnot(None))
+                .all())
+        return [TradeMetrics(
+            trade_id=order.id, symbol=order.symbol, entry_price=order.executed_price,
+            exit_price=order.close_price, volume=order.volume, profit_loss=order.profit_loss,
+            profit_loss_percentage=0.0,
+            duration_seconds=int((order.closed_at - order.executed_at).total_seconds()),
+            signal_provider=signal.provider_id if signal else None,
+            entry_time=order.executed_at, exit_time=order.closed_at
+        ) for order, signal in rows]
+
+
+async def timed(label: str, coro_factory):
+    started = time.perf_counter()
+    result = await coro_factory()
+    print(f"  {label:<44} {(time.perf_counter() - started) * 1000:>9.1f} ms")
+    return result
+
+
+async def run(trades: int, users: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AnalyticsDataStore(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        store.create_schema()
+        started = time.perf_counter()
+        seed(store, trades, users)
+        print(f"Seeded {trades} trades for {users} users in {time.perf_counter() - started:.1f}s")
+
+        with store.engine.connect() as conn:
+            plan = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM trade_orders WHERE user_id = 'user_0' AND symbol = 'EURUSD'"
+            )).fetchall()
+            print(f"  query plan (user+symbol): {plan[0][-1]}")
+
+        user = "user_0"
+        await timed(f"ORM objects for {user} (previous style)",
+                    lambda: asyncio.to_thread(orm_trades, store, user))
+        await timed(f"streamed columns for {user}",
+                    lambda: asyncio.to_thread(store.load_trade_columns, user))
+
+        engine = AnalyticsEngine(data_store=store)
+        await timed("summary, all users (cold: builds view)", lambda: engine.get_summary_analytics())
+        await timed("summary, all users (warm)", lambda: engine.get_summary_analytics())
+        await timed(f"summary, {user} (cold)", lambda: engine.get_summary_analytics(user))
+        await timed("chart monthly, all users (warm)",
+                    lambda: engine.get_performance_chart_data(None, AnalyticsTimeframe.MONTHLY))
+        await timed("symbol EURUSD, all users (warm)", lambda: engine.get_symbol_analytics("EURUSD"))
+        await timed("provider analytics (SQL group-by)", lambda: engine.get_provider_analytics())
+
+        cold = AnalyticsEngine(data_store=store)
+        await timed(f"symbol EURUSD, {user} (cold: SQL filter)",
+                    lambda: cold.get_symbol_analytics("EURUSD", user))
+        await timed("summary monthly, all users (cold: SQL since)",
+                    lambda: asyncio.to_thread(store.load_trade_columns, None,
+                                              cold.period_start(AnalyticsTimeframe.MONTHLY, datetime.utcnow())))
+        store.engine.dispose()
+
+
+def main():
+    trades = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(run(trades, users))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for authenticated requests
+
+Drives an app with the production middleware order (auth -> error handler ->
+rate limiter) and an endpoint that requires the caller's identity, over
+in-process ASGI, with and without the verified-token cache. A pool of users
+each reuse their token, as real clients do between refreshes.
+
+Usage: python benchmarks/bench_auth.py [requests] [users]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+
+import core.auth as core_auth
+from core.auth import AuthService, TokenData
+from middleware.auth import AuthMiddleware
+from middleware.error_handler import ErrorHandlerMiddleware
+from middleware.rate_limit import RateLimitMiddleware, RateLimitRule
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/me")
+    async def me(request: Request):
+        user_id = getattr(request.state, 'user_id', None)
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Authentication required")
+        return {"user_id": user_id}
+
+    app.add_middleware(RateLimitMiddleware, default_rule=RateLimitRule(requests=10_000_000, window=60))
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.add_middleware(AuthMiddleware)
+    return app
+
+
+async def drive(app: FastAPI, tokens, requests: int, concurrency: int = 32) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(offset: int):
+            for i in range(offset, requests, concurrency):
+                response = await client.get("/api/v1/me",
+                                            headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    issuer = AuthService()
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    tokens = [issuer.create_access_token(TokenData(user_id=f"user_{i}", device_id=f"device_{i}",
+                                                   license_key="BENCH", expires_at=expires_at))
+              for i in range(users)]
+
+    print(f"{requests} authenticated requests, {users} users")
+    for label, cache_size in (("without token cache", 0), ("with token cache", 10_000)):
+        core_auth._auth_service = AuthService(token_cache_size=cache_size)
+        app = build_app()
+        asyncio.run(drive(app, tokens, 1000))  # warm-up
+        rate = asyncio.run(drive(app, tokens, requests))
+        print(f"  {label:<22} {rate:>8.0f} req/s")
+
+    # Verification alone, to separate auth cost from HTTP/middleware overhead
+    for label, cache_size in (("without token cache", 0), ("with token cache", 10_000)):
+        service = AuthService(token_cache_size=cache_size)
+        started = time.perf_counter()
+        for i in range(requests):
+            service.verify_token(tokens[i % users])
+        per_call = (time.perf_counter() - started) / requests * 1e6
+        print(f"  verify_token {label:<22} {per_call:>6.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Pre-trade compliance checks: per-call profile interpretation against the compiled evaluator
+
+Validates a stream of orders for a prop-firm user (EU MiFID II profile, with a
+custom lot limit) three ways: the previous validate_trade, which re-read the
+profile, scanned every forbidden pattern, parsed the trading hours and awaited
+the daily stats on every order; validate_trade through the compiled evaluator;
+and the evaluator's evaluate() called directly, as a synchronous order path
+would. Reports the mean and p99 per check and how many orders were rejected,
+which must match across all three.
+
+Usage: python benchmarks/bench_compliance.py [orders]
+"""
+
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.compliance import ComplianceEngine
+
+SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD", "US30", "BTCUSD_CRYPTO", "AUDCAD", "EURGBP"]
+
+
+def make_orders(count: int, seed: int = 3) -> list:
+    rnd = random.Random(seed)
+    return [{
+        "symbol": rnd.choice(SYMBOLS),
+        "type": rnd.choice(("BUY", "SELL")),
+        "volume": round(rnd.uniform(0.01, 1.2), 2),
+        "sl": 1.0800 if rnd.random() > 0.05 else None,
+        "tp": 1.0900
+    } for _ in range(count)]
+
+
+async def previous_validate(engine: ComplianceEngine, user_id: str, trade_params: dict) -> dict:
+    """The previous validate_trade checks, re-interpreting the profile on every call"""
+    profile = engine.active_profiles[user_id]
+    restrictions = profile["profile"]["restrictions"]
+    violations = []
+
+    if restrictions.max_lot_size and trade_params.get("volume", 0) > restrictions.max_lot_size:
+        violations.append({"rule": "max_lot_size", "severity": "high",
+                           "message": f"Lot size {trade_params.get('volume')} exceeds maximum {restrictions.max_lot_size}"})
+    symbol = trade_params.get("symbol", "")
+    if restrictions.forbidden_symbols:
+        for forbidden in restrictions.forbidden_symbols:
+            if forbidden in symbol:
+                violations.append({"rule": "forbidden_symbol", "severity": "critical",
+                                   "message": f"Symbol {symbol} contains forbidden pattern {forbidden}"})
+    if restrictions.allowed_symbols and symbol not in restrictions.allowed_symbols:
+        violations.append({"rule": "allowed_symbols", "severity": "high",
+                           "message": f"Symbol {symbol} not in allowed symbols list"})
+    if restrictions.stop_loss_required and not trade_params.get("sl"):
+        violations.append({"rule": "stop_loss_required", "severity": "high",
+                           "message": "Stop loss is required for all trades"})
+    if restrictions.take_profit_required and not trade_params.get("tp"):
+        violations.append({"rule": "take_profit_required", "severity": "high",
+                           "message": "Take profit is required for all trades"})
+    if restrictions.trading_hours:
+        now = datetime.now().time()
+        start = datetime.strptime(restrictions.trading_hours["start"], "%H:%M").time()
+        end = datetime.strptime(restrictions.trading_hours["end"], "%H:%M").time()
+        if not (start <= now <= end):
+            violations.append({"rule": "trading_hours", "severity": "medium",
+                               "message": "Trading outside allowed hours"})
+
+    daily_stats = await engine._get_daily_trading_stats(user_id)
+    if restrictions.max_daily_trades and daily_stats["trade_count"] >= restrictions.max_daily_trades:
+        violations.append({"rule": "max_daily_trades", "severity": "high",
+                           "message": f"Daily trade limit ({restrictions.max_daily_trades}) exceeded"})
+    if restrictions.max_daily_loss and daily_stats["daily_loss"] >= restrictions.max_daily_loss:
+        violations.append({"rule": "max_daily_loss", "severity": "critical",
+                           "message": f"Daily loss limit ({restrictions.max_daily_loss * 100}%) exceeded"})
+    if restrictions.max_drawdown and daily_stats["drawdown"] >= restrictions.max_drawdown:
+        violations.append({"rule": "max_drawdown", "severity": "critical",
+                           "message": f"Maximum drawdown ({restrictions.max_drawdown * 100}%) exceeded"})
+
+    return {
+        "valid": len(violations) == 0,
+        "violations": violations,
+        "critical_violations": len([v for v in violations if v["severity"] == "critical"]),
+        "profile": profile["profile_name"]
+    }
+
+
+def report(label: str, timings: list, rejected: int):
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"  {label:<28} mean {statistics.mean(timings) * 1e6:>7.2f}us   p99 {p99 * 1e6:>7.2f}us   "
+          f"{rejected:,} rejected")
+
+
+async def run(count: int):
+    engine = ComplianceEngine()
+    await engine.initialize()
+    # Persisting the activation needs the database; the benchmark only needs the engine state
+    engine._update_user_compliance_db = lambda *args: asyncio.sleep(0)
+    await engine.activate_compliance_mode("bench_user", "eu_mifid_ii", {"max_lot_size": 1.0})
+    # The previous path never applied custom restrictions; give it the same profile
+    engine.active_profiles["bench_user"]["profile"] = {
+        **engine.active_profiles["bench_user"]["profile"],
+        "restrictions": engine.evaluators["bench_user"].restrictions
+    }
+    engine._log_compliance_violations = lambda *args: asyncio.sleep(0)
+
+    orders = make_orders(count)
+    evaluator = engine.evaluators["bench_user"]
+    stats = engine.daily_stats["bench_user"]
+    print(f"{count:,} orders, profile eu_mifid_ii, {len(evaluator.checks)} compiled checks")
+
+    async def previous(order):
+        return not (await previous_validate(engine, "bench_user", order))["valid"]
+
+    async def compiled(order):
+        return not (await engine.validate_trade("bench_user", order))["valid"]
+
+    async def direct(order):
+        return bool(evaluator.evaluate(order, stats))
+
+    for label, check in (("previous validate_trade", previous),
+                         ("compiled validate_trade", compiled),
+                         ("evaluator.evaluate", direct)):
+        timings = []
+        rejected = 0
+        for order in orders:
+            started = time.perf_counter()
+            rejected += await check(order)
+            timings.append(time.perf_counter() - started)
+        report(label, timings, rejected)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    logging.disable(logging.WARNING)
+    asyncio.run(run(count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Reconnect sync of a long offline queue: one action at a time against batched
+
+Queues a backlog of offline actions (parsed signals, trade opens and closes on
+a pool of tickets) and syncs it with a simulated server round trip per
+request: the previous loop, one request per action plus a fresh connection
+and commit for every status update, against sync_offline_actions, which
+sends per-type bulk requests and writes each batch back in one transaction.
+Another device then changes some tickets, and the batched sync holds those
+actions back as conflicts before sending them.
+
+Usage: python benchmarks/bench_offline_sync.py [actions] [rtt_ms]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.offline import OfflineOperationEngine
+
+
+class SimulatedServerEngine(OfflineOperationEngine):
+    """Sends cost one round trip per request, bulk or single"""
+
+    rtt = 0.0
+    requests = 0
+
+    async def _round_trip(self, count: int):
+        type(self).requests += 1
+        await asyncio.sleep(self.rtt)
+        return [{"success": True} for _ in range(count)]
+
+    async def _sync_single_action(self, action):
+        return (await self._round_trip(1))[0]
+
+    async def _sync_signal_parse_batch(self, payloads):
+        return await self._round_trip(len(payloads))
+
+    async def _sync_trade_open_batch(self, payloads):
+        return await self._round_trip(len(payloads))
+
+    async def _send_action_batch(self, action_type, actions):
+        if action_type == "TRADE_CLOSE":
+            return await self._round_trip(len(actions))
+        return await super()._send_action_batch(action_type, actions)
+
+
+async def queue_backlog(engine: OfflineOperationEngine, count: int, seed: int = 5) -> float:
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+    for i in range(count):
+        kind = rnd.random()
+        if kind < 0.5:
+            await engine._queue_offline_action("SIGNAL_PARSE", {"text": f"BUY EURUSD {i}"})
+        elif kind < 0.8:
+            await engine._queue_offline_action("TRADE_OPEN", {"ticket": i, "symbol": "EURUSD", "volume": 0.1})
+        else:
+            await engine._queue_offline_action("TRADE_CLOSE", {"ticket": rnd.randrange(max(i, 1))})
+    return time.perf_counter() - started
+
+
+async def previous_sync(engine: OfflineOperationEngine) -> dict:
+    """The previous sync_offline_actions: one request and one connection + commit per action"""
+    results = {"successful": 0}
+    for action in await engine._get_unsynced_actions():
+        result = await engine._sync_single_action(action)
+        if result["success"]:
+            conn = sqlite3.connect(engine.offline_db_path)
+            conn.execute("UPDATE offline_actions SET synced = 1, sync_attempts = sync_attempts + 1 WHERE id = ?",
+                         (action["id"],))
+            conn.commit()
+            conn.close()
+            results["successful"] += 1
+    return results
+
+
+async def run(count: int, rtt_ms: float):
+    SimulatedServerEngine.rtt = rtt_ms / 1000.0
+    print(f"{count:,} queued actions, simulated round trip {rtt_ms:.1f}ms per request")
+
+    for label in ("one action at a time", "batched"):
+        engine = SimulatedServerEngine("bench_user", f"{label.split()[0]}.db")
+        await engine._setup_offline_database()
+        queue_seconds = await queue_backlog(engine, count)
+        SimulatedServerEngine.requests = 0
+
+        progress = []
+        started = time.perf_counter()
+        if label == "batched":
+            result = await engine.sync_offline_actions(progress=progress.append)
+        else:
+            result = await previous_sync(engine)
+        elapsed = time.perf_counter() - started
+
+        print(f"  {label:<22} {elapsed:>7.2f}s  {count / elapsed:>9,.0f} actions/s  "
+              f"{SimulatedServerEngine.requests:>6,} requests  synced {result['successful']:,}"
+              + (f"  ({len(progress) - 1} progress updates)" if progress else ""))
+        if label == "batched":
+            print(f"  (queueing took {queue_seconds:.2f}s, {count / queue_seconds:,.0f} actions/s)")
+
+    # Another device closes some tickets while this one is still offline
+    engine = SimulatedServerEngine("bench_user", "conflicts.db")
+    await engine._setup_offline_database()
+    await queue_backlog(engine, count)
+    tickets = [action["entity_key"] for action in await engine._get_unsynced_actions()
+               if action["action_type"] == "TRADE_CLOSE"][:count // 100]
+    engine.record_server_versions({ticket: {"device-other": 1} for ticket in tickets})
+    result = await engine.sync_offline_actions()
+    print(f"  with {len(tickets)} tickets changed elsewhere: {result['successful']:,} synced, "
+          f"{result['conflicts']:,} held as conflicts before sending")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rtt_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        asyncio.run(run(count, rtt_ms))
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
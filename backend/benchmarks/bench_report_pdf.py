@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Event-loop impact of PDF report generation
+
+Seeds a temporary SQLite database, then renders a report with the full trade
+log two ways while a ticker task measures event-loop stalls: inline on the
+loop with all trades loaded as TradeMetrics (the previous endpoint behaviour),
+and through ReportJobManager, which renders in a process pool and streams the
+trade log from the database inside the worker.
+
+Usage: python benchmarks/bench_report_pdf.py [trades]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_analytics_sql import seed
+from core.analytics import AnalyticsEngine, AnalyticsTimeframe, TradeMetrics
+from core.analytics_store import AnalyticsDataStore
+from services.report_jobs import ReportJobManager
+from services.report_pdf import PDFReportBuilder
+
+
+async def ticker(stalls: list, interval: float = 0.01):
+    """Record how late each 10 ms tick fires; a blocked loop shows up as a long stall"""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - started - interval)
+
+
+async def measure(label: str, coro_factory):
+    stalls = []
+    tick = asyncio.create_task(ticker(stalls))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    result = await coro_factory()
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.05)  # let the ticker record the tick delayed by a blocking call
+    tick.cancel()
+    print(f"  {label:<40} total {elapsed * 1000:>8.0f} ms   worst loop stall {max(stalls) * 1000:>8.1f} ms")
+    return result
+
+
+async def run(trades: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        store = AnalyticsDataStore(url)
+        store.create_schema()
+        seed(store, trades, users=1)
+        print(f"Seeded {trades} closed trades")
+
+        engine = AnalyticsEngine(data_store=store)
+        summary = await engine.get_summary_analytics("user_0")
+        providers = await engine.get_provider_analytics()
+        chart_data = await engine.get_performance_chart_data("user_0", AnalyticsTimeframe.DAILY)
+        columns = store.load_trade_columns("user_0")
+
+        async def inline():
+            # Previous endpoint shape: everything in memory, rendered on the loop
+            metrics = [
+                TradeMetrics(trade_id=str(i), symbol=columns.symbols[columns.symbol_codes[i]],
+                             entry_price=0.0, exit_price=0.0, volume=float(columns.volume[i]),
+                             profit_loss=float(columns.pnl[i]), profit_loss_percentage=0.0,
+                             duration_seconds=int(columns.duration[i]), signal_provider=None,
+                             entry_time=datetime(1970, 1, 1) + timedelta(seconds=float(columns.entry_ts[i])),
+                             exit_time=datetime(1970, 1, 1) + timedelta(seconds=float(columns.exit_ts[i])))
+                for i in range(len(columns))
+            ]
+            return PDFReportBuilder().generate_analytics_report(summary, metrics, providers, chart_data)
+
+        pdf = await measure("inline on event loop", inline)
+        print(f"    {len(pdf)} bytes")
+
+        manager = ReportJobManager(max_workers=2, output_dir=os.path.join(tmp, "reports"))
+        request = {
+            "summary": summary, "providers": providers, "chart_data": chart_data, "user_name": "User user_0",
+            "trade_query": {"database_url": url, "user_id": "user_0", "since": None}
+        }
+
+        async def job_stream():
+            job = await manager.submit(request, "user_0")
+            first_byte, size = None, 0
+            started = time.perf_counter()
+            async for chunk in manager.stream(job.job_id):
+                first_byte = first_byte or time.perf_counter() - started
+                size += len(chunk)
+            return job, first_byte, size
+
+        for attempt in ("cold pool", "warm pool, cached chart"):
+            job, first_byte, size = await measure(f"process pool job ({attempt})", job_stream)
+            print(f"    {size} bytes, {job.pages} pages, {job.trade_rows} trade rows, "
+                  f"first byte after {first_byte * 1000:.0f} ms, chart cache hit: {job.chart_cache_hit}")
+
+        manager.shutdown()
+        store.engine.dispose()
+
+
+def main():
+    trades = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    asyncio.run(run(trades))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Webhook delivery throughput against a local HTTP stub
+
+Starts a keep-alive HTTP/1.1 stub server in a separate process (optionally
+adding per-request latency), then delivers the same events to four endpoints
+two ways: the previous per-delivery AsyncClient approach, and WebhookService's
+pooled client with per-endpoint queues and batching.
+
+Usage: python benchmarks/bench_webhooks.py [events] [latency_ms]
+"""
+
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from core.future.webhooks import EventType, WebhookService
+
+ENDPOINTS = [("discord", "/discord"), ("slack", "/slack"), ("generic", "/generic"), ("telegram", "/telegram")]
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok"
+
+
+def run_stub(port: int, latency: float, ready):
+    """Minimal HTTP/1.1 server: reads each request (headers + body) and answers 200 after latency"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                if length:
+                    await reader.readexactly(length)
+                if latency:
+                    await asyncio.sleep(latency)
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+async def legacy_deliver(url: str, payload: dict):
+    """Previous behaviour: a fresh client (and TCP connection) per delivery"""
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.post(url, json=payload)
+        response.raise_for_status()
+
+
+async def run_legacy(service: WebhookService, events: int, concurrency: int = 64) -> float:
+    webhooks = list(service.webhooks.values())
+    semaphore = asyncio.Semaphore(concurrency)
+    event_data = {"symbol": "EURUSD", "type": "BUY", "volume": 0.1, "price": 1.085}
+
+    async def one(i: int, webhook):
+        async with semaphore:
+            from core.future.webhooks import WebhookEvent
+            from datetime import datetime
+            event = WebhookEvent(id=f"e{i}", type=EventType.TRADE_OPENED, data=event_data,
+                                 timestamp=datetime.utcnow())
+            await legacy_deliver(str(webhook.url), service._prepare_payload(webhook, event))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, w) for i in range(events) for w in webhooks))
+    return time.perf_counter() - started
+
+
+async def run_engine(service: WebhookService, events: int) -> float:
+    expected = events * len(service.webhooks)
+    event_data = {"symbol": "EURUSD", "type": "BUY", "volume": 0.1, "price": 1.085}
+    started = time.perf_counter()
+    for _ in range(events):
+        await service.send_event(EventType.TRADE_OPENED, event_data)
+    while service.stats["delivered"] + service.stats["failed"] < expected:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    assert service.stats["failed"] == 0, service.stats
+    return elapsed
+
+
+async def build_service(port: int) -> WebhookService:
+    service = WebhookService()
+    for kind, path in ENDPOINTS:
+        await service.create_webhook({"name": kind, "type": kind, "url": f"http://127.0.0.1:{port}{path}",
+                                      "events": ["trade_opened"]})
+    return service
+
+
+async def run(events: int, latency_ms: float, port: int):
+    deliveries = events * len(ENDPOINTS)
+
+    service = await build_service(port)
+    legacy = await run_legacy(service, events)
+    print(f"  per-delivery client         {deliveries / legacy:>9.0f} deliveries/s  ({legacy:.2f}s)")
+
+    service = await build_service(port)
+    elapsed = await run_engine(service, events)
+    print(f"  pooled engine               {deliveries / elapsed:>9.0f} deliveries/s  ({elapsed:.2f}s, "
+          f"{service.stats['requests']} requests)")
+    await service.close()
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    ready = multiprocessing.Event()
+    stub = multiprocessing.Process(target=run_stub, args=(port, latency_ms / 1000, ready), daemon=True)
+    stub.start()
+    ready.wait(10)
+    try:
+        print(f"{events} events x {len(ENDPOINTS)} endpoints, stub latency {latency_ms} ms")
+        asyncio.run(run(events, latency_ms, port))
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
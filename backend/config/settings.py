@@ -61,12 +61,20 @@ class Settings(BaseSettings):
     SIGNAL_QUEUE_SIZE: int = 1000
     SIGNAL_PROCESSING_TIMEOUT: int = 30
     SIGNAL_RETRY_ATTEMPTS: int = 3
+    PARSER_CASCADE_ORDER: str = "structured,regex,ai,ocr"
+    PARSER_LATENCY_BUDGET_MS: float = 0.0
+    PARSER_MIN_CONFIDENCE: float = 0.7
     
     # Trading
     MAX_DAILY_TRADES: int = 50
     MAX_RISK_PER_TRADE: float = 0.02
     DEFAULT_LOT_SIZE: float = 0.01
     
+    # Reports
+    REPORT_WORKERS: int = 2
+    REPORT_OUTPUT_DIR: str = "./reports"
+    REPORT_JOB_TTL_SECONDS: int = 3600
+    
     # Logging
     LOG_FILE_PATH: str = "./logs/signalos.log"
     LOG_ROTATION_SIZE: str = "10MB"
@@ -90,6 +98,10 @@ class Settings(BaseSettings):
         """Parse CORS origins from string"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
+    def get_parser_cascade_order(self) -> List[str]:
+        """Parse the parser cascade stage order from string"""
+        return [stage.strip() for stage in self.PARSER_CASCADE_ORDER.split(",") if stage.strip()]
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -3,14 +3,19 @@ Analytics System - PnL, WinRate, DD, Latency calculations
 """
 
 import asyncio
+import bisect
+import itertools
 import json
 import statistics
-from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple, Sequence, Union, Callable
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 import math
 
+import numpy as np
+
 from utils.logging_config import get_logger
 # from db.models import Trade, Signal, User  # Will be used in production
 
@@ -99,13 +104,527 @@ class ProviderAnalytics:
         return data
 
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(dt: datetime) -> float:
+    """Naive datetimes are treated as UTC, matching datetime.utcnow() usage"""
+    if dt.tzinfo is None:
+        return (dt - _EPOCH).total_seconds()
+    return dt.timestamp()
+
+
+class TradeColumns:
+    """
+    Columnar trade store: one NumPy array per metric, sorted once by close time.
+    Provider and symbol names are dictionary-encoded as integer codes.
+    """
+    
+    def __init__(self, pnl: np.ndarray, pnl_pct: np.ndarray, volume: np.ndarray,
+                 duration: np.ndarray, entry_ts: np.ndarray, exit_ts: np.ndarray,
+                 provider_codes: np.ndarray, symbol_codes: np.ndarray,
+                 providers: Sequence[Optional[str]], symbols: Sequence[str],
+                 presorted: bool = False):
+        if not presorted and len(exit_ts) > 1:
+            order = np.argsort(exit_ts, kind='stable')
+            pnl, pnl_pct, volume = pnl[order], pnl_pct[order], volume[order]
+            duration, entry_ts, exit_ts = duration[order], entry_ts[order], exit_ts[order]
+            provider_codes, symbol_codes = provider_codes[order], symbol_codes[order]
+        
+        self.pnl = np.asarray(pnl, dtype=np.float64)
+        self.pnl_pct = np.asarray(pnl_pct, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.duration = np.asarray(duration, dtype=np.int64)
+        self.entry_ts = np.asarray(entry_ts, dtype=np.float64)
+        self.exit_ts = np.asarray(exit_ts, dtype=np.float64)
+        self.provider_codes = np.asarray(provider_codes, dtype=np.int32)
+        self.symbol_codes = np.asarray(symbol_codes, dtype=np.int32)
+        self.providers = list(providers)
+        self.symbols = list(symbols)
+    
+    def __len__(self) -> int:
+        return len(self.pnl)
+    
+    @classmethod
+    def from_trades(cls, trades: Sequence[TradeMetrics]) -> 'TradeColumns':
+        """Build columns from TradeMetrics objects"""
+        provider_index: Dict[Optional[str], int] = {}
+        symbol_index: Dict[str, int] = {}
+        provider_codes = [provider_index.setdefault(t.signal_provider, len(provider_index)) for t in trades]
+        symbol_codes = [symbol_index.setdefault(t.symbol, len(symbol_index)) for t in trades]
+        
+        return cls(
+            pnl=np.array([t.profit_loss for t in trades], dtype=np.float64),
+            pnl_pct=np.array([t.profit_loss_percentage for t in trades], dtype=np.float64),
+            volume=np.array([t.volume for t in trades], dtype=np.float64),
+            duration=np.array([t.duration_seconds for t in trades], dtype=np.int64),
+            entry_ts=np.array([_to_epoch(t.entry_time) for t in trades], dtype=np.float64),
+            exit_ts=np.array([_to_epoch(t.exit_time) for t in trades], dtype=np.float64),
+            provider_codes=np.array(provider_codes, dtype=np.int32),
+            symbol_codes=np.array(symbol_codes, dtype=np.int32),
+            providers=list(provider_index),
+            symbols=list(symbol_index)
+        )
+    
+    def select(self, mask: np.ndarray) -> 'TradeColumns':
+        """Subset of rows, keeping the code dictionaries"""
+        return TradeColumns(self.pnl[mask], self.pnl_pct[mask], self.volume[mask], self.duration[mask],
+                            self.entry_ts[mask], self.exit_ts[mask], self.provider_codes[mask],
+                            self.symbol_codes[mask], self.providers, self.symbols, presorted=True)
+    
+    def for_symbol(self, symbol: str) -> 'TradeColumns':
+        if symbol not in self.symbols:
+            return self.select(np.zeros(len(self), dtype=bool))
+        return self.select(self.symbol_codes == self.symbols.index(symbol))
+    
+    def drawdown(self) -> Tuple[float, float]:
+        """Maximum drawdown of the running P&L (peak starts at 0) and its % of the peak"""
+        if len(self) == 0:
+            return 0.0, 0.0
+        running = np.cumsum(self.pnl)
+        peak = np.maximum(np.maximum.accumulate(running), 0.0)
+        drawdowns = peak - running
+        worst = int(np.argmax(drawdowns))
+        max_drawdown = float(drawdowns[worst])
+        if max_drawdown <= 0:
+            return 0.0, 0.0
+        percentage = float(max_drawdown / peak[worst] * 100) if peak[worst] > 0 else 0.0
+        return max_drawdown, percentage
+    
+    def streaks(self) -> Tuple[int, int]:
+        """Longest winning and losing (including break-even) runs"""
+        if len(self) == 0:
+            return 0, 0
+        wins = self.pnl > 0
+        boundaries = np.flatnonzero(wins[1:] != wins[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        lengths = np.diff(np.concatenate((starts, [len(wins)])))
+        run_is_win = wins[starts]
+        max_wins = int(lengths[run_is_win].max()) if run_is_win.any() else 0
+        max_losses = int(lengths[~run_is_win].max()) if (~run_is_win).any() else 0
+        return max_wins, max_losses
+    
+    def sharpe_ratio(self, risk_free_rate: float = 0.02 / 252) -> float:
+        """Per-trade Sharpe ratio of percentage returns"""
+        if len(self) < 2:
+            return 0.0
+        std_return = float(np.std(self.pnl_pct, ddof=1))
+        if std_return == 0:
+            return 0.0
+        return float((np.mean(self.pnl_pct) - risk_free_rate) / std_return)
+    
+    def group_metrics(self, by: str = "symbol") -> Dict[str, Dict[str, Any]]:
+        """Per-symbol or per-provider metrics via group-by reductions over the codes"""
+        if by == "symbol":
+            return self._reduce_groups(self.symbol_codes, self.symbols, "symbol")
+        return self._reduce_groups(self.provider_codes, self.providers, "provider_id")
+    
+    def totals(self, label: str, key: str = "symbol") -> Dict[str, Any]:
+        """Metrics of all rows as a single group"""
+        return self._reduce_groups(np.zeros(len(self), dtype=np.int32), [label], key)[label]
+    
+    def _reduce_groups(self, codes: np.ndarray, names: List[Optional[str]], key: str) -> Dict[str, Dict[str, Any]]:
+        groups = len(names)
+        if len(self) == 0 or groups == 0:
+            return {}
+        
+        counts = np.bincount(codes, minlength=groups)
+        wins = np.bincount(codes, weights=(self.pnl > 0), minlength=groups)
+        pnl_sums = np.bincount(codes, weights=self.pnl, minlength=groups)
+        volume_sums = np.bincount(codes, weights=self.volume, minlength=groups)
+        duration_sums = np.bincount(codes, weights=self.duration, minlength=groups)
+        best = np.full(groups, -np.inf)
+        worst = np.full(groups, np.inf)
+        np.maximum.at(best, codes, self.pnl)
+        np.minimum.at(worst, codes, self.pnl)
+        
+        metrics = {}
+        for code in np.flatnonzero(counts):
+            total = int(counts[code])
+            winning = int(wins[code])
+            total_pnl = float(pnl_sums[code])
+            total_volume = float(volume_sums[code])
+            metrics[names[code]] = {
+                key: names[code],
+                "total_trades": total,
+                "winning_trades": winning,
+                "losing_trades": total - winning,
+                "win_rate": winning / total * 100,
+                "total_pnl": total_pnl,
+                "average_pnl": total_pnl / total,
+                "best_trade": float(best[code]),
+                "worst_trade": float(worst[code]),
+                "average_duration_seconds": int(duration_sums[code] / total),
+                "total_volume": total_volume,
+                "average_volume": total_volume / total
+            }
+        return metrics
+    
+    def current_streaks(self) -> Tuple[int, int]:
+        """Length of the trailing winning or losing run (the other one is 0)"""
+        if len(self) == 0:
+            return 0, 0
+        wins = self.pnl > 0
+        last_win = bool(wins[-1])
+        breaks = np.flatnonzero(wins != last_win)
+        run = len(wins) - (int(breaks[-1]) + 1 if breaks.size else 0)
+        return (run, 0) if last_win else (0, run)
+    
+    def period_codes(self, key_func) -> Tuple[List[str], np.ndarray]:
+        """
+        Sorted period labels and a label code per row. key_func maps a datetime
+        to its label; it is evaluated once per distinct entry day, not per trade.
+        """
+        if len(self) == 0:
+            return [], np.zeros(0, dtype=np.int64)
+        days = self.entry_ts.astype('datetime64[s]').astype('datetime64[D]')
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        day_labels = np.array([key_func(day.astype(datetime)) for day in unique_days.astype('datetime64[s]')])
+        labels, label_index = np.unique(day_labels, return_inverse=True)
+        return labels.tolist(), label_index[day_index.ravel()]
+    
+    def chart_buckets(self, key_func) -> Tuple[List[str], np.ndarray]:
+        """Sum P&L per period label"""
+        labels, codes = self.period_codes(key_func)
+        return labels, np.bincount(codes, weights=self.pnl, minlength=len(labels))
+    
+    def split_by(self, codes: np.ndarray) -> Dict[int, 'TradeColumns']:
+        """Partition rows by code, keeping close-time order inside each part"""
+        if len(self) == 0:
+            return {}
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+        ends = np.concatenate((starts[1:], [len(order)]))
+        return {int(sorted_codes[start]): self.select(order[start:end]) for start, end in zip(starts, ends)}
+
+
+TradeSource = Union[Sequence[TradeMetrics], TradeColumns]
+
+
+def _as_columns(trades: TradeSource) -> TradeColumns:
+    return trades if isinstance(trades, TradeColumns) else TradeColumns.from_trades(trades)
+
+
+class RunningAggregate:
+    """
+    Summary metrics over a stream of closed trades, updated in O(1) per trade.
+    Drawdown and streaks follow the order trades are added (close-time order).
+    """
+    
+    __slots__ = ('count', 'wins', 'losses', 'pnl_sum', 'pnl_pct_sum', 'gross_profit', 'gross_loss',
+                 'volume_sum', 'duration_sum', 'best', 'worst', 'peak', 'max_drawdown',
+                 'max_drawdown_percentage', 'win_streak', 'loss_streak', 'max_win_streak',
+                 'max_loss_streak', 'return_mean', 'return_m2')
+    
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl_sum = 0.0
+        self.pnl_pct_sum = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.volume_sum = 0.0
+        self.duration_sum = 0
+        self.best = -math.inf
+        self.worst = math.inf
+        self.peak = 0.0  # Equity peak of the running P&L, starting from 0
+        self.max_drawdown = 0.0
+        self.max_drawdown_percentage = 0.0
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+        self.return_mean = 0.0  # Welford moments of pnl %
+        self.return_m2 = 0.0
+    
+    def add(self, pnl: float, pnl_pct: float, volume: float, duration: int):
+        """Fold one closed trade into the aggregate"""
+        self.count += 1
+        self.pnl_sum += pnl
+        self.pnl_pct_sum += pnl_pct
+        self.volume_sum += volume
+        self.duration_sum += duration
+        self.best = max(self.best, pnl)
+        self.worst = min(self.worst, pnl)
+        
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+            self.win_streak += 1
+            self.loss_streak = 0
+            self.max_win_streak = max(self.max_win_streak, self.win_streak)
+        else:
+            if pnl < 0:
+                self.losses += 1
+                self.gross_loss += pnl
+            self.loss_streak += 1
+            self.win_streak = 0
+            self.max_loss_streak = max(self.max_loss_streak, self.loss_streak)
+        
+        if self.pnl_sum > self.peak:
+            self.peak = self.pnl_sum
+        drawdown = self.peak - self.pnl_sum
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+            if self.peak > 0:
+                self.max_drawdown_percentage = drawdown / self.peak * 100
+        
+        delta = pnl_pct - self.return_mean
+        self.return_mean += delta / self.count
+        self.return_m2 += delta * (pnl_pct - self.return_mean)
+    
+    def add_trade(self, trade: TradeMetrics):
+        self.add(trade.profit_loss, trade.profit_loss_percentage, trade.volume, trade.duration_seconds)
+    
+    @classmethod
+    def from_columns(cls, columns: TradeColumns) -> 'RunningAggregate':
+        """Initial state for a batch of trades, computed with vectorized ops"""
+        aggregate = cls()
+        if len(columns) == 0:
+            return aggregate
+        pnl = columns.pnl
+        win_mask = pnl > 0
+        loss_mask = pnl < 0
+        
+        aggregate.count = len(columns)
+        aggregate.wins = int(np.count_nonzero(win_mask))
+        aggregate.losses = int(np.count_nonzero(loss_mask))
+        aggregate.pnl_sum = float(pnl.sum())
+        aggregate.pnl_pct_sum = float(columns.pnl_pct.sum())
+        aggregate.gross_profit = float(pnl[win_mask].sum())
+        aggregate.gross_loss = float(pnl[loss_mask].sum())
+        aggregate.volume_sum = float(columns.volume.sum())
+        aggregate.duration_sum = int(columns.duration.sum())
+        aggregate.best = float(pnl.max())
+        aggregate.worst = float(pnl.min())
+        aggregate.peak = max(float(np.cumsum(pnl).max()), 0.0)
+        aggregate.max_drawdown, aggregate.max_drawdown_percentage = columns.drawdown()
+        aggregate.max_win_streak, aggregate.max_loss_streak = columns.streaks()
+        aggregate.win_streak, aggregate.loss_streak = columns.current_streaks()
+        aggregate.return_mean = float(columns.pnl_pct.mean())
+        aggregate.return_m2 = float(((columns.pnl_pct - aggregate.return_mean) ** 2).sum())
+        return aggregate
+    
+    def sharpe_ratio(self, risk_free_rate: float = 0.02 / 252) -> float:
+        if self.count < 2:
+            return 0.0
+        std_return = math.sqrt(self.return_m2 / (self.count - 1))
+        if std_return == 0:
+            return 0.0
+        return (self.return_mean - risk_free_rate) / std_return
+    
+    def to_summary(self) -> AnalyticsSummary:
+        count = self.count
+        return AnalyticsSummary(
+            total_trades=count,
+            winning_trades=self.wins,
+            losing_trades=self.losses,
+            win_rate=(self.wins / count) * 100 if count else 0.0,
+            total_pnl=self.pnl_sum,
+            total_pnl_percentage=self.pnl_pct_sum,
+            average_win=self.gross_profit / self.wins if self.wins else 0,
+            average_loss=self.gross_loss / self.losses if self.losses else 0,
+            profit_factor=(self.gross_profit / abs(self.gross_loss)) if self.losses else float('inf'),
+            max_drawdown=self.max_drawdown,
+            max_drawdown_percentage=self.max_drawdown_percentage,
+            sharpe_ratio=self.sharpe_ratio(),
+            average_trade_duration=int(self.duration_sum / count) if count else 0,
+            best_trade=self.best if count else 0.0,
+            worst_trade=self.worst if count else 0.0,
+            consecutive_wins=self.max_win_streak,
+            consecutive_losses=self.max_loss_streak,
+            total_volume=self.volume_sum,
+            average_latency_ms=85.5 if count else 0.0  # Simulated average latency
+        )
+    
+    def to_symbol_metrics(self, symbol: str) -> Dict[str, Any]:
+        count = self.count
+        return {
+            "symbol": symbol,
+            "total_trades": count,
+            "winning_trades": self.wins,
+            "losing_trades": count - self.wins,
+            "win_rate": (self.wins / count) * 100 if count else 0.0,
+            "total_pnl": self.pnl_sum,
+            "average_pnl": self.pnl_sum / count if count else 0.0,
+            "best_trade": self.best if count else 0.0,
+            "worst_trade": self.worst if count else 0.0,
+            "average_duration_seconds": int(self.duration_sum / count) if count else 0,
+            "total_volume": self.volume_sum,
+            "average_volume": self.volume_sum / count if count else 0.0
+        }
+
+
+# Timeframes with their own period buckets; ALL_TIME charts use daily buckets
+CHART_TIMEFRAMES = (AnalyticsTimeframe.DAILY, AnalyticsTimeframe.WEEKLY,
+                    AnalyticsTimeframe.MONTHLY, AnalyticsTimeframe.YEARLY)
+
+
+class MaterializedAnalytics:
+    """Running aggregates for one user (or all users): overall, per symbol/provider and per period"""
+    
+    def __init__(self, time_key: Callable[[datetime, AnalyticsTimeframe], str]):
+        self.time_key = time_key
+        self.overall = RunningAggregate()
+        self.by_symbol: Dict[str, RunningAggregate] = {}
+        self.by_provider: Dict[Optional[str], RunningAggregate] = {}
+        self.periods: Dict[AnalyticsTimeframe, Dict[str, RunningAggregate]] = {tf: {} for tf in CHART_TIMEFRAMES}
+        self.period_labels: Dict[AnalyticsTimeframe, List[str]] = {tf: [] for tf in CHART_TIMEFRAMES}
+        self.last_exit_ts = -math.inf
+        self.out_of_order = False  # Set when a close is recorded after a later one
+    
+    @classmethod
+    def from_columns(cls, columns: TradeColumns,
+                     time_key: Callable[[datetime, AnalyticsTimeframe], str]) -> 'MaterializedAnalytics':
+        view = cls(time_key)
+        view.overall = RunningAggregate.from_columns(columns)
+        for code, part in columns.split_by(columns.symbol_codes).items():
+            view.by_symbol[columns.symbols[code]] = RunningAggregate.from_columns(part)
+        for code, part in columns.split_by(columns.provider_codes).items():
+            view.by_provider[columns.providers[code]] = RunningAggregate.from_columns(part)
+        for timeframe in CHART_TIMEFRAMES:
+            labels, codes = columns.period_codes(lambda dt: time_key(dt, timeframe))
+            view.period_labels[timeframe] = labels
+            view.periods[timeframe] = {labels[code]: RunningAggregate.from_columns(part)
+                                       for code, part in columns.split_by(codes).items()}
+        if len(columns):
+            view.last_exit_ts = float(columns.exit_ts[-1])
+        return view
+    
+    def add(self, trade: TradeMetrics):
+        """Fold one closed trade into every aggregate of this view"""
+        # Closes arrive in close order, whatever order the trades were opened in
+        exit_ts = _to_epoch(trade.exit_time)
+        if exit_ts < self.last_exit_ts:
+            self.out_of_order = True
+        self.last_exit_ts = max(self.last_exit_ts, exit_ts)
+        
+        self.overall.add_trade(trade)
+        self.by_symbol.setdefault(trade.symbol, RunningAggregate()).add_trade(trade)
+        self.by_provider.setdefault(trade.signal_provider, RunningAggregate()).add_trade(trade)
+        for timeframe in CHART_TIMEFRAMES:
+            label = self.time_key(trade.entry_time, timeframe)
+            periods = self.periods[timeframe]
+            if label not in periods:
+                periods[label] = RunningAggregate()
+                bisect.insort(self.period_labels[timeframe], label)
+            periods[label].add_trade(trade)
+    
+    def summary(self, timeframe: AnalyticsTimeframe, now: datetime) -> Optional[AnalyticsSummary]:
+        """ALL_TIME covers every trade; other timeframes cover the current calendar period"""
+        if timeframe == AnalyticsTimeframe.ALL_TIME:
+            aggregate = self.overall
+        else:
+            aggregate = self.periods[timeframe].get(self.time_key(now, timeframe))
+        if aggregate is None or aggregate.count == 0:
+            return None
+        return aggregate.to_summary()
+    
+    def chart(self, timeframe: AnalyticsTimeframe) -> Tuple[List[str], List[float]]:
+        """Period labels and P&L per period, in label order"""
+        if timeframe not in self.periods:
+            timeframe = AnalyticsTimeframe.DAILY
+        periods = self.periods[timeframe]
+        labels = self.period_labels[timeframe]
+        return labels, [periods[label].pnl_sum for label in labels]
+
+
+class ProviderMaterialization:
+    """Running signal/execution counters for one signal provider"""
+    
+    def __init__(self, provider_id: str, provider_name: str):
+        self.provider_id = provider_id
+        self.provider_name = provider_name
+        self.total_signals = 0
+        self.last_signal_time: Optional[datetime] = None
+        self.executed = 0
+        self.winning = 0
+        self.pnl_sum = 0.0
+        self.symbol_pnl: Dict[str, List[float]] = {}  # symbol -> [pnl sum, executions]
+    
+    @classmethod
+    def from_provider_data(cls, provider_data: Dict[str, Any]) -> 'ProviderMaterialization':
+        view = cls(provider_data.get('id', 'unknown'), provider_data.get('name', 'Unknown Provider'))
+        
+        # Pre-aggregated rows from AnalyticsDataStore
+        if 'symbol_stats' in provider_data:
+            view.total_signals = provider_data.get('total_signals', 0)
+            view.last_signal_time = provider_data.get('last_signal_time')
+            for symbol, stats in provider_data['symbol_stats'].items():
+                view.executed += stats['executed']
+                view.winning += stats['winning']
+                view.pnl_sum += stats['pnl']
+                view.symbol_pnl[symbol] = [stats['pnl'], stats['executed']]
+            return view
+        
+        for signal in provider_data.get('signals', []):
+            view.add_signal(datetime.fromisoformat(signal.get('created_at', datetime.utcnow().isoformat())))
+        for signal in provider_data.get('executed_signals', []):
+            view.add_execution(signal.get('symbol', 'UNKNOWN'), signal.get('profit_loss', 0))
+        return view
+    
+    def add_signal(self, created_at: datetime):
+        self.total_signals += 1
+        if self.last_signal_time is None or created_at > self.last_signal_time:
+            self.last_signal_time = created_at
+    
+    def add_execution(self, symbol: str, pnl: float):
+        self.executed += 1
+        self.pnl_sum += pnl
+        if pnl > 0:
+            self.winning += 1
+        totals = self.symbol_pnl.setdefault(symbol, [0.0, 0])
+        totals[0] += pnl
+        totals[1] += 1
+    
+    def to_analytics(self) -> ProviderAnalytics:
+        best_performing_symbol = "N/A"
+        worst_performing_symbol = "N/A"
+        if self.symbol_pnl:
+            symbol_averages = {symbol: total / count for symbol, (total, count) in self.symbol_pnl.items()}
+            best_performing_symbol = max(symbol_averages, key=symbol_averages.get)
+            worst_performing_symbol = min(symbol_averages, key=symbol_averages.get)
+        
+        return ProviderAnalytics(
+            provider_id=self.provider_id,
+            provider_name=self.provider_name,
+            total_signals=self.total_signals,
+            executed_signals=self.executed,
+            execution_rate=(self.executed / self.total_signals) * 100 if self.total_signals > 0 else 0,
+            win_rate=(self.winning / self.executed) * 100 if self.executed > 0 else 0,
+            average_pnl=self.pnl_sum / self.executed if self.executed else 0,
+            best_performing_symbol=best_performing_symbol,
+            worst_performing_symbol=worst_performing_symbol,
+            average_signal_latency_ms=120.0,  # Simulated
+            last_signal_time=self.last_signal_time or datetime.utcnow()
+        )
+
+
 class AnalyticsEngine:
     """Main analytics calculation engine"""
     
-    def __init__(self):
+    def __init__(self, max_materialized_users: int = 256, data_store=None):
+        """
+        Args:
+            max_materialized_users: Per-user materialized views kept in memory
+            data_store: AnalyticsDataStore reading the trade/signal tables; without
+                        one, or while it holds no trades or signals yet, the
+                        engine serves built-in sample data
+        """
+        self.data_store = data_store
+        self.store_populated = False
         self.cache = {}
         self.cache_timeout = 300  # 5 minutes
         self.last_cache_update = {}
+        
+        # Incremental materializations, built once from the data source and then
+        # updated per closed trade; key None is the all-users view
+        self.max_materialized_users = max_materialized_users
+        self.materialized: "OrderedDict[Optional[str], MaterializedAnalytics]" = OrderedDict()
+        self.provider_views: Optional[Dict[str, ProviderMaterialization]] = None
+        self._build_locks: Dict[Any, asyncio.Lock] = {}
     
     def _should_update_cache(self, cache_key: str) -> bool:
         """Check if cache should be updated"""
@@ -120,28 +639,120 @@ class AnalyticsEngine:
         self.cache[cache_key] = data
         self.last_cache_update[cache_key] = datetime.utcnow()
     
+    async def _get_materialized(self, user_id: Optional[str]) -> MaterializedAnalytics:
+        """Materialized view for a user, built from the data source on first use"""
+        view = self.materialized.get(user_id)
+        if view is not None and not view.out_of_order:
+            self.materialized.move_to_end(user_id)
+            return view
+        
+        lock = self._build_locks.setdefault(('trades', user_id), asyncio.Lock())
+        async with lock:
+            view = self.materialized.get(user_id)
+            if view is None or view.out_of_order:
+                trades = await self._get_trades_data(user_id, AnalyticsTimeframe.ALL_TIME)
+                view = MaterializedAnalytics.from_columns(_as_columns(trades), self._get_time_key)
+                self.materialized[user_id] = view
+                
+                # The all-users view is always kept; per-user views are evicted LRU
+                user_views = [key for key in self.materialized if key is not None]
+                if len(user_views) > self.max_materialized_users:
+                    del self.materialized[user_views[0]]
+            self.materialized.move_to_end(user_id)
+            return view
+    
+    async def _get_provider_views(self) -> Dict[str, ProviderMaterialization]:
+        if self.provider_views is None:
+            async with self._build_locks.setdefault('providers', asyncio.Lock()):
+                if self.provider_views is None:
+                    providers_data = await self._get_provider_data()
+                    self.provider_views = {view.provider_id: view for view in
+                                           map(ProviderMaterialization.from_provider_data, providers_data)}
+        return self.provider_views
+    
+    def record_closed_trade(self, trade: TradeMetrics, user_id: Optional[str] = None):
+        """
+        Fold a newly closed trade into the materialized views in O(1).
+        Views that were not built yet pick the trade up from the data source.
+        """
+        for key in {user_id, None}:
+            view = self.materialized.get(key)
+            if view is not None:
+                view.add(trade)
+        
+        if self.provider_views is not None and trade.signal_provider:
+            view = self.provider_views.get(trade.signal_provider)
+            if view is not None:
+                view.add_execution(trade.symbol, trade.profit_loss)
+    
+    async def record_trade_close(self, trade: TradeMetrics, user_id: str, order_type: int,
+                                 ticket: Optional[int] = None, signal_id: Optional[str] = None,
+                                 provider_name: Optional[str] = None):
+        """
+        Persist a closed trade to the data store and fold it into the materialized views.
+        Trades carry their provider through the signal row they reference.
+        """
+        if self.data_store is not None:
+            if signal_id and trade.signal_provider:
+                await self.record_provider_signal(signal_id, user_id, trade.symbol,
+                                                  "BUY" if order_type % 2 == 0 else "SELL",
+                                                  trade.signal_provider, provider_name, trade.entry_time)
+            await asyncio.to_thread(
+                self.data_store.save_closed_trade, trade.trade_id, user_id, trade.symbol, order_type,
+                trade.volume, trade.entry_price, trade.entry_time, trade.exit_price, trade.exit_time,
+                trade.profit_loss, ticket, signal_id)
+            if not self.store_populated:
+                # Views built from sample data are replaced by the store's
+                self.materialized.clear()
+                self.provider_views = None
+                self.store_populated = True
+                return
+        self.record_closed_trade(trade, user_id)
+    
+    async def _use_store(self) -> bool:
+        """Whether to read from the data store rather than the sample data"""
+        if self.data_store is None:
+            return False
+        if not self.store_populated:
+            try:
+                self.store_populated = await asyncio.to_thread(self.data_store.has_data)
+            except Exception as e:
+                logger.warning(f"Analytics data store unavailable, serving sample data: {e}")
+        return self.store_populated
+    
+    def record_signal(self, provider_id: str, provider_name: str, created_at: Optional[datetime] = None):
+        """Count a new provider signal in the materialized provider views"""
+        if self.provider_views is None:
+            return
+        view = self.provider_views.get(provider_id)
+        if view is None:
+            view = self.provider_views[provider_id] = ProviderMaterialization(provider_id, provider_name)
+        view.add_signal(created_at or datetime.utcnow())
+    
+    async def record_provider_signal(self, signal_id: str, user_id: str, symbol: str, signal_type: str,
+                                     provider_id: str, provider_name: Optional[str] = None,
+                                     created_at: Optional[datetime] = None):
+        """Persist a signal received from a provider and count it in the provider views once"""
+        if self.data_store is not None:
+            inserted = await asyncio.to_thread(
+                self.data_store.save_signal, signal_id, user_id, symbol, signal_type,
+                provider_id, provider_name, created_at)
+            if not inserted:
+                return
+        self.record_signal(provider_id, provider_name or provider_id, created_at)
+    
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop materializations after out-of-band writes so they rebuild on next use"""
+        self.materialized.pop(user_id, None)
+        self.materialized.pop(None, None)
+        self.provider_views = None
+    
     async def get_summary_analytics(self, user_id: str = None, 
                                    timeframe: AnalyticsTimeframe = AnalyticsTimeframe.ALL_TIME) -> AnalyticsSummary:
         """Get summary analytics for user or all users"""
         try:
-            cache_key = f"summary_{user_id or 'all'}_{timeframe.value}"
-            
-            if not self._should_update_cache(cache_key):
-                return self.cache[cache_key]
-            
-            # Get trade data (in production, query from database)
-            trades = await self._get_trades_data(user_id, timeframe)
-            
-            if not trades:
-                return self._get_empty_summary()
-            
-            # Calculate metrics
-            summary = self._calculate_summary_metrics(trades)
-            
-            # Update cache
-            self._update_cache(cache_key, summary)
-            
-            return summary
+            view = await self._get_materialized(user_id)
+            return view.summary(timeframe, datetime.utcnow()) or self._get_empty_summary()
             
         except Exception as e:
             logger.error(f"Error calculating summary analytics: {e}")
@@ -150,23 +761,12 @@ class AnalyticsEngine:
     async def get_provider_analytics(self, provider_id: str = None) -> List[ProviderAnalytics]:
         """Get analytics for signal providers"""
         try:
-            cache_key = f"provider_{provider_id or 'all'}"
-            
-            if not self._should_update_cache(cache_key):
-                return self.cache[cache_key]
+            views = await self._get_provider_views()
             
-            # Get provider data (in production, query from database)
-            providers_data = await self._get_provider_data(provider_id)
+            if provider_id:
+                return [views[provider_id].to_analytics()] if provider_id in views else []
             
-            analytics = []
-            for provider_data in providers_data:
-                provider_analytics = self._calculate_provider_metrics(provider_data)
-                analytics.append(provider_analytics)
-            
-            # Update cache
-            self._update_cache(cache_key, analytics)
-            
-            return analytics
+            return [view.to_analytics() for view in views.values()]
             
         except Exception as e:
             logger.error(f"Error calculating provider analytics: {e}")
@@ -175,24 +775,20 @@ class AnalyticsEngine:
     async def get_symbol_analytics(self, symbol: str, user_id: str = None) -> Dict[str, Any]:
         """Get analytics for specific symbol"""
         try:
-            cache_key = f"symbol_{symbol}_{user_id or 'all'}"
-            
-            if not self._should_update_cache(cache_key):
-                return self.cache[cache_key]
+            view = self.materialized.get(user_id)
+            if view is not None and not view.out_of_order:
+                aggregate = view.by_symbol.get(symbol)
+                if aggregate is None or aggregate.count == 0:
+                    return self._get_empty_symbol_analytics(symbol)
+                return aggregate.to_symbol_metrics(symbol)
             
-            # Get symbol trades data
+            # No materialized view yet: fetch only this symbol's trades
             trades = await self._get_symbol_trades(symbol, user_id)
             
-            if not trades:
+            if len(trades) == 0:
                 return self._get_empty_symbol_analytics(symbol)
             
-            # Calculate symbol-specific metrics
-            analytics = self._calculate_symbol_metrics(trades, symbol)
-            
-            # Update cache
-            self._update_cache(cache_key, analytics)
-            
-            return analytics
+            return self._calculate_symbol_metrics(trades, symbol)
             
         except Exception as e:
             logger.error(f"Error calculating symbol analytics: {e}")
@@ -202,67 +798,77 @@ class AnalyticsEngine:
                                        timeframe: AnalyticsTimeframe = AnalyticsTimeframe.MONTHLY) -> Dict[str, Any]:
         """Get performance chart data"""
         try:
-            cache_key = f"chart_{user_id or 'all'}_{timeframe.value}"
+            view = await self._get_materialized(user_id)
+            labels, period_pnl = view.chart(timeframe)
             
-            if not self._should_update_cache(cache_key):
-                return self.cache[cache_key]
+            if not labels:
+                return {"labels": [], "datasets": []}
             
-            # Get trade data
-            trades = await self._get_trades_data(user_id, timeframe)
-            
-            # Calculate time series data
-            chart_data = self._calculate_chart_data(trades, timeframe)
-            
-            # Update cache
-            self._update_cache(cache_key, chart_data)
-            
-            return chart_data
+            return {
+                "labels": list(labels),
+                "datasets": [
+                    {
+                        "label": "Cumulative P&L",
+                        "data": list(itertools.accumulate(period_pnl)),
+                        "type": "line"
+                    },
+                    {
+                        "label": "Daily P&L",
+                        "data": period_pnl,
+                        "type": "bar"
+                    }
+                ]
+            }
             
         except Exception as e:
             logger.error(f"Error calculating chart data: {e}")
             return {"labels": [], "datasets": []}
     
-    def _calculate_summary_metrics(self, trades: List[TradeMetrics]) -> AnalyticsSummary:
+    def _calculate_summary_metrics(self, trades: TradeSource) -> AnalyticsSummary:
         """Calculate summary metrics from trades"""
-        if not trades:
+        if len(trades) == 0:
             return self._get_empty_summary()
         
-        total_trades = len(trades)
-        winning_trades = len([t for t in trades if t.profit_loss > 0])
-        losing_trades = len([t for t in trades if t.profit_loss < 0])
+        columns = _as_columns(trades)
+        pnl = columns.pnl
+        
+        total_trades = len(columns)
+        win_mask = pnl > 0
+        loss_mask = pnl < 0
+        winning_trades = int(np.count_nonzero(win_mask))
+        losing_trades = int(np.count_nonzero(loss_mask))
         
         win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
         
-        total_pnl = sum(t.profit_loss for t in trades)
-        total_pnl_percentage = sum(t.profit_loss_percentage for t in trades)
+        total_pnl = float(pnl.sum())
+        total_pnl_percentage = float(columns.pnl_pct.sum())
         
-        wins = [t.profit_loss for t in trades if t.profit_loss > 0]
-        losses = [t.profit_loss for t in trades if t.profit_loss < 0]
+        gross_profit = float(pnl[win_mask].sum())
+        gross_loss = float(pnl[loss_mask].sum())
         
-        average_win = statistics.mean(wins) if wins else 0
-        average_loss = statistics.mean(losses) if losses else 0
+        average_win = gross_profit / winning_trades if winning_trades else 0
+        average_loss = gross_loss / losing_trades if losing_trades else 0
         
-        profit_factor = (sum(wins) / abs(sum(losses))) if losses else float('inf')
+        profit_factor = (gross_profit / abs(gross_loss)) if losing_trades else float('inf')
         
         # Calculate drawdown
-        max_drawdown, max_drawdown_percentage = self._calculate_drawdown(trades)
+        max_drawdown, max_drawdown_percentage = columns.drawdown()
         
         # Calculate Sharpe ratio
-        sharpe_ratio = self._calculate_sharpe_ratio(trades)
+        sharpe_ratio = columns.sharpe_ratio()
         
         # Calculate duration statistics
-        durations = [t.duration_seconds for t in trades]
-        average_trade_duration = statistics.mean(durations) if durations else 0
+        average_trade_duration = float(columns.duration.mean())
         
         # Best and worst trades
-        best_trade = max(t.profit_loss for t in trades) if trades else 0
-        worst_trade = min(t.profit_loss for t in trades) if trades else 0
+        best_trade = float(pnl.max())
+        worst_trade = float(pnl.min())
         
         # Consecutive wins/losses
-        consecutive_wins, consecutive_losses = self._calculate_consecutive_stats(trades)
+        consecutive_wins, consecutive_losses = columns.streaks()
         
         # Total volume
-        total_volume = sum(t.volume for t in trades)
+        total_volume = float(columns.volume.sum())
         
         # Average latency (simulated for now)
         average_latency_ms = 85.5  # Simulated average latency
@@ -289,82 +895,17 @@ class AnalyticsEngine:
             average_latency_ms=average_latency_ms
         )
     
-    def _calculate_drawdown(self, trades: List[TradeMetrics]) -> Tuple[float, float]:
+    def _calculate_drawdown(self, trades: TradeSource) -> Tuple[float, float]:
         """Calculate maximum drawdown"""
-        if not trades:
-            return 0.0, 0.0
-        
-        # Sort trades by time
-        sorted_trades = sorted(trades, key=lambda t: t.entry_time)
-        
-        # Calculate running P&L
-        running_pnl = 0
-        peak_pnl = 0
-        max_drawdown = 0
-        max_drawdown_percentage = 0
-        
-        for trade in sorted_trades:
-            running_pnl += trade.profit_loss
-            
-            if running_pnl > peak_pnl:
-                peak_pnl = running_pnl
-            
-            drawdown = peak_pnl - running_pnl
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-                
-                if peak_pnl > 0:
-                    max_drawdown_percentage = (drawdown / peak_pnl) * 100
-        
-        return max_drawdown, max_drawdown_percentage
+        return _as_columns(trades).drawdown()
     
-    def _calculate_sharpe_ratio(self, trades: List[TradeMetrics]) -> float:
+    def _calculate_sharpe_ratio(self, trades: TradeSource) -> float:
         """Calculate Sharpe ratio"""
-        if not trades or len(trades) < 2:
-            return 0.0
-        
-        returns = [t.profit_loss_percentage for t in trades]
-        
-        if not returns:
-            return 0.0
-        
-        mean_return = statistics.mean(returns)
-        std_return = statistics.stdev(returns) if len(returns) > 1 else 0
-        
-        if std_return == 0:
-            return 0.0
-        
-        # Risk-free rate (assumed 2% annually, converted to per-trade)
-        risk_free_rate = 0.02 / 252  # Daily risk-free rate
-        
-        sharpe_ratio = (mean_return - risk_free_rate) / std_return
-        
-        return sharpe_ratio
+        return _as_columns(trades).sharpe_ratio()
     
-    def _calculate_consecutive_stats(self, trades: List[TradeMetrics]) -> Tuple[int, int]:
+    def _calculate_consecutive_stats(self, trades: TradeSource) -> Tuple[int, int]:
         """Calculate consecutive wins and losses"""
-        if not trades:
-            return 0, 0
-        
-        # Sort trades by time
-        sorted_trades = sorted(trades, key=lambda t: t.entry_time)
-        
-        max_consecutive_wins = 0
-        max_consecutive_losses = 0
-        current_consecutive_wins = 0
-        current_consecutive_losses = 0
-        
-        for trade in sorted_trades:
-            if trade.profit_loss > 0:
-                current_consecutive_wins += 1
-                current_consecutive_losses = 0
-                max_consecutive_wins = max(max_consecutive_wins, current_consecutive_wins)
-            else:
-                current_consecutive_losses += 1
-                current_consecutive_wins = 0
-                max_consecutive_losses = max(max_consecutive_losses, current_consecutive_losses)
-        
-        return max_consecutive_wins, max_consecutive_losses
+        return _as_columns(trades).streaks()
     
     def _calculate_provider_metrics(self, provider_data: Dict[str, Any]) -> ProviderAnalytics:
         """Calculate metrics for signal provider"""
@@ -422,87 +963,35 @@ class AnalyticsEngine:
             last_signal_time=last_signal_time
         )
     
-    def _calculate_symbol_metrics(self, trades: List[TradeMetrics], symbol: str) -> Dict[str, Any]:
+    def _calculate_symbol_metrics(self, trades: TradeSource, symbol: str) -> Dict[str, Any]:
         """Calculate metrics for specific symbol"""
-        if not trades:
+        if len(trades) == 0:
             return self._get_empty_symbol_analytics(symbol)
         
-        total_trades = len(trades)
-        winning_trades = len([t for t in trades if t.profit_loss > 0])
-        
-        win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-        total_pnl = sum(t.profit_loss for t in trades)
-        average_pnl = total_pnl / total_trades if total_trades > 0 else 0
-        
-        # Best and worst trades
-        best_trade = max(t.profit_loss for t in trades) if trades else 0
-        worst_trade = min(t.profit_loss for t in trades) if trades else 0
-        
-        # Average duration
-        avg_duration = statistics.mean([t.duration_seconds for t in trades]) if trades else 0
-        
-        # Volume statistics
-        total_volume = sum(t.volume for t in trades)
-        avg_volume = total_volume / total_trades if total_trades > 0 else 0
-        
-        return {
-            "symbol": symbol,
-            "total_trades": total_trades,
-            "winning_trades": winning_trades,
-            "losing_trades": total_trades - winning_trades,
-            "win_rate": win_rate,
-            "total_pnl": total_pnl,
-            "average_pnl": average_pnl,
-            "best_trade": best_trade,
-            "worst_trade": worst_trade,
-            "average_duration_seconds": int(avg_duration),
-            "total_volume": total_volume,
-            "average_volume": avg_volume
-        }
+        # Trades arrive already filtered on the symbol
+        return _as_columns(trades).totals(symbol)
     
-    def _calculate_chart_data(self, trades: List[TradeMetrics], timeframe: AnalyticsTimeframe) -> Dict[str, Any]:
+    def _calculate_chart_data(self, trades: TradeSource, timeframe: AnalyticsTimeframe) -> Dict[str, Any]:
         """Calculate time series chart data"""
-        if not trades:
+        if len(trades) == 0:
             return {"labels": [], "datasets": []}
         
-        # Sort trades by time
-        sorted_trades = sorted(trades, key=lambda t: t.entry_time)
-        
-        # Group trades by time period
-        time_groups = {}
-        for trade in sorted_trades:
-            time_key = self._get_time_key(trade.entry_time, timeframe)
-            if time_key not in time_groups:
-                time_groups[time_key] = []
-            time_groups[time_key].append(trade)
-        
-        # Calculate cumulative P&L
-        labels = []
-        cumulative_pnl = []
-        daily_pnl = []
-        
-        running_pnl = 0
-        for time_key in sorted(time_groups.keys()):
-            trades_in_period = time_groups[time_key]
-            period_pnl = sum(t.profit_loss for t in trades_in_period)
-            
-            running_pnl += period_pnl
-            
-            labels.append(time_key)
-            cumulative_pnl.append(running_pnl)
-            daily_pnl.append(period_pnl)
+        # Group trades by time period and calculate cumulative P&L
+        labels, period_pnl = _as_columns(trades).chart_buckets(
+            lambda dt: self._get_time_key(dt, timeframe))
+        cumulative_pnl = np.cumsum(period_pnl)
         
         return {
             "labels": labels,
             "datasets": [
                 {
                     "label": "Cumulative P&L",
-                    "data": cumulative_pnl,
+                    "data": cumulative_pnl.tolist(),
                     "type": "line"
                 },
                 {
                     "label": "Daily P&L",
-                    "data": daily_pnl,
+                    "data": period_pnl.tolist(),
                     "type": "bar"
                 }
             ]
@@ -562,11 +1051,25 @@ class AnalyticsEngine:
             "average_volume": 0.0
         }
     
+    def period_start(self, timeframe: AnalyticsTimeframe, now: datetime) -> Optional[datetime]:
+        """Start of the current calendar period, matching the _get_time_key buckets"""
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if timeframe == AnalyticsTimeframe.DAILY:
+            return today
+        elif timeframe == AnalyticsTimeframe.WEEKLY:
+            return today - timedelta(days=(today.weekday() + 1) % 7)  # %U weeks start on Sunday
+        elif timeframe == AnalyticsTimeframe.MONTHLY:
+            return today.replace(day=1)
+        elif timeframe == AnalyticsTimeframe.YEARLY:
+            return today.replace(month=1, day=1)
+        return None
+    
     async def _get_trades_data(self, user_id: str = None, 
-                             timeframe: AnalyticsTimeframe = AnalyticsTimeframe.ALL_TIME) -> List[TradeMetrics]:
-        """Get trade data from database (simulated for now)"""
-        # In production, this would query the database
-        # For now, return sample data
+                             timeframe: AnalyticsTimeframe = AnalyticsTimeframe.ALL_TIME) -> TradeSource:
+        """Get closed trades from the database, or sample data until it holds any"""
+        if await self._use_store():
+            since = self.period_start(timeframe, datetime.utcnow())
+            return await asyncio.to_thread(self.data_store.load_trade_columns, user_id, since)
         
         sample_trades = [
             TradeMetrics(
@@ -600,9 +1103,9 @@ class AnalyticsEngine:
         return sample_trades
     
     async def _get_provider_data(self, provider_id: str = None) -> List[Dict[str, Any]]:
-        """Get provider data from database (simulated for now)"""
-        # In production, this would query the database
-        # For now, return sample data
+        """Get provider data from the database, or sample data until it holds any"""
+        if await self._use_store():
+            return await asyncio.to_thread(self.data_store.load_provider_aggregates, provider_id)
         
         sample_providers = [
             {
@@ -633,8 +1136,11 @@ class AnalyticsEngine:
         
         return sample_providers
     
-    async def _get_symbol_trades(self, symbol: str, user_id: str = None) -> List[TradeMetrics]:
+    async def _get_symbol_trades(self, symbol: str, user_id: str = None) -> TradeSource:
         """Get trades for specific symbol"""
+        if await self._use_store():
+            return await asyncio.to_thread(self.data_store.load_trade_columns, user_id, None, symbol)
+        
         all_trades = await self._get_trades_data(user_id)
         return [t for t in all_trades if t.symbol == symbol]
 
@@ -647,5 +1153,17 @@ def get_analytics_engine() -> AnalyticsEngine:
     """Get global analytics engine instance"""
     global _analytics_engine
     if _analytics_engine is None:
-        _analytics_engine = AnalyticsEngine()
-    return _analytics_engine
\ No newline at end of file
+        from core.analytics_store import AnalyticsDataStore
+        data_store = AnalyticsDataStore()
+        try:
+            data_store.create_schema()
+        except Exception as e:
+            logger.error(f"Could not prepare the analytics tables: {e}")
+        _analytics_engine = AnalyticsEngine(data_store=data_store)
+    return _analytics_engine
+
+
+def invalidate_analytics(user_id: Optional[str] = None):
+    """Drop the global engine's materializations after an out-of-band write, if it exists"""
+    if _analytics_engine is not None:
+        _analytics_engine.invalidate(user_id)
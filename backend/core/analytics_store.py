@@ -0,0 +1,234 @@
+"""
+Analytics data access - streams closed trades from the TradeOrder/Signal tables
+into columnar arrays and pushes filters and provider aggregations into SQL
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import create_engine, select, func, case, and_, type_coerce, inspect, update, String
+from sqlalchemy.engine import Engine
+
+from config.settings import get_settings
+from core.analytics import TradeColumns, _to_epoch
+from db.models import Base, Signal, TradeOrder
+from utils.logging_config import get_logger
+
+logger = get_logger("analytics_store")
+
+_trades = TradeOrder.__table__
+_signals = Signal.__table__
+
+
+def _datetimes_to_epoch(values: Sequence[Union[str, datetime]]) -> np.ndarray:
+    """
+    Naive UTC timestamps to epoch seconds. SQLite hands back ISO strings, which
+    NumPy parses in C; drivers returning datetime objects take the Python path.
+    """
+    if values and isinstance(values[0], str):
+        return np.array(values, dtype='datetime64[us]').astype(np.int64) / 1e6
+    return np.array([_to_epoch(value) for value in values], dtype=np.float64)
+
+
+class AnalyticsDataStore:
+    """Read-only access to closed trades and provider statistics for AnalyticsEngine"""
+
+    def __init__(self, database_url: Optional[str] = None, chunk_size: int = 10000,
+                 engine: Optional[Engine] = None):
+        settings = get_settings()
+        url = database_url or settings.DATABASE_URL
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = engine or create_engine(url, connect_args=connect_args)
+        self.chunk_size = chunk_size
+
+    def create_schema(self):
+        """
+        Create the trade/signal tables if missing, and bring existing ones up to
+        date: add the columns analytics reads (nullable, so existing rows are
+        left alone) and the analytics indexes
+        """
+        Base.metadata.create_all(self.engine, tables=[_trades, _signals])
+
+        inspector = inspect(self.engine)
+        with self.engine.begin() as conn:
+            for table in (_trades, _signals):
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                        logger.info(f"Added column {table.name}.{column.name}")
+            for table in (_trades, _signals):
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+    def has_data(self) -> bool:
+        """Whether any closed trade or provider signal has been recorded"""
+        closed = select(_trades.c.id).where(_trades.c.closed_at.isnot(None)).limit(1)
+        signals = select(_signals.c.id).where(_signals.c.provider_id.isnot(None)).limit(1)
+        with self.engine.connect() as conn:
+            return conn.execute(closed).first() is not None or conn.execute(signals).first() is not None
+
+    def save_closed_trade(self, trade_id: str, user_id: str, symbol: str, order_type: int, volume: float,
+                          executed_price: Optional[float], executed_at: Optional[datetime],
+                          close_price: Optional[float], closed_at: datetime, profit_loss: Optional[float],
+                          ticket: Optional[int] = None, signal_id: Optional[str] = None):
+        """Record a closed trade, filling the close columns of its order row (created if missing)"""
+        close_values = {"close_price": close_price, "closed_at": closed_at, "profit_loss": profit_loss}
+        with self.engine.begin() as conn:
+            updated = conn.execute(update(_trades).where(_trades.c.id == trade_id).values(**close_values))
+            if updated.rowcount == 0:
+                conn.execute(_trades.insert().values(
+                    id=trade_id, signal_id=signal_id, user_id=user_id, symbol=symbol, order_type=order_type,
+                    volume=volume, status="EXECUTED", ticket=ticket, executed_price=executed_price,
+                    executed_at=executed_at, **close_values))
+
+    def save_signal(self, signal_id: str, user_id: str, symbol: str, signal_type: str,
+                    provider_id: Optional[str], provider_name: Optional[str] = None,
+                    processed_at: Optional[datetime] = None, raw_text: str = "",
+                    parsing_method: str = "unknown", confidence: str = "UNCERTAIN") -> bool:
+        """Record a provider signal unless it is already stored; returns whether it was inserted"""
+        with self.engine.begin() as conn:
+            if conn.execute(select(_signals.c.id).where(_signals.c.id == signal_id)).first() is not None:
+                return False
+            conn.execute(_signals.insert().values(
+                id=signal_id, user_id=user_id, symbol=symbol, signal_type=signal_type,
+                confidence=confidence, raw_text=raw_text, parsing_method=parsing_method,
+                processed_at=processed_at or datetime.utcnow(), provider_id=provider_id,
+                provider_name=provider_name))
+            return True
+
+    def _closed_trades_query(self, user_id: Optional[str] = None, since: Optional[datetime] = None,
+                             symbol: Optional[str] = None, provider_id: Optional[str] = None):
+        conditions = [_trades.c.closed_at.isnot(None), _trades.c.profit_loss.isnot(None),
+                      _trades.c.executed_at.isnot(None)]
+        if user_id:
+            conditions.append(_trades.c.user_id == user_id)
+        if symbol:
+            conditions.append(_trades.c.symbol == symbol)
+        if since:
+            conditions.append(_trades.c.executed_at >= since)
+        if provider_id:
+            conditions.append(_signals.c.provider_id == provider_id)
+
+        return (
+            # Timestamps are fetched raw (no per-row datetime objects) and parsed per chunk
+            select(type_coerce(_trades.c.executed_at, String), type_coerce(_trades.c.closed_at, String),
+                   _trades.c.profit_loss, _trades.c.executed_price, _trades.c.close_price, _trades.c.volume,
+                   _trades.c.order_type, _trades.c.symbol, _signals.c.provider_id)
+            .select_from(_trades.outerjoin(_signals, _signals.c.id == _trades.c.signal_id))
+            .where(and_(*conditions))
+        )
+
+    def load_trade_columns(self, user_id: Optional[str] = None, since: Optional[datetime] = None,
+                           symbol: Optional[str] = None, provider_id: Optional[str] = None) -> TradeColumns:
+        """
+        Stream matching closed trades in chunks of raw rows (no ORM objects) and
+        assemble them into TradeColumns
+        """
+        chunks: Dict[str, List[np.ndarray]] = {name: [] for name in
+                                               ('pnl', 'pnl_pct', 'volume', 'duration', 'entry', 'exit',
+                                                'provider', 'symbol')}
+        provider_index: Dict[Optional[str], int] = {}
+        symbol_index: Dict[str, int] = {}
+
+        query = self._closed_trades_query(user_id, since, symbol, provider_id)
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+            for rows in result.partitions(self.chunk_size):
+                (executed_at, closed_at, profit_loss, executed_price, close_price,
+                 volume, order_type, symbols, providers) = zip(*rows)
+
+                entry = _datetimes_to_epoch(executed_at)
+                exit_ = _datetimes_to_epoch(closed_at)
+                entry_price = np.array(executed_price, dtype=np.float64)
+                exit_price = np.array(close_price, dtype=np.float64)
+                # MT5 buy-side order types (BUY, BUY_LIMIT, BUY_STOP) are even, sell-side are odd
+                direction = np.where(np.array(order_type, dtype=np.int64) % 2 == 0, 1.0, -1.0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    move = direction * (exit_price - entry_price) / entry_price * 100
+
+                chunks['pnl'].append(np.array(profit_loss, dtype=np.float64))
+                chunks['pnl_pct'].append(np.nan_to_num(move, nan=0.0, posinf=0.0, neginf=0.0))
+                chunks['volume'].append(np.array(volume, dtype=np.float64))
+                chunks['duration'].append(np.maximum(exit_ - entry, 0).astype(np.int64))
+                chunks['entry'].append(entry)
+                chunks['exit'].append(exit_)
+                chunks['provider'].append(np.array(
+                    [provider_index.setdefault(p, len(provider_index)) for p in providers], dtype=np.int32))
+                chunks['symbol'].append(np.array(
+                    [symbol_index.setdefault(s, len(symbol_index)) for s in symbols], dtype=np.int32))
+
+        def column(name: str, dtype) -> np.ndarray:
+            return np.concatenate(chunks[name]) if chunks[name] else np.zeros(0, dtype=dtype)
+
+        return TradeColumns(
+            pnl=column('pnl', np.float64),
+            pnl_pct=column('pnl_pct', np.float64),
+            volume=column('volume', np.float64),
+            duration=column('duration', np.int64),
+            entry_ts=column('entry', np.float64),
+            exit_ts=column('exit', np.float64),
+            provider_codes=column('provider', np.int32),
+            symbol_codes=column('symbol', np.int32),
+            providers=list(provider_index),
+            symbols=list(symbol_index)
+        )
+
+    def iter_trade_rows(self, user_id: Optional[str] = None, since: Optional[datetime] = None,
+                        symbol: Optional[str] = None, provider_id: Optional[str] = None,
+                        limit: Optional[int] = None) -> Iterator[Tuple[float, str, str, float, int]]:
+        """
+        Closed trades, most recent first, as (entry epoch, symbol, side, P&L,
+        duration seconds) rows for the report trade log. Rows are fetched and
+        converted one chunk at a time; limit caps how many are read.
+        """
+        query = (self._closed_trades_query(user_id, since, symbol, provider_id)
+                 .order_by(_trades.c.executed_at.desc()).limit(limit))
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+            for rows in result.partitions(self.chunk_size):
+                executed_at, closed_at, profit_loss, _, _, _, order_type, symbols, _ = zip(*rows)
+                entry = _datetimes_to_epoch(executed_at)
+                duration = np.maximum(_datetimes_to_epoch(closed_at) - entry, 0).astype(np.int64)
+                sides = ["BUY" if order % 2 == 0 else "SELL" for order in order_type]
+                yield from zip(entry.tolist(), symbols, sides, profit_loss, duration.tolist())
+
+    def load_provider_aggregates(self, provider_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-provider signal counts and per-symbol execution totals, grouped in SQL"""
+        signal_query = (
+            select(_signals.c.provider_id, func.max(_signals.c.provider_name),
+                   func.count(), func.max(_signals.c.processed_at))
+            .where(_signals.c.provider_id.isnot(None))
+            .group_by(_signals.c.provider_id)
+        )
+        execution_query = (
+            select(_signals.c.provider_id, _trades.c.symbol, func.count(),
+                   func.sum(case((_trades.c.profit_loss > 0, 1), else_=0)),
+                   func.sum(_trades.c.profit_loss))
+            .select_from(_trades.join(_signals, _signals.c.id == _trades.c.signal_id))
+            .where(and_(_trades.c.closed_at.isnot(None), _trades.c.profit_loss.isnot(None)))
+            .group_by(_signals.c.provider_id, _trades.c.symbol)
+        )
+        if provider_id:
+            signal_query = signal_query.where(_signals.c.provider_id == provider_id)
+            execution_query = execution_query.where(_signals.c.provider_id == provider_id)
+
+        providers: Dict[str, Dict[str, Any]] = {}
+        with self.engine.connect() as conn:
+            for pid, name, total, last_signal in conn.execute(signal_query):
+                providers[pid] = {
+                    "id": pid,
+                    "name": name or pid,
+                    "total_signals": total,
+                    "last_signal_time": last_signal,
+                    "symbol_stats": {}
+                }
+            for pid, symbol, executed, winning, pnl in conn.execute(execution_query):
+                provider = providers.setdefault(pid, {"id": pid, "name": pid, "total_signals": 0,
+                                                      "last_signal_time": None, "symbol_stats": {}})
+                provider["symbol_stats"][symbol] = {"executed": executed, "winning": winning or 0,
+                                                    "pnl": pnl or 0.0}
+
+        return list(providers.values())
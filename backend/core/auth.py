@@ -2,11 +2,15 @@
 Authentication and licensing core module
 """
 
+import calendar
 import jwt
 import hashlib
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from passlib.context import CryptContext
 from pydantic import BaseModel, validator
 
@@ -51,6 +55,7 @@ class TokenData(BaseModel):
     license_key: str
     expires_at: datetime
     token_type: str = "access"  # access or refresh
+    refresh_token_id: Optional[str] = None  # refresh token the access token was issued under
 
 
 class RefreshTokenData(BaseModel):
@@ -76,13 +81,26 @@ class DeviceBinding(BaseModel):
 class AuthService:
     """Authentication service"""
     
-    def __init__(self):
+    def __init__(self, token_cache_size: int = 10000):
         self.secret_key = settings.JWT_SECRET_KEY
         self.algorithm = settings.JWT_ALGORITHM
         self.expiration_hours = settings.JWT_EXPIRATION_HOURS
         self.refresh_expiration_days = 30
         self.device_bindings: Dict[str, DeviceBinding] = {}  # In production, use database
         self.refresh_tokens: Dict[str, RefreshTokenData] = {}  # In production, use database
+        
+        # Key material and decode arguments are prepared once instead of per request
+        self._verify_key = self.secret_key.encode()
+        self._algorithms = [self.algorithm]
+        
+        # Verified tokens: sha256(token) -> (claims, exp epoch, refresh token id).
+        # Signature checks run once per token; exp and revocation are re-checked on every hit.
+        self.token_cache_size = token_cache_size
+        self._verified_tokens: "OrderedDict[bytes, Tuple[TokenData, float, Optional[str]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Revoked refresh token id -> epoch after which no token derived from it can still be valid
+        self.revoked_token_ids: Dict[str, float] = {}
     
     def hash_password(self, password: str) -> str:
         """Hash password"""
@@ -102,8 +120,9 @@ class AuthService:
         license_data = f"{user_id}-{plan_type}-{uuid.uuid4().hex[:8]}"
         return hashlib.sha256(license_data.encode()).hexdigest()[:32].upper()
     
-    def create_access_token(self, token_data: TokenData) -> str:
-        """Create JWT access token"""
+    def create_access_token(self, token_data: TokenData, refresh_token_id: Optional[str] = None) -> str:
+        """Create JWT access token; tokens issued from a refresh token carry its id for revocation"""
+        refresh_token_id = refresh_token_id or token_data.refresh_token_id
         payload = {
             "user_id": token_data.user_id,
             "device_id": token_data.device_id,
@@ -112,6 +131,8 @@ class AuthService:
             "iat": datetime.utcnow(),
             "type": "access"
         }
+        if refresh_token_id:
+            payload["rid"] = refresh_token_id
         
         token = jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
         logger.info(f"Access token created for user {token_data.user_id}")
@@ -120,6 +141,15 @@ class AuthService:
     
     def create_refresh_token(self, user_id: str, device_id: str) -> str:
         """Create JWT refresh token"""
+        return self._issue_refresh_token(user_id, device_id)[0]
+    
+    def create_session_tokens(self, token_data: TokenData) -> Tuple[str, str]:
+        """Access and refresh token pair for a login; revoking the refresh token revokes both"""
+        refresh_token, token_id = self._issue_refresh_token(token_data.user_id, token_data.device_id)
+        return self.create_access_token(token_data, refresh_token_id=token_id), refresh_token
+    
+    def _issue_refresh_token(self, user_id: str, device_id: str) -> Tuple[str, str]:
+        """Signed refresh token and its id"""
         token_id = uuid.uuid4().hex
         expires_at = datetime.utcnow() + timedelta(days=self.refresh_expiration_days)
         
@@ -145,28 +175,79 @@ class AuthService:
         self.refresh_tokens[token_id] = refresh_data
         
         logger.info(f"Refresh token created for user {user_id}")
-        return token
+        return token, token_id
     
     def verify_token(self, token: str) -> Optional[TokenData]:
         """Verify JWT token"""
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._cache_lock:
+            cached = self._verified_tokens.get(digest)
+            if cached is not None:
+                self._verified_tokens.move_to_end(digest)
+        
+        if cached is not None:
+            token_data, expires_ts, refresh_token_id = cached
+            if time.time() >= expires_ts:
+                self._forget_token(digest)
+                logger.warning("Token has expired")
+                return None
+            if refresh_token_id is not None and refresh_token_id in self.revoked_token_ids:
+                self._forget_token(digest)
+                logger.warning("Token has been revoked")
+                return None
+            return token_data.model_copy()
+        
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(token, self._verify_key, algorithms=self._algorithms)
+            
+            refresh_token_id = payload.get("rid") or payload.get("token_id")
+            if refresh_token_id is not None and refresh_token_id in self.revoked_token_ids:
+                logger.warning("Token has been revoked")
+                return None
             
             token_data = TokenData(
                 user_id=payload["user_id"],
                 device_id=payload["device_id"],
                 license_key=payload["license_key"],
-                expires_at=datetime.fromtimestamp(payload["exp"])
+                expires_at=datetime.fromtimestamp(payload["exp"]),
+                refresh_token_id=payload.get("rid")
             )
             
-            return token_data
-            
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
             return None
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid token: {e}")
             return None
+        except KeyError as e:
+            logger.warning(f"Invalid token: missing claim {e}")
+            return None
+        
+        if self.token_cache_size > 0:
+            with self._cache_lock:
+                self._verified_tokens[digest] = (token_data, float(payload["exp"]), refresh_token_id)
+                if len(self._verified_tokens) > self.token_cache_size:
+                    self._verified_tokens.popitem(last=False)
+        
+        return token_data.model_copy()
+    
+    def _forget_token(self, digest: bytes):
+        with self._cache_lock:
+            self._verified_tokens.pop(digest, None)
+    
+    def clear_token_cache(self):
+        """Drop all verified-token entries, e.g. after rotating the signing key"""
+        with self._cache_lock:
+            self._verified_tokens.clear()
+    
+    def extract_bearer_claims(self, authorization: Optional[str]) -> Optional[TokenData]:
+        """Claims for an "Authorization: Bearer <jwt>" header value, or None"""
+        if not authorization:
+            return None
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return self.verify_token(token.strip())
     
     def bind_device(self, user_id: str, device_uuid: str, ip_address: str, user_agent: str) -> DeviceBinding:
         """Bind device to user account"""
@@ -229,16 +310,23 @@ class AuthService:
                 expires_at=expires_at
             )
             
-            return self.create_access_token(token_data)
+            return self.create_access_token(token_data, refresh_token_id=token_id)
             
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid refresh token: {e}")
             return None
     
     def revoke_refresh_token(self, token_id: str) -> bool:
-        """Revoke refresh token"""
+        """Revoke refresh token and every access token issued from it"""
         if token_id in self.refresh_tokens:
-            del self.refresh_tokens[token_id]
+            refresh_data = self.refresh_tokens.pop(token_id)
+            
+            # Derived access tokens may outlive the refresh token by one access lifetime
+            now = time.time()
+            valid_until = max(calendar.timegm(refresh_data.expires_at.utctimetuple()), now) + self.expiration_hours * 3600
+            self.revoked_token_ids = {tid: until for tid, until in self.revoked_token_ids.items() if until > now}
+            self.revoked_token_ids[token_id] = valid_until
+            
             logger.info(f"Refresh token {token_id} revoked")
             return True
         return False
@@ -319,4 +407,16 @@ class LicenseValidator:
                 "advanced_strategies": True,
                 "telegram_integration": True
             }
-        }
\ No newline at end of file
+        }
+
+
+# Global auth service instance
+_auth_service = None
+
+
+def get_auth_service() -> AuthService:
+    """Get global auth service instance, shared by the API, auth middleware and rate limiter"""
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService()
+    return _auth_service
@@ -1,14 +1,24 @@
 """
 SignalOS Compliance & Regulatory Mode System
 Handles prop firm requirements and regulatory compliance
+
+When compliance mode is activated, the user's profile (with any custom
+restrictions applied) is compiled into a ComplianceEvaluator. The evaluator
+runs only the checks the profile actually sets, always in the same order.
+Symbol sets are prebuilt, forbidden-pattern matches are memoized per symbol,
+and trading hours are parsed once. Daily stats are seeded once and then
+updated from trade events, so validate_trade does no I/O and builds nothing
+for a trade that passes.
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union
+import time
+from typing import Dict, List, Optional, Any, Union, Callable, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, replace
 
 from db.models import ComplianceProfile, UserCompliance
 from utils.logging_config import get_logger
@@ -60,6 +70,231 @@ class ComplianceRule:
     is_active: bool = True
 
 
+def _next_midnight(now: float) -> float:
+    """Epoch seconds of the next local midnight after now"""
+    tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+    return datetime(tomorrow.year, tomorrow.month, tomorrow.day).timestamp()
+
+
+@dataclass
+class DailyTradingStats:
+    """Running trading stats for one user's day, updated from trade events
+
+    daily_loss and drawdown are fractions of the day's starting balance and of
+    peak equity. They can only be derived once a balance is known; until then
+    they keep their seeded values.
+    """
+    trade_count: int = 0
+    open_positions: int = 0
+    profit_loss: float = 0.0
+    daily_loss: float = 0.0
+    drawdown: float = 0.0
+    start_balance: Optional[float] = None
+    equity: Optional[float] = None
+    peak_equity: Optional[float] = None
+    day_ends_at: float = field(default_factory=lambda: _next_midnight(time.time()))
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "DailyTradingStats":
+        """Seed from a _get_daily_trading_stats result"""
+        stats = cls(
+            trade_count=int(snapshot.get("trade_count", 0)),
+            open_positions=int(snapshot.get("open_positions", 0)),
+            profit_loss=float(snapshot.get("profit_loss", 0.0)),
+            daily_loss=float(snapshot.get("daily_loss", 0.0)),
+            drawdown=float(snapshot.get("drawdown", 0.0))
+        )
+        balance = snapshot.get("balance")
+        if balance is None and stats.daily_loss > 0 and stats.profit_loss < 0:
+            # The loss fraction and the loss amount give the day's starting balance
+            balance = stats.start_balance_from_loss()
+        if balance is not None:
+            stats.start_balance = float(balance)
+            stats.equity = stats.start_balance + stats.profit_loss
+            stats.peak_equity = stats.equity / (1.0 - stats.drawdown) if stats.drawdown < 1.0 else stats.equity
+        return stats
+    
+    def start_balance_from_loss(self) -> float:
+        return -self.profit_loss / self.daily_loss
+    
+    def roll_over(self, now: float):
+        """Start a new day: counters reset, equity and its peak carry over"""
+        self.trade_count = 0
+        self.profit_loss = 0.0
+        self.daily_loss = 0.0
+        self.start_balance = self.equity
+        self.day_ends_at = _next_midnight(now)
+    
+    def apply(self, event_type: str, profit: float = 0.0, balance: Optional[float] = None):
+        """Update from one trade event: opened, closed (with its profit) or a new balance"""
+        if event_type == "opened":
+            self.trade_count += 1
+            self.open_positions += 1
+            return
+        
+        if event_type == "closed":
+            self.open_positions = max(0, self.open_positions - 1)
+            self.profit_loss += profit
+            if self.equity is not None:
+                self.equity += profit
+        elif event_type == "balance":
+            self.equity = balance
+            if self.start_balance is None:
+                self.start_balance = balance - self.profit_loss
+        else:
+            raise ValueError(f"Unknown trade event: {event_type}")
+        
+        if self.equity is not None:
+            self.peak_equity = self.equity if self.peak_equity is None else max(self.peak_equity, self.equity)
+            if self.start_balance:
+                self.daily_loss = max(0.0, -self.profit_loss) / self.start_balance
+            if self.peak_equity:
+                self.drawdown = max(0.0, self.peak_equity - self.equity) / self.peak_equity
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trade_count": self.trade_count,
+            "open_positions": self.open_positions,
+            "daily_loss": self.daily_loss,
+            "drawdown": self.drawdown,
+            "profit_loss": self.profit_loss,
+            "equity": self.equity
+        }
+
+
+# Distinct symbols whose forbidden-pattern matches an evaluator remembers
+SYMBOL_MEMO_SIZE = 4096
+
+
+class ComplianceEvaluator:
+    """A user's compliance profile compiled into a fixed sequence of checks
+    
+    Checks the profile does not set are left out. Each check appends a
+    violation only when it fails, in the same order validate_trade has always
+    reported them.
+    """
+    
+    def __init__(self, profile_name: str, restrictions: TradingRestriction):
+        self.profile_name = profile_name
+        self.restrictions = restrictions
+        self.forbidden_patterns: Tuple[str, ...] = tuple(restrictions.forbidden_symbols or ())
+        self.allowed_symbols = frozenset(restrictions.allowed_symbols or ())
+        self._forbidden_matches: Dict[str, Tuple[str, ...]] = {}
+        
+        if restrictions.trading_hours:
+            self.trading_start = datetime.strptime(restrictions.trading_hours["start"], "%H:%M").time()
+            self.trading_end = datetime.strptime(restrictions.trading_hours["end"], "%H:%M").time()
+            self.hours_message = (f"Trading outside allowed hours "
+                                  f"({restrictions.trading_hours['start']}-{restrictions.trading_hours['end']})")
+        
+        # Fixed check order; trade checks first, then the daily limits
+        candidates = [
+            (restrictions.max_lot_size, self._check_lot_size),
+            (self.forbidden_patterns, self._check_forbidden_symbols),
+            (self.allowed_symbols, self._check_allowed_symbols),
+            (restrictions.stop_loss_required, self._check_stop_loss),
+            (restrictions.take_profit_required, self._check_take_profit),
+            (restrictions.trading_hours, self._check_trading_hours),
+            (restrictions.max_daily_trades, self._check_daily_trades),
+            (restrictions.max_daily_loss, self._check_daily_loss),
+            (restrictions.max_drawdown, self._check_drawdown)
+        ]
+        self.checks: Tuple[Callable[[Dict[str, Any], DailyTradingStats, List[Dict[str, Any]]], None], ...] = tuple(
+            check for enabled, check in candidates if enabled
+        )
+    
+    def evaluate(self, trade_params: Dict[str, Any], stats: DailyTradingStats) -> List[Dict[str, Any]]:
+        """Violations for one trade; an empty list when it passes"""
+        violations: List[Dict[str, Any]] = []
+        for check in self.checks:
+            check(trade_params, stats, violations)
+        return violations
+    
+    def forbidden_matches(self, symbol: str) -> Tuple[str, ...]:
+        """Forbidden patterns contained in symbol, memoized per symbol"""
+        matches = self._forbidden_matches.get(symbol)
+        if matches is None:
+            matches = tuple(pattern for pattern in self.forbidden_patterns if pattern in symbol)
+            if len(self._forbidden_matches) >= SYMBOL_MEMO_SIZE:
+                self._forbidden_matches.clear()
+            self._forbidden_matches[symbol] = matches
+        return matches
+    
+    def _check_lot_size(self, trade_params, stats, violations):
+        if trade_params.get("volume", 0) > self.restrictions.max_lot_size:
+            violations.append({
+                "rule": "max_lot_size",
+                "message": f"Lot size {trade_params.get('volume')} exceeds maximum {self.restrictions.max_lot_size}",
+                "severity": "high"
+            })
+    
+    def _check_forbidden_symbols(self, trade_params, stats, violations):
+        symbol = trade_params.get("symbol", "")
+        for forbidden in self.forbidden_matches(symbol):
+            violations.append({
+                "rule": "forbidden_symbol",
+                "message": f"Symbol {symbol} contains forbidden pattern {forbidden}",
+                "severity": "critical"
+            })
+    
+    def _check_allowed_symbols(self, trade_params, stats, violations):
+        symbol = trade_params.get("symbol", "")
+        if symbol not in self.allowed_symbols:
+            violations.append({
+                "rule": "allowed_symbols",
+                "message": f"Symbol {symbol} not in allowed symbols list",
+                "severity": "high"
+            })
+    
+    def _check_stop_loss(self, trade_params, stats, violations):
+        if not trade_params.get("sl"):
+            violations.append({
+                "rule": "stop_loss_required",
+                "message": "Stop loss is required for all trades",
+                "severity": "high"
+            })
+    
+    def _check_take_profit(self, trade_params, stats, violations):
+        if not trade_params.get("tp"):
+            violations.append({
+                "rule": "take_profit_required",
+                "message": "Take profit is required for all trades",
+                "severity": "high"
+            })
+    
+    def _check_trading_hours(self, trade_params, stats, violations):
+        if not (self.trading_start <= datetime.now().time() <= self.trading_end):
+            violations.append({
+                "rule": "trading_hours",
+                "message": self.hours_message,
+                "severity": "medium"
+            })
+    
+    def _check_daily_trades(self, trade_params, stats, violations):
+        if stats.trade_count >= self.restrictions.max_daily_trades:
+            violations.append({
+                "rule": "max_daily_trades",
+                "message": f"Daily trade limit ({self.restrictions.max_daily_trades}) exceeded",
+                "severity": "high"
+            })
+    
+    def _check_daily_loss(self, trade_params, stats, violations):
+        if stats.daily_loss >= self.restrictions.max_daily_loss:
+            violations.append({
+                "rule": "max_daily_loss",
+                "message": f"Daily loss limit ({self.restrictions.max_daily_loss * 100}%) exceeded",
+                "severity": "critical"
+            })
+    
+    def _check_drawdown(self, trade_params, stats, violations):
+        if stats.drawdown >= self.restrictions.max_drawdown:
+            violations.append({
+                "rule": "max_drawdown",
+                "message": f"Maximum drawdown ({self.restrictions.max_drawdown * 100}%) exceeded",
+                "severity": "critical"
+            })
+
+
 class ComplianceEngine:
     """Core compliance and regulatory engine"""
     
@@ -68,6 +303,10 @@ class ComplianceEngine:
         self.compliance_rules = {}
         self.violation_history = {}
         
+        # Per-user compiled profiles and running daily stats
+        self.evaluators: Dict[str, ComplianceEvaluator] = {}
+        self.daily_stats: Dict[str, DailyTradingStats] = {}
+        
     async def initialize(self):
         """Initialize compliance engine"""
         try:
@@ -271,6 +510,9 @@ class ComplianceEngine:
                 "violations": []
             }
             
+            # Compile the profile now, so validating a trade does no setup
+            await self._compile_evaluator(user_id)
+            
             # Update database
             await self._update_user_compliance_db(user_id, profile_name, custom_restrictions)
             
@@ -293,6 +535,7 @@ class ComplianceEngine:
         try:
             if user_id in self.active_profiles:
                 del self.active_profiles[user_id]
+            self.evaluators.pop(user_id, None)
             
             # Update database
             await self._deactivate_user_compliance_db(user_id)
@@ -316,101 +559,25 @@ class ComplianceEngine:
             if user_id not in self.active_profiles:
                 return {"valid": True, "message": "No compliance mode active"}
             
-            profile = self.active_profiles[user_id]
-            restrictions = profile["profile"]["restrictions"]
-            rules = profile["profile"]["rules"]
+            evaluator = self.evaluators.get(user_id)
+            if evaluator is None:
+                evaluator = await self._compile_evaluator(user_id)
             
-            violations = []
+            stats = self.daily_stats[user_id]
+            if time.time() >= stats.day_ends_at:
+                stats.roll_over(time.time())
             
-            # Check lot size
-            if restrictions.max_lot_size and trade_params.get("volume", 0) > restrictions.max_lot_size:
-                violations.append({
-                    "rule": "max_lot_size",
-                    "message": f"Lot size {trade_params.get('volume')} exceeds maximum {restrictions.max_lot_size}",
-                    "severity": "high"
-                })
-            
-            # Check symbol restrictions
-            symbol = trade_params.get("symbol", "")
-            if restrictions.forbidden_symbols:
-                for forbidden in restrictions.forbidden_symbols:
-                    if forbidden in symbol:
-                        violations.append({
-                            "rule": "forbidden_symbol",
-                            "message": f"Symbol {symbol} contains forbidden pattern {forbidden}",
-                            "severity": "critical"
-                        })
-            
-            if restrictions.allowed_symbols and symbol not in restrictions.allowed_symbols:
-                violations.append({
-                    "rule": "allowed_symbols",
-                    "message": f"Symbol {symbol} not in allowed symbols list",
-                    "severity": "high"
-                })
-            
-            # Check stop loss requirement
-            if restrictions.stop_loss_required and not trade_params.get("sl"):
-                violations.append({
-                    "rule": "stop_loss_required",
-                    "message": "Stop loss is required for all trades",
-                    "severity": "high"
-                })
-            
-            # Check take profit requirement
-            if restrictions.take_profit_required and not trade_params.get("tp"):
-                violations.append({
-                    "rule": "take_profit_required",
-                    "message": "Take profit is required for all trades",
-                    "severity": "high"
-                })
-            
-            # Check trading hours
-            if restrictions.trading_hours:
-                current_time = datetime.now().time()
-                start_time = datetime.strptime(restrictions.trading_hours["start"], "%H:%M").time()
-                end_time = datetime.strptime(restrictions.trading_hours["end"], "%H:%M").time()
-                
-                if not (start_time <= current_time <= end_time):
-                    violations.append({
-                        "rule": "trading_hours",
-                        "message": f"Trading outside allowed hours ({restrictions.trading_hours['start']}-{restrictions.trading_hours['end']})",
-                        "severity": "medium"
-                    })
-            
-            # Check daily limits
-            daily_stats = await self._get_daily_trading_stats(user_id)
-            
-            if restrictions.max_daily_trades and daily_stats["trade_count"] >= restrictions.max_daily_trades:
-                violations.append({
-                    "rule": "max_daily_trades",
-                    "message": f"Daily trade limit ({restrictions.max_daily_trades}) exceeded",
-                    "severity": "high"
-                })
-            
-            if restrictions.max_daily_loss and daily_stats["daily_loss"] >= restrictions.max_daily_loss:
-                violations.append({
-                    "rule": "max_daily_loss",
-                    "message": f"Daily loss limit ({restrictions.max_daily_loss * 100}%) exceeded",
-                    "severity": "critical"
-                })
-            
-            # Check drawdown
-            if restrictions.max_drawdown and daily_stats["drawdown"] >= restrictions.max_drawdown:
-                violations.append({
-                    "rule": "max_drawdown",
-                    "message": f"Maximum drawdown ({restrictions.max_drawdown * 100}%) exceeded",
-                    "severity": "critical"
-                })
+            violations = evaluator.evaluate(trade_params, stats)
             
             # Log violations
             if violations:
                 await self._log_compliance_violations(user_id, violations)
             
             return {
-                "valid": len(violations) == 0,
+                "valid": not violations,
                 "violations": violations,
-                "critical_violations": len([v for v in violations if v["severity"] == "critical"]),
-                "profile": profile["profile_name"]
+                "critical_violations": sum(1 for v in violations if v["severity"] == "critical"),
+                "profile": evaluator.profile_name
             }
             
         except Exception as e:
@@ -420,6 +587,53 @@ class ComplianceEngine:
                 "error": str(e)
             }
     
+    async def _compile_evaluator(self, user_id: str) -> ComplianceEvaluator:
+        """Compile the user's active profile and seed their daily stats"""
+        profile = self.active_profiles[user_id]
+        restrictions = profile["profile"]["restrictions"]
+        
+        # Custom restrictions override the profile's, field by field
+        custom = profile.get("custom_restrictions") or {}
+        known = {f.name for f in fields(TradingRestriction)}
+        unknown = sorted(set(custom) - known)
+        if unknown:
+            logger.warning(f"Ignoring unknown custom restrictions for user {user_id}: {', '.join(unknown)}")
+        overrides = {name: value for name, value in custom.items() if name in known}
+        if overrides:
+            restrictions = replace(restrictions, **overrides)
+        
+        evaluator = ComplianceEvaluator(profile["profile_name"], restrictions)
+        self.evaluators[user_id] = evaluator
+        
+        # Stats are read once; trade events keep them current from here on
+        if user_id not in self.daily_stats:
+            self.daily_stats[user_id] = DailyTradingStats.from_snapshot(
+                await self._get_daily_trading_stats(user_id))
+        
+        return evaluator
+    
+    def record_trade_event(self, user_id: str, event_type: str, profit: float = 0.0,
+                           balance: Optional[float] = None):
+        """Update a user's daily stats from a trade event
+        
+        event_type is "opened" for a new trade, "closed" with its realized
+        profit, or "balance" with the current account balance.
+        """
+        stats = self.daily_stats.get(user_id)
+        if stats is None:
+            # Not tracked yet; activation seeds the stats from the trade history
+            return
+        
+        now = time.time()
+        if now >= stats.day_ends_at:
+            stats.roll_over(now)
+        stats.apply(event_type, profit, balance)
+    
+    def get_daily_stats(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Current daily stats for a user, if any are being kept"""
+        stats = self.daily_stats.get(user_id)
+        return stats.to_dict() if stats else None
+    
     async def _get_daily_trading_stats(self, user_id: str) -> Dict[str, Any]:
         """Get daily trading statistics for user"""
         # This would query your database for daily stats
@@ -581,9 +795,9 @@ class ComplianceEngine:
             
             # Validate profile data
             required_fields = ["name", "description", "restrictions"]
-            for field in required_fields:
-                if field not in profile_data:
-                    raise ValueError(f"Missing required field: {field}")
+            for field_name in required_fields:
+                if field_name not in profile_data:
+                    raise ValueError(f"Missing required field: {field_name}")
             
             # Create custom profile
             custom_profile = {
@@ -680,4 +894,21 @@ class ComplianceEngine:
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+
+# Global compliance engine instance, so activations and daily stats outlive a request
+_compliance_engine: Optional[ComplianceEngine] = None
+_compliance_engine_lock = asyncio.Lock()
+
+
+async def get_compliance_engine() -> ComplianceEngine:
+    """Get the global compliance engine, initialized on first use"""
+    global _compliance_engine
+    if _compliance_engine is None:
+        async with _compliance_engine_lock:
+            if _compliance_engine is None:
+                engine = ComplianceEngine()
+                await engine.initialize()
+                _compliance_engine = engine
+    return _compliance_engine
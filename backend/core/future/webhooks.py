@@ -3,11 +3,14 @@ Future Phase: Webhook system for Discord/Slack/Telegram notifications
 """
 
 import asyncio
+import heapq
+import itertools
 import json
 import httpx
-from typing import Dict, List, Optional, Any, Union
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Any, Set, Tuple, Union
 from pydantic import BaseModel, Field, HttpUrl
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
 from utils.logging_config import get_logger
@@ -15,6 +18,16 @@ from utils.logging_config import get_logger
 logger = get_logger("webhooks")
 
 
+# Most events one request may carry, per target: Discord allows 10 embeds per
+# message, Slack ~20 attachments; Telegram messages are sent one at a time
+BATCH_LIMITS = {
+    "discord": 10,
+    "slack": 20,
+    "telegram": 1,
+    "generic": 100
+}
+
+
 class WebhookType(str, Enum):
     """Webhook types"""
     DISCORD = "discord"
@@ -48,6 +61,8 @@ class WebhookConfig(BaseModel):
     timeout: int = 30
     headers: Dict[str, str] = {}
     template: Optional[str] = None
+    max_concurrency: int = 4  # Requests in flight to this endpoint
+    batch_max_events: Optional[int] = None  # None: target default (generic endpoints are not batched)
     created_at: datetime
     updated_at: datetime
     
@@ -77,6 +92,8 @@ class WebhookDelivery(BaseModel):
     response_body: Optional[str] = None
     error_message: Optional[str] = None
     attempts: int = 0
+    batch_size: int = 1
+    next_attempt_at: Optional[datetime] = None
     delivered_at: Optional[datetime] = None
     created_at: datetime
     
@@ -84,17 +101,73 @@ class WebhookDelivery(BaseModel):
         from_attributes = True
 
 
+class _PendingDelivery:
+    """A delivery waiting in an endpoint queue or the retry queue"""
+    __slots__ = ('delivery', 'payload', 'done')
+    
+    def __init__(self, delivery: WebhookDelivery, payload: Dict[str, Any],
+                 done: Optional[asyncio.Future] = None):
+        self.delivery = delivery
+        self.payload = payload
+        self.done = done
+
+
 class WebhookService:
-    """Webhook service for event notifications"""
+    """
+    Webhook service for event notifications
+    
+    Deliveries go through one pooled keep-alive HTTP client. Each endpoint has
+    a queue drained by at most max_concurrency in-flight requests, events
+    queued together are batched into one request where the target supports
+    it, and failed deliveries wait on a delay queue instead of in sleeping
+    tasks. Delivery history is capped at max_history entries.
+    """
     
-    def __init__(self):
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 max_history: int = 10000, max_retry_delay: float = 300.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
         self.webhooks: Dict[str, WebhookConfig] = {}
-        self.deliveries: Dict[str, WebhookDelivery] = {}
+        self.deliveries: "OrderedDict[str, WebhookDelivery]" = OrderedDict()
+        self.max_history = max_history
+        self.max_retry_delay = max_retry_delay
         self.templates = {
             "discord": self._get_discord_template(),
             "slack": self._get_slack_template(),
             "telegram": self._get_telegram_template()
         }
+        
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_keepalive_connections)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        self._queues: Dict[str, Deque[_PendingDelivery]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._sequence = itertools.count(1)
+        
+        # Delay queue: (due loop time, sequence, webhook id, pending delivery)
+        self._retry_heap: List[Tuple[float, int, str, _PendingDelivery]] = []
+        self._retry_wakeup: Optional[asyncio.Event] = None
+        self._retry_task: Optional[asyncio.Task] = None
+        
+        self.stats = {"requests": 0, "delivered": 0, "failed": 0, "retried": 0}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self._limits, transport=self._transport)
+        return self._client
+    
+    async def close(self):
+        """Stop the retry scheduler and close pooled connections"""
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            self._retry_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def create_webhook(self, webhook_data: Dict[str, Any]) -> WebhookConfig:
         """Create new webhook"""
@@ -176,12 +249,15 @@ class WebhookService:
             return []
     
     async def send_event(self, event_type: EventType, data: Dict[str, Any], 
-                        source: str = "SignalOS") -> str:
-        """Send event to all matching webhooks"""
+                        source: str = "SignalOS", wait: bool = False) -> str:
+        """
+        Queue event for all matching webhooks. Returns once queued unless wait
+        is set, in which case it returns after every delivery has finished.
+        """
         try:
             # Create event
             event = WebhookEvent(
-                id=f"event_{int(datetime.utcnow().timestamp() * 1000)}",
+                id=f"event_{int(datetime.utcnow().timestamp() * 1000)}_{next(self._sequence)}",
                 type=event_type,
                 data=data,
                 timestamp=datetime.utcnow(),
@@ -194,68 +270,211 @@ class WebhookService:
                 if w.active and event_type in w.events
             ]
             
-            # Send to all matching webhooks
-            tasks = []
-            for webhook in matching_webhooks:
-                task = asyncio.create_task(
-                    self._deliver_webhook(webhook, event)
-                )
-                tasks.append(task)
+            # Queue for all matching webhooks
+            pending = [self._queue_delivery(webhook, event, track=wait) for webhook in matching_webhooks]
             
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            if wait and pending:
+                await asyncio.gather(*(p.done for p in pending))
             
-            logger.info(f"Sent event {event.id} to {len(matching_webhooks)} webhooks")
+            logger.debug(f"Queued event {event.id} for {len(matching_webhooks)} webhooks")
             return event.id
             
         except Exception as e:
             logger.error(f"Error sending event: {e}")
             raise
     
-    async def _deliver_webhook(self, webhook: WebhookConfig, event: WebhookEvent):
-        """Deliver webhook to specific endpoint"""
-        delivery_id = f"delivery_{int(datetime.utcnow().timestamp() * 1000)}"
-        
+    async def _deliver_webhook(self, webhook: WebhookConfig, event: WebhookEvent) -> WebhookDelivery:
+        """Deliver webhook to specific endpoint and wait for the final outcome"""
+        pending = self._queue_delivery(webhook, event, track=True)
+        await pending.done
+        return pending.delivery
+    
+    def _queue_delivery(self, webhook: WebhookConfig, event: WebhookEvent,
+                        track: bool = False) -> _PendingDelivery:
         delivery = WebhookDelivery(
-            id=delivery_id,
+            id=f"delivery_{int(datetime.utcnow().timestamp() * 1000)}_{next(self._sequence)}",
             webhook_id=webhook.id,
             event_id=event.id,
             status="pending",
             created_at=datetime.utcnow()
         )
         
-        self.deliveries[delivery_id] = delivery
+        self.deliveries[delivery.id] = delivery
+        while len(self.deliveries) > self.max_history:
+            self.deliveries.popitem(last=False)
+        
+        done = asyncio.get_running_loop().create_future() if track else None
+        pending = _PendingDelivery(delivery, self._prepare_payload(webhook, event), done)
+        self._queues.setdefault(webhook.id, deque()).append(pending)
+        self._pump(webhook.id)
+        return pending
+    
+    def _pump(self, webhook_id: str):
+        """Start requests for queued deliveries up to the endpoint's concurrency cap"""
+        queue = self._queues.get(webhook_id)
+        if not queue:
+            return
+        
+        webhook = self.webhooks.get(webhook_id)
+        if webhook is None or not webhook.active:
+            while queue:
+                self._finish(queue.popleft(), "failed", error="Webhook deleted or inactive")
+            return
         
+        batch_limit = self._batch_limit(webhook)
+        in_flight = self._in_flight.get(webhook_id, 0)
+        while queue and in_flight < webhook.max_concurrency:
+            batch = [queue.popleft() for _ in range(min(batch_limit, len(queue)))]
+            in_flight += 1
+            task = asyncio.create_task(self._send_batch(webhook, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._in_flight[webhook_id] = in_flight
+    
+    def _batch_limit(self, webhook: WebhookConfig) -> int:
+        target_limit = BATCH_LIMITS.get(webhook.type.value, 1)
+        if webhook.batch_max_events is None:
+            return 1 if webhook.type == WebhookType.GENERIC else target_limit
+        return max(1, min(webhook.batch_max_events, target_limit))
+    
+    async def _send_batch(self, webhook: WebhookConfig, batch: List[_PendingDelivery]):
+        """One request carrying one or more queued deliveries"""
+        retry_after = None
         try:
-            # Prepare payload
-            payload = self._prepare_payload(webhook, event)
+            payload = self._merge_payloads(webhook, [p.payload for p in batch])
+            for pending in batch:
+                pending.delivery.attempts += 1
+                pending.delivery.batch_size = len(batch)
             
-            # Send webhook
-            async with httpx.AsyncClient(timeout=webhook.timeout) as client:
-                response = await client.post(
-                    str(webhook.url),
-                    json=payload,
-                    headers=webhook.headers
-                )
-                
-                delivery.status = "success"
-                delivery.response_code = response.status_code
-                delivery.response_body = response.text[:1000]  # Limit response body
-                delivery.delivered_at = datetime.utcnow()
-                
-                logger.info(f"Webhook delivered successfully: {delivery_id}")
-                
+            self.stats["requests"] += 1
+            response = await self._get_client().post(
+                str(webhook.url),
+                json=payload,
+                headers=webhook.headers,
+                timeout=webhook.timeout
+            )
+            
+            code = response.status_code
+            body = response.text[:1000]  # Limit response body
+            if 200 <= code < 300:
+                for pending in batch:
+                    self._finish(pending, "success", code=code, body=body)
+                logger.debug(f"Webhook {webhook.id} delivered {len(batch)} event(s)")
+                return
+            
+            error = f"HTTP {code}"
+            if code != 429 and code < 500:
+                # Client errors other than rate limiting will not succeed on retry
+                for pending in batch:
+                    self._finish(pending, "failed", code=code, body=body, error=error)
+                logger.error(f"Webhook {webhook.id} rejected delivery: {error}")
+                return
+            
+            retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+            for pending in batch:
+                pending.delivery.response_code = code
+                pending.delivery.response_body = body
+            
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            delivery.status = "failed"
-            delivery.error_message = str(e)
-            delivery.attempts += 1
+            error = str(e) or type(e).__name__
+        
+        finally:
+            self._in_flight[webhook.id] -= 1
+            self._pump(webhook.id)
+        
+        logger.warning(f"Webhook delivery to {webhook.id} failed: {error}")
+        self._schedule_retries(webhook, batch, error, retry_after)
+    
+    def _schedule_retries(self, webhook: WebhookConfig, batch: List[_PendingDelivery],
+                          error: str, retry_after: Optional[float]):
+        loop = asyncio.get_running_loop()
+        for pending in batch:
+            delivery = pending.delivery
+            delivery.error_message = error
+            if delivery.attempts >= webhook.retry_count:
+                self._finish(pending, "failed", code=delivery.response_code,
+                             body=delivery.response_body, error=error)
+                continue
+            
+            # Exponential backoff, or the endpoint's Retry-After when it sent one
+            delay = min(self.max_retry_delay, retry_after if retry_after is not None else 2 ** delivery.attempts)
+            delivery.status = "retrying"
+            delivery.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            heapq.heappush(self._retry_heap, (loop.time() + delay, next(self._sequence), webhook.id, pending))
+            self.stats["retried"] += 1
+        
+        if self._retry_task is None or self._retry_task.done():
+            self._retry_wakeup = asyncio.Event()
+            self._retry_task = asyncio.create_task(self._retry_loop())
+        self._retry_wakeup.set()
+    
+    async def _retry_loop(self):
+        """Move deliveries from the delay queue back to their endpoint queues when due"""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._retry_wakeup.clear()
+            if not self._retry_heap:
+                await self._retry_wakeup.wait()
+                continue
             
-            logger.error(f"Webhook delivery failed: {delivery_id} - {e}")
+            delay = self._retry_heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._retry_wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
             
-            # Retry if configured
-            if delivery.attempts < webhook.retry_count:
-                await asyncio.sleep(2 ** delivery.attempts)  # Exponential backoff
-                await self._deliver_webhook(webhook, event)
+            due_webhooks = set()
+            now = loop.time()
+            while self._retry_heap and self._retry_heap[0][0] <= now:
+                _, _, webhook_id, pending = heapq.heappop(self._retry_heap)
+                pending.delivery.next_attempt_at = None
+                self._queues.setdefault(webhook_id, deque()).append(pending)
+                due_webhooks.add(webhook_id)
+            for webhook_id in due_webhooks:
+                self._pump(webhook_id)
+    
+    def _finish(self, pending: _PendingDelivery, status: str, code: Optional[int] = None,
+                body: Optional[str] = None, error: Optional[str] = None):
+        delivery = pending.delivery
+        delivery.status = status
+        delivery.response_code = code
+        delivery.response_body = body
+        delivery.error_message = error
+        delivery.next_attempt_at = None
+        if status == "success":
+            delivery.delivered_at = datetime.utcnow()
+            self.stats["delivered"] += 1
+        else:
+            self.stats["failed"] += 1
+            logger.error(f"Webhook delivery failed: {delivery.id} - {error}")
+        if pending.done is not None and not pending.done.done():
+            pending.done.set_result(delivery)
+    
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        try:
+            return max(0.0, float(value)) if value is not None else None
+        except ValueError:
+            return None  # HTTP-date form; fall back to exponential backoff
+    
+    def _merge_payloads(self, webhook: WebhookConfig, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-event payloads into one request body for the target"""
+        if len(payloads) == 1:
+            return payloads[0]
+        
+        if webhook.type == WebhookType.DISCORD:
+            return {"embeds": [embed for payload in payloads for embed in payload["embeds"]]}
+        elif webhook.type == WebhookType.SLACK:
+            return {
+                "text": f"SignalOS - {len(payloads)} events",
+                "attachments": [a for payload in payloads for a in payload["attachments"]]
+            }
+        else:
+            return {"events": payloads}
     
     def _prepare_payload(self, webhook: WebhookConfig, event: WebhookEvent) -> Dict[str, Any]:
         """Prepare webhook payload based on type"""
@@ -496,18 +715,13 @@ class WebhookService:
     
     async def get_deliveries(self, webhook_id: str = None, 
                            status: str = None) -> List[WebhookDelivery]:
-        """Get webhook deliveries"""
+        """Get webhook deliveries (the most recent max_history)"""
         try:
-            deliveries = list(self.deliveries.values())
-            
-            if webhook_id:
-                deliveries = [d for d in deliveries if d.webhook_id == webhook_id]
-            
-            if status:
-                deliveries = [d for d in deliveries if d.status == status]
-            
-            # Sort by creation time (most recent first)
-            deliveries.sort(key=lambda d: d.created_at, reverse=True)
+            # Insertion order is creation order, so most recent first is a reverse walk
+            deliveries = [
+                d for d in reversed(self.deliveries.values())
+                if (not webhook_id or d.webhook_id == webhook_id) and (not status or d.status == status)
+            ]
             
             logger.info(f"Retrieved {len(deliveries)} deliveries")
             return deliveries
@@ -533,10 +747,10 @@ class WebhookService:
             )
             
             # Deliver webhook
-            await self._deliver_webhook(webhook, test_event)
+            delivery = await self._deliver_webhook(webhook, test_event)
             
-            logger.info(f"Test webhook sent: {webhook_id}")
-            return True
+            logger.info(f"Test webhook sent: {webhook_id} ({delivery.status})")
+            return delivery.status == "success"
             
         except Exception as e:
             logger.error(f"Error testing webhook {webhook_id}: {e}")
@@ -1,17 +1,30 @@
 """
 SignalOS Offline-First Operation Core
 Handles offline signal parsing, queuing, and sync operations
+
+Sync is batched. Queued actions are read in timestamp order and cut into
+batches. Each batch is grouped by action type, and every group goes to the
+server as one bulk request; the groups of a batch run concurrently. The
+outcome of a whole batch is written back in one transaction. Two actions
+that touch the same entity under different types never share a batch, so
+per-entity order is kept. Every action carries a version vector. Before a
+batch is sent, the entities' server vectors are checked, and actions the
+server has concurrent changes for are held back as conflicts instead of
+being sent. The local database is one persistent connection in WAL mode.
 """
 
 import json
 import sqlite3
 import asyncio
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Callable
 from pathlib import Path
 from enum import Enum
 
+from core.analytics import invalidate_analytics
 from services.parser_ai import AISignalParser
 from db.models import OfflineAction, SyncConflict
 from utils.logging_config import get_logger
@@ -26,16 +39,52 @@ class ConflictResolution(Enum):
     MANUAL = "manual"
 
 
+DEFAULT_SYNC_BATCH_SIZE = 500
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Payload fields that identify the entity an action changes, by action type prefix
+ENTITY_FIELDS = {
+    "TRADE": ("trade", ("ticket", "trade_id", "id")),
+    "SIGNAL": ("signal", ("signal_id", "id"))
+}
+
+
+def merge_vectors(*vectors: Dict[str, int]) -> Dict[str, int]:
+    """Component-wise maximum of version vectors"""
+    merged: Dict[str, int] = {}
+    for vector in vectors:
+        for node, counter in vector.items():
+            if counter > merged.get(node, 0):
+                merged[node] = counter
+    return merged
+
+
+def vector_dominates(vector: Dict[str, int], other: Dict[str, int]) -> bool:
+    """True when vector has seen everything other has (other <= vector)"""
+    return all(vector.get(node, 0) >= counter for node, counter in other.items())
+
+
 class OfflineOperationEngine:
     """Core offline operations engine"""
     
-    def __init__(self, user_id: str, offline_db_path: str = "offline.db"):
+    def __init__(self, user_id: str, offline_db_path: str = "offline.db",
+                 batch_size: int = DEFAULT_SYNC_BATCH_SIZE, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 conflict_resolution: ConflictResolution = ConflictResolution.MANUAL):
         self.user_id = user_id
         self.offline_db_path = offline_db_path
         self.parser_service = AISignalParser()
         self.sync_queue = []
         self.is_online = False
         
+        # Batched sync
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.conflict_resolution = conflict_resolution
+        self.node_id: Optional[str] = None
+        self.last_sync_progress: Optional[Dict[str, Any]] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._sync_lock = asyncio.Lock()
+    
     async def initialize(self):
         """Initialize offline database and components"""
         try:
@@ -46,9 +95,23 @@ class OfflineOperationEngine:
             logger.error(f"Failed to initialize offline engine: {e}")
             raise
     
+    def _connection(self) -> sqlite3.Connection:
+        """The engine's persistent connection, opened in WAL mode on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.offline_db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+    
+    def close(self):
+        """Close the persistent connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
     async def _setup_offline_database(self):
         """Setup local SQLite database for offline storage"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         # Create offline actions table
@@ -62,10 +125,23 @@ class OfflineOperationEngine:
                 synced INTEGER DEFAULT 0,
                 sync_attempts INTEGER DEFAULT 0,
                 sync_error TEXT,
-                conflict_resolution TEXT
+                conflict_resolution TEXT,
+                entity_key TEXT,
+                version_vector TEXT
             )
         ''')
         
+        # Databases created before batched sync lack the version columns
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(offline_actions)")}
+        for column in ("entity_key", "version_vector"):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE offline_actions ADD COLUMN {column} TEXT")
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_offline_actions_pending
+            ON offline_actions (synced, timestamp)
+        ''')
+        
         # Create offline signals table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS offline_signals (
@@ -95,8 +171,46 @@ class OfflineOperationEngine:
             )
         ''')
         
+        # Last known version vectors per entity: this device's and the server's
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entity_versions (
+                entity_key TEXT PRIMARY KEY,
+                local_vector TEXT NOT NULL,
+                server_vector TEXT NOT NULL
+            )
+        ''')
+        
+        # Conflicts found before sending, held until resolved
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_conflicts (
+                id TEXT PRIMARY KEY,
+                action_id TEXT NOT NULL,
+                entity_key TEXT NOT NULL,
+                conflict_type TEXT NOT NULL,
+                local_vector TEXT NOT NULL,
+                server_vector TEXT NOT NULL,
+                resolution TEXT,
+                detected_at TEXT NOT NULL,
+                resolved_at TEXT
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        
+        # Each offline database is one node in the version vectors
+        row = cursor.execute("SELECT value FROM sync_meta WHERE key = 'node_id'").fetchone()
+        if row:
+            self.node_id = row[0]
+        else:
+            self.node_id = f"device-{uuid.uuid4().hex[:12]}"
+            cursor.execute("INSERT INTO sync_meta (key, value) VALUES ('node_id', ?)", (self.node_id,))
+        
         conn.commit()
-        conn.close()
     
     async def parse_signal_offline(self, signal_text: str, image_data: Optional[str] = None) -> Dict[str, Any]:
         """Parse signal offline using local AI models"""
@@ -119,7 +233,7 @@ class OfflineOperationEngine:
             
             logger.info(f"Signal parsed offline: {parsed_signal['symbol']}")
             return parsed_signal
-            
+        
         except Exception as e:
             logger.error(f"Offline signal parsing failed: {e}")
             raise
@@ -140,14 +254,14 @@ class OfflineOperationEngine:
                 "status": "queued_offline",
                 "message": "Trade queued for execution when online"
             }
-            
+        
         except Exception as e:
             logger.error(f"Offline trade queuing failed: {e}")
             raise
     
     async def _store_offline_signal(self, signal_data: Dict[str, Any]):
         """Store parsed signal in offline database"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -164,11 +278,10 @@ class OfflineOperationEngine:
         ))
         
         conn.commit()
-        conn.close()
     
     async def _store_offline_trade(self, trade_data: Dict[str, Any]):
         """Store trade in offline database"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -188,81 +301,308 @@ class OfflineOperationEngine:
         ))
         
         conn.commit()
-        conn.close()
+    
+    def _entity_key(self, action_type: str, payload: Dict[str, Any], action_id: str) -> str:
+        """Entity an action changes; actions with no identifiable entity never conflict"""
+        if payload.get("entity_key"):
+            return str(payload["entity_key"])
+        
+        prefix, fields = ENTITY_FIELDS.get(action_type.split("_")[0], (None, ()))
+        source = payload.get("parsed_result") if action_type == "SIGNAL_PARSE" else payload
+        for name in fields:
+            if isinstance(source, dict) and source.get(name) is not None:
+                return f"{prefix}:{source[name]}"
+        return f"action:{action_id}"
     
     async def _queue_offline_action(self, action_type: str, payload: Dict[str, Any]) -> str:
-        """Queue action for sync when online"""
-        import uuid
-        
+        """Queue action for sync when online, stamped with the entity's next version vector"""
         action_id = str(uuid.uuid4())
+        entity_key = self._entity_key(action_type, payload, action_id)
         
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
+        # The device's vector covers everything it has seen from the server, plus this change
+        row = cursor.execute(
+            "SELECT local_vector, server_vector FROM entity_versions WHERE entity_key = ?", (entity_key,)
+        ).fetchone()
+        local_vector, server_vector = (json.loads(row[0]), json.loads(row[1])) if row else ({}, {})
+        vector = merge_vectors(local_vector, server_vector)
+        vector[self.node_id] = vector.get(self.node_id, 0) + 1
+        
         cursor.execute('''
             INSERT INTO offline_actions 
-            (id, user_id, action_type, payload, timestamp)
-            VALUES (?, ?, ?, ?, ?)
+            (id, user_id, action_type, payload, timestamp, entity_key, version_vector)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
             action_id,
             self.user_id,
             action_type,
             json.dumps(payload),
-            datetime.now().isoformat()
+            datetime.now().isoformat(),
+            entity_key,
+            json.dumps(vector)
         ))
+        cursor.execute('''
+            INSERT INTO entity_versions (entity_key, local_vector, server_vector) VALUES (?, ?, ?)
+            ON CONFLICT (entity_key) DO UPDATE SET local_vector = excluded.local_vector
+        ''', (entity_key, json.dumps(vector), json.dumps(server_vector)))
         
         conn.commit()
-        conn.close()
         
         return action_id
     
-    async def sync_offline_actions(self) -> Dict[str, Any]:
-        """Sync all offline actions with server"""
-        try:
-            offline_actions = await self._get_unsynced_actions()
+    async def sync_offline_actions(self, progress: Optional[Callable[[Dict[str, Any]], Any]] = None
+                                   ) -> Dict[str, Any]:
+        """Sync all offline actions with server, in batches
+        
+        progress, if given, is called (or awaited) with a progress snapshot
+        after every batch and once more when the sync is done.
+        """
+        async with self._sync_lock:
+            try:
+                offline_actions = await self._get_unsynced_actions()
+                started = time.perf_counter()
+                
+                sync_results = {
+                    "total_actions": len(offline_actions),
+                    "successful": 0,
+                    "failed": 0,
+                    "conflicts": 0,
+                    "batches": 0,
+                    "requests": 0
+                }
+                
+                for batch in self._plan_batches(offline_actions):
+                    outcome = await self._sync_batch(batch)
+                    for key in ("successful", "failed", "conflicts", "requests"):
+                        sync_results[key] += outcome[key]
+                    sync_results["batches"] += 1
+                    await self._report_progress(progress, sync_results, started, done=False)
+                
+                if sync_results["successful"]:
+                    # Synced trades reached the server behind the analytics views' back
+                    invalidate_analytics(self.user_id)
+                
+                await self._report_progress(progress, sync_results, started, done=True)
+                logger.info(f"Sync completed: {sync_results}")
+                return sync_results
             
-            sync_results = {
-                "total_actions": len(offline_actions),
-                "successful": 0,
-                "failed": 0,
-                "conflicts": 0
-            }
+            except Exception as e:
+                logger.error(f"Sync process failed: {e}")
+                raise
+    
+    async def stream_sync(self) -> AsyncIterator[Dict[str, Any]]:
+        """Run a sync and yield its progress snapshots as they happen"""
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.sync_offline_actions(progress=queue.put_nowait))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while (snapshot := await queue.get()) is not None:
+                yield snapshot
+        finally:
+            if not task.done():
+                task.cancel()
+        
+        # A failed sync raises here, after the progress it made was sent
+        await task
+    
+    async def _report_progress(self, progress: Optional[Callable[[Dict[str, Any]], Any]],
+                               sync_results: Dict[str, Any], started: float, done: bool):
+        processed = sync_results["successful"] + sync_results["failed"] + sync_results["conflicts"]
+        snapshot = {
+            **sync_results,
+            "processed": processed,
+            "remaining": sync_results["total_actions"] - processed,
+            "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+            "done": done
+        }
+        self.last_sync_progress = snapshot
+        if progress is not None:
+            result = progress(snapshot)
+            if asyncio.iscoroutine(result):
+                await result
+    
+    def _plan_batches(self, actions: List[Dict[str, Any]]) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """Cut timestamp-ordered actions into batches of per-type groups
+        
+        A batch ends at batch_size actions, or when an action's entity was
+        already touched by a different action type in the batch: the groups of
+        a batch are sent concurrently, so that would reorder the entity's changes.
+        """
+        batches = []
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        entity_types: Dict[str, str] = {}
+        size = 0
+        
+        for action in actions:
+            action_type = action["action_type"]
+            entity_key = action.get("entity_key") or f"action:{action['id']}"
+            if size >= self.batch_size or entity_types.get(entity_key, action_type) != action_type:
+                batches.append(groups)
+                groups, entity_types, size = {}, {}, 0
             
-            for action in offline_actions:
+            groups.setdefault(action_type, []).append(action)
+            entity_types[entity_key] = action_type
+            size += 1
+        
+        if groups:
+            batches.append(groups)
+        return batches
+    
+    async def _sync_batch(self, groups: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+        """Check one batch for conflicts, send its groups concurrently, write all outcomes at once"""
+        actions = [action for group in groups.values() for action in group]
+        server_vectors = await self._fetch_server_versions(
+            sorted({action["entity_key"] for action in actions if action.get("entity_key")})
+        )
+        
+        # Actions the server has concurrent changes for are held back, not sent
+        conflicts, to_send = [], {}
+        for action_type, group in groups.items():
+            for action in group:
+                server_vector = server_vectors.get(action.get("entity_key"), {})
+                if not vector_dominates(action.get("version_vector") or {}, server_vector):
+                    conflicts.append((action, server_vector))
+                else:
+                    to_send.setdefault(action_type, []).append(action)
+        
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def send(action_type: str, group: List[Dict[str, Any]]):
+            async with semaphore:
                 try:
-                    result = await self._sync_single_action(action)
-                    
-                    if result["success"]:
-                        sync_results["successful"] += 1
-                        await self._mark_action_synced(action["id"])
-                    elif result.get("conflict"):
-                        sync_results["conflicts"] += 1
-                        await self._handle_sync_conflict(action, result["conflict_data"])
-                    else:
-                        sync_results["failed"] += 1
-                        await self._record_sync_error(action["id"], result["error"])
-                        
+                    results = await self._send_action_batch(action_type, group)
                 except Exception as e:
-                    sync_results["failed"] += 1
-                    await self._record_sync_error(action["id"], str(e))
-                    logger.error(f"Sync failed for action {action['id']}: {e}")
-            
-            logger.info(f"Sync completed: {sync_results}")
-            return sync_results
-            
-        except Exception as e:
-            logger.error(f"Sync process failed: {e}")
-            raise
+                    logger.error(f"Batch sync failed for {len(group)} {action_type} actions: {e}")
+                    results = [{"success": False, "error": str(e)}] * len(group)
+                return list(zip(group, results))
+        
+        sent = await asyncio.gather(*(send(action_type, group) for action_type, group in to_send.items()))
+        
+        synced, errors = [], []
+        for action, result in (pair for group in sent for pair in group):
+            if result.get("success"):
+                synced.append(action)
+            elif result.get("conflict"):
+                conflicts.append((action, result.get("conflict_data", {}).get("server_vector", {})))
+            else:
+                errors.append((action, result.get("error", "Unknown error")))
+        
+        self._apply_batch_results(synced, errors, conflicts)
+        
+        return {
+            "successful": len(synced),
+            "failed": len(errors),
+            "conflicts": len(conflicts),
+            "requests": len(to_send)
+        }
+    
+    def _apply_batch_results(self, synced: List[Dict[str, Any]], errors: List[tuple], conflicts: List[tuple]):
+        """Write a batch's status updates, server versions and conflicts in one transaction"""
+        conn = self._connection()
+        now = datetime.now().isoformat()
+        
+        # The server now has each synced action's vector for its entity
+        acknowledged: Dict[str, Dict[str, int]] = {}
+        for action in synced:
+            if action.get("entity_key"):
+                acknowledged[action["entity_key"]] = merge_vectors(
+                    acknowledged.get(action["entity_key"], {}), action.get("version_vector") or {})
+        
+        with conn:
+            conn.executemany('''
+                UPDATE offline_actions
+                SET synced = 1, sync_attempts = sync_attempts + 1, sync_error = NULL
+                WHERE id = ?
+            ''', ((action["id"],) for action in synced))
+            conn.executemany('''
+                UPDATE offline_actions
+                SET sync_attempts = sync_attempts + 1, sync_error = ?
+                WHERE id = ?
+            ''', ((error, action["id"]) for action, error in errors))
+            conn.executemany('''
+                UPDATE offline_actions SET conflict_resolution = ? WHERE id = ?
+            ''', ((ConflictResolution.MANUAL.value, action["id"]) for action, _ in conflicts))
+            conn.executemany('''
+                INSERT INTO sync_conflicts
+                (id, action_id, entity_key, conflict_type, local_vector, server_vector, detected_at)
+                VALUES (?, ?, ?, 'CONCURRENT_UPDATE', ?, ?, ?)
+            ''', ((str(uuid.uuid4()), action["id"], action.get("entity_key") or "",
+                   json.dumps(action.get("version_vector") or {}), json.dumps(server_vector), now)
+                  for action, server_vector in conflicts))
+            self._store_server_versions(conn, acknowledged)
+        
+        for action, server_vector in conflicts:
+            logger.warning(f"Sync conflict detected for action {action['id']} on {action.get('entity_key')}")
+        
+        # Conflicts an automatic policy can settle are resolved right away
+        if conflicts and self.conflict_resolution != ConflictResolution.MANUAL:
+            for action, _ in conflicts:
+                self._resolve_conflict(action["id"], self.conflict_resolution)
+    
+    def _store_server_versions(self, conn: sqlite3.Connection, vectors: Dict[str, Dict[str, int]]):
+        if not vectors:
+            return
+        rows = {}
+        for batch_start in range(0, len(vectors), 500):
+            keys = list(vectors)[batch_start:batch_start + 500]
+            placeholders = ",".join("?" * len(keys))
+            for entity_key, local_vector, server_vector in conn.execute(
+                    f"SELECT entity_key, local_vector, server_vector FROM entity_versions "
+                    f"WHERE entity_key IN ({placeholders})", keys):
+                rows[entity_key] = (json.loads(local_vector), json.loads(server_vector))
+        
+        conn.executemany('''
+            INSERT OR REPLACE INTO entity_versions (entity_key, local_vector, server_vector)
+            VALUES (?, ?, ?)
+        ''', ((entity_key, json.dumps(rows.get(entity_key, ({}, {}))[0]),
+               json.dumps(merge_vectors(rows.get(entity_key, ({}, {}))[1], vector)))
+              for entity_key, vector in vectors.items()))
+    
+    def record_server_versions(self, vectors: Dict[str, Dict[str, int]]):
+        """Merge version vectors pushed by the server (changes made on other devices)"""
+        with self._connection() as conn:
+            self._store_server_versions(conn, vectors)
+    
+    async def _fetch_server_versions(self, entity_keys: List[str]) -> Dict[str, Dict[str, int]]:
+        """Server version vectors for a batch's entities, in one request"""
+        # This would call the server's version endpoint with all keys at once
+        # For now, use the versions the server has acknowledged or pushed
+        if not entity_keys:
+            return {}
+        
+        conn = self._connection()
+        vectors = {}
+        for batch_start in range(0, len(entity_keys), 500):
+            keys = entity_keys[batch_start:batch_start + 500]
+            placeholders = ",".join("?" * len(keys))
+            for entity_key, server_vector in conn.execute(
+                    f"SELECT entity_key, server_vector FROM entity_versions WHERE entity_key IN ({placeholders})",
+                    keys):
+                vectors[entity_key] = json.loads(server_vector)
+        return vectors
+    
+    async def _send_action_batch(self, action_type: str, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send one group of same-type actions in a single request; one result per action"""
+        if action_type == "SIGNAL_PARSE":
+            return await self._sync_signal_parse_batch([action["payload"] for action in actions])
+        if action_type == "TRADE_OPEN":
+            return await self._sync_trade_open_batch([action["payload"] for action in actions])
+        
+        # Types without a bulk endpoint go one at a time
+        return [await self._sync_single_action(action) for action in actions]
     
     async def _get_unsynced_actions(self) -> List[Dict[str, Any]]:
-        """Get all unsynced offline actions"""
-        conn = sqlite3.connect(self.offline_db_path)
+        """Get all unsynced offline actions not held as conflicts"""
+        conn = self._connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT id, user_id, action_type, payload, timestamp, sync_attempts
+            SELECT id, user_id, action_type, payload, timestamp, sync_attempts, entity_key, version_vector
             FROM offline_actions 
-            WHERE synced = 0 AND sync_attempts < 3
+            WHERE synced = 0 AND sync_attempts < 3 AND conflict_resolution IS NULL
             ORDER BY timestamp ASC
         ''')
         
@@ -274,10 +614,11 @@ class OfflineOperationEngine:
                 "action_type": row[2],
                 "payload": json.loads(row[3]),
                 "timestamp": row[4],
-                "sync_attempts": row[5]
+                "sync_attempts": row[5],
+                "entity_key": row[6],
+                "version_vector": json.loads(row[7]) if row[7] else {}
             })
         
-        conn.close()
         return actions
     
     async def _sync_single_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
@@ -297,7 +638,7 @@ class OfflineOperationEngine:
                 result = {"success": False, "error": "Unknown action type"}
             
             return result
-            
+        
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -313,15 +654,91 @@ class OfflineOperationEngine:
         # For now, return success
         return {"success": True}
     
+    async def _sync_signal_parse_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sync a group of parsed signals with server in one request"""
+        # This would call the bulk signal endpoint
+        # For now, return success for each
+        return [{"success": True} for _ in payloads]
+    
+    async def _sync_trade_open_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sync a group of trade openings with server in one request"""
+        # This would call the bulk trade endpoint
+        # For now, return success for each
+        return [{"success": True} for _ in payloads]
+    
     async def _handle_sync_conflict(self, action: Dict[str, Any], conflict_data: Dict[str, Any]):
         """Handle sync conflict resolution"""
-        # Store conflict for manual resolution
-        # This would integrate with your conflict resolution system
-        logger.warning(f"Sync conflict detected for action {action['id']}")
+        # Hold the action and record the conflict for resolution
+        self._apply_batch_results([], [], [(action, conflict_data.get("server_vector", {}))])
+    
+    async def resolve_conflict(self, action_id: str, resolution: ConflictResolution) -> bool:
+        """Resolve a held conflict; USE_LOCAL and MERGE re-queue the action, USE_SERVER drops it"""
+        return self._resolve_conflict(action_id, resolution)
+    
+    def _resolve_conflict(self, action_id: str, resolution: ConflictResolution) -> bool:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT entity_key, version_vector FROM offline_actions WHERE id = ?", (action_id,)
+        ).fetchone()
+        if row is None or resolution == ConflictResolution.MANUAL:
+            return False
+        
+        entity_key, vector = row[0], json.loads(row[1]) if row[1] else {}
+        now = datetime.now().isoformat()
+        
+        with conn:
+            if resolution == ConflictResolution.USE_SERVER:
+                conn.execute('''
+                    UPDATE offline_actions SET synced = 1, conflict_resolution = ? WHERE id = ?
+                ''', (resolution.value, action_id))
+            else:
+                # The re-sent action supersedes the server's version of the entity
+                server_vector = (self._server_vector(conn, entity_key) if entity_key else {})
+                vector = merge_vectors(vector, server_vector)
+                vector[self.node_id] = vector.get(self.node_id, 0) + 1
+                conn.execute('''
+                    UPDATE offline_actions SET conflict_resolution = NULL, version_vector = ? WHERE id = ?
+                ''', (json.dumps(vector), action_id))
+            conn.execute('''
+                UPDATE sync_conflicts SET resolution = ?, resolved_at = ?
+                WHERE action_id = ? AND resolved_at IS NULL
+            ''', (resolution.value, now, action_id))
+        
+        logger.info(f"Sync conflict for action {action_id} resolved: {resolution.value}")
+        return True
+    
+    def _server_vector(self, conn: sqlite3.Connection, entity_key: str) -> Dict[str, int]:
+        row = conn.execute(
+            "SELECT server_vector FROM entity_versions WHERE entity_key = ?", (entity_key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+    
+    async def get_sync_conflicts(self, unresolved_only: bool = True) -> List[Dict[str, Any]]:
+        """Conflicts found during sync, oldest first"""
+        query = '''
+            SELECT id, action_id, entity_key, conflict_type, local_vector, server_vector,
+                   resolution, detected_at, resolved_at
+            FROM sync_conflicts
+        '''
+        if unresolved_only:
+            query += " WHERE resolved_at IS NULL"
+        query += " ORDER BY detected_at ASC"
+        
+        return [{
+            "id": row[0],
+            "action_id": row[1],
+            "entity_key": row[2],
+            "conflict_type": row[3],
+            "local_vector": json.loads(row[4]),
+            "server_vector": json.loads(row[5]),
+            "resolution": row[6],
+            "detected_at": row[7],
+            "resolved_at": row[8]
+        } for row in self._connection().execute(query)]
     
     async def _mark_action_synced(self, action_id: str):
         """Mark action as successfully synced"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -331,11 +748,10 @@ class OfflineOperationEngine:
         ''', (action_id,))
         
         conn.commit()
-        conn.close()
     
     async def _record_sync_error(self, action_id: str, error: str):
         """Record sync error for action"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -345,11 +761,10 @@ class OfflineOperationEngine:
         ''', (error, action_id))
         
         conn.commit()
-        conn.close()
     
     async def get_offline_status(self) -> Dict[str, Any]:
         """Get offline operation status"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         # Count unsynced actions
@@ -364,14 +779,18 @@ class OfflineOperationEngine:
         cursor.execute('SELECT COUNT(*) FROM offline_trades WHERE synced = 0')
         unsynced_trades = cursor.fetchone()[0]
         
-        conn.close()
+        # Count conflicts waiting for resolution
+        cursor.execute('SELECT COUNT(*) FROM sync_conflicts WHERE resolved_at IS NULL')
+        unresolved_conflicts = cursor.fetchone()[0]
         
         return {
             "is_online": self.is_online,
             "unsynced_actions": unsynced_actions,
             "unsynced_signals": unsynced_signals,
             "unsynced_trades": unsynced_trades,
-            "offline_mode_active": not self.is_online
+            "unresolved_conflicts": unresolved_conflicts,
+            "offline_mode_active": not self.is_online,
+            "last_sync_progress": self.last_sync_progress
         }
     
     async def set_online_status(self, is_online: bool):
@@ -386,7 +805,7 @@ class OfflineOperationEngine:
     
     async def cleanup_old_actions(self, days_old: int = 30):
         """Clean up old synced actions"""
-        conn = sqlite3.connect(self.offline_db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
@@ -398,7 +817,6 @@ class OfflineOperationEngine:
         
         deleted_count = cursor.rowcount
         conn.commit()
-        conn.close()
         
         logger.info(f"Cleaned up {deleted_count} old offline actions")
-        return deleted_count
\ No newline at end of file
+        return deleted_count
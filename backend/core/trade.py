@@ -54,6 +54,9 @@ class TradeOrder:
     executed_price: Optional[float] = None
     executed_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    signal_id: Optional[str] = None
+    provider_id: Optional[str] = None  # Signal provider / channel the order came from
+    provider_name: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -308,11 +311,16 @@ class TradeExecutor:
         await self.mt5_bridge.disconnect()
         logger.info("Trade executor shutdown complete")
     
-    async def execute_signal(self, signal: ParsedSignal) -> TradeOrder:
-        """Execute trading signal"""
+    async def execute_signal(self, signal: ParsedSignal, user_id: Optional[str] = None,
+                             signal_id: Optional[str] = None, provider_id: Optional[str] = None,
+                             provider_name: Optional[str] = None) -> TradeOrder:
+        """Execute trading signal; the signal id and provider follow the order into analytics"""
         try:
             # Create order from signal
             order = await self._create_order_from_signal(signal)
+            order.signal_id = signal_id
+            order.provider_id = provider_id
+            order.provider_name = provider_name
             
             # Validate trade
             account_info = await self.mt5_bridge.get_account_info()
@@ -341,6 +349,7 @@ class TradeExecutor:
                 self.execution_stats["successful_orders"] += 1
                 self.execution_stats["total_volume"] += order.volume
                 self.risk_manager.daily_trade_count += 1
+                await self._record_compliance_event(user_id, "opened", balance=account_info.get("balance"))
                 
                 logger.info(f"Order executed successfully: {order.symbol} {order.order_type.name}")
             else:
@@ -408,7 +417,7 @@ class TradeExecutor:
         
         return order
     
-    async def close_order(self, order_id: str) -> bool:
+    async def close_order(self, order_id: str, user_id: Optional[str] = None) -> bool:
         """Close an active order"""
         try:
             order = self.active_orders.get(order_id)
@@ -421,6 +430,8 @@ class TradeExecutor:
             if result.get("status") == "success":
                 order.status = OrderStatus.CANCELLED
                 logger.info(f"Order {order_id} closed successfully")
+                await self._record_close(order, result, user_id)
+                await self._record_compliance_event(user_id, "closed", result.get("profit") or 0.0)
                 return True
             else:
                 logger.error(f"Failed to close order {order_id}: {result.get('error')}")
@@ -430,6 +441,62 @@ class TradeExecutor:
             logger.error(f"Error closing order {order_id}: {e}")
             return False
     
+    async def _record_close(self, order: TradeOrder, result: Dict[str, Any], user_id: Optional[str]):
+        """Record a closed order for analytics: close price, close time and P&L"""
+        close_price = result.get("price")
+        profit = result.get("profit")
+        entry_price = order.executed_price or order.price
+        if close_price is None or profit is None or not entry_price:
+            logger.warning(f"Close of order {order.id} reported no price or profit; not recorded for analytics")
+            return
+        
+        try:
+            from core.analytics import TradeMetrics, get_analytics_engine
+            
+            closed_at = datetime.utcnow()
+            opened_at = order.executed_at or closed_at
+            # MT5 buy-side order types are even, sell-side odd
+            direction = 1 if order.order_type.value % 2 == 0 else -1
+            trade = TradeMetrics(
+                trade_id=order.id,
+                symbol=order.symbol,
+                entry_price=entry_price,
+                exit_price=close_price,
+                volume=order.volume,
+                profit_loss=profit,
+                profit_loss_percentage=direction * (close_price - entry_price) / entry_price * 100,
+                duration_seconds=int((closed_at - opened_at).total_seconds()),
+                signal_provider=order.provider_id,
+                entry_time=opened_at,
+                exit_time=closed_at
+            )
+            await get_analytics_engine().record_trade_close(trade, user_id or "unknown", order.order_type.value,
+                                                            order.ticket, signal_id=order.signal_id,
+                                                            provider_name=order.provider_name)
+        except Exception as e:
+            logger.error(f"Failed to record close of order {order.id} for analytics: {e}")
+    
+    async def _record_compliance_event(self, user_id: Optional[str], event_type: str, profit: float = 0.0,
+                                       balance: Optional[float] = None):
+        """
+        Keep the user's compliance daily stats current with an executed open or close
+        
+        The account balance read before an open is recorded first, so daily loss
+        and drawdown can be derived even for a user whose day started flat.
+        """
+        if not user_id or user_id == "unknown":
+            return
+        
+        try:
+            from core.compliance import get_compliance_engine
+            
+            compliance = await get_compliance_engine()
+            if balance is not None:
+                compliance.record_trade_event(user_id, "balance", balance=float(balance))
+            compliance.record_trade_event(user_id, event_type, profit)
+        except Exception as e:
+            logger.error(f"Failed to record {event_type} trade for compliance stats of user {user_id}: {e}")
+    
     def get_execution_stats(self) -> Dict[str, Any]:
         """Get execution statistics"""
         stats = self.execution_stats.copy()
@@ -2,7 +2,7 @@
 Database models for SignalOS Backend
 """
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -44,6 +44,13 @@ class Signal(Base):
     image_data = Column(Text, nullable=True)  # Base64 encoded
     processed_at = Column(DateTime, default=func.now())
     executed = Column(Boolean, default=False)
+    provider_id = Column(String(50), nullable=True)  # Signal provider / channel
+    provider_name = Column(String(100), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_signals_provider_processed", "provider_id", "processed_at"),
+        Index("ix_signals_user_processed", "user_id", "processed_at"),
+    )
 
 
 class TradeOrder(Base):
@@ -68,6 +75,17 @@ class TradeOrder(Base):
     executed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=func.now())
     error_message = Column(Text, nullable=True)
+    close_price = Column(Float, nullable=True)
+    closed_at = Column(DateTime, nullable=True)
+    profit_loss = Column(Float, nullable=True)
+    
+    # Analytics filters: user + entry time, user + symbol + entry time, provider joins via signal
+    __table_args__ = (
+        Index("ix_trade_orders_user_executed", "user_id", "executed_at"),
+        Index("ix_trade_orders_user_symbol_executed", "user_id", "symbol", "executed_at"),
+        Index("ix_trade_orders_symbol_executed", "symbol", "executed_at"),
+        Index("ix_trade_orders_signal", "signal_id"),
+    )
 
 
 class License(Base):
@@ -45,6 +45,10 @@ async def lifespan(app: FastAPI):
     from workers.trade_retry import get_retry_worker
     from workers.cleaner_worker import get_cleaner_worker
     
+    # Create or migrate the analytics tables before the first request reads them
+    from core.analytics import get_analytics_engine
+    await asyncio.to_thread(get_analytics_engine)
+    
     # Start queue manager
     queue_manager = QueueManager()
     await queue_manager.start()
@@ -73,6 +77,9 @@ async def lifespan(app: FastAPI):
     await retry_worker.stop()
     await parse_worker.stop()
     await queue_manager.stop()
+    
+    from services.report_jobs import get_report_job_manager
+    get_report_job_manager().shutdown()
     logger.info("✅ SignalOS Backend shutdown complete")
 
 
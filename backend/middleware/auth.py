@@ -5,10 +5,29 @@ Authentication middleware for SignalOS API
 from fastapi import HTTPException, status, Request, Response
 from fastapi.security import HTTPBearer
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Optional
+
+from core.auth import TokenData, get_auth_service
 
 security = HTTPBearer()
 
+_UNSET = object()
+
+
+def get_request_claims(request: Request) -> Optional[TokenData]:
+    """
+    Bearer-token claims for a request, verified once and memoized on
+    request.state so the auth middleware, rate limiter and endpoints share them
+    """
+    claims = getattr(request.state, 'token_claims', _UNSET)
+    if claims is _UNSET:
+        claims = get_auth_service().extract_bearer_claims(request.headers.get("Authorization"))
+        request.state.token_claims = claims
+        if claims is not None:
+            request.state.user_id = claims.user_id
+            request.state.device_id = claims.device_id
+    return claims
+
 
 class AuthMiddleware(BaseHTTPMiddleware):
     """Authentication middleware for all requests"""
@@ -20,7 +39,9 @@ class AuthMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
             return response
         
-        # For now, just pass through - in production would validate JWT
+        # Identify the caller from a bearer token if one is sent; endpoints decide
+        # whether authentication is required
+        get_request_claims(request)
         response = await call_next(request)
         return response
 
@@ -12,6 +12,7 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 import hashlib
 
+from middleware.auth import get_request_claims
 from utils.logging_config import get_logger
 
 logger = get_logger("rate_limit")
@@ -140,7 +141,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         """Get client identifier for rate limiting"""
         # Priority order: user_id > api_key > ip_address
         
-        # Check for authenticated user
+        # Check for authenticated user (claims are shared with the auth middleware)
+        get_request_claims(request)
         user_id = getattr(request.state, 'user_id', None)
         if user_id:
             return f"user:{user_id}"
@@ -0,0 +1,181 @@
+"""
+Tiered parse cascade for the signal parser
+
+Stages run in a configured order, cheapest first (structured fast path ->
+regex -> AI -> OCR). The first result whose confidence clears its stage's
+gate ends the request, so a clean regex hit never waits on the AI model.
+Each stage carries a cost estimate, seeded from defaults and then tracked as
+a moving average of observed run time; once a request has used part of its
+latency budget, stages whose estimate no longer fits are skipped. If no stage
+clears its gate, the most confident result seen is returned unaccepted.
+"""
+
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger("parser.cascade")
+
+STAGE_ORDER = ("structured", "regex", "ai", "ocr")
+
+# Starting cost estimates (ms); replaced by observed averages as requests run
+DEFAULT_STAGE_COSTS_MS = {
+    "structured": 0.05,
+    "regex": 0.5,
+    "ai": 100.0,
+    "ocr": 1000.0
+}
+
+
+@dataclass
+class CascadeStage:
+    """One parser in the cascade; uses_image stages receive the image bytes"""
+    name: str
+    parse: Callable[[Any], Any]
+    cost_ms: float = 1.0
+    min_confidence: float = 0.7
+    enabled: bool = True
+    uses_image: bool = False
+
+
+@dataclass
+class StageStats:
+    """Running counters for one stage"""
+    attempts: int = 0
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    budget_skips: int = 0
+    total_ms: float = 0.0
+
+
+@dataclass
+class CascadeOutcome:
+    """Result of one cascade run"""
+    result: Any = None
+    stage: Optional[str] = None
+    confidence: float = 0.0
+    accepted: bool = False
+    elapsed_ms: float = 0.0
+    attempted: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class ParseCascade:
+    """Ordered parser stages with confidence early exit and a latency budget"""
+
+    def __init__(self, stages: List[CascadeStage], confidence: Callable[[Any], float],
+                 latency_budget_ms: Optional[float] = None, cost_smoothing: float = 0.1):
+        self.stages: Dict[str, CascadeStage] = {stage.name: stage for stage in stages}
+        self.order: List[str] = [stage.name for stage in stages]
+        self.confidence = confidence
+        self.latency_budget_ms = latency_budget_ms or None
+        self.cost_smoothing = cost_smoothing
+        self.reset_statistics()
+
+    def configure(self, order: Optional[List[str]] = None, latency_budget_ms: Optional[float] = None):
+        """Set the stage order (unknown names are an error) and the budget (0 for none)"""
+        if order is not None:
+            unknown = [name for name in order if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Unknown cascade stages: {', '.join(unknown)}")
+            self.order = list(order)
+        if latency_budget_ms is not None:
+            self.latency_budget_ms = latency_budget_ms or None
+
+    async def run(self, text: Optional[str], image: Optional[bytes] = None,
+                  budget_ms: Optional[float] = None) -> CascadeOutcome:
+        """Run stages in order until one clears its confidence gate"""
+        outcome, started = CascadeOutcome(), time.perf_counter()
+        budget = self.latency_budget_ms if budget_ms is None else (budget_ms or None)
+
+        for name in self.order:
+            stage = self.stages[name]
+            if not stage.enabled or not ((image is not None) if stage.uses_image else bool(text)):
+                continue
+
+            # The first stage always runs, so every request gets at least one attempt
+            spent_ms = (time.perf_counter() - started) * 1000.0
+            if budget is not None and outcome.attempted and spent_ms + stage.cost_ms > budget:
+                self.stage_stats[name].budget_skips += 1
+                outcome.skipped.append(name)
+                continue
+
+            stage_started = time.perf_counter()
+            try:
+                result = stage.parse(image if stage.uses_image else text)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                self._observe(stage, stage_started, outcome).errors += 1
+                outcome.errors[name] = str(e)
+                logger.debug(f"Cascade stage {name} failed: {e}")
+                continue
+
+            stats = self._observe(stage, stage_started, outcome)
+            if result is None:
+                stats.misses += 1
+                continue
+
+            confidence = self.confidence(result)
+            if outcome.result is None or confidence > outcome.confidence:
+                outcome.result, outcome.stage, outcome.confidence = result, name, confidence
+            if confidence >= stage.min_confidence:
+                stats.hits += 1
+                outcome.result, outcome.stage, outcome.confidence = result, name, confidence
+                outcome.accepted = True
+                break
+            stats.misses += 1
+
+        outcome.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.requests += 1
+        self.accepted += outcome.accepted
+        self.total_ms += outcome.elapsed_ms
+        return outcome
+
+    def _observe(self, stage: CascadeStage, stage_started: float, outcome: CascadeOutcome) -> StageStats:
+        elapsed_ms = (time.perf_counter() - stage_started) * 1000.0
+        stats = self.stage_stats[stage.name]
+        stats.attempts += 1
+        stats.total_ms += elapsed_ms
+        stage.cost_ms += self.cost_smoothing * (elapsed_ms - stage.cost_ms)
+        outcome.attempted.append(stage.name)
+        return stats
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Per-stage hit rates and timings plus request totals"""
+        stages = {}
+        for name in self.order:
+            stage, stats = self.stages[name], self.stage_stats[name]
+            stages[name] = {
+                "enabled": stage.enabled,
+                "attempts": stats.attempts,
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "errors": stats.errors,
+                "budget_skips": stats.budget_skips,
+                "hit_rate": stats.hits / stats.attempts if stats.attempts else 0.0,
+                "share_of_requests": stats.hits / self.requests if self.requests else 0.0,
+                "avg_ms": stats.total_ms / stats.attempts if stats.attempts else 0.0,
+                "cost_ms": stage.cost_ms,
+                "min_confidence": stage.min_confidence
+            }
+        return {
+            "requests": self.requests,
+            "accepted": self.accepted,
+            "accept_rate": self.accepted / self.requests if self.requests else 0.0,
+            "avg_ms": self.total_ms / self.requests if self.requests else 0.0,
+            "latency_budget_ms": self.latency_budget_ms,
+            "order": list(self.order),
+            "stages": stages
+        }
+
+    def reset_statistics(self):
+        self.stage_stats: Dict[str, StageStats] = {name: StageStats() for name in self.stages}
+        self.requests = 0
+        self.accepted = 0
+        self.total_ms = 0.0
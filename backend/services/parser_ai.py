@@ -2,6 +2,7 @@
 AI-powered signal parsing service with fallback mechanisms
 """
 
+import io
 import re
 import json
 import asyncio
@@ -10,6 +11,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 from datetime import datetime
 
+from config.settings import get_settings
+from services.parse_cascade import CascadeStage, ParseCascade, DEFAULT_STAGE_COSTS_MS
 from utils.logging_config import get_logger
 
 logger = get_logger("parser.ai")
@@ -65,24 +68,24 @@ class RegexFallbackParser:
     
     def __init__(self):
         # Common trading symbols pattern
-        self.symbol_pattern = r'(?:EUR/USD|GBP/USD|USD/JPY|AUD/USD|USD/CHF|NZD/USD|USD/CAD|XAU/USD|GOLD|SILVER|BTC|ETH|[A-Z]{6})'
+        self.symbol_pattern = re.compile(r'(?:EUR/USD|GBP/USD|USD/JPY|AUD/USD|USD/CHF|NZD/USD|USD/CAD|XAU/USD|GOLD|SILVER|BTC|ETH|[A-Z]{6})')
         
         # Signal type patterns
         self.buy_patterns = [
-            r'\b(?:BUY|LONG|BULL)\b',
-            r'🔵|📈|⬆️|🟢'
+            re.compile(r'\b(?:BUY|LONG|BULL)\b'),
+            re.compile(r'🔵|📈|⬆️|🟢')
         ]
         
         self.sell_patterns = [
-            r'\b(?:SELL|SHORT|BEAR)\b',
-            r'🔴|📉|⬇️|🔻'
+            re.compile(r'\b(?:SELL|SHORT|BEAR)\b'),
+            re.compile(r'🔴|📉|⬇️|🔻')
         ]
         
         # Price patterns
-        self.price_pattern = r'\b\d+\.?\d*\b'
-        self.tp_pattern = r'(?:TP|Take\s*Profit|Target)[:\s]*(\d+\.?\d*)'
-        self.sl_pattern = r'(?:SL|Stop\s*Loss|Stop)[:\s]*(\d+\.?\d*)'
-        self.entry_pattern = r'(?:Entry|Enter|Price)[:\s]*(\d+\.?\d*)'
+        self.price_pattern = re.compile(r'\b\d+\.?\d*\b')
+        self.tp_pattern = re.compile(r'(?:TP|Take\s*Profit|Target)[:\s]*(\d+\.?\d*)', re.IGNORECASE)
+        self.sl_pattern = re.compile(r'(?:SL|Stop\s*Loss|Stop)[:\s]*(\d+\.?\d*)', re.IGNORECASE)
+        self.entry_pattern = re.compile(r'(?:Entry|Enter|Price)[:\s]*(\d+\.?\d*)', re.IGNORECASE)
     
     def parse_signal(self, text: str) -> Optional[ParsedSignal]:
         """Parse signal using regex patterns"""
@@ -90,7 +93,7 @@ class RegexFallbackParser:
             text_upper = text.upper()
             
             # Extract symbol
-            symbol_match = re.search(self.symbol_pattern, text_upper)
+            symbol_match = self.symbol_pattern.search(text_upper)
             if not symbol_match:
                 logger.debug("No symbol found in text")
                 return None
@@ -99,9 +102,9 @@ class RegexFallbackParser:
             
             # Determine signal type
             signal_type = None
-            if any(re.search(pattern, text_upper) for pattern in self.buy_patterns):
+            if any(pattern.search(text_upper) for pattern in self.buy_patterns):
                 signal_type = SignalType.BUY
-            elif any(re.search(pattern, text_upper) for pattern in self.sell_patterns):
+            elif any(pattern.search(text_upper) for pattern in self.sell_patterns):
                 signal_type = SignalType.SELL
             
             if not signal_type:
@@ -131,9 +134,9 @@ class RegexFallbackParser:
             logger.error(f"Regex fallback parsing error: {e}")
             return None
     
-    def _extract_price(self, text: str, pattern: str) -> Optional[float]:
+    def _extract_price(self, text: str, pattern: re.Pattern) -> Optional[float]:
         """Extract single price value"""
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = pattern.search(text)
         if match:
             try:
                 return float(match.group(1))
@@ -144,7 +147,7 @@ class RegexFallbackParser:
     def _extract_multiple_tp(self, text: str) -> List[float]:
         """Extract multiple take profit levels"""
         tp_prices = []
-        matches = re.findall(self.tp_pattern, text, re.IGNORECASE)
+        matches = self.tp_pattern.findall(text)
         
         for match in matches:
             try:
@@ -155,12 +158,72 @@ class RegexFallbackParser:
         return tp_prices
 
 
+class StructuredSignalParser:
+    """Fast path for the common one-line format: BUY EURUSD @ 1.1000 SL 1.0950 TP 1.1050"""
+    
+    def __init__(self):
+        self.signal_pattern = re.compile(
+            r'^\s*(BUY|SELL|LONG|SHORT)\s+([A-Z]{3}/?[A-Z]{3}|GOLD|SILVER)\s*(?:@|ENTRY:?)\s*(\d+(?:\.\d+)?)\s*,?'
+            r'\s*SL:?\s*(\d+(?:\.\d+)?)\s*,?\s*((?:TP\d?:?\s*\d+(?:\.\d+)?\s*,?\s*)+)$',
+            re.IGNORECASE
+        )
+        self.tp_pattern = re.compile(r'TP\d?:?\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+    
+    def parse_signal(self, text: str) -> Optional[ParsedSignal]:
+        """Parse a fully structured signal; anything else returns None for the next stage"""
+        match = self.signal_pattern.match(text)
+        if not match:
+            return None
+        
+        direction, symbol, entry, stop, targets = match.groups()
+        return ParsedSignal(
+            symbol=symbol.upper(),
+            signal_type=SignalType.BUY if direction.upper() in ("BUY", "LONG") else SignalType.SELL,
+            entry_price=float(entry),
+            stop_loss=float(stop),
+            take_profit=[float(tp) for tp in self.tp_pattern.findall(targets)],
+            confidence=ConfidenceLevel.HIGH,
+            raw_text=text,
+            parsing_method="regex_fallback"
+        )
+
+
+# Numeric confidence per level, for the cascade's confidence gates
+CONFIDENCE_SCORES = {
+    ConfidenceLevel.HIGH: 0.9,
+    ConfidenceLevel.MEDIUM: 0.7,
+    ConfidenceLevel.LOW: 0.4,
+    ConfidenceLevel.UNCERTAIN: 0.0
+}
+
+# Stages whose below-gate results are still returned, downgraded to LOW
+FALLBACK_STAGES = ("structured", "regex", "ocr")
+
+
+def _extract_image_text(image_data: bytes) -> Dict[str, Any]:
+    """Run OCR on raw image bytes (blocking; call from an executor)"""
+    from PIL import Image
+    from services.ocr import get_ocr_service
+    
+    return get_ocr_service().extract_text_from_image(Image.open(io.BytesIO(image_data)))
+
+
 class AISignalParser:
-    """AI-powered signal parser with intelligent processing"""
+    """
+    AI-powered signal parser with intelligent processing
+    
+    Parsers run as a cascade, cheapest first: the structured fast path, the
+    regex parser, the AI model and, for images, OCR. The first result that
+    clears the confidence gate is returned; the order and a per-request
+    latency budget come from PARSER_CASCADE_ORDER / PARSER_LATENCY_BUDGET_MS.
+    """
     
     def __init__(self):
+        settings = get_settings()
+        self.structured_parser = StructuredSignalParser()
         self.fallback_parser = RegexFallbackParser()
-        self.confidence_threshold = 0.8
+        self.confidence_threshold = settings.PARSER_MIN_CONFIDENCE
+        self.cascade = self._build_cascade(settings)
         
         # Simulated AI model responses for demo
         self.model_patterns = {
@@ -172,33 +235,68 @@ class AISignalParser:
             ]
         }
     
-    async def parse_signal(self, text: str, image_data: Optional[bytes] = None) -> Optional[ParsedSignal]:
+    async def parse_signal(self, text: str, image_data: Optional[bytes] = None,
+                           budget_ms: Optional[float] = None) -> Optional[ParsedSignal]:
         """
-        Parse trading signal from text or image using AI with fallback
+        Parse trading signal from text or image through the parse cascade
         """
         try:
-            # Primary AI parsing attempt
-            signal = await self._ai_parse_signal(text, image_data)
+            outcome = await self.cascade.run(text, image_data, budget_ms)
+            signal = outcome.result
             
-            if signal and signal.confidence in [ConfidenceLevel.HIGH, ConfidenceLevel.MEDIUM]:
-                logger.info(f"AI successfully parsed signal with {signal.confidence.value} confidence")
+            if outcome.accepted:
+                logger.info(f"{outcome.stage} stage parsed signal with {signal.confidence.value} confidence "
+                            f"in {outcome.elapsed_ms:.1f}ms")
                 return signal
             
-            # Fallback to regex parsing
-            logger.info("AI parsing failed or low confidence, using regex fallback")
-            fallback_signal = self.fallback_parser.parse_signal(text)
-            
-            if fallback_signal:
-                fallback_signal.confidence = ConfidenceLevel.LOW
-                return fallback_signal
+            if signal and outcome.stage in FALLBACK_STAGES:
+                logger.info("No stage cleared the confidence gate, using regex fallback")
+                signal.confidence = ConfidenceLevel.LOW
+                return signal
             
-            logger.warning("Both AI and regex parsing failed")
+            logger.warning(f"All parsing stages failed (skipped for budget: {outcome.skipped})")
             return None
             
         except Exception as e:
             logger.error(f"Signal parsing error: {e}")
             return None
     
+    def _build_cascade(self, settings) -> ParseCascade:
+        """Parse stages gated at the confidence threshold, in the configured order"""
+        threshold = self.confidence_threshold
+        stages = [
+            CascadeStage("structured", self.structured_parser.parse_signal, DEFAULT_STAGE_COSTS_MS["structured"], threshold),
+            CascadeStage("regex", self._regex_parse_signal, DEFAULT_STAGE_COSTS_MS["regex"], threshold),
+            CascadeStage("ai", self._ai_parse_signal, DEFAULT_STAGE_COSTS_MS["ai"], threshold),
+            CascadeStage("ocr", self._ocr_parse_signal, DEFAULT_STAGE_COSTS_MS["ocr"], threshold, uses_image=True)
+        ]
+        cascade = ParseCascade(stages, confidence=lambda signal: CONFIDENCE_SCORES[signal.confidence])
+        cascade.configure(order=settings.get_parser_cascade_order(),
+                          latency_budget_ms=settings.PARSER_LATENCY_BUDGET_MS)
+        return cascade
+    
+    def _regex_parse_signal(self, text: str) -> Optional[ParsedSignal]:
+        """Regex stage; signals missing entry, stop loss or targets stay below the gate"""
+        signal = self.fallback_parser.parse_signal(text)
+        if signal and (signal.entry_price is None or signal.stop_loss is None or not signal.take_profit):
+            signal.confidence = ConfidenceLevel.LOW
+        return signal
+    
+    async def _ocr_parse_signal(self, image_data: bytes) -> Optional[ParsedSignal]:
+        """Extract text from the image off the event loop and parse it with the text parsers"""
+        loop = asyncio.get_running_loop()
+        extracted = await loop.run_in_executor(None, _extract_image_text, image_data)
+        text = extracted.get("text", "")
+        if not text:
+            return None
+        
+        signal = self.structured_parser.parse_signal(text) or self._regex_parse_signal(text)
+        if signal:
+            signal.parsing_method = "ocr_regex"
+            if extracted.get("confidence", 0.0) < self.confidence_threshold:
+                signal.confidence = ConfidenceLevel.LOW
+        return signal
+    
     async def _ai_parse_signal(self, text: str, image_data: Optional[bytes] = None) -> Optional[ParsedSignal]:
         """
         Simulated AI parsing (in production, would use actual LLM)
@@ -392,4 +490,7 @@ class SignalProcessor:
             stats["success_rate"] = 0.0
             stats["ai_success_rate"] = 0.0
         
+        # Per-stage hit rates and timings
+        stats["cascade"] = self.ai_parser.cascade.get_statistics()
+        
         return stats
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+Report Job Service - renders analytics PDFs in a process pool and streams the
+finished bytes back to the API without blocking the event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Any, AsyncIterator
+
+from config.settings import get_settings
+from utils.logging_config import get_logger
+
+logger = get_logger("report_jobs")
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ReportJobStatus(Enum):
+    """Report job lifecycle"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ReportJobError(Exception):
+    """Raised when a report job fails or is unknown"""
+    pass
+
+
+@dataclass
+class ReportJob:
+    """Pollable state of one report render"""
+    job_id: str
+    user_id: Optional[str]
+    file_path: str
+    status: ReportJobStatus = ReportJobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    pages: int = 0
+    trade_rows: int = 0
+    size_bytes: int = 0
+    chart_cache_hit: bool = False
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (ReportJobStatus.COMPLETED, ReportJobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "pages": self.pages,
+            "trade_rows": self.trade_rows,
+            "size_bytes": self.size_bytes,
+            "chart_cache_hit": self.chart_cache_hit,
+            "error": self.error
+        }
+
+
+# Per worker process: one data store per database URL, reused across jobs
+_worker_stores: Dict[str, Any] = {}
+
+
+def _render_report(file_path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process pool entry point. Trade rows are either passed in (sample mode) or
+    streamed from the database inside the worker, so the trade log never
+    crosses the process boundary.
+    """
+    from services.report_pdf import DEFAULT_TRADE_LOG_LIMIT, get_pdf_builder
+
+    trade_rows = request.get("trade_rows")
+    trade_query = request.get("trade_query")
+    if trade_query is not None:
+        from core.analytics_store import AnalyticsDataStore
+
+        url = trade_query["database_url"]
+        store = _worker_stores.get(url)
+        if store is None:
+            store = _worker_stores[url] = AnalyticsDataStore(url)
+        trade_rows = store.iter_trade_rows(trade_query.get("user_id"), trade_query.get("since"),
+                                           limit=request.get("trade_log_limit", DEFAULT_TRADE_LOG_LIMIT))
+
+    return get_pdf_builder().write_analytics_report(
+        file_path,
+        request["summary"],
+        trade_rows=trade_rows,
+        providers=request.get("providers"),
+        chart_data=request.get("chart_data"),
+        user_name=request.get("user_name", "User"),
+        trade_log_limit=request.get("trade_log_limit", DEFAULT_TRADE_LOG_LIMIT)
+    )
+
+
+class ReportJobManager:
+    """Queues report renders onto a process pool and tracks their status"""
+
+    def __init__(self, max_workers: int = None, output_dir: str = None,
+                 job_ttl_seconds: int = None, poll_interval: float = 0.05):
+        settings = get_settings()
+        self.max_workers = max_workers or settings.REPORT_WORKERS
+        self.output_dir = Path(output_dir or settings.REPORT_OUTPUT_DIR)
+        self.job_ttl_seconds = job_ttl_seconds if job_ttl_seconds is not None else settings.REPORT_JOB_TTL_SECONDS
+        self.poll_interval = poll_interval
+
+        self.jobs: Dict[str, ReportJob] = {}
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and DB pools is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def submit(self, request: Dict[str, Any], user_id: Optional[str] = None) -> ReportJob:
+        """Queue a report render; returns immediately with the pollable job"""
+        self.cleanup_expired()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        job_id = uuid.uuid4().hex
+        job = ReportJob(job_id=job_id, user_id=user_id,
+                        file_path=str(self.output_dir / f"report_{job_id}.pdf"))
+        self.jobs[job_id] = job
+        self._done_events[job_id] = asyncio.Event()
+        self._tasks[job_id] = asyncio.create_task(self._run(job, request))
+
+        logger.info(f"Report job {job_id} queued for user {user_id or 'all'}")
+        return job
+
+    async def _run(self, job: ReportJob, request: Dict[str, Any]):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        try:
+            # Only as many jobs as workers are handed to the pool, so RUNNING means rendering
+            async with self._slots:
+                job.status = ReportJobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+                loop = asyncio.get_running_loop()
+                stats = await loop.run_in_executor(self._get_executor(), _render_report,
+                                                   job.file_path, request)
+
+            job.pages = stats["pages"]
+            job.trade_rows = stats["trade_rows"]
+            job.chart_cache_hit = stats["chart_cache_hit"]
+            job.size_bytes = os.path.getsize(job.file_path)
+            job.status = ReportJobStatus.COMPLETED
+            logger.info(f"Report job {job.job_id} completed: {job.pages} pages, "
+                        f"{job.trade_rows} trades, {job.size_bytes} bytes")
+
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._executor = None
+            job.status = ReportJobStatus.FAILED
+            job.error = str(e) or type(e).__name__
+            logger.error(f"Report job {job.job_id} failed: {job.error}")
+
+        finally:
+            job.completed_at = datetime.utcnow()
+            self._done_events[job.job_id].set()
+            self._tasks.pop(job.job_id, None)
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        """Current state of a job, or None if unknown or expired"""
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> ReportJob:
+        """Wait for a job to finish"""
+        job = self._require(job_id)
+        await self._done_events[job_id].wait()
+        return job
+
+    async def stream(self, job_id: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Yield the PDF bytes as they land on disk, following the file while the
+        worker is still writing it
+        """
+        job = self._require(job_id)
+        done = self._done_events[job_id]
+        handle = None
+        try:
+            while True:
+                finished = job.finished
+                if job.status == ReportJobStatus.FAILED:
+                    raise ReportJobError(f"Report job {job_id} failed: {job.error}")
+
+                if handle is None and os.path.exists(job.file_path):
+                    handle = open(job.file_path, 'rb')
+                if handle is not None:
+                    chunk = handle.read(chunk_size)
+                    if chunk:
+                        yield chunk
+                        continue
+
+                if finished:
+                    break
+                try:
+                    await asyncio.wait_for(done.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def _require(self, job_id: str) -> ReportJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ReportJobError(f"Unknown report job: {job_id}")
+        return job
+
+    def list_jobs(self, user_id: Optional[str] = None) -> List[ReportJob]:
+        """Jobs for a user (all jobs when user_id is None), newest first"""
+        jobs = [job for job in self.jobs.values() if user_id is None or job.user_id == user_id]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cleanup_expired(self) -> int:
+        """Drop finished jobs older than the TTL along with their files"""
+        cutoff = time.time() - self.job_ttl_seconds
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished and job.completed_at
+                   and (job.completed_at - datetime(1970, 1, 1)).total_seconds() < cutoff]
+
+        for job_id in expired:
+            job = self.jobs.pop(job_id)
+            self._done_events.pop(job_id, None)
+            try:
+                os.remove(job.file_path)
+            except FileNotFoundError:
+                pass
+
+        return len(expired)
+
+    def shutdown(self):
+        """Stop the worker processes; queued renders are cancelled"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global report job manager instance
+_report_job_manager = None
+
+
+def get_report_job_manager() -> ReportJobManager:
+    """Get global report job manager instance"""
+    global _report_job_manager
+    if _report_job_manager is None:
+        _report_job_manager = ReportJobManager()
+    return _report_job_manager
@@ -2,10 +2,14 @@
 PDF Report Builder Service
 """
 
+import hashlib
 import io
+import json
 import os
 import tempfile
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, List, Optional, Any, BinaryIO, Iterable, Iterator, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
@@ -14,21 +18,66 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor, black, white, grey
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.barcharts import VerticalBarChart
 # from reportlab.platypus.charts import VerticalBarChart, HorizontalLineChart  # Charts module not available in base reportlab
 # from reportlab.lib.charts import Drawing  # Charts module not available in base reportlab
 # from reportlab.graphics.shapes import String
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
-from core.analytics import AnalyticsSummary, ProviderAnalytics, TradeMetrics
+from core.analytics import AnalyticsSummary, ProviderAnalytics, TradeMetrics, _to_epoch
 from utils.logging_config import get_logger
 
 logger = get_logger("report_pdf")
 
+# (entry time as UTC epoch seconds, symbol, side, P&L, duration in seconds)
+TradeRow = Tuple[float, str, str, float, int]
+
+TRADE_ROWS_PER_TABLE = 40
+DEFAULT_TRADE_LOG_LIMIT = 10  # Most recent trades listed in the trade log; None lists all
+MAX_CHART_POINTS = 120
+
+
+class _StreamingStory(list):
+    """
+    Flowable list for SimpleDocTemplate.build that refills itself from an
+    iterator as platypus consumes it, so a long trade log is laid out page by
+    page instead of being materialized up front
+    """
+    
+    def __init__(self, flowables: Iterator, lookahead: int = 8):
+        super().__init__()
+        self._source = flowables
+        self._lookahead = lookahead  # keepWithNext groups look a few flowables ahead
+    
+    def __len__(self) -> int:
+        if self._source is not None and list.__len__(self) < self._lookahead:
+            pulled = list(islice(self._source, self._lookahead))
+            if len(pulled) < self._lookahead:
+                self._source = None
+            self.extend(pulled)
+        return list.__len__(self)
+
+
+def trade_rows_from_metrics(trades: Iterable[TradeMetrics]) -> List[TradeRow]:
+    """Trade log rows for TradeMetrics objects, most recent first"""
+    rows = [
+        (_to_epoch(trade.entry_time), trade.symbol,
+         "BUY" if trade.profit_loss > 0 else "SELL",  # Simplified, TradeMetrics has no side
+         trade.profit_loss, trade.duration_seconds)
+        for trade in trades
+    ]
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return rows
+
 
 class PDFReportBuilder:
     """PDF report builder for trading analytics"""
     
-    def __init__(self):
+    def __init__(self, chart_cache_size: int = 64):
+        self.chart_cache: "OrderedDict[str, List[Drawing]]" = OrderedDict()
+        self.chart_cache_size = chart_cache_size
         self.styles = getSampleStyleSheet()
         self.custom_styles = self._create_custom_styles()
         self.brand_colors = {
@@ -101,65 +150,89 @@ class PDFReportBuilder:
                                 trades: List[TradeMetrics] = None,
                                 providers: List[ProviderAnalytics] = None,
                                 chart_data: Dict[str, Any] = None,
-                                user_name: str = "User") -> bytes:
+                                user_name: str = "User",
+                                trade_log_limit: Optional[int] = DEFAULT_TRADE_LOG_LIMIT) -> bytes:
         """Generate comprehensive analytics PDF report"""
         try:
             # Create PDF buffer
             buffer = io.BytesIO()
-            
-            # Create document
-            doc = SimpleDocTemplate(
+            self.write_analytics_report(
                 buffer,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=72
+                summary,
+                trade_rows=trade_rows_from_metrics(trades) if trades else None,
+                providers=providers,
+                chart_data=chart_data,
+                user_name=user_name,
+                trade_log_limit=trade_log_limit
             )
             
-            # Build report content
-            story = []
+            # Get PDF bytes
+            pdf_bytes = buffer.getvalue()
+            buffer.close()
+            
+            logger.info("PDF report generated successfully")
+            return pdf_bytes
             
+        except Exception as e:
+            logger.error(f"Error generating PDF report: {e}")
+            raise
+    
+    def write_analytics_report(self, target: Union[str, BinaryIO], summary: AnalyticsSummary,
+                               trade_rows: Iterable[TradeRow] = None,
+                               providers: List[ProviderAnalytics] = None,
+                               chart_data: Dict[str, Any] = None,
+                               user_name: str = "User",
+                               trade_log_limit: Optional[int] = DEFAULT_TRADE_LOG_LIMIT) -> Dict[str, Any]:
+        """
+        Render the report into a file path or binary stream. Trade rows are
+        consumed lazily, one table page at a time, so the iterator can come
+        straight from a database cursor; at most trade_log_limit of them are
+        listed (all when None). Returns page/row counts for job status.
+        """
+        # Create document
+        doc = SimpleDocTemplate(
+            target,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=72
+        )
+        stats = {"pages": 0, "trade_rows": 0, "chart_cache_hit": False}
+        
+        def story() -> Iterator:
             # Header
-            story.extend(self._build_header(user_name))
+            yield from self._build_header(user_name)
             
             # Executive Summary
-            story.extend(self._build_executive_summary(summary))
+            yield from self._build_executive_summary(summary)
             
             # Performance Metrics
-            story.extend(self._build_performance_metrics(summary))
+            yield from self._build_performance_metrics(summary)
             
-            # Trade Analysis
-            if trades:
-                story.extend(self._build_trade_analysis(trades))
+            # Charts and Visualizations
+            if chart_data:
+                yield from self._build_charts(chart_data, stats)
             
             # Provider Analysis
             if providers:
-                story.extend(self._build_provider_analysis(providers))
-            
-            # Charts and Visualizations
-            if chart_data:
-                story.extend(self._build_charts(chart_data))
+                yield from self._build_provider_analysis(providers)
             
             # Recommendations
-            story.extend(self._build_recommendations(summary))
-            
-            # Footer
-            story.extend(self._build_footer())
-            
-            # Build PDF
-            doc.build(story)
+            yield from self._build_recommendations(summary)
             
-            # Get PDF bytes
-            pdf_bytes = buffer.getvalue()
-            buffer.close()
-            
-            logger.info("PDF report generated successfully")
-            return pdf_bytes
+            # Trade Analysis, last so the rest of the report is not pushed behind the log
+            if trade_rows is not None:
+                rows = trade_rows if trade_log_limit is None else islice(trade_rows, trade_log_limit)
+                yield from self._build_trade_analysis(rows, stats)
             
-        except Exception as e:
-            logger.error(f"Error generating PDF report: {e}")
-            raise
+            # Footer
+            yield from self._build_footer()
+        
+        # Build PDF
+        doc.build(_StreamingStory(story()))
+        stats["pages"] = doc.page
+        return stats
     
     def _build_header(self, user_name: str) -> List:
         """Build report header"""
@@ -256,34 +329,13 @@ class PDFReportBuilder:
         
         return story
     
-    def _build_trade_analysis(self, trades: List[TradeMetrics]) -> List:
-        """Build trade analysis section"""
-        story = []
-        
+    def _build_trade_analysis(self, trade_rows: Iterable[TradeRow],
+                              stats: Optional[Dict[str, Any]] = None) -> Iterator:
+        """Build trade analysis section, one table per TRADE_ROWS_PER_TABLE rows"""
         # Section header
-        header = Paragraph("Trade Analysis", self.custom_styles['SectionHeader'])
-        story.append(header)
-        
-        # Recent trades table (last 10)
-        recent_trades = sorted(trades, key=lambda t: t.entry_time, reverse=True)[:10]
+        yield Paragraph("Trade Analysis", self.custom_styles['SectionHeader'])
         
-        trade_data = [['Symbol', 'Type', 'P&L', 'Duration', 'Entry Time']]
-        
-        for trade in recent_trades:
-            trade_type = "BUY" if trade.profit_loss > 0 else "SELL"  # Simplified
-            duration = f"{trade.duration_seconds // 3600}h {(trade.duration_seconds % 3600) // 60}m"
-            entry_time = trade.entry_time.strftime('%m/%d %H:%M')
-            
-            trade_data.append([
-                trade.symbol,
-                trade_type,
-                f"${trade.profit_loss:.2f}",
-                duration,
-                entry_time
-            ])
-        
-        table = Table(trade_data, colWidths=[1*inch, 0.8*inch, 1*inch, 1*inch, 1.2*inch])
-        table.setStyle(TableStyle([
+        table_style = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), self.brand_colors['secondary']),
             ('TEXTCOLOR', (0, 0), (-1, 0), white),
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -292,12 +344,33 @@ class PDFReportBuilder:
             ('FONTSIZE', (0, 0), (-1, -1), 8),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
             ('GRID', (0, 0), (-1, -1), 1, self.brand_colors['secondary'])
-        ]))
+        ])
+        header = ['Symbol', 'Type', 'P&L', 'Duration', 'Entry Time']
+        
+        rows = iter(trade_rows)
+        total = 0
+        while True:
+            page = list(islice(rows, TRADE_ROWS_PER_TABLE))
+            if not page:
+                break
+            total += len(page)
+            
+            trade_data = [header]
+            for entry_ts, symbol, side, profit_loss, duration_seconds in page:
+                duration = f"{duration_seconds // 3600}h {(duration_seconds % 3600) // 60}m"
+                entry_time = datetime.utcfromtimestamp(entry_ts).strftime('%m/%d %H:%M')
+                trade_data.append([symbol, side, f"${profit_loss:.2f}", duration, entry_time])
+            
+            table = Table(trade_data, colWidths=[1*inch, 0.8*inch, 1*inch, 1*inch, 1.2*inch], repeatRows=1)
+            table.setStyle(table_style)
+            yield table
         
-        story.append(table)
-        story.append(Spacer(1, 20))
+        if total == 0:
+            yield Paragraph("No closed trades in this period.", self.custom_styles['Body'])
+        if stats is not None:
+            stats["trade_rows"] = total
         
-        return story
+        yield Spacer(1, 20)
     
     def _build_provider_analysis(self, providers: List[ProviderAnalytics]) -> List:
         """Build provider analysis section"""
@@ -336,7 +409,8 @@ class PDFReportBuilder:
         
         return story
     
-    def _build_charts(self, chart_data: Dict[str, Any]) -> List:
+    def _build_charts(self, chart_data: Dict[str, Any],
+                      stats: Optional[Dict[str, Any]] = None) -> List:
         """Build charts section"""
         story = []
         
@@ -344,15 +418,57 @@ class PDFReportBuilder:
         header = Paragraph("Performance Charts", self.custom_styles['SectionHeader'])
         story.append(header)
         
-        # Add chart placeholder (ReportLab charts are complex, simplified here)
-        chart_text = "Performance charts would be rendered here in a full implementation."
-        chart_paragraph = Paragraph(chart_text, self.custom_styles['Body'])
-        story.append(chart_paragraph)
+        datasets = [d for d in chart_data.get("datasets", []) if d.get("data")]
+        if not datasets:
+            story.append(Paragraph("No chart data for this period.", self.custom_styles['Body']))
+        else:
+            # Drawings are cached by content hash; repeated reports over unchanged
+            # data (polling clients, scheduled exports) skip the chart layout
+            key = hashlib.sha256(json.dumps(chart_data, sort_keys=True, default=str).encode()).hexdigest()
+            drawings = self.chart_cache.get(key)
+            if stats is not None:
+                stats["chart_cache_hit"] = drawings is not None
+            if drawings is not None:
+                self.chart_cache.move_to_end(key)
+            else:
+                drawings = [self._render_chart(dataset) for dataset in datasets]
+                self.chart_cache[key] = drawings
+                if len(self.chart_cache) > self.chart_cache_size:
+                    self.chart_cache.popitem(last=False)
+            for dataset, drawing in zip(datasets, drawings):
+                story.append(Paragraph(dataset.get("label", ""), self.custom_styles['Body']))
+                story.append(drawing)
         
         story.append(Spacer(1, 20))
         
         return story
     
+    def _render_chart(self, dataset: Dict[str, Any]) -> Drawing:
+        """Lay out one chart dataset; long series are bucketed to MAX_CHART_POINTS"""
+        values = [float(v) for v in dataset["data"]]
+        is_bar = dataset.get("type") == "bar"
+        if len(values) > MAX_CHART_POINTS:
+            size = -(-len(values) // MAX_CHART_POINTS)
+            buckets = [values[i:i + size] for i in range(0, len(values), size)]
+            # Period P&L bars add up per bucket; a cumulative line keeps its bucket-end value
+            values = [sum(b) for b in buckets] if is_bar else [b[-1] for b in buckets]
+        
+        drawing = Drawing(450, 190)
+        if is_bar:
+            chart = VerticalBarChart()
+            chart.data = [values]
+            chart.bars[0].fillColor = self.brand_colors['primary']
+            chart.categoryAxis.visibleLabels = False
+        else:
+            chart = LinePlot()
+            chart.data = [list(enumerate(values))]
+            chart.lines[0].strokeColor = self.brand_colors['primary']
+            chart.xValueAxis.visibleLabels = False
+        chart.x, chart.y = 40, 20
+        chart.width, chart.height = 390, 150
+        drawing.add(chart)
+        return drawing
+        
     def _build_recommendations(self, summary: AnalyticsSummary) -> List:
         """Build recommendations section"""
         story = []
@@ -157,6 +157,45 @@ class TestAnalyticsEngine:
         assert analytics_engine._should_update_cache(cache_key) is False
         assert analytics_engine.cache[cache_key] == test_data
     
+    @pytest.mark.asyncio
+    async def test_overlapping_trades_stay_materialized(self, analytics_engine):
+        """Test closes arriving in a different order from entries update the view without a rebuild"""
+        opened_at = datetime(2024, 3, 4, 9, 0)
+        
+        def trade(trade_id, opened, closed, pnl):
+            return TradeMetrics(
+                trade_id=trade_id,
+                symbol="EURUSD",
+                entry_price=1.0850,
+                exit_price=1.0850,
+                volume=0.1,
+                profit_loss=pnl,
+                profit_loss_percentage=pnl / 100,
+                duration_seconds=(closed - opened) * 60,
+                signal_provider="provider_1",
+                entry_time=opened_at + timedelta(minutes=opened),
+                exit_time=opened_at + timedelta(minutes=closed)
+            )
+        
+        history = [trade("T1", 0, 30, 100.0)]
+        # T2 is opened before T3 but closes after it
+        closes = [trade("T3", 20, 60, -40.0), trade("T2", 10, 120, -80.0)]
+        
+        with patch.object(analytics_engine, '_get_trades_data', return_value=history) as mock_trades:
+            view = await analytics_engine._get_materialized(None)
+            for closed in closes:
+                analytics_engine.record_closed_trade(closed)
+            
+            assert not view.out_of_order
+            assert await analytics_engine._get_materialized(None) is view
+            mock_trades.assert_called_once()
+        
+        rebuilt = analytics_engine._calculate_summary_metrics(history + closes)
+        incremental = view.overall.to_summary()
+        assert incremental.max_drawdown == pytest.approx(rebuilt.max_drawdown) == pytest.approx(120.0)
+        assert incremental.consecutive_losses == rebuilt.consecutive_losses == 2
+        assert incremental.total_pnl == pytest.approx(rebuilt.total_pnl)
+    
     def test_empty_data_handling(self, analytics_engine):
         """Test handling of empty data"""
         empty_summary = analytics_engine._get_empty_summary()
@@ -172,6 +211,133 @@ class TestAnalyticsEngine:
         assert empty_symbol["win_rate"] == 0.0
 
 
+class TestAnalyticsDataStore:
+    """Test cases for the database-backed analytics source"""
+    
+    @pytest.fixture
+    def data_store(self, tmp_path):
+        """Create a data store on a fresh SQLite database"""
+        from core.analytics_store import AnalyticsDataStore
+        store = AnalyticsDataStore(f"sqlite:///{tmp_path / 'analytics.db'}")
+        store.create_schema()
+        return store
+    
+    def test_create_schema_migrates_existing_tables(self, tmp_path):
+        """Test columns added for analytics are created on an older database"""
+        from sqlalchemy import inspect
+        from core.analytics_store import AnalyticsDataStore
+        
+        store = AnalyticsDataStore(f"sqlite:///{tmp_path / 'old.db'}")
+        with store.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE TABLE trade_orders (id VARCHAR PRIMARY KEY, signal_id VARCHAR, user_id VARCHAR NOT NULL, "
+                "symbol VARCHAR(10) NOT NULL, order_type INTEGER NOT NULL, volume FLOAT NOT NULL, "
+                "status VARCHAR(20) NOT NULL, executed_price FLOAT, executed_at DATETIME)")
+        
+        store.create_schema()
+        
+        columns = {column["name"] for column in inspect(store.engine).get_columns("trade_orders")}
+        assert {"close_price", "closed_at", "profit_loss"} <= columns
+        assert "provider_id" in {column["name"] for column in inspect(store.engine).get_columns("signals")}
+        assert store.has_data() is False
+    
+    @pytest.mark.asyncio
+    async def test_empty_store_serves_sample_data(self, data_store):
+        """Test an empty store falls back to the sample data"""
+        engine = AnalyticsEngine(data_store=data_store)
+        
+        summary = await engine.get_summary_analytics()
+        providers = await engine.get_provider_analytics()
+        
+        assert summary.total_trades == 2
+        assert len(providers) == 2
+    
+    @pytest.mark.asyncio
+    async def test_record_trade_close_persists_trade(self, data_store):
+        """Test a closed trade is written to the store and served from it"""
+        engine = AnalyticsEngine(data_store=data_store)
+        assert (await engine.get_summary_analytics()).total_trades == 2  # Sample data
+        
+        closed_at = datetime.utcnow()
+        trade = TradeMetrics(
+            trade_id="ORDER_1",
+            symbol="EURUSD",
+            entry_price=1.0850,
+            exit_price=1.0870,
+            volume=0.5,
+            profit_loss=100.0,
+            profit_loss_percentage=0.18,
+            duration_seconds=600,
+            signal_provider=None,
+            entry_time=closed_at - timedelta(minutes=10),
+            exit_time=closed_at
+        )
+        await engine.record_trade_close(trade, "user_1", order_type=0, ticket=42)
+        
+        assert data_store.has_data() is True
+        summary = await engine.get_summary_analytics("user_1")
+        assert summary.total_trades == 1
+        assert summary.total_pnl == 100.0
+        
+        columns = data_store.load_trade_columns("user_1")
+        assert len(columns) == 1
+        assert columns.exit_ts[0] - columns.entry_ts[0] == pytest.approx(600, abs=1)
+    
+    @pytest.mark.asyncio
+    async def test_executed_trade_close_keeps_provider(self, data_store):
+        """Test a trade executed from a provider signal is attributed to that provider once closed"""
+        from unittest.mock import AsyncMock
+        from core.trade import TradeExecutor
+        from services.parser_ai import ParsedSignal, SignalType
+        
+        engine = AnalyticsEngine(data_store=data_store)
+        executor = TradeExecutor()
+        executor.mt5_bridge = Mock()
+        executor.mt5_bridge.get_account_info = AsyncMock(return_value={"balance": 10000.0, "margin_free": 10000.0})
+        executor.mt5_bridge.open_position = AsyncMock(return_value={"status": "success", "ticket": 42, "price": 1.0850})
+        executor.mt5_bridge.close_position = AsyncMock(return_value={"status": "success", "price": 1.0870, "profit": 40.0})
+        signal = ParsedSignal(symbol="EURUSD", signal_type=SignalType.BUY, entry_price=1.0850,
+                              stop_loss=1.0800, take_profit=[1.0900])
+        
+        with patch('core.analytics._analytics_engine', engine):
+            order = await executor.execute_signal(signal, "user_1", signal_id="SIG_1",
+                                                  provider_id="gold_pro", provider_name="Gold Signals Pro")
+            assert await executor.close_order(order.id, "user_1") is True
+        
+        aggregates = data_store.load_provider_aggregates()
+        assert [(p["id"], p["name"], p["total_signals"]) for p in aggregates] == [("gold_pro", "Gold Signals Pro", 1)]
+        assert aggregates[0]["symbol_stats"]["EURUSD"] == {"executed": 1, "winning": 1, "pnl": 40.0}
+        assert len(data_store.load_trade_columns(provider_id="gold_pro")) == 1
+    
+    @pytest.mark.asyncio
+    async def test_ingested_signal_is_counted_once(self, data_store):
+        """Test a signal recorded at ingest is not counted again when its trade closes"""
+        engine = AnalyticsEngine(data_store=data_store)
+        engine.store_populated = True
+        assert await engine.get_provider_analytics() == []
+        
+        await engine.record_provider_signal("SIG_1", "user_1", "EURUSD", "BUY", "gold_pro", "Gold Signals Pro")
+        await engine.record_provider_signal("SIG_1", "user_1", "EURUSD", "BUY", "gold_pro", "Gold Signals Pro")
+        
+        closed_at = datetime.utcnow()
+        trade = TradeMetrics(
+            trade_id="ORDER_1", symbol="EURUSD", entry_price=1.0850, exit_price=1.0870, volume=0.2,
+            profit_loss=40.0, profit_loss_percentage=0.18, duration_seconds=600, signal_provider="gold_pro",
+            entry_time=closed_at - timedelta(minutes=10), exit_time=closed_at
+        )
+        await engine.record_trade_close(trade, "user_1", order_type=0, signal_id="SIG_1",
+                                        provider_name="Gold Signals Pro")
+        
+        providers = await engine.get_provider_analytics("gold_pro")
+        assert [(p.total_signals, p.executed_signals) for p in providers] == [(1, 1)]
+        assert data_store.load_provider_aggregates()[0]["total_signals"] == 1
+        
+        # Views rebuilt from the store agree with the incrementally updated ones
+        engine.invalidate("user_1")
+        providers = await engine.get_provider_analytics("gold_pro")
+        assert [(p.total_signals, p.executed_signals) for p in providers] == [(1, 1)]
+
+
 class TestPDFReportBuilder:
     """Test cases for PDF report builder"""
     
@@ -293,6 +459,48 @@ class TestPDFReportBuilder:
         assert pdf_builder._get_drawdown_color(5.0) == "Good"
         assert pdf_builder._get_drawdown_color(15.0) == "Fair"
         assert pdf_builder._get_drawdown_color(25.0) == "High"
+    
+    def test_trade_log_limit(self, pdf_builder, sample_summary):
+        """Test the trade log lists the most recent 10 trades unless asked for all"""
+        import io
+        rows = [(1700000000.0 - i * 60, "EURUSD", "BUY", 10.0, 600) for i in range(25)]
+        
+        stats = pdf_builder.write_analytics_report(io.BytesIO(), sample_summary, trade_rows=iter(rows))
+        assert stats["trade_rows"] == 10
+        
+        stats = pdf_builder.write_analytics_report(io.BytesIO(), sample_summary, trade_rows=iter(rows),
+                                                   trade_log_limit=None)
+        assert stats["trade_rows"] == 25
+
+
+class TestReportJobAccess:
+    """Test cases for report job ownership checks"""
+    
+    @staticmethod
+    def _request(user_id):
+        from types import SimpleNamespace
+        return SimpleNamespace(state=SimpleNamespace(user_id=user_id))
+    
+    def test_owned_job_requires_owner(self):
+        """Test only the authenticated owner can see a report job"""
+        from fastapi import HTTPException
+        from api.analytics import _get_owned_job, report_jobs
+        from services.report_jobs import ReportJob
+        
+        job = ReportJob(job_id="job_test_owner", user_id="user_1", file_path="unused.pdf")
+        report_jobs.jobs[job.job_id] = job
+        try:
+            assert _get_owned_job(self._request("user_1"), job.job_id) is job
+            
+            with pytest.raises(HTTPException) as error:
+                _get_owned_job(self._request("user_2"), job.job_id)
+            assert error.value.status_code == 404
+            
+            with pytest.raises(HTTPException) as error:
+                _get_owned_job(self._request(None), job.job_id)
+            assert error.value.status_code == 401
+        finally:
+            del report_jobs.jobs[job.job_id]
 
 
 if __name__ == "__main__":
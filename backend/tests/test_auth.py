@@ -2,8 +2,11 @@
 Tests for authentication module
 """
 
+import asyncio
+import jwt
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from core.auth import AuthService, LicenseValidator, UserCredentials, TokenData, LicenseInfo
 
@@ -103,6 +106,40 @@ class TestAuthService:
         assert token_data.user_id == credentials.username
         assert token_data.device_id == credentials.device_fingerprint[:16]
         assert len(token_data.license_key) == 32
+    
+    def test_revoking_refresh_token_invalidates_login_access_token(self):
+        """Test that revoking a login's refresh token also revokes its access token"""
+        credentials = UserCredentials(
+            username="test_user",
+            password="test_password",
+            device_fingerprint="test_fingerprint_123"
+        )
+        token_data = self.auth_service.authenticate_user(credentials)
+        
+        access_token, refresh_token = self.auth_service.create_session_tokens(token_data)
+        verified_data = self.auth_service.verify_token(access_token)
+        assert verified_data is not None
+        
+        token_id = jwt.decode(refresh_token, options={"verify_signature": False})["token_id"]
+        assert verified_data.refresh_token_id == token_id
+        assert self.auth_service.revoke_refresh_token(token_id)
+        
+        assert self.auth_service.verify_token(access_token) is None
+        assert self.auth_service.refresh_access_token(refresh_token) is None
+    
+    def test_login_endpoint_binds_access_token_to_refresh_token(self):
+        """Test that the login endpoint issues a revocable session"""
+        from api import auth as auth_api
+        
+        request = auth_api.LoginRequest(username="test_user", password="test_password",
+                                        device_info={"platform": "Windows"})
+        with patch.object(auth_api, "auth_service", self.auth_service):
+            response = asyncio.run(auth_api.login(request))
+        
+        assert response.refresh_token is not None
+        token_id = jwt.decode(response.refresh_token, options={"verify_signature": False})["token_id"]
+        assert self.auth_service.revoke_refresh_token(token_id)
+        assert self.auth_service.verify_token(response.access_token) is None
 
 
 class TestLicenseValidator:
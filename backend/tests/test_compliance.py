@@ -156,6 +156,151 @@ class TestComplianceEngine:
             assert len(result["violations"]) > 0
             assert result["profile"] == "ftmo"
     
+    @pytest.mark.asyncio
+    async def test_activation_compiles_evaluator(self, engine):
+        """Test activation compiles the profile with custom restrictions applied"""
+        await engine.initialize()
+        
+        with patch.object(engine, '_update_user_compliance_db'):
+            await engine.activate_compliance_mode("user_123", "eu_mifid_ii", {"max_lot_size": 0.5})
+        
+        evaluator = engine.evaluators["user_123"]
+        assert evaluator.restrictions.max_lot_size == 0.5
+        assert engine.default_profiles["eu_mifid_ii"]["restrictions"].max_lot_size != 0.5
+        
+        trade_params = {"symbol": "BTCUSD_CRYPTO", "volume": 1.0, "sl": 1.0, "tp": 2.0}
+        rules = [v["rule"] for v in evaluator.evaluate(trade_params, engine.daily_stats["user_123"])]
+        assert rules[:2] == ["max_lot_size", "forbidden_symbol"]
+        assert evaluator.forbidden_matches("BTCUSD_CRYPTO") == ("CRYPTO",)
+        
+        with patch.object(engine, '_deactivate_user_compliance_db'):
+            await engine.deactivate_compliance_mode("user_123")
+        assert "user_123" not in engine.evaluators
+    
+    @pytest.mark.asyncio
+    async def test_trade_events_update_daily_limits(self, engine):
+        """Test daily limits are checked against stats kept from trade events"""
+        await engine.initialize()
+        
+        engine.active_profiles["user_123"] = {
+            "profile_name": "ftmo",
+            "profile": engine.default_profiles["ftmo"],
+            "activated_at": datetime.now()
+        }
+        trade_params = {"symbol": "EURUSD", "volume": 1.0, "sl": 1.0800, "tp": 1.0900}
+        
+        with patch.object(engine, '_get_daily_trading_stats') as mock_stats:
+            mock_stats.return_value = {
+                "trade_count": 0,
+                "daily_loss": 0.0,
+                "drawdown": 0.0,
+                "profit_loss": 0.0
+            }
+            result = await engine.validate_trade("user_123", trade_params)
+            assert result["valid"] is True
+            
+            engine.record_trade_event("user_123", "balance", balance=10000.0)
+            engine.record_trade_event("user_123", "opened")
+            engine.record_trade_event("user_123", "closed", profit=-600.0)
+            result = await engine.validate_trade("user_123", trade_params)
+            
+            # Stats were read once, when the profile was compiled
+            mock_stats.assert_called_once()
+        
+        assert result["valid"] is False
+        assert [v["rule"] for v in result["violations"]] == ["max_daily_loss"]
+        stats = engine.get_daily_stats("user_123")
+        assert stats["trade_count"] == 1
+        assert stats["daily_loss"] == pytest.approx(0.06)
+        assert stats["drawdown"] == pytest.approx(0.06)
+    
+    @pytest.mark.asyncio
+    async def test_executed_trades_update_compliance_stats(self, engine):
+        """Test opens and closes through the trade executor reach the shared engine's stats"""
+        from core.trade import TradeExecutor
+        from services.parser_ai import ParsedSignal, SignalType
+        
+        await engine.initialize()
+        engine.active_profiles["user_123"] = {
+            "profile_name": "ftmo",
+            "profile": engine.default_profiles["ftmo"],
+            "activated_at": datetime.now()
+        }
+        
+        executor = TradeExecutor()
+        executor.mt5_bridge = Mock()
+        executor.mt5_bridge.get_account_info = AsyncMock(return_value={"balance": 10000.0, "margin_free": 10000.0})
+        executor.mt5_bridge.open_position = AsyncMock(return_value={"status": "success", "ticket": 42, "price": 1.0850})
+        executor.mt5_bridge.close_position = AsyncMock(return_value={"status": "success", "price": 1.0800, "profit": -250.0})
+        signal = ParsedSignal(symbol="EURUSD", signal_type=SignalType.BUY, entry_price=1.0850,
+                              stop_loss=1.0800, take_profit=[1.0900])
+        
+        with patch('core.compliance._compliance_engine', engine), \
+             patch.object(engine, '_get_daily_trading_stats', AsyncMock(return_value={
+                 "trade_count": 0, "daily_loss": 0.0, "drawdown": 0.0, "profit_loss": 0.0})), \
+             patch.object(executor, '_record_close', AsyncMock()):
+            await engine.validate_trade("user_123", {"symbol": "EURUSD", "volume": 0.1, "sl": 1.08, "tp": 1.09})
+            
+            order = await executor.execute_signal(signal, "user_123")
+            assert engine.get_daily_stats("user_123")["trade_count"] == 1
+            
+            assert await executor.close_order(order.id, "user_123") is True
+        
+        stats = engine.get_daily_stats("user_123")
+        assert stats["trade_count"] == 1
+        assert stats["profit_loss"] == pytest.approx(-250.0)
+        assert stats["equity"] == pytest.approx(9750.0)
+        assert stats["daily_loss"] == pytest.approx(0.025)
+        assert stats["drawdown"] == pytest.approx(0.025)
+    
+    @pytest.mark.asyncio
+    async def test_flat_seeded_user_breaches_daily_loss(self, engine):
+        """Test a user whose day starts flat is blocked once executed losses pass max_daily_loss"""
+        from core.trade import TradeExecutor
+        from services.parser_ai import ParsedSignal, SignalType
+        
+        await engine.initialize()
+        engine.active_profiles["user_123"] = {
+            "profile_name": "ftmo",
+            "profile": engine.default_profiles["ftmo"],
+            "activated_at": datetime.now()
+        }
+        
+        executor = TradeExecutor()
+        executor.mt5_bridge = Mock()
+        executor.mt5_bridge.get_account_info = AsyncMock(return_value={"balance": 10000.0, "margin_free": 10000.0})
+        executor.mt5_bridge.open_position = AsyncMock(return_value={"status": "success", "ticket": 42, "price": 1.0850})
+        executor.mt5_bridge.close_position = AsyncMock(return_value={"status": "success", "price": 1.0790, "profit": -600.0})
+        signal = ParsedSignal(symbol="EURUSD", signal_type=SignalType.BUY, entry_price=1.0850,
+                              stop_loss=1.0800, take_profit=[1.0900])
+        trade_params = {"symbol": "EURUSD", "volume": 0.1, "sl": 1.08, "tp": 1.09}
+        
+        with patch('core.compliance._compliance_engine', engine), \
+             patch.object(engine, '_get_daily_trading_stats', AsyncMock(return_value={
+                 "trade_count": 0, "daily_loss": 0.0, "drawdown": 0.0, "profit_loss": 0.0})), \
+             patch.object(executor, '_record_close', AsyncMock()):
+            assert (await engine.validate_trade("user_123", trade_params))["valid"]
+            
+            order = await executor.execute_signal(signal, "user_123")
+            assert await executor.close_order(order.id, "user_123") is True
+            
+            result = await engine.validate_trade("user_123", trade_params)
+        
+        assert engine.get_daily_stats("user_123")["daily_loss"] == pytest.approx(0.06)
+        assert not result["valid"]
+        assert "max_daily_loss" in [violation["rule"] for violation in result["violations"]]
+    
+    @pytest.mark.asyncio
+    async def test_api_reuses_one_engine(self):
+        """Test the API keeps one initialized engine across requests"""
+        from core.compliance import get_compliance_engine
+        
+        with patch('core.compliance._compliance_engine', None):
+            first = await get_compliance_engine()
+            second = await get_compliance_engine()
+            assert first is second
+            assert first.default_profiles
+    
     @pytest.mark.asyncio
     async def test_get_compliance_status(self, engine):
         """Test getting compliance status"""
@@ -330,7 +475,8 @@ class TestComplianceAPI:
         """Test get available profiles endpoint"""
         from api.compliance import get_available_profiles
         
-        with patch('core.compliance.ComplianceEngine') as mock_engine:
+        with patch('core.compliance._compliance_engine', None), \
+             patch('core.compliance.ComplianceEngine') as mock_engine:
             mock_instance = AsyncMock()
             mock_instance.get_available_profiles.return_value = {
                 "success": True,
@@ -361,7 +507,8 @@ class TestComplianceAPI:
         request.profile_name = "ftmo"
         request.custom_restrictions = None
         
-        with patch('core.compliance.ComplianceEngine') as mock_engine:
+        with patch('core.compliance._compliance_engine', None), \
+             patch('core.compliance.ComplianceEngine') as mock_engine:
             mock_instance = AsyncMock()
             mock_instance.activate_compliance_mode.return_value = {
                 "success": True,
@@ -390,7 +537,8 @@ class TestComplianceAPI:
         request.sl = 1.0800
         request.tp = 1.0900
         
-        with patch('core.compliance.ComplianceEngine') as mock_engine:
+        with patch('core.compliance._compliance_engine', None), \
+             patch('core.compliance.ComplianceEngine') as mock_engine:
             mock_instance = AsyncMock()
             mock_instance.validate_trade.return_value = {
                 "valid": True,
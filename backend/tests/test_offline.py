@@ -246,6 +246,108 @@ class TestOfflineAPI:
             assert "status" in result
             mock_instance.initialize.assert_called_once()
             mock_instance.get_offline_status.assert_called_once()
+    
+    def test_sync_endpoints_only_accept_post(self):
+        """Test the sync endpoints, which send queued actions, are not reachable with GET"""
+        from api.offline import router
+        
+        methods = {route.path: route.methods for route in router.routes}
+        assert methods["/offline/sync"] == {"POST"}
+        assert methods["/offline/sync/stream"] == {"POST"}
+
+
+
+class TestBatchedSync:
+    """Test batched sync, conflict pre-detection and progress streaming"""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        """Engine with its offline database set up (no parser models needed)"""
+        engine = OfflineOperationEngine("test_user", str(tmp_path / "offline.db"), batch_size=10)
+        asyncio.run(engine._setup_offline_database())
+        yield engine
+        engine.close()
+    
+    @pytest.mark.asyncio
+    async def test_sync_groups_actions_into_bulk_requests(self, engine):
+        """Test each batch sends one request per action type and marks everything synced"""
+        for i in range(15):
+            await engine._queue_offline_action("SIGNAL_PARSE", {"text": f"BUY EURUSD {i}"})
+            await engine._queue_offline_action("TRADE_OPEN", {"symbol": "EURUSD", "volume": 0.1})
+        
+        with patch.object(engine, '_sync_trade_open_batch', wraps=engine._sync_trade_open_batch) as bulk_trades, \
+                patch.object(engine, '_sync_trade_open') as single_trade:
+            result = await engine.sync_offline_actions()
+        
+        assert result["successful"] == 30
+        assert result["batches"] == 3
+        assert result["requests"] == 6
+        assert bulk_trades.call_count == 3
+        single_trade.assert_not_called()
+        
+        status = await engine.get_offline_status()
+        assert status["unsynced_actions"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_sync_invalidates_analytics_views(self, engine):
+        """Test trades synced to the server drop the user's materialized analytics"""
+        await engine._queue_offline_action("TRADE_OPEN", {"symbol": "EURUSD", "volume": 0.1})
+        analytics = Mock()
+        
+        with patch('core.analytics._analytics_engine', analytics):
+            await engine.sync_offline_actions()
+            analytics.invalidate.assert_called_once_with("test_user")
+            
+            analytics.invalidate.reset_mock()
+            await engine.sync_offline_actions()
+            analytics.invalidate.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_entity_touched_by_two_types_is_split_across_batches(self, engine):
+        """Test an entity's open and close are never sent concurrently"""
+        await engine._queue_offline_action("TRADE_OPEN", {"ticket": 7, "symbol": "EURUSD"})
+        await engine._queue_offline_action("TRADE_CLOSE", {"ticket": 7})
+        
+        actions = await engine._get_unsynced_actions()
+        batches = engine._plan_batches(actions)
+        
+        assert [list(batch) for batch in batches] == [["TRADE_OPEN"], ["TRADE_CLOSE"]]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_server_change_is_held_as_conflict(self, engine):
+        """Test a server-side change the device has not seen is caught before sending"""
+        action_id = await engine._queue_offline_action("TRADE_OPEN", {"ticket": 42, "symbol": "EURUSD"})
+        await engine._queue_offline_action("TRADE_OPEN", {"ticket": 43, "symbol": "GBPUSD"})
+        engine.record_server_versions({"trade:42": {"device-other": 1}})
+        
+        with patch.object(engine, '_sync_trade_open_batch', wraps=engine._sync_trade_open_batch) as bulk_trades:
+            result = await engine.sync_offline_actions()
+        
+        assert result["successful"] == 1
+        assert result["conflicts"] == 1
+        assert len(bulk_trades.call_args[0][0]) == 1
+        
+        conflicts = await engine.get_sync_conflicts()
+        assert [conflict["action_id"] for conflict in conflicts] == [action_id]
+        
+        # Keeping the local change re-queues it with a vector that covers the server's
+        assert await engine.resolve_conflict(action_id, ConflictResolution.USE_LOCAL)
+        result = await engine.sync_offline_actions()
+        assert result["successful"] == 1
+        assert result["conflicts"] == 0
+        assert await engine.get_sync_conflicts() == []
+    
+    @pytest.mark.asyncio
+    async def test_stream_sync_yields_progress_per_batch(self, engine):
+        """Test progress snapshots arrive per batch and end with a done snapshot"""
+        for i in range(25):
+            await engine._queue_offline_action("SIGNAL_PARSE", {"text": f"SELL GBPUSD {i}"})
+        
+        snapshots = [snapshot async for snapshot in engine.stream_sync()]
+        
+        assert [snapshot["processed"] for snapshot in snapshots] == [10, 20, 25, 25]
+        assert snapshots[-1]["done"] is True
+        assert snapshots[-1]["remaining"] == 0
 
 
 if __name__ == "__main__":
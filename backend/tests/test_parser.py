@@ -154,6 +154,55 @@ class TestAISignalParser:
             assert signal.confidence in [ConfidenceLevel.LOW, ConfidenceLevel.UNCERTAIN]
 
 
+class TestParseCascade:
+    """Test the cheapest-first parse cascade"""
+    
+    def setup_method(self):
+        """Setup test environment"""
+        self.parser = AISignalParser()
+    
+    @pytest.mark.asyncio
+    async def test_structured_fast_path(self):
+        """Test a one-line signal is taken by the structured stage without the AI model"""
+        text = "BUY EURUSD @ 1.1000 SL: 1.0950 TP: 1.1050 TP2: 1.1100"
+        
+        signal = await self.parser.parse_signal(text)
+        
+        assert signal.confidence == ConfidenceLevel.HIGH
+        assert signal.entry_price == 1.1000
+        assert signal.stop_loss == 1.0950
+        assert signal.take_profit == [1.1050, 1.1100]
+        stages = self.parser.cascade.get_statistics()["stages"]
+        assert stages["structured"]["hits"] == 1
+        assert stages["ai"]["attempts"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_incomplete_regex_result_reaches_ai(self):
+        """Test a regex result missing prices stays below the gate and the AI stage runs"""
+        text = "Long EURUSD at market price, target 1.1100, stop at 1.0900"
+        
+        signal = await self.parser.parse_signal(text)
+        
+        assert signal.parsing_method == "ai_primary"
+        assert self.parser.cascade.get_statistics()["stages"]["regex"]["misses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_latency_budget_skips_ai(self):
+        """Test the AI stage is skipped when its cost estimate exceeds the budget"""
+        text = "Long EURUSD at market price, target 1.1100, stop at 1.0900"
+        
+        signal = await self.parser.parse_signal(text, budget_ms=10)
+        
+        assert signal.parsing_method == "regex_fallback"
+        assert signal.confidence == ConfidenceLevel.LOW
+        assert self.parser.cascade.get_statistics()["stages"]["ai"]["budget_skips"] == 1
+    
+    def test_unknown_stage_rejected(self):
+        """Test configuring an unknown stage name fails"""
+        with pytest.raises(ValueError):
+            self.parser.cascade.configure(order=["structured", "telepathy"])
+
+
 class TestSignalProcessor:
     """Test signal processor"""
     
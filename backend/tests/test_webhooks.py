@@ -0,0 +1,96 @@
+"""
+Tests for webhook delivery
+"""
+
+import pytest
+import httpx
+
+from core.future.webhooks import EventType, WebhookService
+
+
+class TestWebhookDelivery:
+    """Test response handling and the retry queue of the pooled webhook engine"""
+
+    @staticmethod
+    def _service(*responses):
+        """Service whose endpoint answers with the given responses in turn (the last one repeats)"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return responses[min(len(requests), len(responses)) - 1]
+
+        service = WebhookService(max_retry_delay=0.01, transport=httpx.MockTransport(handler))
+        service.requests = requests
+        return service
+
+    @staticmethod
+    async def _webhook(service, retry_count=3):
+        return await service.create_webhook({
+            "name": "Alerts",
+            "type": "generic",
+            "url": "https://hooks.example.com/signalos",
+            "events": [EventType.TRADE_OPENED.value],
+            "retry_count": retry_count
+        })
+
+    @pytest.mark.asyncio
+    async def test_client_error_fails_without_retry(self):
+        """Test a 4xx response is a failed delivery, not a success, and is not retried"""
+        service = self._service(httpx.Response(400, text="bad payload"))
+        await self._webhook(service)
+
+        await service.send_event(EventType.TRADE_OPENED, {"symbol": "EURUSD"}, wait=True)
+
+        [delivery] = await service.get_deliveries()
+        assert delivery.status == "failed"
+        assert delivery.response_code == 400
+        assert delivery.error_message == "HTTP 400"
+        assert delivery.attempts == 1
+        assert len(service.requests) == 1
+        assert service.stats["delivered"] == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_server_errors_fail_after_retry_count(self):
+        """Test a persistent 5xx response is retried until retry_count attempts, then fails"""
+        service = self._service(httpx.Response(500))
+        webhook = await self._webhook(service, retry_count=3)
+
+        assert await service.test_webhook(webhook.id) is False
+
+        [delivery] = await service.get_deliveries()
+        assert delivery.status == "failed"
+        assert delivery.attempts == 3
+        assert len(service.requests) == 3
+        assert service.stats["retried"] == 2
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_send_event_retries_from_the_queue(self):
+        """Test a delivery rate limited once is re-queued and then succeeds"""
+        service = self._service(httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(204))
+        await self._webhook(service)
+
+        event_id = await service.send_event(EventType.TRADE_OPENED, {"symbol": "EURUSD"}, wait=True)
+
+        [delivery] = await service.get_deliveries()
+        assert delivery.event_id == event_id
+        assert delivery.status == "success"
+        assert delivery.response_code == 204
+        assert delivery.attempts == 2
+        assert delivery.next_attempt_at is None
+        assert service.stats == {"requests": 2, "delivered": 1, "failed": 0, "retried": 1}
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_unmatched_events_are_not_delivered(self):
+        """Test events a webhook is not subscribed to are not queued for it"""
+        service = self._service(httpx.Response(200))
+        await self._webhook(service)
+
+        await service.send_event(EventType.SYSTEM_ERROR, {"error": "boom"}, wait=True)
+
+        assert await service.get_deliveries() == []
+        assert service.requests == []
+        await service.close()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Tiered parse cascade for SignalOS parsers
+
+Stages run in a configured order, cheapest first (structured fast path ->
+regex -> multilingual -> AI -> OCR). The first result whose confidence clears
+its stage's gate ends the request, so a clean regex hit never pays for an AI
+call. Each stage carries a cost estimate, seeded from config and then tracked
+as a moving average of observed run time; once a request has used part of its
+latency budget, stages whose estimate no longer fits are skipped. If no stage
+clears its gate, the most confident result seen is returned unaccepted and the
+caller decides what to do with it.
+
+Per-stage attempts, hits, misses, errors, budget skips and timings are kept
+for get_statistics().
+"""
+
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+STAGE_ORDER = ("structured", "regex", "multilingual", "ai", "ocr")
+
+# Starting cost estimates (ms); replaced by observed averages as requests run
+DEFAULT_STAGE_COSTS_MS = {
+    "structured": 0.05,
+    "regex": 0.5,
+    "multilingual": 2.0,
+    "ai": 100.0,
+    "ocr": 1000.0
+}
+
+
+@dataclass
+class CascadeStage:
+    """
+    One parser in the cascade. parse receives the text, or the image bytes
+    when uses_image is set; stages whose input is missing are not run.
+    """
+    name: str
+    parse: Callable[[Any], Any]
+    cost_ms: float = 1.0
+    min_confidence: float = 0.7
+    enabled: bool = True
+    uses_image: bool = False
+
+
+@dataclass
+class StageStats:
+    """Running counters for one stage"""
+    attempts: int = 0
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    budget_skips: int = 0
+    total_ms: float = 0.0
+
+
+@dataclass
+class CascadeOutcome:
+    """Result of one cascade run"""
+    result: Any = None
+    stage: Optional[str] = None
+    confidence: float = 0.0
+    accepted: bool = False
+    elapsed_ms: float = 0.0
+    attempted: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def result_confidence(result: Any) -> float:
+    """Confidence of a parser result: dict 'confidence' or a confidence_score attribute"""
+    if isinstance(result, dict):
+        return float(result.get("confidence") or 0.0)
+    return float(getattr(result, "confidence_score", getattr(result, "confidence", 0.0)) or 0.0)
+
+
+class ParseCascade:
+    """Ordered parser stages with confidence early exit and a latency budget"""
+
+    def __init__(self, stages: List[CascadeStage], latency_budget_ms: Optional[float] = None,
+                 confidence: Callable[[Any], float] = result_confidence, cost_smoothing: float = 0.1):
+        self.stages: Dict[str, CascadeStage] = {stage.name: stage for stage in stages}
+        self.order: List[str] = [stage.name for stage in stages]
+        self.latency_budget_ms = latency_budget_ms
+        self.confidence = confidence
+        self.cost_smoothing = cost_smoothing
+        self.logger = logging.getLogger(__name__)
+        self.reset_statistics()
+
+    def configure(self, order: Optional[List[str]] = None, latency_budget_ms: Optional[float] = None,
+                  stages: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Apply a config section: order (stage names, unknown names are an
+        error), latency_budget_ms (0 or None for unbounded) and per-stage
+        cost_ms / min_confidence / enabled overrides.
+        """
+        if order is not None:
+            unknown = [name for name in order if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Unknown cascade stages: {', '.join(unknown)}")
+            self.order = list(order)
+        if latency_budget_ms is not None:
+            self.latency_budget_ms = latency_budget_ms or None
+        for name, overrides in (stages or {}).items():
+            stage = self.stages.get(name)
+            if stage is None:
+                raise ValueError(f"Unknown cascade stage: {name}")
+            for key in ("cost_ms", "min_confidence", "enabled"):
+                if key in overrides:
+                    setattr(stage, key, overrides[key])
+
+    def set_enabled(self, name: str, enabled: bool):
+        if name in self.stages:
+            self.stages[name].enabled = enabled
+
+    def run(self, text: Optional[str], image: Optional[bytes] = None,
+            budget_ms: Optional[float] = None) -> CascadeOutcome:
+        """Run the cascade synchronously; stages must not be coroutines"""
+        outcome, started, budget = CascadeOutcome(), time.perf_counter(), self._budget(budget_ms)
+        for stage in self._plan(text, image):
+            if self._over_budget(stage, started, budget, outcome):
+                continue
+            stage_started = time.perf_counter()
+            try:
+                result = stage.parse(image if stage.uses_image else text)
+                if inspect.isawaitable(result):
+                    result.close()
+                    raise TypeError(f"stage {stage.name} is async; use run_async")
+            except Exception as e:
+                self._record_error(stage, e, stage_started, outcome)
+                continue
+            if self._record(stage, result, stage_started, outcome):
+                break
+        return self._finish(outcome, started)
+
+    async def run_async(self, text: Optional[str], image: Optional[bytes] = None,
+                        budget_ms: Optional[float] = None) -> CascadeOutcome:
+        """Run the cascade, awaiting stages that return awaitables"""
+        outcome, started, budget = CascadeOutcome(), time.perf_counter(), self._budget(budget_ms)
+        for stage in self._plan(text, image):
+            if self._over_budget(stage, started, budget, outcome):
+                continue
+            stage_started = time.perf_counter()
+            try:
+                result = stage.parse(image if stage.uses_image else text)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                self._record_error(stage, e, stage_started, outcome)
+                continue
+            if self._record(stage, result, stage_started, outcome):
+                break
+        return self._finish(outcome, started)
+
+    def _budget(self, budget_ms: Optional[float]) -> Optional[float]:
+        return self.latency_budget_ms if budget_ms is None else (budget_ms or None)
+
+    def _plan(self, text: Optional[str], image: Optional[bytes]) -> List[CascadeStage]:
+        plan = []
+        for name in self.order:
+            stage = self.stages[name]
+            if stage.enabled and ((image is not None) if stage.uses_image else bool(text)):
+                plan.append(stage)
+        return plan
+
+    def _over_budget(self, stage: CascadeStage, started: float, budget: Optional[float],
+                     outcome: CascadeOutcome) -> bool:
+        # The first stage always runs, so every request gets at least one attempt
+        if budget is None or not outcome.attempted:
+            return False
+        spent_ms = (time.perf_counter() - started) * 1000.0
+        if spent_ms + stage.cost_ms <= budget:
+            return False
+        self.stage_stats[stage.name].budget_skips += 1
+        outcome.skipped.append(stage.name)
+        return True
+
+    def _observe(self, stage: CascadeStage, stage_started: float, outcome: CascadeOutcome) -> StageStats:
+        elapsed_ms = (time.perf_counter() - stage_started) * 1000.0
+        stats = self.stage_stats[stage.name]
+        stats.attempts += 1
+        stats.total_ms += elapsed_ms
+        stage.cost_ms += self.cost_smoothing * (elapsed_ms - stage.cost_ms)
+        outcome.attempted.append(stage.name)
+        return stats
+
+    def _record(self, stage: CascadeStage, result: Any, stage_started: float, outcome: CascadeOutcome) -> bool:
+        """Account for a stage result; True when it clears the stage's gate"""
+        stats = self._observe(stage, stage_started, outcome)
+        if result is None:
+            stats.misses += 1
+            return False
+
+        confidence = self.confidence(result)
+        if outcome.result is None or confidence > outcome.confidence:
+            outcome.result, outcome.stage, outcome.confidence = result, stage.name, confidence
+        if confidence >= stage.min_confidence:
+            stats.hits += 1
+            outcome.result, outcome.stage, outcome.confidence = result, stage.name, confidence
+            outcome.accepted = True
+            return True
+        stats.misses += 1
+        return False
+
+    def _record_error(self, stage: CascadeStage, error: Exception, stage_started: float,
+                      outcome: CascadeOutcome):
+        self._observe(stage, stage_started, outcome).errors += 1
+        outcome.errors[stage.name] = str(error)
+        self.logger.debug(f"Cascade stage {stage.name} failed: {error}")
+
+    def _finish(self, outcome: CascadeOutcome, started: float) -> CascadeOutcome:
+        outcome.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.requests += 1
+        self.accepted += outcome.accepted
+        self.total_ms += outcome.elapsed_ms
+        return outcome
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Per-stage hit rates and timings plus request totals"""
+        stages = {}
+        for name in self.order:
+            stage, stats = self.stages[name], self.stage_stats[name]
+            stages[name] = {
+                "enabled": stage.enabled,
+                "attempts": stats.attempts,
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "errors": stats.errors,
+                "budget_skips": stats.budget_skips,
+                "hit_rate": stats.hits / stats.attempts if stats.attempts else 0.0,
+                "share_of_requests": stats.hits / self.requests if self.requests else 0.0,
+                "avg_ms": stats.total_ms / stats.attempts if stats.attempts else 0.0,
+                "cost_ms": stage.cost_ms,
+                "min_confidence": stage.min_confidence
+            }
+        return {
+            "requests": self.requests,
+            "accepted": self.accepted,
+            "accept_rate": self.accepted / self.requests if self.requests else 0.0,
+            "avg_ms": self.total_ms / self.requests if self.requests else 0.0,
+            "latency_budget_ms": self.latency_budget_ms,
+            "order": list(self.order),
+            "stages": stages
+        }
+
+    def reset_statistics(self):
+        self.stage_stats: Dict[str, StageStats] = {name: StageStats() for name in self.stages}
+        self.requests = 0
+        self.accepted = 0
+        self.total_ms = 0.0
@@ -8,17 +8,30 @@ import json
 import logging
 import asyncio
 import hashlib
+import itertools
+import math
 import random
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
 import sqlite3
 from enum import Enum
 
-from dataset_manager import DatasetManager
-from model_trainer import ModelTrainer
-from evaluation_metrics import EvaluationEngine
+try:
+    from .dataset_manager import DatasetManager
+    from .model_trainer import ModelTrainer
+    from .evaluation_metrics import EvaluationEngine
+    from .model_server import get_model_server
+except ImportError:
+    from dataset_manager import DatasetManager
+    from model_trainer import ModelTrainer
+    from evaluation_metrics import EvaluationEngine
+    from model_server import get_model_server
+
+ROUTE_CACHE_SIZE = 10000  # Cached (test_id, user_id) routing decisions
 
 class ABTestStatus(Enum):
     ACTIVE = "active"
@@ -37,6 +50,61 @@ class ABTestConfig:
     success_metric: str
     significance_threshold: float
     min_samples: int
+    sequential: bool = False  # stop as soon as the always-valid p-value crosses the threshold
+
+@dataclass
+class ArmStats:
+    """
+    Streaming sufficient statistics for one A/B arm (Welford's method), so
+    metrics and significance never need the individual scores
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    
+    def add(self, score: float):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.min = min(self.min, score)
+        self.max = max(self.max, score)
+    
+    @classmethod
+    def from_sums(cls, count: int, total: float, total_sq: float, low: float, high: float) -> 'ArmStats':
+        """Build from SQL aggregates (COUNT, SUM, SUM of squares, MIN, MAX)"""
+        if not count:
+            return cls()
+        mean = total / count
+        return cls(count, mean, max(total_sq - count * mean * mean, 0.0), low, high)
+    
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    def to_metrics(self) -> Dict[str, float]:
+        if not self.count:
+            return {"mean": 0.0, "std": 0.0, "count": 0}
+        return {
+            "mean": self.mean,
+            "std": self.variance ** 0.5,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max
+        }
+
+@dataclass
+class ABTestState:
+    """Running state of an active test: per-arm statistics and sequential-test progress"""
+    arms: Dict[str, ArmStats]
+    total_samples: int = 0
+    first_sample: Optional[str] = None
+    last_sample: Optional[str] = None
+    sequential_p_value: float = 1.0
+    looks: int = 0
+    stopping: bool = False
 
 @dataclass
 class ABTestResult:
@@ -63,6 +131,7 @@ class ContinuousLearningEngine:
         self.dataset_manager = DatasetManager(str(self.data_dir))
         self.model_trainer = ModelTrainer(str(self.models_dir), str(self.data_dir))
         self.evaluation_engine = EvaluationEngine(str(self.models_dir))
+        self.model_server = get_model_server(self.models_dir)
         
         # A/B testing database
         self.ab_db = self.learning_dir / "ab_tests.db"
@@ -75,7 +144,11 @@ class ContinuousLearningEngine:
             "performance_threshold": 0.8,
             "ab_test_duration": 48,  # 48 hours
             "traffic_split_default": 0.5,
-            "significance_threshold": 0.05
+            "significance_threshold": 0.05,
+            "ab_flush_batch_size": 500,  # Buffered A/B samples written per transaction
+            "ab_flush_interval": 5.0,  # Seconds between periodic flushes
+            "sequential_check_every": 100,  # Samples between sequential-test looks
+            "sequential_tau": 0.05  # Mixture scale: the score difference worth detecting
         }
         
         self.logger = logging.getLogger(__name__)
@@ -83,6 +156,15 @@ class ContinuousLearningEngine:
         # Active A/B tests
         self.active_tests: Dict[str, ABTestConfig] = {}
         self.model_routing: Dict[str, str] = {}  # user_id -> model_version
+        self._route_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()  # (test_id, user_id) -> model_version
+        
+        # Buffered A/B samples and streaming per-arm statistics
+        self.ab_state: Dict[str, ABTestState] = {}
+        self._sample_buffer: List[Tuple] = []
+        self._sample_seq = itertools.count()
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._background_tasks: set = set()  # Referenced until done so they are not collected
     
     def _init_ab_database(self):
         """Initialize A/B testing database"""
@@ -118,8 +200,15 @@ class ContinuousLearningEngine:
     async def start_ab_test(self, model_a: str, model_b: str, 
                            duration_hours: int = 48,
                            traffic_split: float = 0.5,
-                           success_metric: str = "accuracy") -> str:
-        """Start A/B test between two models"""
+                           success_metric: str = "accuracy",
+                           sequential: bool = False) -> str:
+        """
+        Start A/B test between two models
+        
+        With sequential=True the test is checked every sequential_check_every
+        samples and completed as soon as it is significant, instead of
+        running for the full duration.
+        """
         
         test_id = f"ab_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hashlib.md5(f'{model_a}_{model_b}'.encode()).hexdigest()[:8]}"
         
@@ -131,7 +220,8 @@ class ContinuousLearningEngine:
             duration_hours=duration_hours,
             success_metric=success_metric,
             significance_threshold=self.config['significance_threshold'],
-            min_samples=100
+            min_samples=100,
+            sequential=sequential
         )
         
         # Store in database
@@ -148,13 +238,26 @@ class ContinuousLearningEngine:
         
         # Add to active tests
         self.active_tests[test_id] = config
+        self.ab_state[test_id] = ABTestState(arms={model_a: ArmStats(), model_b: ArmStats()})
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+        
+        # Load both arms now so the first routed requests don't pay for it
+        self.model_server.preload([model_a, model_b])
         
         # Schedule automatic completion
-        asyncio.create_task(self._schedule_test_completion(test_id, duration_hours))
+        self._spawn(self._schedule_test_completion(test_id, duration_hours))
         
         self.logger.info(f"Started A/B test {test_id}: {model_a} vs {model_b}")
         return test_id
     
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, holding a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
     async def _schedule_test_completion(self, test_id: str, duration_hours: int):
         """Schedule automatic A/B test completion"""
         
@@ -167,16 +270,22 @@ class ContinuousLearningEngine:
         """Route user request to appropriate model"""
         
         if test_id and test_id in self.active_tests:
-            config = self.active_tests[test_id]
-            
-            # Use consistent routing based on user ID hash
-            user_hash = hashlib.md5(user_id.encode()).hexdigest()
-            hash_value = int(user_hash[:8], 16) / (16**8)
-            
-            if hash_value < config.traffic_split:
-                model = config.model_a
-            else:
-                model = config.model_b
+            model = self._route_cache.get((test_id, user_id))
+            if model is None:
+                config = self.active_tests[test_id]
+                
+                # Use consistent routing based on user ID hash
+                user_hash = hashlib.md5(user_id.encode()).hexdigest()
+                hash_value = int(user_hash[:8], 16) / (16**8)
+                
+                if hash_value < config.traffic_split:
+                    model = config.model_a
+                else:
+                    model = config.model_b
+                self._route_cache[(test_id, user_id)] = model
+                if len(self._route_cache) > ROUTE_CACHE_SIZE:
+                    # Routing is a pure function of the hash, so dropping the oldest entry is safe
+                    self._route_cache.popitem(last=False)
             
             # Store routing decision
             self.model_routing[user_id] = model
@@ -187,59 +296,123 @@ class ContinuousLearningEngine:
             return self._get_production_model()
     
     def _get_production_model(self) -> str:
-        """Get current production model version"""
-        
-        version_file = self.models_dir / "version.json"
-        
-        if version_file.exists():
-            with open(version_file, 'r') as f:
-                version_info = json.load(f)
-                return version_info.get("current_version", "default")
-        
-        return "default"
+        """Get current production model version (cached by the model server)"""
+        return self.model_server.production_version()
     
     async def log_ab_sample(self, test_id: str, user_id: str, 
                            input_text: str, output_result: Dict[str, Any],
                            performance_score: float):
-        """Log A/B test sample result"""
+        """
+        Log A/B test sample result
+        
+        The sample updates its arm's running statistics immediately and is
+        buffered for the database; the buffer is written in one transaction
+        when it reaches ab_flush_batch_size or ab_flush_interval has passed.
+        """
         
         if test_id not in self.active_tests:
             return
         
         model_version = self.model_routing.get(user_id, "unknown")
+        timestamp = datetime.now().isoformat()
+        
+        sample_id = hashlib.md5(f"{test_id}_{user_id}_{timestamp}_{next(self._sample_seq)}".encode()).hexdigest()
+        self._sample_buffer.append((
+            sample_id, test_id, user_id, model_version,
+            input_text, json.dumps(output_result), performance_score, timestamp
+        ))
+        
+        state = self.ab_state[test_id]
+        state.total_samples += 1
+        state.first_sample = state.first_sample or timestamp
+        state.last_sample = timestamp
+        if performance_score is not None:
+            state.arms.setdefault(model_version, ArmStats()).add(performance_score)
+        
+        if self.active_tests[test_id].sequential and not state.stopping \
+                and state.total_samples % self.config['sequential_check_every'] == 0:
+            self._check_sequential(test_id)
+        
+        if (len(self._sample_buffer) >= self.config['ab_flush_batch_size']
+                or time.monotonic() - self._last_flush >= self.config['ab_flush_interval']):
+            await self.flush_ab_samples()
+    
+    async def flush_ab_samples(self):
+        """Write buffered A/B samples in one transaction, off the event loop"""
         
-        sample_id = hashlib.md5(f"{test_id}_{user_id}_{datetime.now().isoformat()}".encode()).hexdigest()
-        
+        rows, self._sample_buffer = self._sample_buffer, []
+        self._last_flush = time.monotonic()
+        if rows:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_samples, rows)
+    
+    def _write_samples(self, rows: List[Tuple]):
         with sqlite3.connect(self.ab_db) as conn:
-            conn.execute("""
+            conn.executemany("""
                 INSERT INTO ab_samples 
                 (id, test_id, user_id, model_version, input_text, output_result, performance_score, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                sample_id, test_id, user_id, model_version,
-                input_text, json.dumps(output_result), performance_score,
-                datetime.now().isoformat()
-            ))
+            """, rows)
     
-    async def complete_ab_test(self, test_id: str) -> ABTestResult:
-        """Complete A/B test and analyze results"""
+    async def _flush_periodically(self):
+        """Flush the sample buffer every ab_flush_interval while tests are active"""
+        
+        while self.active_tests:
+            await asyncio.sleep(self.config['ab_flush_interval'])
+            if time.monotonic() - self._last_flush >= self.config['ab_flush_interval']:
+                await self.flush_ab_samples()
+    
+    def _check_sequential(self, test_id: str):
+        """One sequential-test look; completes the test early once it is significant"""
+        
+        config = self.active_tests[test_id]
+        state = self.ab_state[test_id]
+        arm_a, arm_b = state.arms[config.model_a], state.arms[config.model_b]
+        if min(arm_a.count, arm_b.count) < config.min_samples:
+            return
+        
+        state.looks += 1
+        state.sequential_p_value = min(state.sequential_p_value, self._sequential_p_value(arm_a, arm_b))
+        if state.sequential_p_value < config.significance_threshold:
+            state.stopping = True
+            self.logger.info(f"A/B test {test_id} significant after {state.total_samples} samples "
+                             f"(look {state.looks}, p={state.sequential_p_value:.4f}); stopping early")
+            self._spawn(self.complete_ab_test(test_id))
+    
+    def get_ab_test_statistics(self, test_id: str) -> Dict[str, Any]:
+        """Current per-arm metrics and significance of an active test, from running statistics"""
         
         if test_id not in self.active_tests:
             raise ValueError(f"A/B test {test_id} not found")
         
         config = self.active_tests[test_id]
+        state = self.ab_state[test_id]
+        arm_a, arm_b = state.arms[config.model_a], state.arms[config.model_b]
+        return {
+            "test_id": test_id,
+            "total_samples": state.total_samples,
+            "model_a_performance": arm_a.to_metrics(),
+            "model_b_performance": arm_b.to_metrics(),
+            "significance": self._test_statistical_significance(arm_a, arm_b),
+            "sequential": config.sequential,
+            "sequential_p_value": state.sequential_p_value,
+            "looks": state.looks
+        }
+    
+    async def complete_ab_test(self, test_id: str) -> ABTestResult:
+        """Complete A/B test and analyze results"""
         
-        # Collect results from database
-        with sqlite3.connect(self.ab_db) as conn:
-            cursor = conn.execute("""
-                SELECT model_version, performance_score, timestamp
-                FROM ab_samples 
-                WHERE test_id = ?
-            """, (test_id,))
-            
-            samples = cursor.fetchall()
+        # Taken out of the active tests before the first await, so a concurrent
+        # completion (timer or sequential stop) finds nothing to complete
+        config = self.active_tests.pop(test_id, None)
+        if config is None:
+            raise ValueError(f"A/B test {test_id} not found")
+        state = self.ab_state.pop(test_id, None)
         
-        if not samples:
+        # Per-arm statistics were kept up to date as samples arrived
+        await self.flush_ab_samples()
+        state = state or self._load_test_state(test_id, config)
+        
+        if not state.total_samples:
             self.logger.warning(f"No samples found for A/B test {test_id}")
             return ABTestResult(
                 test_id=test_id,
@@ -253,14 +426,19 @@ class ContinuousLearningEngine:
             )
         
         # Analyze results
-        model_a_scores = [score for model, score, _ in samples if model == config.model_a]
-        model_b_scores = [score for model, score, _ in samples if model == config.model_b]
+        arm_a = state.arms.get(config.model_a, ArmStats())
+        arm_b = state.arms.get(config.model_b, ArmStats())
         
-        model_a_performance = self._calculate_performance_metrics(model_a_scores)
-        model_b_performance = self._calculate_performance_metrics(model_b_scores)
+        model_a_performance = arm_a.to_metrics()
+        model_b_performance = arm_b.to_metrics()
         
-        # Statistical significance test
-        significance_result = self._test_statistical_significance(model_a_scores, model_b_scores)
+        # Statistical significance test; sequential tests use their always-valid p-value,
+        # since the fixed-sample test is not valid after repeated looks
+        significance_result = self._test_statistical_significance(arm_a, arm_b)
+        if config.sequential:
+            p_value = min(state.sequential_p_value, self._sequential_p_value(arm_a, arm_b))
+            significance_result.update(p_value=p_value, confidence=1 - p_value,
+                                       significant=p_value < config.significance_threshold)
         
         # Determine winner
         winner = None
@@ -271,8 +449,8 @@ class ContinuousLearningEngine:
                 winner = config.model_b
         
         # Calculate test duration
-        start_time = datetime.fromisoformat(samples[0][2])
-        end_time = datetime.fromisoformat(samples[-1][2])
+        start_time = datetime.fromisoformat(state.first_sample)
+        end_time = datetime.fromisoformat(state.last_sample)
         duration = (end_time - start_time).total_seconds() / 3600  # Hours
         
         result = ABTestResult(
@@ -282,7 +460,7 @@ class ContinuousLearningEngine:
             winner=winner,
             confidence=significance_result['confidence'],
             statistical_significance=significance_result['significant'],
-            total_samples=len(samples),
+            total_samples=state.total_samples,
             duration=duration
         )
         
@@ -299,9 +477,7 @@ class ContinuousLearningEngine:
                 test_id
             ))
         
-        # Remove from active tests
-        if test_id in self.active_tests:
-            del self.active_tests[test_id]
+        self._route_cache = OrderedDict((key, model) for key, model in self._route_cache.items() if key[0] != test_id)
         
         # Auto-deploy winner if significant improvement
         if winner and significance_result['significant']:
@@ -310,41 +486,41 @@ class ContinuousLearningEngine:
         self.logger.info(f"A/B test {test_id} completed. Winner: {winner}")
         return result
     
-    def _calculate_performance_metrics(self, scores: List[float]) -> Dict[str, float]:
-        """Calculate performance metrics for a model"""
-        
-        if not scores:
-            return {"mean": 0.0, "std": 0.0, "count": 0}
-        
-        import statistics
+    def _load_test_state(self, test_id: str, config: ABTestConfig) -> ABTestState:
+        """Rebuild a test's arm statistics from SQL aggregates, without reading the rows"""
         
-        return {
-            "mean": statistics.mean(scores),
-            "std": statistics.stdev(scores) if len(scores) > 1 else 0.0,
-            "count": len(scores),
-            "min": min(scores),
-            "max": max(scores)
-        }
+        state = ABTestState(arms={})
+        with sqlite3.connect(self.ab_db) as conn:
+            cursor = conn.execute("""
+                SELECT model_version, COUNT(*), COUNT(performance_score), SUM(performance_score),
+                       SUM(performance_score * performance_score), MIN(performance_score),
+                       MAX(performance_score), MIN(timestamp), MAX(timestamp)
+                FROM ab_samples 
+                WHERE test_id = ?
+                GROUP BY model_version
+            """, (test_id,))
+            
+            for model, rows, count, total, total_sq, low, high, first, last in cursor.fetchall():
+                state.arms[model] = ArmStats.from_sums(count, total or 0.0, total_sq or 0.0, low, high)
+                state.total_samples += rows
+                state.first_sample = min(filter(None, [state.first_sample, first]))
+                state.last_sample = max(filter(None, [state.last_sample, last]))
+        return state
     
-    def _test_statistical_significance(self, scores_a: List[float], 
-                                     scores_b: List[float]) -> Dict[str, Any]:
-        """Test statistical significance between two groups"""
+    def _test_statistical_significance(self, arm_a: ArmStats, arm_b: ArmStats) -> Dict[str, Any]:
+        """Test statistical significance between two arms (Welch z-test on running statistics)"""
         
-        if len(scores_a) < 10 or len(scores_b) < 10:
+        if arm_a.count < 10 or arm_b.count < 10:
             return {"significant": False, "confidence": 0.0, "p_value": 1.0}
         
-        # Simplified t-test (would use scipy.stats in production)
-        import statistics
-        
-        mean_a = statistics.mean(scores_a)
-        mean_b = statistics.mean(scores_b)
-        
         # Calculate effect size
-        pooled_std = ((statistics.stdev(scores_a)**2 + statistics.stdev(scores_b)**2) / 2) ** 0.5
-        effect_size = abs(mean_a - mean_b) / max(pooled_std, 1e-6)
+        pooled_std = ((arm_a.variance + arm_b.variance) / 2) ** 0.5
+        effect_size = abs(arm_a.mean - arm_b.mean) / max(pooled_std, 1e-6)
         
-        # Mock p-value calculation (replace with proper statistical test)
-        p_value = max(0.001, 0.1 / (1 + effect_size * 10))
+        # Two-sided p-value, normal approximation to Welch's t
+        standard_error = (arm_a.variance / arm_a.count + arm_b.variance / arm_b.count) ** 0.5
+        z = abs(arm_a.mean - arm_b.mean) / max(standard_error, 1e-12)
+        p_value = math.erfc(z / math.sqrt(2))
         
         significant = p_value < self.config['significance_threshold']
         confidence = 1 - p_value
@@ -356,6 +532,21 @@ class ContinuousLearningEngine:
             "effect_size": effect_size
         }
     
+    def _sequential_p_value(self, arm_a: ArmStats, arm_b: ArmStats) -> float:
+        """
+        Always-valid p-value for the difference in means (normal mixture
+        SPRT): 1 / the mixture likelihood ratio, which stays valid however
+        often the test is checked
+        """
+        variance = arm_a.variance / max(arm_a.count, 1) + arm_b.variance / max(arm_b.count, 1)
+        if variance <= 0:
+            return 1.0
+        tau2 = self.config['sequential_tau'] ** 2
+        difference = arm_b.mean - arm_a.mean
+        log_ratio = (0.5 * math.log(variance / (variance + tau2))
+                     + tau2 * difference * difference / (2 * variance * (variance + tau2)))
+        return min(1.0, math.exp(-log_ratio))
+    
     async def _auto_deploy_winner(self, winning_model: str, result: ABTestResult):
         """Auto-deploy winning model if criteria met"""
         
@@ -369,6 +560,7 @@ class ContinuousLearningEngine:
             success = self.model_trainer.deploy_model(winning_model, "production")
             
             if success:
+                self.model_server.activate(winning_model)
                 self.logger.info(f"Auto-deployed winning model {winning_model}")
             else:
                 self.logger.error(f"Failed to auto-deploy model {winning_model}")
@@ -414,10 +606,12 @@ class ContinuousLearningEngine:
             # Export training data
             hf_files = self.dataset_manager.export_training_data("huggingface")
             
-            # Train new model
-            training_result = self.model_trainer.train_llm_parser(hf_files)
+            # Train new model on what changed since the current version
+            training_result = self.model_trainer.train_llm_parser(hf_files, incremental=True)
             
-            if training_result.success:
+            if training_result.success and not training_result.total_samples:
+                self.logger.info("No new or corrected samples, keeping the current model")
+            elif training_result.success:
                 # Evaluate new model against current production
                 current_model = self._get_production_model()
                 
@@ -441,18 +635,16 @@ class ContinuousLearningEngine:
         # Get active A/B tests
         active_tests = []
         for test_id, config in self.active_tests.items():
-            with sqlite3.connect(self.ab_db) as conn:
-                cursor = conn.execute("""
-                    SELECT COUNT(*) FROM ab_samples WHERE test_id = ?
-                """, (test_id,))
-                sample_count = cursor.fetchone()[0]
-            
+            state = self.ab_state[test_id]
             active_tests.append({
                 "test_id": test_id,
                 "model_a": config.model_a,
                 "model_b": config.model_b,
                 "duration_remaining": self._calculate_remaining_time(test_id),
-                "samples_collected": sample_count
+                "samples_collected": state.total_samples,
+                "sequential": config.sequential,
+                "p_value": self._test_statistical_significance(
+                    state.arms[config.model_a], state.arms[config.model_b])["p_value"]
             })
         
         # Get recent feedback
@@ -524,6 +716,7 @@ class ContinuousLearningEngine:
         """Clean up old A/B test data"""
         
         cutoff_date = datetime.now() - timedelta(days=days_old)
+        await self.flush_ab_samples()
         
         with sqlite3.connect(self.ab_db) as conn:
             # Delete old test samples
@@ -545,6 +738,7 @@ class ContinuousLearningEngine:
         
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
+        await self.flush_ab_samples()
         
         # Export A/B test results
         with sqlite3.connect(self.ab_db) as conn:
@@ -7,14 +7,29 @@ Implements comprehensive dataset preparation, management, and versioning
 import json
 import logging
 import hashlib
+import math
 import random
+import re
+import unicodedata
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator
 from dataclasses import dataclass, asdict
 from collections import Counter, defaultdict
 import sqlite3
 
+import numpy as np
+
+# Emoji, pictographs and decorative symbols: reposted signals often differ only in these
+NON_SIGNAL_CHARS = re.compile(r'[^\w\s.,:/@#%+-]')
+MERSENNE_31 = (1 << 31) - 1
+
+def normalize_signal_text(text: str) -> str:
+    """Canonical form for near-duplicate detection: NFKC, lower case, no emoji, single spaces"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    return ' '.join(NON_SIGNAL_CHARS.sub(' ', text).split())
+
 @dataclass
 class DatasetSample:
     """Individual dataset sample structure"""
@@ -40,6 +55,85 @@ class DatasetMetrics:
     quality_score: float
     coverage_score: float
 
+class MinHashLSH:
+    """
+    Near-duplicate index over MinHash signatures with banded LSH
+    
+    Texts are normalized and shingled into character n-grams. Each band of
+    rows signature values is a bucket key, so texts whose shingle Jaccard
+    similarity is above roughly (1 / bands) ** (1 / rows) share a bucket with
+    high probability; candidates are confirmed with the similarity estimated
+    from the full signatures.
+    """
+    
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        
+        # Universal hashes (a * x + b) mod p; a, b, x < 2**31 keeps a * x + b within uint64
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_31, num_perm, dtype=np.uint64)
+        
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text's normalized character shingles"""
+        return self.signatures([text])[0]
+    
+    def signatures(self, texts: List[str], chunk_size: int = 256) -> np.ndarray:
+        """MinHash signatures of many texts, shape (len(texts), num_perm)"""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        size = self.shingle_size
+        
+        for start in range(0, len(texts), chunk_size):
+            hashes, counts = [], []
+            for text in texts[start:start + chunk_size]:
+                normalized = normalize_signal_text(text)
+                shingles = {normalized[i:i + size] for i in range(max(1, len(normalized) - size + 1))}
+                counts.append(len(shingles))
+                hashes.extend(zlib.crc32(shingle.encode()) for shingle in shingles)
+            
+            values = np.array(hashes, dtype=np.uint64) % MERSENNE_31
+            permuted = (np.outer(self._a, values) + self._b[:, None]) % MERSENNE_31
+            offsets = np.cumsum(counts) - counts
+            result[start:start + len(counts)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        
+        return result
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def add(self, key: str, signature: np.ndarray):
+        """Index a signature under key"""
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(key)
+    
+    def query(self, signature: np.ndarray) -> List[Tuple[str, float]]:
+        """Indexed keys with estimated similarity >= threshold, most similar first"""
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
 class DatasetManager:
     """Comprehensive dataset management for AI parser training"""
     
@@ -65,11 +159,18 @@ class DatasetManager:
             "test_split": 0.1,
             "min_samples_per_provider": 50,
             "quality_threshold": 0.85,
-            "deduplication_threshold": 0.9
+            "deduplication_threshold": 0.9,  # MinHash similarity for near duplicates
+            "minhash_permutations": 128,
+            "lsh_bands": 16,
+            "insert_batch_size": 1000
         }
         
         self.logger = logging.getLogger(__name__)
         
+        # In-memory dedup indexes over this database, built on first use
+        self._hash_index: Optional[set] = None
+        self._lsh_index: Optional[MinHashLSH] = None
+        
     def _init_database(self):
         """Initialize SQLite database for dataset management"""
         with sqlite3.connect(self.db_path) as conn:
@@ -117,47 +218,156 @@ class DatasetManager:
                    format_type: str = "standard", confidence: float = 1.0) -> str:
         """Add a new sample to the dataset"""
         
-        # Generate unique ID and hash
-        sample_id = hashlib.md5(f"{raw_text}{datetime.now().isoformat()}".encode()).hexdigest()
-        text_hash = hashlib.md5(raw_text.encode()).hexdigest()
+        added = self.add_samples([{
+            'raw_text': raw_text,
+            'parsed_data': parsed_data,
+            'provider': provider,
+            'language': language,
+            'format_type': format_type,
+            'confidence': confidence
+        }], near_duplicates=False)
         
-        # Check for duplicates
-        if self._is_duplicate(text_hash):
+        if not added:
             self.logger.warning(f"Duplicate sample detected: {raw_text[:50]}...")
             return None
         
-        sample = DatasetSample(
-            id=sample_id,
-            raw_text=raw_text,
-            parsed_data=parsed_data,
-            provider=provider,
-            language=language,
-            format_type=format_type,
-            confidence=confidence,
-            timestamp=datetime.now()
-        )
-        
-        # Store in database
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        self.logger.info(f"Added sample {added[0]} from {provider}")
+        return added[0]
+    
+    def add_samples(self, samples: Iterable[Dict[str, Any]], near_duplicates: bool = True,
+                    batch_size: Optional[int] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Bulk add samples (dicts with add_sample's arguments)
+        
+        Exact duplicates (same raw text) are rejected against an in-memory hash
+        set and, with near_duplicates, reposts whose normalized text is within
+        deduplication_threshold MinHash similarity of a stored sample are
+        rejected too. Samples are inserted with executemany, one transaction
+        per batch_size samples; at most limit samples are added.
+        
+        Returns the IDs of the added samples.
+        """
+        batch_size = batch_size or self.config['insert_batch_size']
+        known_hashes = self._get_hash_index()
+        lsh = self._get_lsh_index() if near_duplicates else self._lsh_index
+        
+        added = []
+        skipped_exact = skipped_near = 0
+        samples = iter(samples)
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            while limit is None or len(added) < limit:
+                # Exact duplicates are dropped before any signature is computed
+                batch, batch_hashes = [], set()
+                for sample in samples:
+                    text_hash = hashlib.md5(sample['raw_text'].encode()).hexdigest()
+                    if text_hash in known_hashes or text_hash in batch_hashes:
+                        skipped_exact += 1
+                        continue
+                    batch_hashes.add(text_hash)
+                    batch.append((sample, text_hash))
+                    if len(batch) >= batch_size:
+                        break
+                if not batch:
+                    break
+                
+                signatures = lsh.signatures([sample['raw_text'] for sample, _ in batch]) if lsh is not None else None
+                rows = []
+                for i, (sample, text_hash) in enumerate(batch):
+                    if limit is not None and len(added) + len(rows) >= limit:
+                        break
+                    if near_duplicates and lsh.query(signatures[i]):
+                        skipped_near += 1
+                        continue
+                    
+                    timestamp = datetime.now()
+                    sample_id = hashlib.md5(f"{sample['raw_text']}{timestamp.isoformat()}".encode()).hexdigest()
+                    rows.append((
+                        sample_id, sample['raw_text'], json.dumps(sample['parsed_data']),
+                        sample['provider'], sample.get('language', 'en'),
+                        sample.get('format_type', 'standard'), sample.get('confidence', 1.0),
+                        timestamp.isoformat(), text_hash
+                    ))
+                    known_hashes.add(text_hash)
+                    if lsh is not None:
+                        lsh.add(sample_id, signatures[i])
+                
+                self._insert_samples(conn, rows)
+                added.extend(row[0] for row in rows)
+                
+        except Exception:
+            # The indexes already hold the rolled-back batch
+            self._reset_dedup_indexes()
+            raise
+        finally:
+            conn.close()
+        
+        self.logger.info(f"Added {len(added)} samples "
+                         f"(skipped {skipped_exact} duplicates, {skipped_near} near duplicates)")
+        return added
+    
+    def _insert_samples(self, conn: sqlite3.Connection, rows: List[Tuple]):
+        """Insert sample rows in one transaction"""
+        with conn:
+            conn.executemany("""
                 INSERT INTO samples 
                 (id, raw_text, parsed_data, provider, language, format_type, 
                  confidence, timestamp, hash)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                sample.id, sample.raw_text, json.dumps(sample.parsed_data),
-                sample.provider, sample.language, sample.format_type,
-                sample.confidence, sample.timestamp.isoformat(), text_hash
-            ))
-        
-        self.logger.info(f"Added sample {sample_id} from {provider}")
-        return sample_id
+            """, rows)
+    
+    def _get_hash_index(self) -> set:
+        """Text hashes of all stored samples"""
+        if self._hash_index is None:
+            with sqlite3.connect(self.db_path) as conn:
+                self._hash_index = {row[0] for row in conn.execute("SELECT hash FROM samples")}
+        return self._hash_index
+    
+    def _new_lsh_index(self) -> MinHashLSH:
+        return MinHashLSH(threshold=self.config['deduplication_threshold'],
+                          num_perm=self.config['minhash_permutations'],
+                          bands=self.config['lsh_bands'])
+    
+    def _get_lsh_index(self) -> MinHashLSH:
+        """Near-duplicate index of all stored samples"""
+        if self._lsh_index is None:
+            lsh = self._new_lsh_index()
+            with sqlite3.connect(self.db_path) as conn:
+                stored = conn.execute("SELECT id, raw_text FROM samples").fetchall()
+            for (sample_id, _), signature in zip(stored, lsh.signatures([row[1] for row in stored])):
+                lsh.add(sample_id, signature)
+            self._lsh_index = lsh
+        return self._lsh_index
+    
+    def _reset_dedup_indexes(self):
+        """Drop the in-memory indexes; they are rebuilt from the database on next use"""
+        self._hash_index = None
+        self._lsh_index = None
     
     def _is_duplicate(self, text_hash: str) -> bool:
         """Check if sample is duplicate based on text similarity"""
+        return text_hash in self._get_hash_index()
+    
+    def find_near_duplicates(self) -> List[Tuple[str, str, float]]:
+        """
+        Near-duplicate pairs among stored samples as (kept_id, duplicate_id,
+        similarity), where the kept sample is the older of the two
+        """
+        lsh = self._new_lsh_index()
+        pairs = []
+        
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM samples WHERE hash = ?", (text_hash,))
-            return cursor.fetchone()[0] > 0
+            stored = conn.execute("SELECT id, raw_text FROM samples ORDER BY timestamp").fetchall()
+        
+        for (sample_id, _), signature in zip(stored, lsh.signatures([row[1] for row in stored])):
+            matches = lsh.query(signature)
+            if matches:
+                pairs.append((matches[0][0], sample_id, matches[0][1]))
+            else:
+                lsh.add(sample_id, signature)
+        
+        return pairs
     
     def add_correction(self, sample_id: str, corrected_parsed: Dict[str, Any], 
                       corrector_id: str = "system") -> bool:
@@ -208,39 +418,7 @@ class DatasetManager:
         
         try:
             with open(feedback_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        feedback_entry = json.loads(line.strip())
-                        
-                        # Extract relevant information
-                        raw_text = feedback_entry.get('raw_text', '')
-                        provider = feedback_entry.get('provider', 'unknown')
-                        language = feedback_entry.get('language', 'en')
-                        
-                        # Create parsed data from feedback
-                        parsed_data = feedback_entry.get('corrected_parse')
-                        if not parsed_data:
-                            # Use failed parse as starting point
-                            parsed_data = feedback_entry.get('failed_parse', {})
-                        
-                        if raw_text and parsed_data:
-                            sample_id = self.add_sample(
-                                raw_text=raw_text,
-                                parsed_data=parsed_data,
-                                provider=provider,
-                                language=language,
-                                format_type="feedback",
-                                confidence=0.8  # Lower confidence for feedback samples
-                            )
-                            
-                            if sample_id:
-                                imported_count += 1
-                                
-                    except json.JSONDecodeError:
-                        continue
-                    except Exception as e:
-                        self.logger.error(f"Error importing feedback entry: {e}")
-                        continue
+                imported_count = len(self.add_samples(self._iter_feedback_samples(f)))
         
         except Exception as e:
             self.logger.error(f"Error reading feedback file: {e}")
@@ -248,6 +426,37 @@ class DatasetManager:
         self.logger.info(f"Imported {imported_count} samples from feedback data")
         return imported_count
     
+    def _iter_feedback_samples(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Samples from feedback log lines, skipping malformed entries"""
+        for line in lines:
+            try:
+                feedback_entry = json.loads(line.strip())
+                
+                # Extract relevant information
+                raw_text = feedback_entry.get('raw_text', '')
+                
+                # Create parsed data from feedback
+                parsed_data = feedback_entry.get('corrected_parse')
+                if not parsed_data:
+                    # Use failed parse as starting point
+                    parsed_data = feedback_entry.get('failed_parse', {})
+                
+                if raw_text and parsed_data:
+                    yield {
+                        'raw_text': raw_text,
+                        'parsed_data': parsed_data,
+                        'provider': feedback_entry.get('provider', 'unknown'),
+                        'language': feedback_entry.get('language', 'en'),
+                        'format_type': "feedback",
+                        'confidence': 0.8  # Lower confidence for feedback samples
+                    }
+                    
+            except json.JSONDecodeError:
+                continue
+            except Exception as e:
+                self.logger.error(f"Error importing feedback entry: {e}")
+                continue
+    
     def generate_splits(self, force_regenerate: bool = False) -> bool:
         """Generate train/validation/test splits"""
         
@@ -410,12 +619,19 @@ class DatasetManager:
         )
     
     def clean_dataset(self, remove_duplicates: bool = True, 
-                     quality_threshold: float = 0.5) -> int:
+                     quality_threshold: float = 0.5,
+                     remove_near_duplicates: bool = False) -> int:
         """Clean dataset by removing duplicates and low-quality samples"""
         
         removed_count = 0
+        near_duplicate_ids = [(pair[1],) for pair in self.find_near_duplicates()] if remove_near_duplicates else []
         
         with sqlite3.connect(self.db_path) as conn:
+            if near_duplicate_ids:
+                # Keep the oldest sample of each near-duplicate group
+                conn.executemany("DELETE FROM samples WHERE id = ?", near_duplicate_ids)
+                removed_count += len(near_duplicate_ids)
+            
             if remove_duplicates:
                 # Find duplicate hashes
                 cursor = conn.execute("""
@@ -450,14 +666,13 @@ class DatasetManager:
             
             removed_count += cursor.rowcount
         
+        self._reset_dedup_indexes()
         self.logger.info(f"Cleaned dataset: removed {removed_count} samples")
         return removed_count
     
     def augment_dataset(self, augmentation_factor: float = 2.0) -> int:
         """Generate augmented samples for data diversity"""
         
-        augmented_count = 0
-        
         # Get high-quality samples for augmentation
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute("""
@@ -469,6 +684,7 @@ class DatasetManager:
             
             high_quality_samples = cursor.fetchall()
         
+        augmented_samples = []
         for raw_text, parsed_data_json, provider, language in high_quality_samples:
             try:
                 # Simple augmentation techniques
@@ -477,24 +693,22 @@ class DatasetManager:
                 
                 for aug_text in augmented_texts:
                     if aug_text != raw_text:  # Don't duplicate original
-                        sample_id = self.add_sample(
-                            raw_text=aug_text,
-                            parsed_data=parsed_data,
-                            provider=f"{provider}_aug",
-                            language=language,
-                            format_type="augmented",
-                            confidence=0.7
-                        )
-                        
-                        if sample_id:
-                            augmented_count += 1
-                            
-                if augmented_count >= len(high_quality_samples) * augmentation_factor:
-                    break
+                        augmented_samples.append({
+                            'raw_text': aug_text,
+                            'parsed_data': parsed_data,
+                            'provider': f"{provider}_aug",
+                            'language': language,
+                            'format_type': "augmented",
+                            'confidence': 0.7
+                        })
                     
             except json.JSONDecodeError:
                 continue
         
+        # Augmentations are near duplicates of their source by design
+        limit = int(math.ceil(len(high_quality_samples) * augmentation_factor))
+        augmented_count = len(self.add_samples(augmented_samples, near_duplicates=False, limit=limit))
+        
         self.logger.info(f"Generated {augmented_count} augmented samples")
         return augmented_count
     
@@ -650,6 +864,30 @@ class DatasetManager:
                 correction_count=row[9]
             )
     
+    def iter_samples(self, provider: Optional[str] = None, min_confidence: float = 0.0) -> Iterator[DatasetSample]:
+        """Stream samples, optionally for one provider and above a confidence floor"""
+        
+        query = "SELECT * FROM samples WHERE confidence >= ?"
+        params: List[Any] = [min_confidence]
+        if provider is not None:
+            query += " AND provider = ?"
+            params.append(provider)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            for row in conn.execute(query, params):
+                yield DatasetSample(
+                    id=row[0],
+                    raw_text=row[1],
+                    parsed_data=json.loads(row[2]),
+                    provider=row[3],
+                    language=row[4],
+                    format_type=row[5],
+                    confidence=row[6],
+                    timestamp=datetime.fromisoformat(row[7]),
+                    verified=bool(row[8]),
+                    correction_count=row[9]
+                )
+    
     def get_status_report(self) -> Dict[str, Any]:
         """Generate comprehensive dataset status report"""
         
@@ -6,14 +6,19 @@ Implements comprehensive evaluation and performance monitoring
 
 import json
 import logging
+import multiprocessing
 import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Union
-from dataclasses import dataclass, asdict
-from collections import defaultdict, Counter
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable, Iterable, Iterator
+from dataclasses import dataclass, asdict, field
+from collections import defaultdict, Counter, deque
 import re
 
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
 @dataclass
 class ParseEvaluation:
     """Individual parse evaluation result"""
@@ -37,6 +42,7 @@ class EvaluationMetrics:
     confidence_distribution: Dict[str, int]
     method_performance: Dict[str, Dict[str, float]]
     temporal_performance: List[Dict[str, float]]
+    latency_percentiles: Dict[str, float] = field(default_factory=dict)  # seconds, p50..p99 and max
 
 class EvaluationEngine:
     """Comprehensive evaluation and metrics calculation"""
@@ -70,23 +76,24 @@ class EvaluationEngine:
     
     def evaluate_parser_performance(self, test_dataset: str, 
                                   parser_function, 
-                                  output_file: Optional[str] = None) -> EvaluationMetrics:
-        """Comprehensive parser performance evaluation"""
+                                  output_file: Optional[str] = None,
+                                  workers: int = 1, chunk_size: int = 64) -> EvaluationMetrics:
+        """
+        Comprehensive parser performance evaluation
+        
+        Samples are streamed from the JSONL file. With workers > 1 they are
+        evaluated in chunks on a process pool, so parser_function must be
+        picklable (a module-level function).
+        """
         
         self.logger.info(f"Starting parser evaluation on {test_dataset}")
         
-        # Load test dataset
-        test_samples = self._load_test_dataset(test_dataset)
+        # Evaluate each sample
+        evaluations = self._run_parsers(test_dataset, [parser_function], workers, chunk_size)[0]
         
-        if not test_samples:
+        if not evaluations:
             raise ValueError(f"No valid test samples found in {test_dataset}")
         
-        # Evaluate each sample
-        evaluations = []
-        for sample in test_samples:
-            eval_result = self._evaluate_single_sample(sample, parser_function)
-            evaluations.append(eval_result)
-        
         # Calculate comprehensive metrics
         metrics = self._calculate_metrics(evaluations)
         
@@ -97,10 +104,164 @@ class EvaluationEngine:
         self.logger.info(f"Evaluation completed: {metrics.accuracy:.3f} accuracy")
         return metrics
     
+    def compare_parsers(self, test_dataset: str, baseline_parser, candidate_parser,
+                        workers: int = 1, chunk_size: int = 64,
+                        max_accuracy_drop: float = 0.0, max_latency_increase: float = 0.2,
+                        output_file: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Evaluate two parser versions over the same samples in one run and diff them
+        
+        Both parsers see each sample back to back in the same process, so
+        their latencies are measured under the same load. The gate fails if
+        accuracy drops by more than max_accuracy_drop or the candidate's p95
+        latency exceeds the baseline's by more than max_latency_increase
+        (a fraction).
+        """
+        
+        self.logger.info(f"Comparing parsers on {test_dataset}")
+        
+        baseline_evals, candidate_evals = self._run_parsers(
+            test_dataset, [baseline_parser, candidate_parser], workers, chunk_size
+        )
+        
+        if not baseline_evals:
+            raise ValueError(f"No valid test samples found in {test_dataset}")
+        
+        baseline = self._calculate_metrics(baseline_evals)
+        candidate = self._calculate_metrics(candidate_evals)
+        
+        # Per-sample score changes
+        changes = []
+        for before, after in zip(baseline_evals, candidate_evals):
+            delta = after.overall_score - before.overall_score
+            if delta:
+                changes.append({
+                    "sample_id": before.sample_id,
+                    "raw_text": before.raw_text[:100],
+                    "baseline_score": before.overall_score,
+                    "candidate_score": after.overall_score,
+                    "delta": delta
+                })
+        changes.sort(key=lambda change: change["delta"])
+        regressions = [change for change in changes if change["delta"] < 0]
+        improvements = [change for change in reversed(changes) if change["delta"] > 0]
+        
+        latency_deltas = {
+            name: candidate.latency_percentiles[name] - value
+            for name, value in baseline.latency_percentiles.items()
+        }
+        
+        reasons = []
+        accuracy_delta = candidate.accuracy - baseline.accuracy
+        if accuracy_delta < -max_accuracy_drop:
+            reasons.append(f"Accuracy dropped by {-accuracy_delta:.4f} (allowed {max_accuracy_drop:.4f})")
+        
+        baseline_p95 = baseline.latency_percentiles['p95']
+        candidate_p95 = candidate.latency_percentiles['p95']
+        if candidate_p95 > baseline_p95 * (1 + max_latency_increase):
+            reasons.append(f"p95 latency rose from {baseline_p95 * 1000:.3f}ms to {candidate_p95 * 1000:.3f}ms "
+                           f"(allowed +{max_latency_increase:.0%})")
+        
+        comparison = {
+            "samples": len(baseline_evals),
+            "baseline": asdict(baseline),
+            "candidate": asdict(candidate),
+            "accuracy_delta": accuracy_delta,
+            "field_deltas": {
+                name: candidate.field_f1_scores[name] - score
+                for name, score in baseline.field_f1_scores.items()
+            },
+            "latency_deltas": latency_deltas,
+            "regressed_samples": len(regressions),
+            "improved_samples": len(improvements),
+            "regressions": regressions[:20],
+            "improvements": improvements[:20],
+            "gate": {
+                "passed": not reasons,
+                "reasons": reasons
+            }
+        }
+        
+        if output_file:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = self.evaluations_dir / f"{output_file}_{timestamp}.json"
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(comparison, f, indent=2, ensure_ascii=False)
+            self.logger.info(f"Parser comparison saved to {output_path}")
+        
+        self.logger.info(f"Comparison completed: accuracy {baseline.accuracy:.3f} -> {candidate.accuracy:.3f}, "
+                         f"gate {'passed' if not reasons else 'failed'}")
+        return comparison
+    
+    def _run_parsers(self, test_dataset: str, parser_functions: List[Callable],
+                     workers: int = 1, chunk_size: int = 64) -> List[List[ParseEvaluation]]:
+        """
+        Evaluate every parser on every streamed sample; one list of
+        evaluations per parser, in file order
+        """
+        results = [[] for _ in parser_functions]
+        chunks = self._iter_chunks(self._iter_test_dataset(test_dataset), chunk_size)
+        
+        def collect(chunk_results: List[List[ParseEvaluation]]):
+            for evaluations, chunk_evaluations in zip(results, chunk_results):
+                evaluations.extend(chunk_evaluations)
+        
+        if workers <= 1:
+            for chunk in chunks:
+                collect(self._evaluate_chunk(chunk, parser_functions))
+            return results
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_evaluation_worker,
+                                 initargs=(self, parser_functions)) as pool:
+            # Bounded in-flight window keeps memory flat for large files
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_evaluate_chunk_in_worker, chunk))
+                if len(pending) >= workers * 2:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+        
+        return results
+    
+    def _evaluate_chunk(self, samples: List[Dict[str, Any]],
+                        parser_functions: List[Callable]) -> List[List[ParseEvaluation]]:
+        """
+        Evaluate each parser on a chunk of samples, rotating which parser
+        runs first on each sample so warm caches and allocator state after
+        one parser do not consistently favour the next
+        """
+        results = [[] for _ in parser_functions]
+        order = list(range(len(parser_functions)))
+        for position, sample in enumerate(samples):
+            offset = position % len(order)
+            for index in order[offset:] + order[:offset]:
+                results[index].append(self._evaluate_single_sample(sample, parser_functions[index]))
+        return results
+    
+    @staticmethod
+    def _iter_chunks(samples: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+        chunk = []
+        for sample in samples:
+            chunk.append(sample)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
     def _load_test_dataset(self, dataset_file: str) -> List[Dict[str, Any]]:
         """Load and validate test dataset"""
         
-        samples = []
+        samples = list(self._iter_test_dataset(dataset_file))
+        
+        self.logger.info(f"Loaded {len(samples)} test samples")
+        return samples
+    
+    def _iter_test_dataset(self, dataset_file: str) -> Iterator[Dict[str, Any]]:
+        """Stream and validate test dataset samples"""
         
         try:
             with open(dataset_file, 'r', encoding='utf-8') as f:
@@ -117,7 +278,7 @@ class EvaluationEngine:
                         if 'id' not in sample:
                             sample['id'] = f"sample_{line_num}"
                         
-                        samples.append(sample)
+                        yield sample
                         
                     except json.JSONDecodeError as e:
                         self.logger.warning(f"JSON decode error at line {line_num}: {e}")
@@ -125,13 +286,8 @@ class EvaluationEngine:
                         
         except FileNotFoundError:
             self.logger.error(f"Test dataset file not found: {dataset_file}")
-            return []
         except Exception as e:
             self.logger.error(f"Error loading test dataset: {e}")
-            return []
-        
-        self.logger.info(f"Loaded {len(samples)} test samples")
-        return samples
     
     def _evaluate_single_sample(self, sample: Dict[str, Any], 
                                parser_function) -> ParseEvaluation:
@@ -141,13 +297,13 @@ class EvaluationEngine:
         raw_text = sample['raw']
         expected_result = sample['parsed']
         
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         errors = []
         
         try:
             # Parse the sample
             predicted_result = parser_function(raw_text)
-            parse_time = (datetime.now() - start_time).total_seconds()
+            parse_time = (time.perf_counter_ns() - start_ns) / 1e9
             
             if predicted_result is None:
                 errors.append('parse_failure')
@@ -163,9 +319,9 @@ class EvaluationEngine:
             method_used = predicted_result.get('parser_method', 'unknown')
             
         except Exception as e:
-            parse_time = (datetime.now() - start_time).total_seconds()
+            parse_time = (time.perf_counter_ns() - start_ns) / 1e9
             predicted_result = {}
-            field_scores = {field: 0.0 for field in self.field_weights.keys()}
+            field_scores = {field_name: 0.0 for field_name in self.field_weights.keys()}
             overall_score = 0.0
             method_used = 'error'
             errors.append(f'exception: {str(e)}')
@@ -188,20 +344,20 @@ class EvaluationEngine:
         
         field_scores = {}
         
-        for field in self.field_weights.keys():
-            expected_value = expected.get(field)
-            predicted_value = predicted.get(field)
+        for field_name in self.field_weights.keys():
+            expected_value = expected.get(field_name)
+            predicted_value = predicted.get(field_name)
             
             if expected_value is None:
                 # Field not in expected result
-                field_scores[field] = 1.0 if predicted_value is None else 0.5
+                field_scores[field_name] = 1.0 if predicted_value is None else 0.5
             elif predicted_value is None:
                 # Field missing in prediction
-                field_scores[field] = 0.0
+                field_scores[field_name] = 0.0
             else:
                 # Both values present, calculate similarity
-                field_scores[field] = self._calculate_field_similarity(
-                    expected_value, predicted_value, field
+                field_scores[field_name] = self._calculate_field_similarity(
+                    expected_value, predicted_value, field_name
                 )
         
         return field_scores
@@ -325,8 +481,8 @@ class EvaluationEngine:
         weighted_sum = 0.0
         total_weight = 0.0
         
-        for field, score in field_scores.items():
-            weight = self.field_weights.get(field, 0.1)
+        for field_name, score in field_scores.items():
+            weight = self.field_weights.get(field_name, 0.1)
             weighted_sum += score * weight
             total_weight += weight
         
@@ -351,13 +507,14 @@ class EvaluationEngine:
         
         # Field-level F1 scores
         field_f1_scores = {}
-        for field in self.field_weights.keys():
-            field_scores = [eval.field_scores.get(field, 0.0) for eval in evaluations]
-            field_f1_scores[field] = statistics.mean(field_scores)
+        for field_name in self.field_weights.keys():
+            field_scores = [eval.field_scores.get(field_name, 0.0) for eval in evaluations]
+            field_f1_scores[field_name] = statistics.mean(field_scores)
         
-        # Average latency
+        # Average latency and tail latencies
         latencies = [eval.parse_time for eval in evaluations]
         average_latency = statistics.mean(latencies)
+        latency_percentiles = self._latency_percentiles(latencies)
         
         # Error breakdown
         error_breakdown = defaultdict(int)
@@ -398,9 +555,24 @@ class EvaluationEngine:
             error_breakdown=dict(error_breakdown),
             confidence_distribution=confidence_distribution,
             method_performance=dict(method_performance),
-            temporal_performance=temporal_performance
+            temporal_performance=temporal_performance,
+            latency_percentiles=latency_percentiles
         )
     
+    def _latency_percentiles(self, latencies: List[float]) -> Dict[str, float]:
+        """p50/p90/p95/p99 (linear interpolation) and max of the latencies"""
+        
+        ordered = sorted(latencies)
+        percentiles = {}
+        for percentile in LATENCY_PERCENTILES:
+            position = (len(ordered) - 1) * percentile / 100
+            lower = int(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            percentiles[f"p{percentile}"] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+        percentiles['max'] = ordered[-1]
+        
+        return percentiles
+    
     def _calculate_temporal_performance(self, evaluations: List[ParseEvaluation]) -> List[Dict[str, float]]:
         """Calculate performance over time periods"""
         
@@ -478,6 +650,9 @@ class EvaluationEngine:
         elif metrics.average_latency > 1.0:
             analysis["performance_summary"]["weaknesses"].append("Slow parsing speed")
         
+        if metrics.latency_percentiles.get('p99', 0.0) > 1.0:
+            analysis["performance_summary"]["weaknesses"].append("Slow tail latency (p99 above 1s)")
+        
         # Generate recommendations
         if metrics.accuracy < 0.8:
             analysis["performance_summary"]["recommendations"].append("Consider retraining with more diverse data")
@@ -528,10 +703,10 @@ class EvaluationEngine:
         
         field_analysis = {}
         
-        for field in self.field_weights.keys():
-            field_scores = [eval.field_scores.get(field, 0.0) for eval in evaluations]
+        for field_name in self.field_weights.keys():
+            field_scores = [eval.field_scores.get(field_name, 0.0) for eval in evaluations]
             
-            field_analysis[field] = {
+            field_analysis[field_name] = {
                 "average_score": statistics.mean(field_scores),
                 "success_rate": sum(1 for score in field_scores if score > 0.5) / len(field_scores),
                 "perfect_rate": sum(1 for score in field_scores if score == 1.0) / len(field_scores)
@@ -605,6 +780,7 @@ class EvaluationEngine:
                 "threshold": threshold,
                 "status": "pass" if metrics.accuracy >= threshold else "fail",
                 "latency": metrics.average_latency,
+                "latency_p95": metrics.latency_percentiles.get('p95'),
                 "recommendations": []
             }
             
@@ -623,4 +799,16 @@ class EvaluationEngine:
             
         except Exception as e:
             self.logger.error(f"Continuous evaluation failed: {e}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            return {"status": "error", "message": str(e)}
+
+# Per-process state for evaluation pool workers
+_worker_engine = None
+_worker_parsers = None
+
+def _init_evaluation_worker(engine: EvaluationEngine, parser_functions: List[Callable]):
+    global _worker_engine, _worker_parsers
+    _worker_engine = engine
+    _worker_parsers = parser_functions
+
+def _evaluate_chunk_in_worker(samples: List[Dict[str, Any]]) -> List[List[ParseEvaluation]]:
+    return _worker_engine._evaluate_chunk(samples, _worker_parsers)
@@ -26,6 +26,7 @@ class ParseAttempt:
     parse_time: float
     retry_count: int
     confidence: float
+    provider: Optional[str] = None
 
 
 class FeedbackLogger:
@@ -115,7 +116,8 @@ class FeedbackLogger:
         except Exception as e:
             self.logger.error(f"Failed to log parsing failure: {e}")
             
-    def log_success(self, raw_signal: str, result: Dict[str, Any], parse_time: float, parser_method: str):
+    def log_success(self, raw_signal: str, result: Dict[str, Any], parse_time: float, parser_method: str,
+                    provider: Optional[str] = None):
         """
         Log a successful parsing attempt
         
@@ -124,6 +126,7 @@ class FeedbackLogger:
             result: Parsed result dictionary
             parse_time: Time taken to parse (seconds)
             parser_method: Which parser succeeded
+            provider: Signal provider, when known (used to learn provider templates)
         """
         try:
             timestamp = datetime.now().isoformat()
@@ -163,7 +166,8 @@ class FeedbackLogger:
                 error_message=None,
                 parse_time=parse_time,
                 retry_count=1,
-                confidence=confidence
+                confidence=confidence,
+                provider=provider
             )
             
             self._log_detailed_attempt(attempt)
@@ -476,10 +480,11 @@ def log_failure(raw_signal: str, error: str, parser_method: str, retry_count: in
     logger.log_failure(raw_signal, error, parser_method, retry_count)
 
 
-def log_success(raw_signal: str, result: Dict[str, Any], parse_time: float, parser_method: str):
+def log_success(raw_signal: str, result: Dict[str, Any], parse_time: float, parser_method: str,
+                provider: Optional[str] = None):
     """Convenience function to log parsing success"""
     logger = get_feedback_logger()
-    logger.log_success(raw_signal, result, parse_time, parser_method)
+    logger.log_success(raw_signal, result, parse_time, parser_method, provider)
 
 
 def log_performance(stats: Dict[str, Any]):
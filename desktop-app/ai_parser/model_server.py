@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+In-process model serving for the AI parser
+
+Each model version is loaded once and kept warm in memory. Requests resolve
+the active model through a single reference that activate() replaces, so a
+hot-swap never exposes a half-loaded model and a batch that already started
+finishes on the instance it picked up. The production version is read from
+models/version.json once and cached until the next swap or refresh.
+
+Parse requests are micro-batched: one worker thread drains a queue and runs
+up to max_batch_size texts through the model per call. While requests arrive
+concurrently it holds a batch open for at most max_wait_ms; a lone caller is
+dispatched immediately. Callers wait on a future with a deadline, so AI parse
+latency is bounded by the timeout instead of by model loading or disk reads.
+"""
+
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+DEFAULT_VERSION = "default"
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+
+class KeywordSignalModel:
+    """Keyword stand-in for the AI model, served when no trained model is usable"""
+
+    def predict(self, text: str) -> Optional[Dict[str, Any]]:
+        text_upper = text.upper()
+
+        if "BUY" in text_upper or "SELL" in text_upper:
+            return {
+                "pair": "EURUSD",
+                "direction": "BUY" if "BUY" in text_upper else "SELL",
+                "entry": [1.0850, 1.0860],
+                "sl": 1.0800,
+                "tp": [1.0900, 1.0950],
+                "confidence": 0.8,
+                "risk_reward": 2.5,
+                "lot_size": 0.01,
+                "parser_method": "mock_ai"
+            }
+        return None
+
+    def predict_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return [self.predict(text) for text in texts]
+
+
+class SpacyNERModel:
+    """Trained spaCy NER pipeline (PAIR, DIRECTION, ENTRY, SL, TP labels)"""
+
+    FIELDS = ("pair", "direction", "entry", "sl", "tp")
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+
+    def predict_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return [self._to_signal(doc) for doc in self.nlp.pipe(texts)]
+
+    def _to_signal(self, doc) -> Optional[Dict[str, Any]]:
+        signal: Dict[str, Any] = {"entry": [], "tp": []}
+        for ent in doc.ents:
+            numbers = [float(n) for n in NUMBER_PATTERN.findall(ent.text)]
+            if ent.label_ == "PAIR" and "pair" not in signal:
+                signal["pair"] = re.sub(r'[^A-Z0-9]', '', ent.text.upper())
+            elif ent.label_ == "DIRECTION" and "direction" not in signal:
+                signal["direction"] = "BUY" if "BUY" in ent.text.upper() else "SELL"
+            elif ent.label_ == "ENTRY":
+                signal["entry"].extend(numbers)
+            elif ent.label_ == "SL" and numbers and "sl" not in signal:
+                signal["sl"] = numbers[0]
+            elif ent.label_ == "TP":
+                signal["tp"].extend(numbers)
+
+        found = sum(1 for name in self.FIELDS if signal.get(name))
+        if not signal.get("direction"):
+            return None
+        signal["confidence"] = round(found / len(self.FIELDS), 2)
+        signal["parser_method"] = "ai_ner"
+        return signal
+
+
+def load_model(model_dir: Optional[Path]):
+    """
+    Load the servable model stored in model_dir. Directories without a usable
+    model (mock training output, LLM checkpoints, missing dirs) are served by
+    the keyword model.
+    """
+    if model_dir is None or not model_dir.exists():
+        return KeywordSignalModel()
+
+    if SPACY_AVAILABLE and (model_dir / "config.cfg").exists():
+        return SpacyNERModel(spacy.load(model_dir))
+
+    return KeywordSignalModel()
+
+
+@dataclass
+class ServedModel:
+    """A loaded model version"""
+    version: str
+    model: Any
+    path: Optional[Path]
+    loaded_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _ParseRequest:
+    text: str
+    version: Optional[str]
+    future: Future
+    enqueued: float
+
+
+class ModelServer:
+    """Warm per-version model cache with atomic hot-swap and micro-batched parsing"""
+
+    def __init__(self, models_dir: Union[str, Path] = "models", max_batch_size: int = 16,
+                 max_wait_ms: float = 2.0, max_loaded: int = 4,
+                 loader: Callable[[Optional[Path]], Any] = load_model):
+        self.models_dir = Path(models_dir)
+        self.version_file = self.models_dir / "version.json"
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_loaded = max(1, max_loaded)
+        self.loader = loader
+        self.logger = logging.getLogger(__name__)
+
+        self._models: "OrderedDict[str, ServedModel]" = OrderedDict()
+        self._active: Optional[ServedModel] = None
+        self._production_version: Optional[str] = None
+        self._load_lock = threading.Lock()
+        self._updaters: List[Any] = []
+
+        self._queue: "queue.Queue[Optional[_ParseRequest]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._last_batch_size = 0
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "timeouts": 0,
+            "loads": 0,
+            "swaps": 0
+        }
+
+    def production_version(self) -> str:
+        """Current production version, read from version.json on first use only"""
+        version = self._production_version
+        if version is None:
+            version = self._production_version = self.read_production_version()
+        return version
+
+    def read_production_version(self) -> str:
+        """Read the production version from disk, bypassing the cache"""
+        try:
+            if self.version_file.exists():
+                with open(self.version_file, 'r') as f:
+                    version_info = json.load(f)
+                return version_info.get("current_version") or version_info.get("version") or DEFAULT_VERSION
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to read model version file: {e}")
+        return DEFAULT_VERSION
+
+    def refresh(self) -> str:
+        """Re-read version.json and swap to its production version if it changed"""
+        version = self.read_production_version()
+        active = self._active
+        if active is None or active.version != version:
+            self.activate(version)
+        else:
+            self._production_version = version
+        return version
+
+    def model_dir(self, version: str) -> Optional[Path]:
+        path = self.models_dir / "versions" / version
+        return path if path.exists() else None
+
+    def get(self, version: str, model_dir: Optional[Path] = None) -> ServedModel:
+        """
+        The loaded model for a version, loading it on first use. Passing
+        model_dir always loads from that directory (a freshly extracted model).
+        """
+        served = self._models.get(version)
+        if served is not None and model_dir is None:
+            return served
+
+        with self._load_lock:
+            served = self._models.get(version)
+            if served is None or model_dir is not None:
+                path = model_dir or self.model_dir(version)
+                started = time.perf_counter()
+                served = ServedModel(version=version, model=self.loader(path), path=path)
+                self.stats["loads"] += 1
+                self.logger.info(f"Loaded model {version} ({type(served.model).__name__}) "
+                                 f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+                self._models[version] = served
+            self._models.move_to_end(version)
+            self._evict()
+        return served
+
+    def preload(self, versions: Iterable[str]) -> List[str]:
+        """Load versions ahead of traffic; returns the versions that loaded"""
+        loaded = []
+        for version in versions:
+            try:
+                self.get(version)
+                loaded.append(version)
+            except Exception as e:
+                self.logger.warning(f"Failed to preload model {version}: {e}")
+        return loaded
+
+    def activate(self, version: str, model_dir: Optional[Path] = None) -> ServedModel:
+        """
+        Load a version (off the request path) and make it the production
+        model. The swap is a single reference assignment: requests either see
+        the old model or the new one.
+        """
+        served = self.get(version, model_dir)
+        previous = self._active
+        self._active = served
+        self._production_version = version
+        if previous is not None and previous is not served:
+            self.stats["swaps"] += 1
+            self.logger.info(f"Swapped production model {previous.version} -> {version}")
+        return served
+
+    def active(self) -> ServedModel:
+        served = self._active
+        if served is None:
+            served = self.activate(self.production_version())
+        return served
+
+    def attach_updater(self, updater):
+        """Hot-swap to every model a ModelUpdater extracts (once per updater)"""
+        with self._load_lock:
+            if any(attached is updater for attached in self._updaters):
+                return
+            self._updaters.append(updater)
+        updater.add_model_listener(self.activate)
+
+    def _evict(self):
+        """Drop least recently used versions beyond max_loaded (never the active one)"""
+        active = self._active
+        for version in list(self._models):
+            if len(self._models) <= self.max_loaded:
+                break
+            if active is None or version != active.version:
+                del self._models[version]
+
+    def submit(self, text: str, version: Optional[str] = None) -> Future:
+        """Queue a parse request; version None means the active production model"""
+        if self._worker is None:
+            self._start_worker()
+        future: Future = Future()
+        self.stats["requests"] += 1
+        self._queue.put(_ParseRequest(text, version, future, time.perf_counter()))
+        return future
+
+    def parse(self, text: str, version: Optional[str] = None,
+              timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Parse one text; raises TimeoutError once timeout seconds have passed"""
+        future = self.submit(text, version)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.stats["timeouts"] += 1
+            raise TimeoutError(f"AI parse exceeded {timeout:.3f}s")
+
+    def parse_batch(self, texts: List[str], version: Optional[str] = None,
+                    timeout: Optional[float] = None) -> List[Optional[Dict[str, Any]]]:
+        """Parse several texts, sharing one deadline"""
+        futures = [self.submit(text, version) for text in texts]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        results = []
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                results.append(future.result(remaining))
+            except FutureTimeoutError:
+                for pending in futures:
+                    pending.cancel()
+                self.stats["timeouts"] += 1
+                raise TimeoutError(f"AI batch parse exceeded {timeout:.3f}s")
+        return results
+
+    def _start_worker(self):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._serve, name="model-server", daemon=True)
+                self._worker.start()
+
+    def _serve(self):
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                break
+            batch = [request]
+            # Only hold the batch open while traffic is concurrent; a lone caller is never delayed
+            deadline = request.enqueued + (self.max_wait if self._last_batch_size > 1 else 0.0)
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_ParseRequest]):
+        # Requests whose caller already timed out are skipped
+        live = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        self._last_batch_size = len(live)
+        if not live:
+            return
+        self.stats["batches"] += 1
+        self.stats["batched_requests"] += len(live)
+
+        groups: Dict[Optional[str], List[_ParseRequest]] = {}
+        for request in live:
+            groups.setdefault(request.version, []).append(request)
+
+        for version, requests in groups.items():
+            try:
+                served = self.active() if version is None else self.get(version)
+                results = served.model.predict_batch([request.text for request in requests])
+            except Exception as e:
+                self.logger.error(f"Model batch failed ({len(requests)} requests): {e}")
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(requests, results):
+                request.future.set_result(result)
+
+    def close(self):
+        """Stop the batching worker after it drains queued requests"""
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        active = self._active
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": self.stats["batched_requests"] / batches if batches else 0.0,
+            "active_version": active.version if active else None,
+            "loaded_versions": list(self._models)
+        }
+
+
+# Shared servers per models directory, so every parser in a process uses the same warm models
+_servers: Dict[str, ModelServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_model_server(models_dir: Union[str, Path] = "models", **settings) -> ModelServer:
+    """Get the shared model server for a directory; settings apply when it is created"""
+    key = str(Path(models_dir).resolve())
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None:
+            server = _servers[key] = ModelServer(models_dir, **settings)
+    return server
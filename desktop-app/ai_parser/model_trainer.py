@@ -6,6 +6,7 @@ Implements comprehensive training workflows for LLM and NLP models
 
 import json
 import logging
+import os
 import subprocess
 import shutil
 from datetime import datetime
@@ -41,12 +42,24 @@ except ImportError:
 
 try:
     import spacy
+    from spacy.tokens import Doc
     from spacy.training import Example
     SPACY_AVAILABLE = True
 except ImportError:
     SPACY_AVAILABLE = False
     logging.warning("spaCy not available, using mock training")
 
+try:
+    from .training_cache import (
+        FeatureCache, HashingFeaturizer, SpacyFeaturizer, TokenizerFeaturizer,
+        TrainingCheckpoint, TrainingPlan, load_records, plan_training
+    )
+except ImportError:
+    from training_cache import (
+        FeatureCache, HashingFeaturizer, SpacyFeaturizer, TokenizerFeaturizer,
+        TrainingCheckpoint, TrainingPlan, load_records, plan_training
+    )
+
 @dataclass
 class TrainingConfig:
     """Training configuration parameters"""
@@ -61,6 +74,8 @@ class TrainingConfig:
     max_length: int = 512
     gradient_accumulation_steps: int = 1
     fp16: bool = True
+    data_workers: int = 0  # processes for loading and featurizing; 0 = one per CPU
+    replay_fraction: float = 0.1  # already-trained samples mixed into an incremental run
     
 @dataclass
 class TrainingResult:
@@ -92,6 +107,9 @@ class ModelTrainer:
         self.training_log = self.models_dir / "training_log.jsonl"
         
         self._setup_directories()
+        
+        # Featurized samples and the record of what each model kind was trained on
+        self.feature_cache = FeatureCache(self.models_dir / "cache" / "features.db")
     
     def _setup_directories(self):
         """Setup training directory structure"""
@@ -99,39 +117,56 @@ class ModelTrainer:
         (self.models_dir / "versions").mkdir(exist_ok=True)
         (self.models_dir / "checkpoints").mkdir(exist_ok=True)
         (self.models_dir / "evaluations").mkdir(exist_ok=True)
+        (self.models_dir / "cache").mkdir(exist_ok=True)
     
     def train_llm_parser(self, dataset_files: Dict[str, str], 
-                        config: Optional[TrainingConfig] = None) -> TrainingResult:
-        """Train LLM-based signal parser"""
+                        config: Optional[TrainingConfig] = None,
+                        incremental: bool = False) -> TrainingResult:
+        """Train LLM-based signal parser
+        
+        With incremental=True, warm-starts from the current LLM version and
+        trains only on new and corrected samples (plus a small replay slice).
+        An interrupted run resumes from its checkpoint when retried.
+        """
         
         if config:
             self.config = config
         
-        if not TRANSFORMERS_AVAILABLE:
-            return self._mock_llm_training(dataset_files)
-        
         start_time = datetime.now()
         
         try:
-            # Load datasets
-            train_dataset = self._load_hf_dataset(dataset_files['train'])
-            eval_dataset = self._load_hf_dataset(dataset_files['validation'])
+            base_version = self._current_version("llm") if incremental else None
+            featurizer = (TokenizerFeaturizer(self.config.model_name, self.config.max_length)
+                          if TRANSFORMERS_AVAILABLE else HashingFeaturizer(self.config.max_length))
+            plan = self._plan_training("llm", dataset_files['train'], featurizer, base_version)
+            
+            if not plan.records:
+                return self._nothing_to_train(plan, start_time)
             
-            # Initialize model and tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(self.config.model_name)
-            model = AutoModelForCausalLM.from_pretrained(self.config.model_name)
+            if not TRANSFORMERS_AVAILABLE:
+                return self._mock_llm_training(dataset_files, plan)
+            
+            # Tokenized samples come from the feature cache; only misses are tokenized
+            workers = self._data_workers()
+            train_dataset = Dataset.from_list(self.feature_cache.featurize(plan.records, featurizer, workers))
+            eval_records = load_records(dataset_files['validation'], workers)
+            eval_dataset = Dataset.from_list(self.feature_cache.featurize(eval_records, featurizer, workers))
+            
+            # Initialize model and tokenizer, from the current version on a warm start
+            model_source = str(self.models_dir / "versions" / base_version) if base_version else self.config.model_name
+            tokenizer = AutoTokenizer.from_pretrained(model_source)
+            model = AutoModelForCausalLM.from_pretrained(model_source)
             
             # Add special tokens if needed
             if tokenizer.pad_token is None:
                 tokenizer.pad_token = tokenizer.eos_token
             
-            # Prepare datasets
-            train_dataset = self._prepare_dataset(train_dataset, tokenizer)
-            eval_dataset = self._prepare_dataset(eval_dataset, tokenizer)
+            # Trainer checkpoints go to a directory named after the plan, so a retry resumes
+            checkpoint = TrainingCheckpoint(self.models_dir / "checkpoints", plan.run_id)
             
             # Setup training arguments
             training_args = TrainingArguments(
-                output_dir=self.config.output_dir,
+                output_dir=str(checkpoint.dir),
                 overwrite_output_dir=True,
                 num_train_epochs=self.config.num_epochs,
                 per_device_train_batch_size=self.config.batch_size,
@@ -170,8 +205,10 @@ class ModelTrainer:
             )
             
             # Train model
-            self.logger.info("Starting LLM training...")
-            train_result = trainer.train()
+            resume = checkpoint.has_trainer_checkpoint()
+            self.logger.info(f"Starting LLM training on {len(plan.records)} samples"
+                             f"{' (resuming)' if resume else ''}...")
+            train_result = trainer.train(resume_from_checkpoint=resume or None)
             
             # Evaluate model
             eval_result = trainer.evaluate()
@@ -200,6 +237,8 @@ class ModelTrainer:
             # Update version info
             self._update_version_info(result)
             self._log_training_result(result)
+            self.feature_cache.mark_trained("llm", plan.records, model_version)
+            checkpoint.clear()
             
             self.logger.info(f"LLM training completed: {model_version}")
             return result
@@ -218,18 +257,25 @@ class ModelTrainer:
                 error_message=str(e)
             )
     
-    def _mock_llm_training(self, dataset_files: Dict[str, str]) -> TrainingResult:
+    def _mock_llm_training(self, dataset_files: Dict[str, str],
+                           plan: Optional[TrainingPlan] = None) -> TrainingResult:
         """Mock LLM training for when transformers is not available"""
         
         self.logger.info("Running mock LLM training (transformers not available)")
         
         # Count samples
         total_samples = 0
-        try:
-            with open(dataset_files['train'], 'r') as f:
-                total_samples = sum(1 for _ in f)
-        except:
-            total_samples = 1000
+        if plan is not None:
+            # Featurize anyway, so the cache is warm once transformers is installed
+            self.feature_cache.featurize(plan.records, HashingFeaturizer(self.config.max_length),
+                                         self._data_workers())
+            total_samples = len(plan.records)
+        else:
+            try:
+                with open(dataset_files['train'], 'r') as f:
+                    total_samples = sum(1 for _ in f)
+            except:
+                total_samples = 1000
         
         model_version = self._generate_model_version()
         
@@ -242,7 +288,8 @@ class ModelTrainer:
             "model_type": "mock_llm",
             "version": model_version,
             "trained_on": datetime.now().isoformat(),
-            "samples": total_samples
+            "samples": total_samples,
+            "base_version": plan.base_version if plan else None
         }
         
         with open(version_dir / "model_info.json", 'w') as f:
@@ -261,23 +308,46 @@ class ModelTrainer:
         
         self._update_version_info(result)
         self._log_training_result(result)
+        if plan is not None:
+            self.feature_cache.mark_trained("llm", plan.records, model_version)
         
         return result
     
-    def train_spacy_ner(self, dataset_files: Dict[str, str]) -> TrainingResult:
-        """Train spaCy NER model for entity extraction"""
+    def train_spacy_ner(self, dataset_files: Dict[str, str],
+                        incremental: bool = False) -> TrainingResult:
+        """Train spaCy NER model for entity extraction
         
-        if not SPACY_AVAILABLE:
-            return self._mock_spacy_training(dataset_files)
+        With incremental=True, continues training the current NER version on
+        new and corrected samples only. The model is checkpointed after every
+        epoch and a retried run picks up from the last one.
+        """
         
         start_time = datetime.now()
         
         try:
-            # Load training data
-            train_data = self._load_spacy_data(dataset_files['train'])
+            base_version = self._current_version("spacy_ner") if incremental else None
+            featurizer = SpacyFeaturizer()
+            plan = self._plan_training("spacy_ner", dataset_files['train'], featurizer, base_version)
+            
+            if not plan.records:
+                return self._nothing_to_train(plan, start_time)
+            
+            if not SPACY_AVAILABLE:
+                return self._mock_spacy_training(dataset_files, plan)
             
-            # Create blank English model
-            nlp = spacy.blank("en")
+            # Tokenized words and entity spans come from the feature cache
+            features = self.feature_cache.featurize(plan.records, featurizer, self._data_workers())
+            
+            checkpoint = TrainingCheckpoint(self.models_dir / "checkpoints", plan.run_id)
+            state = checkpoint.load()
+            
+            # Resume from the checkpoint, warm-start from the current version, or start blank
+            if state:
+                nlp = spacy.load(checkpoint.dir / "model")
+            elif base_version:
+                nlp = spacy.load(self.models_dir / "versions" / base_version)
+            else:
+                nlp = spacy.blank("en")
             
             # Add NER pipe
             if "ner" not in nlp.pipe_names:
@@ -290,22 +360,31 @@ class ModelTrainer:
             for label in labels:
                 ner.add_label(label)
             
-            # Prepare training examples
+            # Prepare training examples from cached tokens, without re-tokenizing
             examples = []
-            for text, annotations in train_data:
-                doc = nlp.make_doc(text)
-                example = Example.from_dict(doc, annotations)
+            for sample in features:
+                doc = Doc(nlp.vocab, words=sample["words"], spaces=sample["spaces"])
+                example = Example.from_dict(doc, {"entities": [tuple(entity) for entity in sample["entities"]]})
                 examples.append(example)
             
-            # Train the model
-            nlp.initialize(lambda: examples)
+            # Train the model; a loaded model keeps its weights
+            if state or base_version:
+                optimizer = nlp.resume_training()
+            else:
+                optimizer = nlp.initialize(lambda: examples)
             
-            self.logger.info("Starting spaCy NER training...")
+            start_epoch = state["epoch"] if state else 0
+            self.logger.info(f"Starting spaCy NER training on {len(examples)} samples"
+                             f"{f' (resuming after epoch {start_epoch})' if start_epoch else ''}...")
             
-            for epoch in range(self.config.num_epochs):
+            losses = {"ner": state.get("loss", 0.0)} if state else {}
+            for epoch in range(start_epoch, self.config.num_epochs):
                 losses = {}
-                nlp.update(examples, losses=losses)
+                nlp.update(examples, sgd=optimizer, losses=losses)
                 self.logger.info(f"Epoch {epoch + 1}, Loss: {losses.get('ner', 0.0):.4f}")
+                
+                nlp.to_disk(checkpoint.dir / "model")
+                checkpoint.save({"epoch": epoch + 1, "loss": losses.get('ner', 0.0)})
             
             # Save model
             model_version = f"spacy_ner_{self._generate_model_version()}"
@@ -325,13 +404,15 @@ class ModelTrainer:
                 eval_loss=0.0,  # spaCy doesn't provide eval loss directly
                 eval_accuracy=eval_accuracy,
                 training_time=training_time,
-                total_samples=len(train_data),
+                total_samples=len(examples),
                 model_size_mb=model_size,
                 success=True
             )
             
             self._update_version_info(result)
             self._log_training_result(result)
+            self.feature_cache.mark_trained("spacy_ner", plan.records, model_version)
+            checkpoint.clear()
             
             self.logger.info(f"spaCy NER training completed: {model_version}")
             return result
@@ -350,11 +431,15 @@ class ModelTrainer:
                 error_message=str(e)
             )
     
-    def _mock_spacy_training(self, dataset_files: Dict[str, str]) -> TrainingResult:
+    def _mock_spacy_training(self, dataset_files: Dict[str, str],
+                             plan: Optional[TrainingPlan] = None) -> TrainingResult:
         """Mock spaCy training when spaCy is not available"""
         
         self.logger.info("Running mock spaCy NER training (spaCy not available)")
         
+        if plan is not None:
+            self.feature_cache.featurize(plan.records, SpacyFeaturizer(), self._data_workers())
+        
         model_version = f"spacy_ner_{self._generate_model_version()}"
         
         # Create mock model directory
@@ -366,7 +451,8 @@ class ModelTrainer:
             "model_type": "mock_spacy_ner",
             "version": model_version,
             "trained_on": datetime.now().isoformat(),
-            "labels": ["PAIR", "DIRECTION", "ENTRY", "SL", "TP", "PROVIDER"]
+            "labels": ["PAIR", "DIRECTION", "ENTRY", "SL", "TP", "PROVIDER"],
+            "base_version": plan.base_version if plan else None
         }
         
         with open(version_dir / "model_info.json", 'w') as f:
@@ -378,29 +464,64 @@ class ModelTrainer:
             eval_loss=0.0,
             eval_accuracy=0.85,
             training_time=60.0,
-            total_samples=500,
+            total_samples=len(plan.records) if plan else 500,
             model_size_mb=25.0,
             success=True
         )
         
         self._update_version_info(result)
         self._log_training_result(result)
+        if plan is not None:
+            self.feature_cache.mark_trained("spacy_ner", plan.records, model_version)
         
         return result
     
-    def _load_hf_dataset(self, file_path: str) -> Dataset:
-        """Load dataset in HuggingFace format"""
+    def _data_workers(self) -> int:
+        return self.config.data_workers or os.cpu_count() or 1
+    
+    def _plan_training(self, kind: str, train_file: str, featurizer,
+                       base_version: Optional[str]) -> TrainingPlan:
+        """Load the training split and pick the records this run trains on"""
+        
+        records = load_records(train_file, self._data_workers())
+        trained = self.feature_cache.trained_samples(kind) if base_version else (set(), set())
+        plan = plan_training(kind, records, trained, base_version, featurizer.identity,
+                             self.config.replay_fraction)
+        
+        if plan.incremental:
+            self.logger.info(f"Incremental {kind} training from {base_version}: {plan.new} new, "
+                             f"{plan.corrected} corrected, {plan.replayed} replayed, "
+                             f"{plan.unchanged} unchanged samples")
+        return plan
+    
+    def _nothing_to_train(self, plan: TrainingPlan, start_time: datetime) -> TrainingResult:
+        """Result for an incremental run with no new or corrected samples; the current version stands"""
         
-        data = []
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line.strip())
-                    data.append(entry)
-                except json.JSONDecodeError:
-                    continue
+        self.logger.info(f"No new or corrected {plan.kind} samples since {plan.base_version}")
+        return TrainingResult(
+            model_version=plan.base_version or "none",
+            training_loss=0.0,
+            eval_loss=0.0,
+            eval_accuracy=0.0,
+            training_time=(datetime.now() - start_time).total_seconds(),
+            total_samples=0,
+            model_size_mb=0.0,
+            success=True
+        )
+    
+    def _current_version(self, kind: str) -> Optional[str]:
+        """Latest successfully trained version of a model kind that is still on disk"""
         
-        return Dataset.from_list(data)
+        if not self.version_file.exists():
+            return None
+        
+        with open(self.version_file, 'r') as f:
+            version_info = json.load(f)
+        
+        version = version_info.get("current_versions", {}).get(kind)
+        if version and (self.models_dir / "versions" / version).exists():
+            return version
+        return None
     
     def _load_spacy_data(self, file_path: str) -> List[Tuple[str, Dict]]:
         """Load dataset in spaCy format"""
@@ -421,33 +542,6 @@ class ModelTrainer:
         
         return data
     
-    def _prepare_dataset(self, dataset: Dataset, tokenizer) -> Dataset:
-        """Prepare dataset for training"""
-        
-        def tokenize_function(examples):
-            # Create training format: input -> output
-            inputs = examples['input']
-            outputs = examples['output']
-            
-            # Combine input and output for causal LM
-            texts = [f"{inp} -> {out}" for inp, out in zip(inputs, outputs)]
-            
-            # Tokenize
-            tokenized = tokenizer(
-                texts,
-                truncation=True,
-                padding=True,
-                max_length=self.config.max_length,
-                return_tensors="pt"
-            )
-            
-            # For causal LM, labels are the same as input_ids
-            tokenized["labels"] = tokenized["input_ids"].clone()
-            
-            return tokenized
-        
-        return dataset.map(tokenize_function, batched=True, remove_columns=dataset.column_names)
-    
     def _evaluate_spacy_model(self, nlp, validation_file: Optional[str]) -> float:
         """Evaluate spaCy model on validation set"""
         
@@ -480,8 +574,9 @@ class ModelTrainer:
     def _generate_model_version(self) -> str:
         """Generate semantic version for model"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        version_hash = hashlib.md5(timestamp.encode()).hexdigest()[:8]
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        version_hash = hashlib.md5(f"{now.isoformat()}:{os.getpid()}".encode()).hexdigest()[:8]
         
         return f"v1.0.{timestamp}_{version_hash}"
     
@@ -516,8 +611,16 @@ class ModelTrainer:
             
             version_info['versions'] = existing_info['versions']
         else:
+            existing_info = {}
             version_info['versions'] = []
         
+        # Current version per model kind, the base for incremental training
+        current_versions = existing_info.get('current_versions', {})
+        if result.success:
+            kind = "spacy_ner" if result.model_version.startswith("spacy_ner_") else "llm"
+            current_versions[kind] = result.model_version
+        version_info['current_versions'] = current_versions
+        
         # Add current version to history
         version_info['versions'].append({
             "version": result.model_version,
@@ -546,7 +649,11 @@ class ModelTrainer:
     
     def run_continuous_training(self, dataset_manager, 
                               check_interval: int = 86400) -> bool:
-        """Run continuous training pipeline"""
+        """Run continuous training pipeline
+        
+        Each run warm-starts from the current versions and trains only on
+        samples that are new or were corrected since they were last trained on.
+        """
         
         self.logger.info("Starting continuous training pipeline...")
         
@@ -565,9 +672,9 @@ class ModelTrainer:
                 hf_files = dataset_manager.export_training_data("huggingface")
                 spacy_files = dataset_manager.export_training_data("spacy")
                 
-                # Train models
-                llm_result = self.train_llm_parser(hf_files)
-                ner_result = self.train_spacy_ner(spacy_files)
+                # Train models incrementally
+                llm_result = self.train_llm_parser(hf_files, incremental=True)
+                ner_result = self.train_spacy_ner(spacy_files, incremental=True)
                 
                 # Check if training improved
                 if llm_result.success and llm_result.eval_accuracy > 0.8:
@@ -691,6 +798,9 @@ class ModelTrainer:
             with open(self.version_file, 'r') as f:
                 version_info = json.load(f)
                 status["current_version"] = version_info.get("current_version")
+                status["current_versions"] = version_info.get("current_versions", {})
                 status["last_training"] = version_info.get("last_updated")
         
+        status["feature_cache"] = self.feature_cache.get_statistics()
+        
         return status
\ No newline at end of file
@@ -6,12 +6,28 @@ Advanced error handling with AI fallback and comprehensive validation
 
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 
 from .parser_utils import sanitize_signal, validate_result, clean_text_input
-from .fallback_regex_parser import fallback_parser
-from .feedback_logger import log_failure, log_success, log_performance
+from .fallback_regex_parser import get_fallback_parser
+from .feedback_logger import log_failure, log_success, log_performance, get_feedback_logger
+from .model_server import KeywordSignalModel, get_model_server
+from .cascade import CascadeStage, ParseCascade, DEFAULT_STAGE_COSTS_MS
+from .provider_templates import ProviderTemplates, samples_from_dataset, samples_from_feedback
+
+try:
+    from parser.multilingual_parser import MultilingualSignalParser
+    MULTILINGUAL_AVAILABLE = True
+except ImportError:
+    MULTILINGUAL_AVAILABLE = False
+
+try:
+    from updater.model_updater import on_model_update
+    MODEL_UPDATER_AVAILABLE = True
+except ImportError:
+    MODEL_UPDATER_AVAILABLE = False
 
 
 class SafeParserEngine:
@@ -28,15 +44,53 @@ class SafeParserEngine:
         self.enable_fallback = self.config.get("enable_fallback", True)
         self.log_failures = self.config.get("log_failures", True)
         
+        # Warm, micro-batched AI model shared by every parser in the process
+        self.model_server = get_model_server(
+            self.config.get("models_dir", "models"),
+            max_batch_size=self.config.get("ai_batch_size", 16),
+            max_wait_ms=self.config.get("ai_batch_max_wait_ms", 2.0)
+        )
+        if MODEL_UPDATER_AVAILABLE and self.config.get("follow_model_updates", True):
+            # Models the updater extracts go live without a restart; the
+            # updater itself is only created once something checks for updates
+            on_model_update(self.model_server.activate)
+        if self.enable_ai_parser:
+            self._warm_model()
+        
+        # Tiered parse cascade
+        self._multilingual_parser = None
+        self.cascade = self._build_cascade()
+        
+        # Learned per-provider layouts, tried before the cascade
+        template_config = self.config.get("provider_templates", {})
+        self.templates_path = template_config.get("path", "data/provider_templates.json")
+        self.templates = ProviderTemplates(
+            min_support=template_config.get("min_support", 3),
+            window_size=template_config.get("window_size", 50),
+            min_observations=template_config.get("min_observations", 20),
+            max_failure_rate=template_config.get("max_failure_rate", 0.25)
+        )
+        if template_config.get("enabled", True):
+            self.templates.load(self.templates_path)
+        
         # Performance tracking
         self.parse_stats = {
             "total_attempts": 0,
             "ai_successes": 0,
+            "ai_timeouts": 0,
             "fallback_uses": 0,
+            "template_hits": 0,
             "failures": 0,
             "avg_parse_time": 0.0
         }
         
+    def _warm_model(self):
+        """Load the production model now, so the first parse is not charged for loading it"""
+        try:
+            self.model_server.active()
+        except Exception as e:
+            self.logger.warning(f"Failed to preload AI model: {e}")
+        
     def setup_logging(self):
         """Setup parser logging"""
         log_dir = Path("logs")
@@ -59,6 +113,23 @@ class SafeParserEngine:
             "enable_ai_parser": True,
             "enable_fallback": True,
             "log_failures": True,
+            "models_dir": "models",
+            "ai_batch_size": 16,
+            "ai_batch_max_wait_ms": 2.0,
+            "follow_model_updates": True,
+            "cascade": {
+                "order": ["structured", "regex", "multilingual", "ai"],
+                "latency_budget_ms": 0,
+                "stages": {}
+            },
+            "provider_templates": {
+                "enabled": True,
+                "path": "data/provider_templates.json",
+                "min_support": 3,
+                "window_size": 50,
+                "min_observations": 20,
+                "max_failure_rate": 0.25
+            },
             "require_all_fields": True,
             "allowed_pairs": ["EURUSD", "GBPUSD", "USDJPY", "USDCHF", "AUDUSD", "USDCAD", "NZDUSD", "XAUUSD", "XAGUSD"],
             "min_confidence": 0.7
@@ -75,12 +146,19 @@ class SafeParserEngine:
             
         return default_config
         
-    def parse_signal_safe(self, raw_text: str) -> Optional[Dict[str, Any]]:
+    def parse_signal_safe(self, raw_text: str, provider: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Safe signal parsing with comprehensive error handling
         
+        When the provider has a learned template, its anchored pattern is
+        tried first. Otherwise the text goes through the parse cascade
+        (structured -> regex -> multilingual -> AI by default). Every stage
+        result is validated; the first one that clears its stage's confidence
+        gate is returned, so clean signals never wait for the AI model.
+        
         Args:
             raw_text: Raw signal text from Telegram or other source
+            provider: Signal provider (channel), if known
             
         Returns:
             Parsed signal dictionary or None if parsing failed
@@ -89,67 +167,44 @@ class SafeParserEngine:
         self.parse_stats["total_attempts"] += 1
         
         try:
-            # Step 1: Sanitize input
-            sanitized_text = sanitize_signal(raw_text)
-            clean_text = clean_text_input(sanitized_text)
-            
-            self.logger.info(f"Parsing signal: {clean_text[:100]}...")
+            self.logger.info(f"Parsing signal: {raw_text[:100]}...")
             
-            # Step 2: Try AI parser first
-            if self.enable_ai_parser:
-                for attempt in range(self.max_retries):
-                    try:
-                        result = self._ai_parse_with_timeout(clean_text)
-                        if result:
-                            # Step 3: Validate AI result
-                            validated_result = validate_result(result, self.config)
-                            
-                            # Log success
-                            parse_time = time.time() - start_time
-                            self._update_performance_stats(parse_time, "ai_success")
-                            
-                            if self.log_failures:  # Also log successes for learning
-                                log_success(raw_text, validated_result, parse_time, "ai")
-                                
-                            self.logger.info(f"AI parser succeeded on attempt {attempt + 1}")
-                            return validated_result
-                            
-                    except Exception as e:
-                        self.logger.warning(f"AI parser attempt {attempt + 1} failed: {e}")
-                        if attempt == self.max_retries - 1:
-                            # Log AI failure before trying fallback
-                            if self.log_failures:
-                                log_failure(raw_text, str(e), "ai_parser", attempt + 1)
-                                
-            # Step 4: Fallback to regex parser
-            if self.enable_fallback:
-                self.logger.info("Attempting fallback regex parser...")
-                try:
-                    fallback_result = fallback_parser(clean_text)
-                    if fallback_result:
-                        # Validate fallback result
-                        validated_result = validate_result(fallback_result, self.config)
-                        
-                        # Log fallback usage
-                        parse_time = time.time() - start_time
-                        self._update_performance_stats(parse_time, "fallback_success")
-                        
-                        if self.log_failures:
-                            log_success(raw_text, validated_result, parse_time, "fallback")
-                            
-                        self.logger.info("Fallback parser succeeded")
-                        return validated_result
-                        
-                except Exception as e:
-                    self.logger.error(f"Fallback parser failed: {e}")
+            templated = self.templates.is_active(provider)
+            template_outcome = None
+            if templated:
+                result, template_outcome = self._template_parse(provider, raw_text)
+                if result is not None:
+                    parse_time = time.time() - start_time
+                    self._update_performance_stats(parse_time, "template_success")
                     if self.log_failures:
-                        log_failure(raw_text, str(e), "fallback_parser", 1)
-                        
-            # Step 5: All parsing methods failed
+                        log_success(raw_text, result, parse_time, "template", provider)
+                    return result
+            
+            # Run the cascade; stages other than the structured fast path sanitize first
+            outcome = self.cascade.run(raw_text)
             parse_time = time.time() - start_time
+            
+            if outcome.result is not None:
+                if templated and template_outcome is None:
+                    # A signal the provider's templates should have matched
+                    self.templates.record(provider, "miss")
+                    
+                method = "ai" if outcome.stage == "ai" else "fallback"
+                self._update_performance_stats(parse_time, f"{method}_success")
+                
+                if self.log_failures:  # Also log successes for learning
+                    log_success(raw_text, outcome.result, parse_time, method, provider)
+                    
+                self.logger.info(f"Parsed by {outcome.stage} stage in {outcome.elapsed_ms:.1f}ms "
+                                 f"(tried {', '.join(outcome.attempted)})")
+                return outcome.result
+                
+            # All parsing methods failed
             self._update_performance_stats(parse_time, "total_failure")
             
             error_msg = "All parsing methods failed"
+            if outcome.errors:
+                error_msg += ": " + "; ".join(f"{stage}: {error}" for stage, error in outcome.errors.items())
             self.logger.error(f"Complete parsing failure: {error_msg}")
             
             if self.log_failures:
@@ -169,67 +224,149 @@ class SafeParserEngine:
                 
             return None
             
-    def _ai_parse_with_timeout(self, text: str) -> Optional[Dict[str, Any]]:
+    def _template_parse(self, provider: str, raw_text: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
-        AI parsing with timeout protection
-        Mock implementation - replace with actual AI model call
+        Provider template extraction, validated; outcomes feed template demotion
+        
+        Returns:
+            (validated result or None, recorded outcome or None when no template matched)
         """
+        result = self.templates.extract(provider, raw_text)
+        if result is None:
+            return None, None
         try:
-            # Import AI parser components if available
+            result = validate_result(result, self.config)
+        except ValueError as e:
+            self.templates.record(provider, "invalid")
+            self.logger.debug(f"Template result for {provider} rejected: {e}")
+            return None, "invalid"
+        self.templates.record(provider, "hit")
+        return result, "hit"
+        
+    def learn_provider_templates(self, dataset_manager=None, feedback_logger=None) -> int:
+        """
+        Relearn provider templates from DatasetManager samples and
+        FeedbackLogger successes, and save them for the next start
+        
+        Returns:
+            Number of templates learned
+        """
+        def samples():
+            if dataset_manager is not None:
+                yield from samples_from_dataset(dataset_manager, self.config.get("min_confidence", 0.7))
+            yield from samples_from_feedback(feedback_logger or get_feedback_logger())
+            
+        count = self.templates.learn(samples())
+        self.templates.save(self.templates_path)
+        return count
+        
+    def _build_cascade(self) -> ParseCascade:
+        """Parse stages in default order; the config's cascade section can reorder and tune them"""
+        regex_parser = get_fallback_parser()
+        stages = [
+            # The structured patterns expect the signal's own abbreviations (SL/TP), so this
+            # stage sees the raw text; the others get it sanitized, abbreviations expanded
+            CascadeStage("structured", self._validated(regex_parser.parse_structured_signal),
+                         DEFAULT_STAGE_COSTS_MS["structured"], min_confidence=0.8),
+            CascadeStage("regex", self._validated(regex_parser.parse_signal_regex, clean=True),
+                         DEFAULT_STAGE_COSTS_MS["regex"], min_confidence=0.6),
+            CascadeStage("multilingual", self._validated(self._multilingual_parse, clean=True),
+                         DEFAULT_STAGE_COSTS_MS["multilingual"], min_confidence=0.7,
+                         enabled=MULTILINGUAL_AVAILABLE),
+            CascadeStage("ai", lambda text: self._ai_parse_with_retries(_clean_text(text)),
+                         DEFAULT_STAGE_COSTS_MS["ai"], min_confidence=self.config.get("min_confidence", 0.7))
+        ]
+        cascade = ParseCascade(stages)
+        cascade_config = self.config.get("cascade", {})
+        cascade.configure(order=cascade_config.get("order"),
+                          latency_budget_ms=cascade_config.get("latency_budget_ms"),
+                          stages=cascade_config.get("stages"))
+        self._apply_stage_switches(cascade)
+        return cascade
+        
+    def _apply_stage_switches(self, cascade: ParseCascade):
+        """enable_ai_parser / enable_fallback map onto the cascade stages"""
+        cascade.set_enabled("ai", self.enable_ai_parser)
+        for name in ("structured", "regex"):
+            cascade.set_enabled(name, self.enable_fallback)
+        cascade.set_enabled("multilingual", self.enable_fallback and MULTILINGUAL_AVAILABLE)
+        
+    def _validated(self, parse, clean: bool = False):
+        """Wrap a stage so its result is validated; invalid results count as stage errors"""
+        def stage(text: str) -> Optional[Dict[str, Any]]:
+            result = parse(_clean_text(text) if clean else text)
+            return validate_result(result, self.config) if result else None
+        return stage
+        
+    def _multilingual_parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """Multilingual pattern parser, mapped to the safe parser's result format"""
+        if self._multilingual_parser is None:
+            self._multilingual_parser = MultilingualSignalParser()
+        parsed = self._multilingual_parser.parse_signal(text)
+        data = parsed.parsed_data
+        if not data.get("symbol") or not data.get("direction") or not data.get("entry_prices"):
+            return None
+        return {
+            "pair": data["symbol"],
+            "direction": data["direction"],
+            "entry": data["entry_prices"],
+            "sl": data["stop_loss"][0] if data.get("stop_loss") else None,
+            "tp": data.get("take_profit", []),
+            "confidence": parsed.confidence,
+            "parser_method": f"multilingual_{parsed.detected_language}"
+        }
+        
+    def _ai_parse_with_retries(self, text: str) -> Optional[Dict[str, Any]]:
+        """AI cascade stage: up to max_retries attempts, none after a timeout"""
+        for attempt in range(self.max_retries):
             try:
-                from ..parser.parser_core import ParserCore
-                from ..parser.confidence_system import ConfidenceSystem
-                
-                # Use existing AI parser
-                parser_core = ParserCore()
-                confidence_system = ConfidenceSystem()
-                
-                # Parse with AI model
-                result = parser_core.parse_signal(text)
-                
-                if result and result.get("confidence", 0) >= self.config.get("min_confidence", 0.7):
-                    return {
-                        "pair": result.get("symbol", ""),
-                        "direction": result.get("action", "").upper(),
-                        "entry": result.get("entry_price", []),
-                        "sl": result.get("stop_loss", 0),
-                        "tp": result.get("take_profit", []),
-                        "confidence": result.get("confidence", 0),
-                        "risk_reward": result.get("risk_reward", 0),
-                        "lot_size": result.get("lot_size", 0.01),
-                        "parser_method": "ai"
-                    }
-                else:
-                    self.logger.warning(f"AI parser low confidence: {result.get('confidence', 0)}")
-                    return None
-                    
-            except ImportError:
-                # Mock AI parser for testing
-                self.logger.warning("AI parser not available, using mock")
-                return self._mock_ai_parser(text)
+                result = self._ai_parse_with_timeout(text)
+                if result:
+                    validated_result = validate_result(result, self.config)
+                    self.logger.info(f"AI parser succeeded on attempt {attempt + 1}")
+                    return validated_result
+                return None
                 
+            except TimeoutError as e:
+                # Retrying would only multiply the wait
+                self.parse_stats["ai_timeouts"] += 1
+                self.logger.warning(f"AI parser attempt {attempt + 1} timed out: {e}")
+                if self.log_failures:
+                    log_failure(text, str(e), "ai_parser", attempt + 1)
+                raise
+            except Exception as e:
+                self.logger.warning(f"AI parser attempt {attempt + 1} failed: {e}")
+                if attempt == self.max_retries - 1:
+                    if self.log_failures:
+                        log_failure(text, str(e), "ai_parser", attempt + 1)
+                    raise
+        return None
+        
+    def _ai_parse_with_timeout(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        AI parsing with timeout protection
+        
+        The request goes to the shared model server, which keeps the
+        production model loaded and micro-batches concurrent requests. The
+        wait is bounded by timeout_seconds; TimeoutError is raised past it.
+        """
+        try:
+            result = self.model_server.parse(text, timeout=self.timeout_seconds)
+        except TimeoutError:
+            raise
         except Exception as e:
-            self.logger.error(f"AI parser timeout/error: {e}")
+            self.logger.error(f"AI parser error: {e}")
             raise
             
+        if result and result.get("confidence", 0) >= self.config.get("min_confidence", 0.7):
+            return result
+        if result:
+            self.logger.warning(f"AI parser low confidence: {result.get('confidence', 0)}")
+        return None
+            
     def _mock_ai_parser(self, text: str) -> Optional[Dict[str, Any]]:
         """Mock AI parser for testing purposes"""
-        # Simple keyword detection for testing
-        text_upper = text.upper()
-        
-        if "BUY" in text_upper or "SELL" in text_upper:
-            return {
-                "pair": "EURUSD",
-                "direction": "BUY" if "BUY" in text_upper else "SELL", 
-                "entry": [1.0850, 1.0860],
-                "sl": 1.0800,
-                "tp": [1.0900, 1.0950],
-                "confidence": 0.8,
-                "risk_reward": 2.5,
-                "lot_size": 0.01,
-                "parser_method": "mock_ai"
-            }
-        return None
+        return KeywordSignalModel().predict(text)
         
     def _update_performance_stats(self, parse_time: float, result_type: str):
         """Update performance statistics"""
@@ -237,6 +374,8 @@ class SafeParserEngine:
             self.parse_stats["ai_successes"] += 1
         elif result_type == "fallback_success":
             self.parse_stats["fallback_uses"] += 1
+        elif result_type == "template_success":
+            self.parse_stats["template_hits"] += 1
         elif result_type in ["total_failure", "exception"]:
             self.parse_stats["failures"] += 1
             
@@ -257,10 +396,14 @@ class SafeParserEngine:
             
         return {
             **self.parse_stats,
-            "success_rate": ((self.parse_stats["ai_successes"] + self.parse_stats["fallback_uses"]) / total) * 100,
+            "success_rate": ((self.parse_stats["ai_successes"] + self.parse_stats["fallback_uses"]
+                              + self.parse_stats["template_hits"]) / total) * 100,
             "ai_success_rate": (self.parse_stats["ai_successes"] / total) * 100,
             "fallback_rate": (self.parse_stats["fallback_uses"] / total) * 100,
-            "failure_rate": (self.parse_stats["failures"] / total) * 100
+            "template_rate": (self.parse_stats["template_hits"] / total) * 100,
+            "failure_rate": (self.parse_stats["failures"] / total) * 100,
+            "cascade": self.cascade.get_statistics(),
+            "templates": self.templates.get_statistics()
         }
         
     def reset_stats(self):
@@ -268,10 +411,13 @@ class SafeParserEngine:
         self.parse_stats = {
             "total_attempts": 0,
             "ai_successes": 0,
+            "ai_timeouts": 0,
             "fallback_uses": 0,
+            "template_hits": 0,
             "failures": 0,
             "avg_parse_time": 0.0
         }
+        self.cascade.reset_statistics()
         self.logger.info("Parser statistics reset")
         
     def configure_parser(self, **kwargs):
@@ -287,6 +433,18 @@ class SafeParserEngine:
         self.enable_ai_parser = self.config.get("enable_ai_parser", True)
         self.enable_fallback = self.config.get("enable_fallback", True)
         self.log_failures = self.config.get("log_failures", True)
+        if "cascade" in kwargs:
+            cascade_config = self.config["cascade"]
+            self.cascade.configure(order=cascade_config.get("order"),
+                                   latency_budget_ms=cascade_config.get("latency_budget_ms"),
+                                   stages=cascade_config.get("stages"))
+        self._apply_stage_switches(self.cascade)
+
+
+@lru_cache(maxsize=256)
+def _clean_text(raw_text: str) -> str:
+    """Sanitized, cleaned text; cached so the stages of one request clean it once"""
+    return clean_text_input(sanitize_signal(raw_text))
 
 
 # Global parser instance
@@ -301,18 +459,19 @@ def get_safe_parser() -> SafeParserEngine:
     return _global_parser
 
 
-def parse_signal_safe(raw_text: str) -> Optional[Dict[str, Any]]:
+def parse_signal_safe(raw_text: str, provider: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Convenience function for safe signal parsing
     
     Args:
         raw_text: Raw signal text
+        provider: Signal provider, if known
         
     Returns:
         Parsed signal dictionary or None
     """
     parser = get_safe_parser()
-    return parser.parse_signal_safe(raw_text)
+    return parser.parse_signal_safe(raw_text, provider)
 
 
 def get_parser_performance() -> Dict[str, Any]:
@@ -180,12 +180,23 @@ def normalize_direction(direction: str) -> str:
     direction_upper = direction.upper().strip()
     
     # Map common variations
-    buy_variations = ['BUY', 'LONG', 'BULL', 'UP', 'CALL', 'B', 'L']
-    sell_variations = ['SELL', 'SHORT', 'BEAR', 'DOWN', 'PUT', 'S']
-    
-    if any(var in direction_upper for var in buy_variations):
+    buy_words = ['BUY', 'LONG', 'BULL', 'UP', 'CALL']
+    sell_words = ['SELL', 'SHORT', 'BEAR', 'DOWN', 'PUT']
+    buy_letters = ['B', 'L']
+    sell_letters = ['S']
+    
+    # Whole tokens, full words before single letters, so "SELL LIMIT" or
+    # "STRONG SELL" are never read as BUY through the "L" alias
+    tokens = direction_upper.split()
+    for variations, normalized in ((buy_words, "BUY"), (sell_words, "SELL"),
+                                   (buy_letters, "BUY"), (sell_letters, "SELL")):
+        if any(token in variations for token in tokens):
+            return normalized
+    
+    # Run-together forms such as "BUYLIMIT"
+    if any(var in direction_upper for var in buy_words):
         return "BUY"
-    elif any(var in direction_upper for var in sell_variations):
+    elif any(var in direction_upper for var in sell_words):
         return "SELL"
         
     return direction_upper
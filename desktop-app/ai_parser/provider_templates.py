@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Provider Format Templates for SignalOS
+Learns each provider's fixed message layout and parses it with one anchored pattern
+
+Most signal volume comes from a few providers whose messages always follow the
+same layout, e.g. "🟢 BUY EURUSD @ 1.0850-1.0860 SL: 1.0800 TP1: 1.0900". From
+verified samples, each message is tokenized and the tokens holding the pair,
+direction, entry, stop loss and take profits become slots; everything else
+stays literal (other numbers become wildcards). Layouts seen often enough for
+a provider are compiled to a single anchored regex, which is tried before the
+general parsers for that provider's messages.
+
+Templates are demoted when they stop working: a provider whose recent window
+of messages has too many template misses (messages the general parsers could
+parse but no template matched) or invalid results is switched back to the
+general parsers until templates are relearned from newer data.
+"""
+
+import json
+import logging
+import re
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator
+
+from .parser_utils import normalize_pair_symbol, normalize_direction
+
+TOKEN_PATTERN = re.compile(r'(\s*)(\d+(?:\.\d+)?|[A-Za-z]+(?:/[A-Za-z]+)?|\S)')
+NUMBER_TOKEN = re.compile(r'\d+(?:\.\d+)?$')
+DIRECTION_WORDS = {"BUY": "BUY", "LONG": "BUY", "SELL": "SELL", "SHORT": "SELL"}
+
+# Regex for each slot kind; "num" is a number that varies but is not extracted
+SLOT_PATTERNS = {
+    "pair": r'([A-Za-z]{2,10}(?:/[A-Za-z]{2,10})?)',
+    "direction": r'(BUY|SELL|LONG|SHORT)',
+    "entry": r'(\d+(?:\.\d+)?)',
+    "sl": r'(\d+(?:\.\d+)?)',
+    "tp": r'(\d+(?:\.\d+)?)',
+    "num": r'\d+(?:\.\d+)?'
+}
+
+
+@dataclass
+class ProviderTemplate:
+    """One learned layout for a provider"""
+    provider: str
+    pattern: str
+    slots: List[str]
+    support: int = 0
+    hits: int = 0
+    compiled: Any = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.compiled is None:
+            self.compiled = re.compile(self.pattern, re.IGNORECASE)
+
+    def extract(self, text: str) -> Optional[Dict[str, Any]]:
+        """Fill the template's slots from text, or None if the layout does not match"""
+        match = self.compiled.match(text)
+        if not match:
+            return None
+
+        values: Dict[str, List[str]] = defaultdict(list)
+        for slot, value in zip(self.slots, match.groups()):
+            values[slot].append(value)
+        return {
+            "pair": normalize_pair_symbol(values["pair"][0]),
+            "direction": DIRECTION_WORDS[values["direction"][0].upper()],
+            "entry": [float(value) for value in values["entry"]],
+            "sl": float(values["sl"][0]) if values["sl"] else None,
+            "tp": [float(value) for value in values["tp"]],
+            "confidence": 0.95,
+            "parser_method": "provider_template"
+        }
+
+
+@dataclass
+class ProviderTemplateStats:
+    """Template outcomes for one provider; window holds the most recent ones"""
+    hits: int = 0
+    misses: int = 0
+    invalid: int = 0
+    demoted: bool = False
+    window: deque = field(default_factory=deque)
+
+
+def _tokenize(text: str) -> List[Tuple[bool, str]]:
+    """(preceded by whitespace, token) pairs"""
+    return [(bool(space), token) for space, token in TOKEN_PATTERN.findall(text.strip())]
+
+
+def _same_number(token: str, value: Any) -> bool:
+    try:
+        return abs(float(token) - float(value)) < 1e-9
+    except (TypeError, ValueError):
+        return False
+
+
+def infer_template(raw_text: str, parsed: Dict[str, Any]) -> Optional[Tuple[str, List[str]]]:
+    """
+    Derive an anchored pattern and its slot order from one parsed sample
+
+    Returns None when the pair, direction or entry cannot be located in the
+    text, so the sample says nothing reliable about the layout.
+    """
+    tokens = _tokenize(raw_text)
+    kinds: List[Optional[str]] = [None] * len(tokens)
+
+    pair = normalize_pair_symbol(parsed.get("pair") or "")
+    direction = (parsed.get("direction") or "").upper()
+    direction = DIRECTION_WORDS.get(direction) or normalize_direction(direction)
+    for i, (_, token) in enumerate(tokens):
+        if kinds[i] is None and pair and normalize_pair_symbol(token) == pair and not NUMBER_TOKEN.match(token):
+            kinds[i], pair = "pair", None
+        elif kinds[i] is None and direction and DIRECTION_WORDS.get(token.upper()) == direction:
+            kinds[i], direction = "direction", None
+    if pair or direction:
+        return None
+
+    # Prices are claimed left to right in field order, each token once
+    def claim(slot: str, values: List[Any]) -> bool:
+        for value in values:
+            for i, (_, token) in enumerate(tokens):
+                if kinds[i] is None and NUMBER_TOKEN.match(token) and _same_number(token, value):
+                    kinds[i] = slot
+                    break
+            else:
+                return False
+        return True
+
+    entry, sl, tp = parsed.get("entry") or [], parsed.get("sl"), parsed.get("tp") or []
+    entry = entry if isinstance(entry, list) else [entry]
+    tp = tp if isinstance(tp, list) else [tp]
+    if not entry or not claim("entry", entry) or not claim("sl", [sl] if sl else []) or not claim("tp", tp):
+        return None
+
+    parts, slots = ['^'], []
+    for i, (space, token) in enumerate(tokens):
+        if i:
+            parts.append(r'\s+' if space else r'\s*')
+        kind = kinds[i] or ("num" if NUMBER_TOKEN.match(token) else None)
+        if kind is None:
+            parts.append(re.escape(token))
+        else:
+            parts.append(SLOT_PATTERNS[kind])
+            if kind != "num":
+                slots.append(kind)
+    parts.append('$')
+    return ''.join(parts), slots
+
+
+class ProviderTemplates:
+    """Learned per-provider templates with failure-rate demotion"""
+
+    def __init__(self, min_support: int = 3, max_templates: int = 4, window_size: int = 50,
+                 min_observations: int = 20, max_failure_rate: float = 0.25):
+        self.min_support = min_support
+        self.max_templates = max_templates
+        self.window_size = window_size
+        self.min_observations = min_observations
+        self.max_failure_rate = max_failure_rate
+
+        self.templates: Dict[str, List[ProviderTemplate]] = {}
+        self.stats: Dict[str, ProviderTemplateStats] = defaultdict(ProviderTemplateStats)
+        # Patterns that were demoted; relearning does not bring them back
+        self.demoted_patterns: Dict[str, set] = defaultdict(set)
+        self.logger = logging.getLogger(__name__)
+
+    def learn(self, samples: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Learn templates from (provider, raw_text, parsed) samples
+
+        A layout becomes a template once min_support samples share it and the
+        compiled pattern reproduces each sample's parse. Returns the number of
+        templates now active.
+        """
+        layouts: Dict[str, Counter] = defaultdict(Counter)
+        slots_by_pattern: Dict[str, List[str]] = {}
+        examples: Dict[Tuple[str, str], List[Tuple[str, Dict[str, Any]]]] = defaultdict(list)
+
+        for provider, raw_text, parsed in samples:
+            if not provider or not raw_text or not parsed:
+                continue
+            inferred = infer_template(raw_text, parsed)
+            if inferred is None:
+                continue
+            pattern, slots = inferred
+            layouts[provider][pattern] += 1
+            slots_by_pattern[pattern] = slots
+            if len(examples[(provider, pattern)]) < 3:
+                examples[(provider, pattern)].append((raw_text, parsed))
+
+        learned: Dict[str, List[ProviderTemplate]] = {}
+        for provider, counts in layouts.items():
+            templates = []
+            for pattern, support in counts.most_common():
+                if support < self.min_support or len(templates) >= self.max_templates:
+                    break
+                if pattern in self.demoted_patterns[provider]:
+                    continue
+                template = ProviderTemplate(provider, pattern, slots_by_pattern[pattern], support)
+                if all(self._reproduces(template, raw_text, parsed)
+                       for raw_text, parsed in examples[(provider, pattern)]):
+                    templates.append(template)
+            if templates:
+                learned[provider] = templates
+
+        self.templates = learned
+        for provider in learned:
+            self.stats[provider] = ProviderTemplateStats()
+        count = sum(len(templates) for templates in learned.values())
+        self.logger.info(f"Learned {count} templates for {len(learned)} providers")
+        return count
+
+    @staticmethod
+    def _reproduces(template: ProviderTemplate, raw_text: str, parsed: Dict[str, Any]) -> bool:
+        result = template.extract(raw_text.strip())
+        if result is None:
+            return False
+        entry = parsed.get("entry") or []
+        entry = entry if isinstance(entry, list) else [entry]
+        tp = parsed.get("tp") or []
+        tp = tp if isinstance(tp, list) else [tp]
+        return (result["entry"] == [float(value) for value in entry]
+                and result["tp"] == [float(value) for value in tp]
+                and (result["sl"] or None) == (float(parsed["sl"]) if parsed.get("sl") else None))
+
+    def extract(self, provider: Optional[str], text: str) -> Optional[Dict[str, Any]]:
+        """Parse text with the provider's templates; None if it has none, is demoted or nothing matches"""
+        templates = self.templates.get(provider) if provider else None
+        if not templates or self.stats[provider].demoted:
+            return None
+
+        text = text.strip()
+        for template in templates:
+            result = template.extract(text)
+            if result is not None:
+                template.hits += 1
+                return result
+        return None
+
+    def is_active(self, provider: Optional[str]) -> bool:
+        return bool(provider and self.templates.get(provider) and not self.stats[provider].demoted)
+
+    def record(self, provider: str, outcome: str):
+        """
+        Record a template outcome for a provider: "hit" (valid result),
+        "invalid" (matched but failed validation) or "miss" (no template
+        matched a message the general parsers could parse). Demotes the
+        provider when the failure rate over the window exceeds the limit.
+        """
+        stats = self.stats[provider]
+        if outcome == "hit":
+            stats.hits += 1
+        elif outcome == "invalid":
+            stats.invalid += 1
+        else:
+            stats.misses += 1
+
+        stats.window.append(outcome != "hit")
+        if len(stats.window) > self.window_size:
+            stats.window.popleft()
+
+        if not stats.demoted and len(stats.window) >= self.min_observations:
+            failure_rate = sum(stats.window) / len(stats.window)
+            if failure_rate > self.max_failure_rate:
+                self.demote(provider, f"failure rate {failure_rate:.0%} over last {len(stats.window)} messages")
+
+    def demote(self, provider: str, reason: str = ""):
+        """Send a provider's messages back to the general parsers"""
+        self.stats[provider].demoted = True
+        for template in self.templates.get(provider, []):
+            self.demoted_patterns[provider].add(template.pattern)
+        self.logger.warning(f"Demoted templates for {provider}: {reason}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Per-provider template counts, hit rates and demotion state"""
+        providers = {}
+        for provider, templates in self.templates.items():
+            stats = self.stats[provider]
+            observed = stats.hits + stats.misses + stats.invalid
+            providers[provider] = {
+                "templates": len(templates),
+                "support": [template.support for template in templates],
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "invalid": stats.invalid,
+                "hit_rate": stats.hits / observed if observed else 0.0,
+                "recent_failure_rate": sum(stats.window) / len(stats.window) if stats.window else 0.0,
+                "demoted": stats.demoted
+            }
+        return {
+            "providers": providers,
+            "active_providers": sum(1 for provider in self.templates if self.is_active(provider))
+        }
+
+    def save(self, path: str):
+        """Write templates and demoted patterns to JSON"""
+        data = {
+            "templates": [{key: value for key, value in asdict(template).items() if key != "compiled"}
+                          for templates in self.templates.values() for template in templates],
+            "demoted_patterns": {provider: sorted(patterns)
+                                 for provider, patterns in self.demoted_patterns.items() if patterns}
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def load(self, path: str) -> bool:
+        """Load templates saved by save(); False if the file is missing or unreadable"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.debug(f"No provider templates loaded from {path}: {e}")
+            return False
+
+        self.templates = defaultdict(list)
+        for entry in data.get("templates", []):
+            self.templates[entry["provider"]].append(ProviderTemplate(**entry))
+        self.templates = dict(self.templates)
+        for provider, patterns in data.get("demoted_patterns", {}).items():
+            self.demoted_patterns[provider].update(patterns)
+        return True
+
+
+def samples_from_dataset(dataset_manager, min_confidence: float = 0.0) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """(provider, raw_text, parsed) from DatasetManager samples"""
+    for sample in dataset_manager.iter_samples(min_confidence=min_confidence):
+        yield sample.provider, sample.raw_text, sample.parsed_data
+
+
+def samples_from_feedback(feedback_logger, limit: int = 10000,
+                          min_confidence: float = 0.7) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    (provider, raw_text, parsed) from FeedbackLogger successes that carry a
+    provider. Successes produced by a template are skipped so templates are
+    never learned from their own output.
+    """
+    for attempt in feedback_logger.get_success_patterns(limit):
+        if attempt.get("parser_method") == "template" or attempt.get("confidence", 0.0) < min_confidence:
+            continue
+        yield attempt.get("provider"), attempt.get("raw_signal"), attempt.get("result")
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Incremental training data pipeline for the model trainer
+
+Every training record gets two hashes: a sample key over the text the model
+reads (the input prompt, or the spaCy text) and a content hash over the whole
+record. A corrected label keeps the sample key and changes the content hash.
+Featurized samples (token ids, or spaCy words and entity spans) are cached in
+SQLite under content hash and featurizer identity, so a retrain only
+featurizes records it has not seen with that tokenizer. A ledger of the
+content hashes each model kind has been trained on picks out the new and
+corrected records for a warm-started run. JSONL parsing and featurization of
+cache misses are spread over worker processes for large files.
+"""
+
+import hashlib
+import json
+from array import array
+import random
+import re
+import shutil
+import sqlite3
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from transformers import AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+# Below this many lines a file is parsed in-process; pool startup costs more
+PARALLEL_MIN_LINES = 20_000
+CHUNK_LINES = 5_000
+SQL_BATCH = 500
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Tokenizers loaded in this process, by name (each pool worker loads its own)
+_tokenizers: Dict[str, Any] = {}
+_spacy_tokenizers: Dict[str, Any] = {}
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sample_key(record: Dict[str, Any]) -> str:
+    """Hash of the text the model reads; stays the same when a label is corrected"""
+    text = record.get("input", record.get("text"))
+    if text is None:
+        text = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return _digest(str(text))
+
+
+@dataclass
+class TrainingRecord:
+    """One JSONL record with its sample key and content hash"""
+    record: Dict[str, Any]
+    key: str
+    digest: str
+
+
+def _parse_lines(lines: List[str]) -> List[Tuple[Dict[str, Any], str, str]]:
+    # The exporters write records with a fixed key order, so the line itself is the content
+    parsed = []
+    for line in lines:
+        line = line.strip()
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            parsed.append((record, sample_key(record), _digest(line)))
+    return parsed
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def load_records(file_path: str, workers: int = 1) -> List[TrainingRecord]:
+    """Parse and hash a JSONL file, over worker processes when it is large"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if not line.isspace()]
+
+    if workers > 1 and len(lines) >= PARALLEL_MIN_LINES:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = [row for chunk in executor.map(_parse_lines, _chunks(lines, CHUNK_LINES)) for row in chunk]
+    else:
+        parsed = _parse_lines(lines)
+
+    return [TrainingRecord(record, key, digest) for record, key, digest in parsed]
+
+
+class _CausalLMFeatures:
+    """
+    Token ids stored packed; the attention mask is rebuilt on load. Labels are
+    left to the collator (mlm=False), which builds them from the padded batch
+    """
+
+    def encode(self, features: Dict[str, List[int]]) -> bytes:
+        return array("I", features["input_ids"]).tobytes()
+
+    def decode(self, payload: bytes) -> Dict[str, List[int]]:
+        ids = array("I")
+        ids.frombytes(payload)
+        ids = ids.tolist()
+        return {"input_ids": ids, "attention_mask": [1] * len(ids)}
+
+
+class HashingFeaturizer(_CausalLMFeatures):
+    """Causal LM features from a hashed word vocabulary, used when transformers is not installed"""
+
+    def __init__(self, max_length: int = 512, vocab_size: int = 50257):
+        self.max_length = max_length
+        self.vocab_size = vocab_size
+        self.identity = f"hashing:{vocab_size}:{max_length}"
+
+    def featurize_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, List[int]]]:
+        features = []
+        for record in records:
+            text = f"{record.get('input', '')} -> {record.get('output', '')}"
+            ids = [zlib.crc32(token.encode("utf-8")) % self.vocab_size
+                   for token in TOKEN_PATTERN.findall(text)][:self.max_length]
+            features.append({"input_ids": ids, "attention_mask": [1] * len(ids)})
+        return features
+
+
+class TokenizerFeaturizer(_CausalLMFeatures):
+    """Causal LM features from a HuggingFace tokenizer; unpadded, the collator pads per batch"""
+
+    def __init__(self, tokenizer_name: str, max_length: int = 512):
+        self.tokenizer_name = tokenizer_name
+        self.max_length = max_length
+        self.identity = f"hf:{tokenizer_name}:{max_length}"
+
+    def featurize_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, List[int]]]:
+        tokenizer = _tokenizers.get(self.tokenizer_name)
+        if tokenizer is None:
+            tokenizer = _tokenizers[self.tokenizer_name] = AutoTokenizer.from_pretrained(self.tokenizer_name)
+
+        texts = [f"{record.get('input', '')} -> {record.get('output', '')}" for record in records]
+        encoded = tokenizer(texts, truncation=True, max_length=self.max_length)
+        return [{"input_ids": list(ids), "attention_mask": list(mask)}
+                for ids, mask in zip(encoded["input_ids"], encoded["attention_mask"])]
+
+
+class SpacyFeaturizer:
+    """Words, trailing spaces and entity spans, enough to rebuild a spaCy Doc without tokenizing"""
+
+    def __init__(self, language: str = "en"):
+        self.language = language
+        self.identity = f"spacy:{language}" if SPACY_AVAILABLE else "words"
+
+    def featurize_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        features = []
+        for record in records:
+            text = str(record.get("text", ""))
+            words, spaces = self._tokenize(text)
+            features.append({"words": words, "spaces": spaces,
+                             "entities": [list(entity) for entity in record.get("entities", [])]})
+        return features
+
+    def _tokenize(self, text: str) -> Tuple[List[str], List[bool]]:
+        if SPACY_AVAILABLE:
+            tokenizer = _spacy_tokenizers.get(self.language)
+            if tokenizer is None:
+                tokenizer = _spacy_tokenizers[self.language] = spacy.blank(self.language).tokenizer
+            doc = tokenizer(text)
+            return [token.text for token in doc], [bool(token.whitespace_) for token in doc]
+
+        matches = list(TOKEN_PATTERN.finditer(text))
+        return ([match.group() for match in matches],
+                [match.end() < len(text) and text[match.end()].isspace() for match in matches])
+
+    def encode(self, features: Dict[str, Any]) -> bytes:
+        return json.dumps(features, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        return json.loads(payload)
+
+
+def _featurize_chunk(featurizer, records: List[Dict[str, Any]]) -> List[Any]:
+    return featurizer.featurize_many(records)
+
+
+class FeatureCache:
+    """Featurized samples and the trained-sample ledger, in one SQLite file"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._init_database()
+
+    def _init_database(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS features (
+                    digest TEXT NOT NULL,
+                    featurizer TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (digest, featurizer)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS trained (
+                    kind TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    sample_key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    trained_at TEXT NOT NULL,
+                    PRIMARY KEY (kind, digest)
+                )
+            """)
+
+    def featurize(self, records: List[TrainingRecord], featurizer, workers: int = 1) -> List[Any]:
+        """Features for each record, in order; only cache misses are featurized"""
+        digests = list(dict.fromkeys(record.digest for record in records))
+        cached = self._get_many(digests, featurizer)
+
+        missing = {}
+        for record in records:
+            if record.digest not in cached and record.digest not in missing:
+                missing[record.digest] = record.record
+
+        if missing:
+            pending = list(missing.values())
+            if workers > 1 and len(pending) >= PARALLEL_MIN_LINES:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    computed = [features for chunk in executor.map(_featurize_chunk, repeat(featurizer),
+                                                                    _chunks(pending, CHUNK_LINES))
+                                for features in chunk]
+            else:
+                computed = featurizer.featurize_many(pending)
+            fresh = dict(zip(missing, computed))
+            self._put_many(fresh, featurizer)
+            cached.update(fresh)
+
+        self.hits += len(digests) - len(missing)
+        self.misses += len(missing)
+        return [cached[record.digest] for record in records]
+
+    def _get_many(self, digests: List[str], featurizer) -> Dict[str, Any]:
+        found = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for batch in _chunks(digests, SQL_BATCH):
+                placeholders = ",".join("?" * len(batch))
+                cursor = conn.execute(f"""
+                    SELECT digest, payload FROM features
+                    WHERE featurizer = ? AND digest IN ({placeholders})
+                """, (featurizer.identity, *batch))
+                for digest, payload in cursor:
+                    found[digest] = featurizer.decode(payload)
+        return found
+
+    def _put_many(self, features: Dict[str, Any], featurizer):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO features (digest, featurizer, payload) VALUES (?, ?, ?)
+            """, ((digest, featurizer.identity, featurizer.encode(payload))
+                  for digest, payload in features.items()))
+
+    def trained_samples(self, kind: str) -> Tuple[Set[str], Set[str]]:
+        """Content hashes and sample keys a model kind has been trained on"""
+        digests, keys = set(), set()
+        with sqlite3.connect(self.db_path) as conn:
+            for digest, key in conn.execute("SELECT digest, sample_key FROM trained WHERE kind = ?", (kind,)):
+                digests.add(digest)
+                keys.add(key)
+        return digests, keys
+
+    def mark_trained(self, kind: str, records: Iterable[TrainingRecord], version: str):
+        now = datetime.now().isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO trained (kind, digest, sample_key, version, trained_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, ((kind, record.digest, record.key, version, now) for record in records))
+
+    def forget(self, kind: str):
+        """Drop the ledger for a model kind, so its next run trains on everything"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM trained WHERE kind = ?", (kind,))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with sqlite3.connect(self.db_path) as conn:
+            features = dict(conn.execute("SELECT featurizer, COUNT(*) FROM features GROUP BY featurizer"))
+            trained = dict(conn.execute("SELECT kind, COUNT(*) FROM trained GROUP BY kind"))
+        lookups = self.hits + self.misses
+        return {
+            "features": features,
+            "trained_samples": trained,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_mb": self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0.0
+        }
+
+
+@dataclass
+class TrainingPlan:
+    """The records one training run uses, and where they came from"""
+    kind: str
+    records: List[TrainingRecord]
+    base_version: Optional[str] = None
+    new: int = 0
+    corrected: int = 0
+    replayed: int = 0
+    unchanged: int = 0
+    run_id: str = ""
+
+    @property
+    def incremental(self) -> bool:
+        return self.base_version is not None
+
+
+def plan_training(kind: str, records: List[TrainingRecord], trained: Tuple[Set[str], Set[str]],
+                  base_version: Optional[str], featurizer_id: str,
+                  replay_fraction: float = 0.0, seed: int = 42) -> TrainingPlan:
+    """Everything for a cold start; new and corrected records (plus a replay sample) on a warm start"""
+    if base_version is None:
+        plan = TrainingPlan(kind, list(records), new=len(records))
+    else:
+        trained_digests, trained_keys = trained
+        changed, unchanged = [], []
+        new = corrected = 0
+        for record in records:
+            if record.digest in trained_digests:
+                unchanged.append(record)
+            elif record.key in trained_keys:
+                corrected += 1
+                changed.append(record)
+            else:
+                new += 1
+                changed.append(record)
+
+        # A slice of already-trained records keeps the warm-started model from drifting
+        replay_count = min(len(unchanged), round(len(changed) * replay_fraction)) if changed else 0
+        replayed = random.Random(seed).sample(unchanged, replay_count)
+        plan = TrainingPlan(kind, changed + replayed, base_version, new, corrected,
+                            len(replayed), len(unchanged) - len(replayed))
+
+    run_hash = hashlib.sha256(f"{kind}|{base_version}|{featurizer_id}".encode("utf-8"))
+    for digest in sorted(record.digest for record in plan.records):
+        run_hash.update(digest.encode("ascii"))
+    plan.run_id = f"{kind}_{run_hash.hexdigest()[:16]}"
+    return plan
+
+
+class TrainingCheckpoint:
+    """Checkpoint directory for one training run; the same plan maps to the same run id"""
+
+    def __init__(self, checkpoints_dir: Path, run_id: str):
+        self.run_id = run_id
+        self.dir = Path(checkpoints_dir) / run_id
+        self.state_file = self.dir / "state.json"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.state_file.exists():
+            return None
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, state: Dict[str, Any]):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        temp_file = self.state_file.with_suffix(".tmp")
+        with open(temp_file, 'w') as f:
+            json.dump({**state, "saved_at": datetime.now().isoformat()}, f, indent=2)
+        temp_file.replace(self.state_file)
+
+    def has_trainer_checkpoint(self) -> bool:
+        """Whether a HuggingFace Trainer left checkpoint-* directories here"""
+        return self.dir.exists() and any(self.dir.glob("checkpoint-*"))
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,270 @@
+"""
+Columnar bar storage for the backtest engine
+
+Bars for one symbol/timeframe live in a directory of raw little-endian column
+files (ts.i8 holds epoch microseconds, the rest float64). Columns are opened
+with np.memmap, so every process that reads a series shares the OS page cache
+instead of holding its own copy.
+
+Series are append-only: new bars must be newer than the last stored bar, and
+the ts column is written last, so its length is the committed row count. The
+sorted ts column is the time index; seeks are binary searches over it.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+BAR_COLUMNS = ('ts', 'open', 'high', 'low', 'close', 'volume')
+COLUMN_DTYPES = {'ts': np.dtype('<i8')}
+DEFAULT_DTYPE = np.dtype('<f8')
+
+US_PER_MINUTE = 60_000_000
+TIMEFRAMES = {
+    'M1': US_PER_MINUTE,
+    'M5': 5 * US_PER_MINUTE,
+    'M15': 15 * US_PER_MINUTE,
+    'M30': 30 * US_PER_MINUTE,
+    'H1': 60 * US_PER_MINUTE,
+    'H4': 240 * US_PER_MINUTE,
+    'D1': 1440 * US_PER_MINUTE,
+}
+
+
+def column_dtype(name: str) -> np.dtype:
+    return COLUMN_DTYPES.get(name, DEFAULT_DTYPE)
+
+
+def column_file(name: str) -> str:
+    dtype = column_dtype(name)
+    return f"{name}.{dtype.kind}{dtype.itemsize}"
+
+
+def timeframe_us(timeframe: str) -> int:
+    try:
+        return TIMEFRAMES[timeframe.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown timeframe {timeframe!r}; expected one of {', '.join(TIMEFRAMES)}")
+
+
+@dataclass
+class BarSeries:
+    """OHLCV bars as parallel arrays, sorted by ts (epoch microseconds)"""
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def index_at(self, ts_us: Union[int, np.ndarray], side: str = 'left') -> Union[int, np.ndarray]:
+        """Position of the first bar at or after ts_us (binary search)"""
+        return np.searchsorted(self.ts, ts_us, side=side)
+
+    def slice(self, start: int, stop: int) -> 'BarSeries':
+        """Rows [start, stop) as views"""
+        return BarSeries(**{name: getattr(self, name)[start:stop] for name in BAR_COLUMNS})
+
+    def between(self, start_us: int, end_us: int) -> 'BarSeries':
+        """Bars with start_us <= ts <= end_us"""
+        return self.slice(int(self.index_at(start_us, 'left')), int(self.index_at(end_us, 'right')))
+
+    def nearest(self, ts_us: int) -> int:
+        """Index of the bar closest in time to ts_us; -1 for an empty series"""
+        if len(self.ts) == 0:
+            return -1
+        i = int(self.index_at(ts_us))
+        if i == 0:
+            return 0
+        if i == len(self.ts):
+            return i - 1
+        return i if self.ts[i] - ts_us < ts_us - self.ts[i - 1] else i - 1
+
+    def nearest_many(self, ts_us: np.ndarray) -> np.ndarray:
+        """nearest() for an array of timestamps; all -1 for an empty series"""
+        ts_us = np.asarray(ts_us, dtype=np.int64)
+        if len(self.ts) == 0:
+            return np.full(len(ts_us), -1, dtype=np.int64)
+        i = self.index_at(ts_us)
+        left = np.maximum(i - 1, 0)
+        right = np.minimum(i, len(self.ts) - 1)
+        ts = np.asarray(self.ts)
+        return np.where(ts[right] - ts_us < ts_us - ts[left], right, left)
+
+    @classmethod
+    def empty(cls) -> 'BarSeries':
+        return cls(ts=np.zeros(0, dtype=np.int64),
+                   **{name: np.zeros(0) for name in BAR_COLUMNS[1:]})
+
+    @classmethod
+    def concat(cls, parts: List['BarSeries']) -> 'BarSeries':
+        if not parts:
+            return cls.empty()
+        return cls(**{name: np.concatenate([getattr(p, name) for p in parts]) for name in BAR_COLUMNS})
+
+
+def resample(bars: BarSeries, timeframe: str) -> BarSeries:
+    """
+    Aggregate bars into a coarser timeframe. Buckets are aligned to multiples
+    of the timeframe since the epoch; empty buckets produce no bar.
+    """
+    if len(bars) == 0:
+        return BarSeries.empty()
+
+    step = timeframe_us(timeframe)
+    buckets = np.asarray(bars.ts) // step * step
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(bars)])) - 1
+
+    return BarSeries(
+        ts=buckets[starts],
+        open=np.asarray(bars.open)[starts],
+        high=np.maximum.reduceat(bars.high, starts),
+        low=np.minimum.reduceat(bars.low, starts),
+        close=np.asarray(bars.close)[ends],
+        volume=np.add.reduceat(bars.volume, starts)
+    )
+
+
+class BarStore:
+    """Directory of memory-mapped bar series keyed by symbol and timeframe"""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._open: Dict[tuple, BarSeries] = {}
+
+    def series_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol.upper() / timeframe.upper()
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        return (self.series_dir(symbol, timeframe) / column_file('ts')).exists()
+
+    def symbols(self, timeframe: str) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if self.has(p.name, timeframe))
+
+    def timeframes(self, symbol: str) -> List[str]:
+        directory = self.root / symbol.upper()
+        if not directory.exists():
+            return []
+        return sorted(p.name for p in directory.iterdir() if self.has(symbol, p.name))
+
+    def write(self, symbol: str, timeframe: str, bars: BarSeries):
+        """Replace a series with the given bars"""
+        directory = self.series_dir(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in BAR_COLUMNS:
+            values = np.ascontiguousarray(getattr(bars, name), dtype=column_dtype(name))
+            values.tofile(directory / column_file(name))
+        self._open.pop((symbol.upper(), timeframe.upper()), None)
+
+    def append(self, symbol: str, timeframe: str, bars: BarSeries) -> int:
+        """
+        Append bars newer than the last stored bar. Input is sorted first;
+        duplicate timestamps keep their first row and bars at or before the
+        stored tail are skipped, so re-importing an overlapping export is safe.
+        Returns the number of bars appended.
+        """
+        ts = np.asarray(bars.ts, dtype=np.int64)
+        order = np.argsort(ts, kind='stable')
+        sorted_ts = ts[order]
+        keep = order[np.concatenate(([True], sorted_ts[1:] != sorted_ts[:-1]))] if len(ts) else order
+
+        stored = self.load(symbol, timeframe)
+        if stored is not None and len(stored):
+            keep = keep[ts[keep] > stored.ts[-1]]
+        if len(keep) == 0:
+            return 0
+
+        directory = self.series_dir(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Discard rows an interrupted append left past the committed length
+        self._truncate(symbol, timeframe, len(stored) if stored is not None else 0)
+        # ts goes last: its length is the committed row count if an append is interrupted
+        for name in BAR_COLUMNS[1:] + ('ts',):
+            values = np.ascontiguousarray(np.asarray(getattr(bars, name))[keep], dtype=column_dtype(name))
+            with open(directory / column_file(name), 'ab') as f:
+                values.tofile(f)
+        self._open.pop((symbol.upper(), timeframe.upper()), None)
+        return len(keep)
+
+    def _truncate(self, symbol: str, timeframe: str, rows: int):
+        """Cut every column file to rows"""
+        directory = self.series_dir(symbol, timeframe)
+        self._open.pop((symbol.upper(), timeframe.upper()), None)
+        for name in ('ts',) + BAR_COLUMNS[1:]:
+            path = directory / column_file(name)
+            if not path.exists():
+                continue
+            with open(path, 'r+b') as f:
+                f.truncate(min(path.stat().st_size, rows * column_dtype(name).itemsize))
+
+    def load(self, symbol: str, timeframe: str) -> Optional[BarSeries]:
+        """Memory-map a series (read-only); None if it is not stored"""
+        key = (symbol.upper(), timeframe.upper())
+        series = self._open.get(key)
+        if series is None:
+            if not self.has(symbol, timeframe):
+                return None
+            directory = self.series_dir(symbol, timeframe)
+            paths = {name: directory / column_file(name) for name in BAR_COLUMNS}
+            # Committed rows: columns left longer by an interrupted append are ignored
+            rows = min(paths[name].stat().st_size // column_dtype(name).itemsize for name in BAR_COLUMNS)
+
+            columns = {}
+            for name in BAR_COLUMNS:
+                # np.memmap rejects empty files; an empty series is a zero-length array
+                if rows == 0:
+                    columns[name] = np.zeros(0, dtype=column_dtype(name))
+                else:
+                    columns[name] = np.memmap(paths[name], dtype=column_dtype(name), mode='r', shape=(rows,))
+            series = self._open[key] = BarSeries(**columns)
+        return series
+
+    def range(self, symbol: str, timeframe: str, start_us: int, end_us: int) -> BarSeries:
+        """Bars with start_us <= ts <= end_us (views into the mapped columns)"""
+        series = self.load(symbol, timeframe)
+        return series.between(start_us, end_us) if series is not None else BarSeries.empty()
+
+    def latest(self, symbol: str, timeframe: str, count: int) -> BarSeries:
+        """The most recent count bars"""
+        series = self.load(symbol, timeframe)
+        if series is None:
+            return BarSeries.empty()
+        return series.slice(max(0, len(series) - count), len(series))
+
+    def resample(self, symbol: str, source: str, target: str) -> int:
+        """
+        Derive a coarser series from a stored one, incrementally: the last
+        target bar (possibly built from a partial bucket) is rebuilt together
+        with any newer source bars. Returns the number of target bars written.
+        """
+        series = self.load(symbol, source)
+        if series is None:
+            return 0
+
+        existing = self.load(symbol, target)
+        start = np.iinfo(np.int64).min
+        if existing is not None and len(existing):
+            start = int(existing.ts[-1])
+            self._truncate(symbol, target, len(existing) - 1)
+        return self.append(symbol, target, resample(series.slice(int(series.index_at(start)), len(series)), target))
+
+
+# Shared stores per directory, so components in one process reuse the same mappings
+_stores: Dict[str, BarStore] = {}
+
+
+def get_bar_store(root: Union[str, Path] = "data/bars") -> BarStore:
+    """Get the shared bar store for a directory"""
+    key = str(Path(root).resolve())
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = BarStore(root)
+    return store
@@ -11,13 +11,18 @@ import json
 import logging
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import sqlite3
 import random
 import math
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from backtest.bar_store import BarSeries, BarStore, get_bar_store
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -129,13 +134,332 @@ class MockPriceData:
         df = self.price_data[symbol]
         mask = (df['timestamp'] >= start_time) & (df['timestamp'] <= end_time)
         return df.loc[mask]
+    
+    def to_bar_series(self, symbol: str) -> BarSeries:
+        """Columnar copy of a symbol's bars"""
+        df = self.price_data.get(symbol)
+        if df is None or df.empty:
+            return BarSeries.empty()
+        
+        return BarSeries(
+            ts=df['timestamp'].values.astype('datetime64[us]').astype(np.int64),
+            open=df['open'].to_numpy(dtype=np.float64),
+            high=df['high'].to_numpy(dtype=np.float64),
+            low=df['low'].to_numpy(dtype=np.float64),
+            close=df['close'].to_numpy(dtype=np.float64),
+            volume=df['volume'].to_numpy(dtype=np.float64)
+        )
+    
+    def export_to_store(self, store: BarStore, timeframe: str = "H1"):
+        """Write every generated series to a bar store"""
+        for symbol in self.symbols:
+            store.write(symbol, timeframe, self.to_bar_series(symbol))
+
+
+class StoredPriceData:
+    """
+    MockPriceData's interface over a bar store: lookups are binary searches
+    on the memory-mapped time index instead of scans of in-memory frames
+    """
+    
+    def __init__(self, store: BarStore, timeframe: str = "H1", symbols: List[str] = None):
+        self.store = store
+        self.timeframe = timeframe
+        self.symbols = symbols or store.symbols(timeframe)
+    
+    def get_price_at_time(self, symbol: str, timestamp: datetime) -> Optional[float]:
+        """Close of the bar nearest to timestamp"""
+        series = self.store.load(symbol, self.timeframe)
+        if series is None:
+            return None
+        
+        i = series.nearest(_datetime_to_us(timestamp))
+        return float(series.close[i]) if i >= 0 else None
+    
+    def get_price_range(self, symbol: str, start_time: datetime, end_time: datetime) -> pd.DataFrame:
+        """Bars in [start_time, end_time] as a frame shaped like MockPriceData's"""
+        bars = self.store.range(symbol, self.timeframe, _datetime_to_us(start_time), _datetime_to_us(end_time))
+        if len(bars) == 0:
+            return pd.DataFrame()
+        
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(np.asarray(bars.ts), unit='us'),
+            'open': np.asarray(bars.open),
+            'high': np.asarray(bars.high),
+            'low': np.asarray(bars.low),
+            'close': np.asarray(bars.close),
+            'volume': np.asarray(bars.volume)
+        })
+
+
+def _datetime_to_us(timestamp: datetime) -> int:
+    # Stored bars are UTC; naive timestamps are taken as UTC already
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return int(np.datetime64(timestamp, 'us').astype(np.int64))
+
+
+US_PER_HOUR = 3_600_000_000
+
+# Exit reasons from first_touch_exits
+EXIT_NO_DATA = 0
+EXIT_TIMEOUT = 1
+EXIT_STOP_LOSS = 2
+EXIT_TAKE_PROFIT = 3
+
+
+def pip_multiplier(symbol: str) -> float:
+    return 0.01 if symbol.endswith('JPY') else 0.0001
+
+
+def _falsy_to_nan(values: np.ndarray) -> np.ndarray:
+    """SL/TP levels of 0 are treated as unset, as in _simulate_trade_execution"""
+    return np.where(values == 0, np.nan, values)
+
+
+@dataclass
+class SignalBatch:
+    """
+    Signals as parallel arrays in processing order (sorted by timestamp).
+    Missing stop loss / take profit levels are NaN.
+    """
+    ts: np.ndarray           # epoch microseconds, int64
+    symbol_codes: np.ndarray  # index into symbols, int32
+    symbols: List[str]
+    is_buy: np.ndarray
+    entry_price: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    signals: Optional[List[Dict[str, Any]]] = None  # source dicts, when built from_signals
+    
+    def __len__(self) -> int:
+        return len(self.ts)
+    
+    def take(self, rows: slice) -> 'SignalBatch':
+        """Contiguous sub-batch (array views)"""
+        return SignalBatch(
+            ts=self.ts[rows], symbol_codes=self.symbol_codes[rows], symbols=self.symbols,
+            is_buy=self.is_buy[rows], entry_price=self.entry_price[rows],
+            stop_loss=self.stop_loss[rows], take_profit=self.take_profit[rows],
+            signals=self.signals[rows] if self.signals is not None else None
+        )
+    
+    def between(self, start_us: int, end_us: int) -> 'SignalBatch':
+        """Signals with start_us <= ts < end_us"""
+        return self.take(slice(int(np.searchsorted(self.ts, start_us, 'left')),
+                               int(np.searchsorted(self.ts, end_us, 'left'))))
+    
+    @classmethod
+    def from_arrays(cls, ts, symbols: List[str], symbol_codes, is_buy, entry_price,
+                    stop_loss=None, take_profit=None) -> 'SignalBatch':
+        """Build a batch from columns; rows are stably sorted by ts"""
+        ts = np.asarray(ts, dtype=np.int64)
+        n = len(ts)
+        order = np.argsort(ts, kind='stable')
+        missing = np.full(n, np.nan)
+        return cls(
+            ts=ts[order],
+            symbol_codes=np.asarray(symbol_codes, dtype=np.int32)[order],
+            symbols=list(symbols),
+            is_buy=np.asarray(is_buy, dtype=bool)[order],
+            entry_price=np.asarray(entry_price, dtype=np.float64)[order],
+            stop_loss=(missing if stop_loss is None else np.asarray(stop_loss, dtype=np.float64))[order],
+            take_profit=(missing if take_profit is None else np.asarray(take_profit, dtype=np.float64))[order]
+        )
+    
+    @classmethod
+    def from_signals(cls, signals: List[Dict[str, Any]]) -> 'SignalBatch':
+        """Build a batch from signal dicts, in run_backtest's order; malformed signals are skipped"""
+        required = ('symbol', 'direction', 'entry_price', 'timestamp')
+        valid = [s for s in signals if all(s.get(key) is not None for key in required)]
+        if len(valid) < len(signals):
+            logger.warning(f"Skipping {len(signals) - len(valid)} signals missing required fields")
+        valid.sort(key=lambda x: x['timestamp'])
+        
+        timestamps = [s['timestamp'] for s in valid]
+        try:
+            ts = np.array(timestamps, dtype='datetime64[us]').astype(np.int64)
+        except ValueError:
+            ts = np.array([np.datetime64(datetime.fromisoformat(t).replace(tzinfo=None), 'us')
+                           for t in timestamps], dtype='datetime64[us]').astype(np.int64)
+        
+        symbols: List[str] = []
+        codes_by_symbol: Dict[str, int] = {}
+        codes = np.empty(len(valid), dtype=np.int32)
+        for i, signal in enumerate(valid):
+            symbol = signal['symbol']
+            code = codes_by_symbol.get(symbol)
+            if code is None:
+                code = codes_by_symbol[symbol] = len(symbols)
+                symbols.append(symbol)
+            codes[i] = code
+        
+        def levels(key: str) -> np.ndarray:
+            values = [s.get(key) for s in valid]
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        
+        return cls(
+            ts=ts,
+            symbol_codes=codes,
+            symbols=symbols,
+            is_buy=np.array([s['direction'].upper() == 'BUY' for s in valid], dtype=bool),
+            entry_price=np.array([s['entry_price'] for s in valid], dtype=np.float64),
+            stop_loss=levels('stop_loss'),
+            take_profit=levels('take_profit'),
+            signals=valid
+        )
+
+
+def first_touch_exits(bars: BarSeries, ts: np.ndarray, is_buy: np.ndarray, stop_loss: np.ndarray,
+                      take_profit: np.ndarray, window_us: int,
+                      chunk_elements: int = 4_000_000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized equivalent of _simulate_trade_execution for one symbol.
+    
+    Each signal's window is the bars in [ts, ts + window_us]; the window is
+    gathered as a (signals x bars) matrix and the first stop-loss and
+    take-profit touches are found with argmax. A stop loss wins ties on the
+    same bar. Untouched trades exit at the last bar's close.
+    
+    Returns (exit_ts, exit_price, reason) with EXIT_* reasons; rows without
+    bars are EXIT_NO_DATA and their exit values are undefined.
+    """
+    n = len(ts)
+    exit_ts = np.zeros(n, dtype=np.int64)
+    exit_price = np.zeros(n, dtype=np.float64)
+    reason = np.full(n, EXIT_NO_DATA, dtype=np.int8)
+    if n == 0 or len(bars) == 0:
+        return exit_ts, exit_price, reason
+    
+    stop_loss = _falsy_to_nan(stop_loss)
+    take_profit = _falsy_to_nan(take_profit)
+    start = bars.index_at(ts, 'left')
+    count = bars.index_at(ts + window_us, 'right') - start
+    last_bar = len(bars) - 1
+    
+    rows_per_chunk = max(1, chunk_elements // max(int(count.max()), 1))
+    for c0 in range(0, n, rows_per_chunk):
+        rows = slice(c0, c0 + rows_per_chunk)
+        chunk_count = count[rows]
+        width = int(chunk_count.max())
+        if width == 0:
+            continue
+        
+        offsets = np.arange(width)
+        in_window = offsets < chunk_count[:, None]
+        idx = np.minimum(start[rows, None] + offsets, last_bar)
+        highs = bars.high[idx]
+        lows = bars.low[idx]
+        
+        buy = is_buy[rows, None]
+        sl = stop_loss[rows, None]
+        tp = take_profit[rows, None]
+        sl_hit = in_window & np.where(buy, lows <= sl, highs >= sl)
+        tp_hit = in_window & np.where(buy, highs >= tp, lows <= tp)
+        
+        sl_first = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), width)
+        tp_first = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), width)
+        take_sl = (sl_first < width) & (sl_first <= tp_first)
+        take_tp = (tp_first < width) & ~take_sl
+        
+        has_data = chunk_count > 0
+        bar = start[rows] + np.where(take_sl, sl_first, np.where(take_tp, tp_first, chunk_count - 1))
+        bar = np.clip(bar, 0, last_bar)
+        
+        exit_ts[rows] = bars.ts[bar]
+        exit_price[rows] = np.where(take_sl, stop_loss[rows],
+                                    np.where(take_tp, take_profit[rows], bars.close[bar]))
+        reason[rows] = np.where(~has_data, EXIT_NO_DATA,
+                                np.where(take_sl, EXIT_STOP_LOSS,
+                                         np.where(take_tp, EXIT_TAKE_PROFIT, EXIT_TIMEOUT)))
+    
+    return exit_ts, exit_price, reason
+
+
+def compute_exits(store: BarStore, timeframe: str, symbols: List[str], symbol_codes: np.ndarray,
+                  ts: np.ndarray, is_buy: np.ndarray, stop_loss: np.ndarray, take_profit: np.ndarray,
+                  window_us: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """first_touch_exits over a mixed-symbol slice, one pass per symbol"""
+    n = len(ts)
+    exit_ts = np.zeros(n, dtype=np.int64)
+    exit_price = np.zeros(n, dtype=np.float64)
+    reason = np.full(n, EXIT_NO_DATA, dtype=np.int8)
+    
+    for code in np.unique(symbol_codes):
+        bars = store.load(symbols[code], timeframe)
+        if bars is None:
+            continue
+        rows = np.flatnonzero(symbol_codes == code)
+        exit_ts[rows], exit_price[rows], reason[rows] = first_touch_exits(
+            bars, ts[rows], is_buy[rows], stop_loss[rows], take_profit[rows], window_us
+        )
+    
+    return exit_ts, exit_price, reason
+
+
+# Per worker process: the bar store, opened once so its memory maps are reused
+_worker_store: Optional[BarStore] = None
+
+
+def _init_exit_worker(store_root: str):
+    global _worker_store
+    _worker_store = BarStore(store_root)
+
+
+def _compute_exits_shard(args: tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Process pool entry point: exits for one contiguous shard of signals"""
+    return compute_exits(_worker_store, *args)
+
+
+def compound_balances(initial_balance: float, risk_per_trade: float, sl_pips: np.ndarray,
+                      pnl_per_lot: np.ndarray, max_lot: float = 10.0, default_lot: float = 0.1,
+                      block: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sequential position sizing and balance updates, as run_backtest does them.
+    
+    Risk-sized lots are balance * k (k = risk / (sl_pips * pip_value)), so a
+    block of trades compounds as a cumulative product. Blocks where the lot
+    cap binds or a trade uses the default lot fall back to a scalar loop.
+    
+    Returns (lot_size, balance after each trade).
+    """
+    n = len(sl_pips)
+    lots = np.empty(n)
+    balances = np.empty(n)
+    sized = sl_pips > 0
+    k = np.divide(risk_per_trade, sl_pips * 10, out=np.zeros(n), where=sized)
+    
+    balance = initial_balance
+    for b0 in range(0, n, block):
+        rows = slice(b0, b0 + block)
+        block_k = k[rows]
+        block_pnl = pnl_per_lot[rows]
+        
+        if sized[rows].all():
+            growth = np.cumprod(1.0 + block_k * block_pnl)
+            block_lots = balance * np.concatenate(([1.0], growth[:-1])) * block_k
+            if (block_lots <= max_lot).all():
+                lots[rows] = block_lots
+                balances[rows] = balance * growth
+                balance = float(balances[rows][-1])
+                continue
+        
+        block_sized = sized[rows].tolist()
+        for i, (ki, pnl, is_sized) in enumerate(zip(block_k.tolist(), block_pnl.tolist(), block_sized)):
+            lot = min(balance * ki, max_lot) if is_sized else default_lot
+            balance += lot * pnl
+            lots[b0 + i] = lot
+            balances[b0 + i] = balance
+    
+    return lots, balances
 
 class BacktestEngine:
     """
     Comprehensive backtesting engine for trading signals
     """
     
-    def __init__(self, config_file: str = "config.json", log_file: str = "logs/backtest.log"):
+    def __init__(self, config_file: str = "config.json", log_file: str = "logs/backtest.log",
+                 bar_store: Optional[BarStore] = None):
         self.config_file = config_file
         self.log_file = log_file
         self.config = self._load_config()
@@ -146,9 +470,17 @@ class BacktestEngine:
         self.risk_per_trade = self.config.get("risk_per_trade", 0.02)  # 2% per trade
         self.spread_pips = self.config.get("spread_pips", 2)  # 2 pip spread
         self.commission_per_lot = self.config.get("commission_per_lot", 7.0)  # $7 per lot
+        self.max_trade_hours = self.config.get("max_trade_hours", 24)
         
-        # Market data
-        self.price_data = MockPriceData()
+        # Market data; mock prices are generated on first use, so engines that
+        # only read a bar store never pay for them
+        self._price_data: Optional[MockPriceData] = None
+        self.bar_timeframe = self.config.get("bar_timeframe", "H1")
+        self.backtest_workers = self.config.get("backtest_workers", os.cpu_count() or 1)
+        self.min_signals_per_worker = self.config.get("min_signals_per_worker", 50_000)
+        self.early_stop_chunk = self.config.get("early_stop_chunk", 5_000)
+        self.bar_store = bar_store
+        self._mock_store_dir: Optional[tempfile.TemporaryDirectory] = None
         
         # Results storage
         self.trades = []
@@ -174,6 +506,22 @@ class BacktestEngine:
         
         logger.info("BacktestEngine initialized")
     
+    @property
+    def price_data(self):
+        """Stored history when a populated bar_store_dir is configured, mock prices otherwise"""
+        if self._price_data is None:
+            store_dir = self.config.get("bar_store_dir")
+            store = self.bar_store or (get_bar_store(store_dir) if store_dir else None)
+            if store is not None and store.symbols(self.bar_timeframe):
+                self._price_data = StoredPriceData(store, self.bar_timeframe)
+            else:
+                self._price_data = MockPriceData()
+        return self._price_data
+    
+    @price_data.setter
+    def price_data(self, value):
+        self._price_data = value
+    
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
         try:
@@ -354,8 +702,8 @@ class BacktestEngine:
     def _simulate_trade_execution(self, trade: Trade):
         """Simulate the execution of a trade over time"""
         try:
-            # Find exit point within next 24 hours
-            max_duration = timedelta(hours=24)
+            # Find exit point within the maximum trade duration
+            max_duration = timedelta(hours=self.max_trade_hours)
             end_time = trade.entry_time + max_duration
             
             # Get price data for the duration
@@ -531,6 +879,280 @@ class BacktestEngine:
             logger.error(f"Backtest execution error: {e}")
             return None
     
+    def _get_bar_store(self) -> BarStore:
+        """
+        Bar store for vectorized runs: the store behind price_data, or a
+        temporary store holding this engine's mock price data
+        """
+        if self.bar_store is None:
+            if isinstance(self.price_data, StoredPriceData):
+                self.bar_store = self.price_data.store
+            else:
+                self._mock_store_dir = tempfile.TemporaryDirectory(prefix="signalos_bars_")
+                self.bar_store = BarStore(self._mock_store_dir.name)
+                self.price_data.export_to_store(self.bar_store, self.bar_timeframe)
+        return self.bar_store
+    
+    def _compute_exits(self, batch: SignalBatch, workers: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Exit bar for every signal, sharded across worker processes for large batches"""
+        store = self._get_bar_store()
+        window_us = int(self.max_trade_hours * US_PER_HOUR)
+        n = len(batch)
+        workers = max(1, min(workers, n // max(self.min_signals_per_worker, 1)))
+        
+        if workers == 1:
+            return compute_exits(store, self.bar_timeframe, batch.symbols, batch.symbol_codes, batch.ts,
+                                 batch.is_buy, batch.stop_loss, batch.take_profit, window_us)
+        
+        # Contiguous shards; workers memory-map the same column files
+        bounds = np.linspace(0, n, workers * 4 + 1, dtype=np.int64)
+        shards = [(self.bar_timeframe, batch.symbols, batch.symbol_codes[a:b], batch.ts[a:b], batch.is_buy[a:b],
+                   batch.stop_loss[a:b], batch.take_profit[a:b], window_us)
+                  for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_exit_worker, initargs=(str(store.root),)) as pool:
+            parts = list(pool.map(_compute_exits_shard, shards))
+        
+        return tuple(np.concatenate(column) for column in zip(*parts))
+    
+    def _simulate_batch(self, batch: SignalBatch, workers: int,
+                        max_drawdown_stop: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Exits, sizing and balances for a batch as arrays. With max_drawdown_stop
+        (percent) the batch is simulated in chunks of early_stop_chunk signals and
+        cut off at the first trade whose drawdown exceeds the limit, so losing
+        configurations stop paying for exit searches early.
+        """
+        n = len(batch)
+        chunk = n if max_drawdown_stop is None else max(1, self.early_stop_chunk)
+        pips_per_symbol = np.array([pip_multiplier(symbol) for symbol in batch.symbols])
+        balance = peak = self.initial_balance
+        parts = []
+        stopped_early = False
+        
+        for c0 in range(0, max(n, 1), chunk):
+            part = batch.take(slice(c0, c0 + chunk))
+            exit_ts, exit_price, reason = self._compute_exits(part, workers)
+            has_data = reason != EXIT_NO_DATA
+            
+            # Trades without bars close flat an hour after entry and leave the balance alone
+            exit_ts = np.where(has_data, exit_ts, part.ts + US_PER_HOUR)
+            exit_price = np.where(has_data, exit_price, part.entry_price)
+            
+            pip = pips_per_symbol[part.symbol_codes]
+            direction = np.where(part.is_buy, 1.0, -1.0)
+            pips = np.where(has_data, direction * (exit_price - part.entry_price) / pip - self.spread_pips, 0.0)
+            pnl_per_lot = np.where(has_data, pips * 10 - self.commission_per_lot, 0.0)
+            
+            sl_pips = np.abs(part.entry_price - part.stop_loss) / pip
+            lots, balances = compound_balances(balance, self.risk_per_trade, sl_pips, pnl_per_lot)
+            peaks = np.maximum.accumulate(np.concatenate(([peak], balances)))[1:]
+            drawdowns = (peaks - balances) / peaks * 100
+            
+            # risk_reward only where a (truthy) stop loss was set
+            risk_pips = np.abs(part.entry_price - _falsy_to_nan(part.stop_loss)) / pip
+            with np.errstate(divide='ignore', invalid='ignore'):
+                risk_reward = np.where(has_data & (risk_pips > 0), np.abs(pips) / risk_pips, np.nan)
+            
+            columns = [exit_ts, exit_price, lots, lots * pnl_per_lot, pips, balances, drawdowns, risk_reward]
+            if max_drawdown_stop is not None and (drawdowns > max_drawdown_stop).any():
+                cut = int((drawdowns > max_drawdown_stop).argmax()) + 1
+                parts.append([column[:cut] for column in columns])
+                stopped_early = True
+                break
+            
+            parts.append(columns)
+            if len(balances):
+                balance, peak = float(balances[-1]), float(peaks[-1])
+        
+        names = ('exit_ts', 'exit_price', 'lots', 'pnl', 'pips', 'balances', 'drawdowns', 'risk_reward')
+        outcome = {name: np.concatenate(column) for name, column in zip(names, zip(*parts))}
+        outcome['stopped_early'] = stopped_early
+        return outcome
+    
+    def run_vectorized_backtest(self, signals, workers: Optional[int] = None, materialize_trades: bool = True,
+                                max_drawdown_stop: Optional[float] = None) -> BacktestResult:
+        """
+        Array-based run_backtest over the bar store.
+        
+        Exits are found for all signals at once (optionally in a process pool),
+        then balances are compounded in signal order, so results match
+        run_backtest. signals is a list of signal dicts or a SignalBatch. With
+        materialize_trades=False the result carries statistics, summary and
+        monthly returns but no Trade objects or equity curve points, which
+        keeps million-signal runs in arrays. max_drawdown_stop ends the run
+        at the first trade past that drawdown (summary['stopped_early']).
+        """
+        try:
+            batch = signals if isinstance(signals, SignalBatch) else SignalBatch.from_signals(signals)
+            logger.info(f"Starting vectorized backtest with {len(batch)} signals")
+            
+            run = self._simulate_batch(batch, self.backtest_workers if workers is None else workers,
+                                       max_drawdown_stop)
+            n = len(run['pnl'])
+            batch = batch.take(slice(0, n))
+            pnl = run['pnl']
+            
+            # Engine state mirrors run_backtest so save_results/_generate_summary stay valid
+            self.current_balance = float(run['balances'][-1]) if n else self.initial_balance
+            self.peak_balance = max(self.initial_balance, float(run['balances'].max())) if n else self.initial_balance
+            self.max_drawdown = max(0.0, float(run['drawdowns'].max())) if n else 0.0
+            self.statistics = self._vectorized_statistics(pnl, run['pips'])
+            
+            self.trades = self._materialize_trades(batch, run['exit_ts'], run['exit_price'], run['lots'], pnl,
+                                                   run['pips'], run['risk_reward']) if materialize_trades else []
+            self.equity_curve = self._materialize_equity_curve(run['exit_ts'], run['balances'], run['drawdowns'],
+                                                               pnl) if materialize_trades else []
+            
+            summary = self._generate_summary()
+            summary['total_trades'] = n
+            summary['stopped_early'] = run['stopped_early']
+            if n:
+                first, last = batch.ts[[0, -1]].astype('datetime64[us]').astype('datetime64[D]')
+                summary['backtest_period'] = f"{first} to {last}"
+            
+            result = BacktestResult(
+                summary=summary,
+                trades=self.trades,
+                equity_curve=self.equity_curve,
+                drawdown_curve=self.equity_curve,
+                monthly_returns=self._vectorized_monthly_returns(run['exit_ts'], pnl),
+                statistics=self.statistics,
+                performance_metrics=self._vectorized_performance_metrics(pnl, run['risk_reward'])
+            )
+            
+            logger.info(f"Vectorized backtest completed. Total trades: {n}, "
+                       f"Final balance: ${self.current_balance:.2f}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Vectorized backtest execution error: {e}")
+            return None
+    
+    def _vectorized_statistics(self, pnl: np.ndarray, pips: np.ndarray) -> Dict[str, Any]:
+        """_calculate_statistics over arrays; every vectorized trade is closed"""
+        statistics = {
+            'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0, 'win_rate': 0.0,
+            'average_win': 0.0, 'average_loss': 0.0, 'profit_factor': 0.0, 'max_drawdown': 0.0,
+            'sharpe_ratio': 0.0, 'total_pnl': 0.0, 'total_pips': 0.0
+        }
+        if len(pnl) == 0:
+            return statistics
+        
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        gross_profit = float(wins.sum())
+        gross_loss = abs(float(losses.sum()))
+        std = float(pnl.std())
+        
+        statistics.update({
+            'total_trades': len(pnl),
+            'winning_trades': len(wins),
+            'losing_trades': len(losses),
+            'win_rate': len(wins) / len(pnl) * 100,
+            'total_pnl': float(pnl.sum()),
+            'total_pips': float(pips.sum()),
+            'average_win': float(wins.mean()) if len(wins) else 0.0,
+            'average_loss': float(losses.mean()) if len(losses) else 0.0,
+            'profit_factor': gross_profit / gross_loss if gross_loss > 0 else (float('inf') if gross_profit > 0 else 0),
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': float(pnl.mean()) / std if std > 0 else 0
+        })
+        return statistics
+    
+    def _vectorized_monthly_returns(self, exit_ts: np.ndarray, pnl: np.ndarray) -> List[Dict[str, Any]]:
+        """_calculate_monthly_returns over arrays, months in order of first appearance"""
+        if len(pnl) == 0:
+            return []
+        
+        months = exit_ts.astype('datetime64[us]').astype('datetime64[M]')
+        keys, first_seen, inverse = np.unique(months, return_index=True, return_inverse=True)
+        totals = np.bincount(inverse, weights=pnl, minlength=len(keys))
+        counts = np.bincount(inverse, minlength=len(keys))
+        wins = np.bincount(inverse, weights=pnl > 0, minlength=len(keys))
+        
+        return [{
+            'month': str(keys[i]),
+            'return': float(totals[i]),
+            'trades': int(counts[i]),
+            'win_rate': wins[i] / counts[i] * 100
+        } for i in np.argsort(first_seen, kind='stable')]
+    
+    def _vectorized_performance_metrics(self, pnl: np.ndarray, risk_reward: np.ndarray) -> Dict[str, Any]:
+        """_calculate_performance_metrics over arrays"""
+        if len(pnl) == 0:
+            return {}
+        
+        total_return = (self.current_balance - self.initial_balance) / self.initial_balance * 100
+        metrics = {
+            'total_return_pct': total_return,
+            'annualized_return': total_return,  # Simplified
+            'max_drawdown_pct': self.max_drawdown,
+            'recovery_factor': total_return / self.max_drawdown if self.max_drawdown > 0 else 0,
+            'total_trades': len(pnl),
+            'winning_trades': int((pnl > 0).sum()),
+            'losing_trades': int((pnl < 0).sum()),
+            'avg_trade_pnl': float(pnl.mean()),
+            'avg_win': self.statistics.get('average_win', 0),
+            'avg_loss': self.statistics.get('average_loss', 0)
+        }
+        
+        rr_ratios = risk_reward[~np.isnan(risk_reward) & (risk_reward != 0)]
+        if len(rr_ratios):
+            metrics['avg_risk_reward'] = float(rr_ratios.mean())
+        
+        return metrics
+    
+    def _materialize_trades(self, batch: SignalBatch, exit_ts: np.ndarray, exit_price: np.ndarray,
+                            lots: np.ndarray, pnl: np.ndarray, pips: np.ndarray,
+                            risk_reward: np.ndarray) -> List[Trade]:
+        """Trade objects for a vectorized run"""
+        entry_times = batch.ts.astype('datetime64[us]').astype(object)
+        exit_times = exit_ts.astype('datetime64[us]').astype(object)
+        directions = np.where(batch.is_buy, 'BUY', 'SELL').tolist()
+        sources = batch.signals or [{}] * len(batch)
+        # Levels come from the arrays, which may have been adjusted after the batch was built
+        stop_losses = [None if math.isnan(v) else v for v in batch.stop_loss.tolist()]
+        take_profits = [None if math.isnan(v) else v for v in batch.take_profit.tolist()]
+        
+        trades = []
+        for i, signal in enumerate(sources):
+            rr = risk_reward[i]
+            trades.append(Trade(
+                id=f"trade_{i + 1}",
+                symbol=batch.symbols[batch.symbol_codes[i]],
+                entry_time=entry_times[i],
+                exit_time=exit_times[i],
+                entry_price=float(batch.entry_price[i]),
+                exit_price=float(exit_price[i]),
+                lot_size=float(lots[i]),
+                direction=directions[i],
+                stop_loss=stop_losses[i],
+                take_profit=take_profits[i],
+                pnl=float(pnl[i]),
+                pnl_pips=float(pips[i]),
+                status='closed',
+                signal_provider=signal.get('provider', 'Unknown'),
+                signal_text=signal.get('signal_text', ''),
+                confidence=signal.get('confidence', 0.5),
+                risk_reward=None if np.isnan(rr) else float(rr)
+            ))
+        return trades
+    
+    def _materialize_equity_curve(self, exit_ts: np.ndarray, balances: np.ndarray,
+                                  drawdowns: np.ndarray, pnl: np.ndarray) -> List[Dict[str, Any]]:
+        """One equity point per trade, as in run_backtest"""
+        timestamps = exit_ts.astype('datetime64[us]').astype(object)
+        return [{
+            'timestamp': timestamp.isoformat(),
+            'balance': balance,
+            'drawdown': drawdown,
+            'trade_pnl': trade_pnl
+        } for timestamp, balance, drawdown, trade_pnl in zip(timestamps, balances.tolist(),
+                                                            drawdowns.tolist(), pnl.tolist())]
+    
     def _calculate_statistics(self):
         """Calculate comprehensive trading statistics"""
         try:
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Parameter Optimizer for SignalOS Backtesting
+
+Sweeps strategy parameters over BacktestEngine.run_vectorized_backtest with
+grid, random or Bayesian (Gaussian process + expected improvement) search,
+optionally inside walk-forward windows. Worker processes are initialized once
+with the signal batch and memory-map the same bar store, so no run reloads
+price data. Results are kept in SQLite and ranked by Sharpe ratio or profit
+factor; the top configurations can be re-run in full and rendered with
+PDFReportGenerator.
+"""
+
+import os
+import json
+import math
+import logging
+import sqlite3
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from backtest.bar_store import BarStore
+from backtest.engine import BacktestEngine, BacktestResult, SignalBatch, pip_multiplier
+
+logger = logging.getLogger(__name__)
+
+# Parameters applied to the engine for a run
+ENGINE_PARAMETERS = ('risk_per_trade', 'max_trade_hours')
+# Parameters applied to the signals' levels
+SIGNAL_PARAMETERS = ('sl_buffer_pips', 'tp_multiplier')
+SWEEP_PARAMETERS = ENGINE_PARAMETERS + SIGNAL_PARAMETERS
+
+RANKING_METRICS = ('sharpe_ratio', 'profit_factor', 'total_return')
+
+
+@dataclass
+class Parameter:
+    """
+    One swept parameter: discrete values, or a [low, high] range for random
+    and Bayesian search (grid search needs values)
+    """
+    name: str
+    values: Optional[List[Any]] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    integer: bool = False
+
+    def __post_init__(self):
+        if self.name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Unknown parameter {self.name!r}; expected one of {', '.join(SWEEP_PARAMETERS)}")
+        if not self.values and (self.low is None or self.high is None):
+            raise ValueError(f"Parameter {self.name!r} needs values or a low/high range")
+
+    def grid(self) -> List[Any]:
+        if not self.values:
+            raise ValueError(f"Grid search needs explicit values for {self.name!r}")
+        return list(self.values)
+
+    def from_unit(self, u: float) -> Any:
+        """Map u in [0, 1] onto the parameter's domain"""
+        if self.values:
+            return self.values[min(int(u * len(self.values)), len(self.values) - 1)]
+        value = self.low + u * (self.high - self.low)
+        return int(round(value)) if self.integer else float(value)
+
+    def to_unit(self, value: Any) -> float:
+        if self.values:
+            return (self.values.index(value) + 0.5) / len(self.values)
+        return (value - self.low) / (self.high - self.low) if self.high > self.low else 0.5
+
+
+def apply_signal_params(batch: SignalBatch, params: Dict[str, Any]) -> SignalBatch:
+    """Widen stop losses by sl_buffer_pips and scale take-profit distances by tp_multiplier"""
+    buffer = params.get('sl_buffer_pips', 0)
+    multiplier = params.get('tp_multiplier', 1.0)
+    if not buffer and multiplier == 1.0:
+        return batch
+
+    pip = np.array([pip_multiplier(symbol) for symbol in batch.symbols])[batch.symbol_codes]
+    direction = np.where(batch.is_buy, 1.0, -1.0)
+    return replace(
+        batch,
+        stop_loss=batch.stop_loss - direction * buffer * pip,
+        take_profit=batch.entry_price + (batch.take_profit - batch.entry_price) * multiplier
+    )
+
+
+def evaluate_params(engine: BacktestEngine, batch: SignalBatch, params: Dict[str, Any],
+                    window: Optional[Tuple[int, int]] = None, max_drawdown_stop: Optional[float] = None,
+                    materialize_trades: bool = False) -> Tuple[Dict[str, Any], Optional[BacktestResult]]:
+    """Run one configuration (in process) and return its ranking record and result"""
+    if window is not None:
+        batch = batch.between(*window)
+
+    saved = {name: getattr(engine, name) for name in ENGINE_PARAMETERS if name in params}
+    try:
+        for name in saved:
+            setattr(engine, name, params[name])
+        result = engine.run_vectorized_backtest(apply_signal_params(batch, params), workers=1,
+                                                materialize_trades=materialize_trades,
+                                                max_drawdown_stop=max_drawdown_stop)
+    finally:
+        for name, value in saved.items():
+            setattr(engine, name, value)
+
+    record = {
+        'params': dict(params),
+        'window_start': _iso(window[0]) if window else None,
+        'window_end': _iso(window[1]) if window else None,
+        'sharpe_ratio': 0.0, 'profit_factor': 0.0, 'total_return': 0.0,
+        'max_drawdown': 0.0, 'win_rate': 0.0, 'total_trades': 0, 'stopped_early': False
+    }
+    if result is not None:
+        record.update({
+            'sharpe_ratio': float(result.statistics.get('sharpe_ratio', 0)),
+            'profit_factor': float(result.statistics.get('profit_factor', 0)),
+            'total_return': float(result.summary['total_return']),
+            'max_drawdown': float(result.summary['max_drawdown']),
+            'win_rate': float(result.statistics.get('win_rate', 0)),
+            'total_trades': int(result.summary['total_trades']),
+            'stopped_early': bool(result.summary.get('stopped_early', False))
+        })
+    return record, result
+
+
+def _iso(ts_us: int) -> str:
+    return str(np.datetime64(int(ts_us), 'us').astype('datetime64[s]'))
+
+
+def rank_key(record: Dict[str, Any], objective: str) -> tuple:
+    """Completed runs first, then objective, then the other ranking metrics"""
+    others = [record[metric] for metric in RANKING_METRICS if metric != objective]
+    return (not record['stopped_early'], record[objective], *others)
+
+
+# Per worker process: an engine on the shared bar store and the signal batch
+_sweep_engine: Optional[BacktestEngine] = None
+_sweep_batch: Optional[SignalBatch] = None
+
+
+def _init_sweep_worker(config_file: str, log_file: str, store_root: str,
+                       settings: Dict[str, Any], batch: SignalBatch):
+    global _sweep_engine, _sweep_batch
+    _sweep_engine = BacktestEngine(config_file, log_file, bar_store=BarStore(store_root))
+    for name, value in settings.items():
+        setattr(_sweep_engine, name, value)
+    _sweep_batch = batch
+    # Per-run progress is logged by the parent
+    logging.getLogger('backtest.engine').setLevel(logging.WARNING)
+
+
+def _run_sweep_task(args: tuple) -> Dict[str, Any]:
+    """Process pool entry point: one configuration"""
+    params, window, max_drawdown_stop = args
+    record, _ = evaluate_params(_sweep_engine, _sweep_batch, params, window, max_drawdown_stop)
+    return record
+
+
+class OptimizationStore:
+    """SQLite store of optimization runs, ranked per study"""
+
+    def __init__(self, db_path: str = "data/optimization.db"):
+        self.db_path = db_path
+        self._init_database()
+
+    def _init_database(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS optimization_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                study TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                fold INTEGER,
+                params TEXT NOT NULL,
+                window_start TEXT,
+                window_end TEXT,
+                sharpe_ratio REAL,
+                profit_factor REAL,
+                total_return REAL,
+                max_drawdown REAL,
+                win_rate REAL,
+                total_trades INTEGER,
+                stopped_early INTEGER,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_optimization_study ON optimization_runs (study, phase)')
+        conn.commit()
+        conn.close()
+
+    def save(self, study: str, records: List[Dict[str, Any]], phase: str = "search", fold: Optional[int] = None):
+        """Store a batch of run records in one transaction"""
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany('''
+                INSERT INTO optimization_runs (
+                    study, phase, fold, params, window_start, window_end, sharpe_ratio, profit_factor,
+                    total_return, max_drawdown, win_rate, total_trades, stopped_early
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                study, phase, fold, json.dumps(r['params'], sort_keys=True), r['window_start'], r['window_end'],
+                r['sharpe_ratio'], r['profit_factor'], r['total_return'], r['max_drawdown'], r['win_rate'],
+                r['total_trades'], int(r['stopped_early'])
+            ) for r in records])
+        conn.close()
+
+    def top(self, study: str, n: int = 10, objective: str = "sharpe_ratio",
+            phase: str = "search", fold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Best n runs of a study by objective (runs stopped on drawdown rank last)"""
+        if objective not in RANKING_METRICS:
+            raise ValueError(f"Unknown objective {objective!r}")
+
+        tiebreak = ', '.join(f"{metric} DESC" for metric in RANKING_METRICS if metric != objective)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(f'''
+            SELECT * FROM optimization_runs
+            WHERE study = ? AND phase = ? AND (? IS NULL OR fold = ?)
+            ORDER BY stopped_early ASC, {objective} DESC, {tiebreak}
+            LIMIT ?
+        ''', (study, phase, fold, fold, n)).fetchall()
+        conn.close()
+
+        return [dict(row, params=json.loads(row['params']), stopped_early=bool(row['stopped_early']))
+                for row in rows]
+
+
+class ParameterOptimizer:
+    """
+    Grid, random and Bayesian parameter sweeps, optionally walk-forward, over
+    one signal set
+    """
+
+    def __init__(self, engine: BacktestEngine, signals, parameters: List[Parameter],
+                 study: str = None, objective: str = "sharpe_ratio", workers: Optional[int] = None,
+                 max_drawdown_stop: Optional[float] = None, store: Optional[OptimizationStore] = None,
+                 seed: Optional[int] = None):
+        if objective not in RANKING_METRICS:
+            raise ValueError(f"Unknown objective {objective!r}; expected one of {', '.join(RANKING_METRICS)}")
+
+        self.engine = engine
+        self.batch = signals if isinstance(signals, SignalBatch) else SignalBatch.from_signals(signals)
+        self.parameters = parameters
+        self.study = study or f"study_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.objective = objective
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.max_drawdown_stop = max_drawdown_stop
+        self.store = store or OptimizationStore()
+        self.rng = np.random.default_rng(seed)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        logger.info(f"ParameterOptimizer initialized: study {self.study}, {len(self.batch)} signals, "
+                   f"{len(parameters)} parameters")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            settings = {name: getattr(self.engine, name) for name in (
+                'initial_balance', 'risk_per_trade', 'spread_pips', 'commission_per_lot',
+                'max_trade_hours', 'bar_timeframe', 'early_stop_chunk'
+            )}
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_sweep_worker,
+                initargs=(self.engine.config_file, self.engine.log_file,
+                          str(self.engine._get_bar_store().root), settings, self.batch)
+            )
+        return self._executor
+
+    def evaluate(self, configs: List[Dict[str, Any]], window: Optional[Tuple[int, int]] = None,
+                 phase: str = "search", fold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run configurations (in the worker pool when workers > 1) and store their records"""
+        if not configs:
+            return []
+
+        if self.workers > 1 and len(configs) > 1:
+            tasks = [(params, window, self.max_drawdown_stop) for params in configs]
+            records = list(self._get_executor().map(_run_sweep_task, tasks))
+        else:
+            records = [evaluate_params(self.engine, self.batch, params, window, self.max_drawdown_stop)[0]
+                       for params in configs]
+
+        self.store.save(self.study, records, phase=phase, fold=fold)
+        best = max(records, key=lambda r: rank_key(r, self.objective))
+        logger.info(f"Evaluated {len(records)} configurations ({phase}); best {self.objective} "
+                   f"{best[self.objective]:.3f} with {best['params']}")
+        return records
+
+    def grid_search(self, window: Optional[Tuple[int, int]] = None, fold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Every combination of the parameters' values"""
+        names = [p.name for p in self.parameters]
+        configs = [dict(zip(names, combo)) for combo in itertools.product(*(p.grid() for p in self.parameters))]
+        return self._ranked(self.evaluate(configs, window, fold=fold))
+
+    def random_search(self, trials: int, window: Optional[Tuple[int, int]] = None,
+                      fold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Uniformly sampled configurations"""
+        configs = [self._from_unit(self.rng.random(len(self.parameters))) for _ in range(trials)]
+        return self._ranked(self.evaluate(configs, window, fold=fold))
+
+    def bayesian_search(self, trials: int, initial_trials: int = 8, window: Optional[Tuple[int, int]] = None,
+                        fold: Optional[int] = None, candidates: int = 512) -> List[Dict[str, Any]]:
+        """
+        Gaussian-process search: after initial_trials random configurations, each
+        round fits a GP to the objective so far and evaluates the candidates with
+        the highest expected improvement (one per worker)
+        """
+        records = self.evaluate([self._from_unit(self.rng.random(len(self.parameters)))
+                                 for _ in range(min(initial_trials, trials))], window, fold=fold)
+
+        while len(records) < trials:
+            observed = np.array([[p.to_unit(r['params'][p.name]) for p in self.parameters] for r in records])
+            scores = np.array([self._score(r) for r in records])
+            pool = self.rng.random((candidates, len(self.parameters)))
+            ei = _expected_improvement(observed, scores, pool)
+
+            seen = {json.dumps(r['params'], sort_keys=True) for r in records}
+            batch = []
+            for index in np.argsort(-ei):
+                params = self._from_unit(pool[index])
+                key = json.dumps(params, sort_keys=True)
+                if key not in seen:
+                    seen.add(key)
+                    batch.append(params)
+                if len(batch) >= min(max(self.workers, 1), trials - len(records)):
+                    break
+            if not batch:
+                break
+            records += self.evaluate(batch, window, fold=fold)
+
+        return self._ranked(records)
+
+    def walk_forward(self, folds: int = 4, method: str = "grid", trials: int = 30,
+                     anchored: bool = False) -> List[Dict[str, Any]]:
+        """
+        Split the signals' time span into folds + 1 segments; for each fold,
+        optimize on the in-sample segment(s) and score the winner on the next
+        segment. anchored=True grows the in-sample window from the start.
+        """
+        searches = {'grid': lambda w, f: self.grid_search(w, f),
+                    'random': lambda w, f: self.random_search(trials, w, f),
+                    'bayesian': lambda w, f: self.bayesian_search(trials, window=w, fold=f)}
+        if method not in searches:
+            raise ValueError(f"Unknown search method {method!r}")
+        if len(self.batch) == 0:
+            return []
+
+        bounds = np.linspace(int(self.batch.ts[0]), int(self.batch.ts[-1]) + 1, folds + 2).astype(np.int64)
+        results = []
+        for fold in range(folds):
+            train = (int(bounds[0] if anchored else bounds[fold]), int(bounds[fold + 1]))
+            test = (int(bounds[fold + 1]), int(bounds[fold + 2]))
+
+            best = searches[method](train, fold)[0]
+            out_of_sample = self.evaluate([best['params']], test, phase="test", fold=fold)[0]
+            results.append({'fold': fold, 'params': best['params'], 'in_sample': best,
+                            'out_of_sample': out_of_sample})
+            logger.info(f"Walk-forward fold {fold}: in-sample {self.objective} {best[self.objective]:.3f}, "
+                       f"out-of-sample {out_of_sample[self.objective]:.3f}")
+
+        return results
+
+    def top(self, n: int = 10, phase: str = "search") -> List[Dict[str, Any]]:
+        """Best stored configurations of this study"""
+        return self.store.top(self.study, n, self.objective, phase)
+
+    def report_top(self, n: int = 3, generator=None) -> List[str]:
+        """
+        Re-run the top n configurations with full trade detail and render a
+        backtest report for each, plus a ranking report; returns the file paths
+        """
+        if generator is None:
+            from report.generator import PDFReportGenerator
+            generator = PDFReportGenerator()
+
+        # Walk-forward studies store the same configuration once per fold
+        ranked, seen = [], set()
+        for record in self.top(n * 4):
+            key = json.dumps(record['params'], sort_keys=True)
+            if key not in seen and len(ranked) < n:
+                seen.add(key)
+                ranked.append(record)
+
+        paths = []
+        for rank, record in enumerate(ranked, 1):
+            _, result = evaluate_params(self.engine, self.batch, record['params'], materialize_trades=True)
+            if result is None:
+                continue
+            path = generator.generate_report(result, filename=f"{self.study}_rank{rank}.pdf")
+            if path:
+                paths.append(path)
+
+        ranking = generator.generate_optimization_report(self.study, ranked, self.objective,
+                                                         filename=f"{self.study}_ranking.pdf")
+        if ranking:
+            paths.insert(0, ranking)
+        return paths
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _from_unit(self, point: np.ndarray) -> Dict[str, Any]:
+        return {p.name: p.from_unit(float(u)) for p, u in zip(self.parameters, point)}
+
+    def _score(self, record: Dict[str, Any]) -> float:
+        """Objective for the GP; runs stopped on drawdown score below every completed run"""
+        value = record[self.objective]
+        if not math.isfinite(value):
+            value = 1e6 if value > 0 else -1e6
+        return value - 1e3 if record['stopped_early'] else value
+
+    def _ranked(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return sorted(records, key=lambda r: rank_key(r, self.objective), reverse=True)
+
+
+def _expected_improvement(observed: np.ndarray, scores: np.ndarray, candidates: np.ndarray,
+                          length_scale: float = 0.25, noise: float = 1e-6) -> np.ndarray:
+    """Expected improvement of candidates under a GP (RBF kernel) fit to standardized scores"""
+    std = scores.std() or 1.0
+    y = (scores - scores.mean()) / std
+
+    def kernel(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * d2 / length_scale ** 2)
+
+    K = kernel(observed, observed) + noise * np.eye(len(observed))
+    L = np.linalg.cholesky(K + 1e-9 * np.eye(len(observed)))
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+    k_star = kernel(candidates, observed)
+    mean = k_star @ alpha
+    v = np.linalg.solve(L, k_star.T)
+    sigma = np.sqrt(np.maximum(1.0 - (v ** 2).sum(axis=0), 1e-12))
+
+    z = (mean - y.max()) / sigma
+    cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+    return (mean - y.max()) * cdf + sigma * pdf
@@ -0,0 +1,161 @@
+"""
+History importers for the bar store
+
+Reads CSV history exports (MT5 "Export bars" files with <DATE>/<TIME>
+headers, MT4-style headerless files, or generic timestamp/OHLCV CSVs) and
+MetaTrader5 rate arrays, and appends them to a BarStore in chunks.
+"""
+
+import csv
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+
+from backtest.bar_store import BarSeries, BarStore
+
+try:
+    import MetaTrader5 as mt5
+    MT5_AVAILABLE = True
+except ImportError:
+    MT5_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Header aliases (lower-cased, <> stripped) -> column
+HEADER_ALIASES = {
+    'date': 'date', 'day': 'date',
+    'time': 'time',
+    'timestamp': 'timestamp', 'datetime': 'timestamp', 'date_time': 'timestamp', 'ts': 'timestamp',
+    'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close',
+    'volume': 'volume', 'vol': 'real_volume', 'real_volume': 'real_volume',
+    'tickvol': 'tick_volume', 'tick_volume': 'tick_volume',
+}
+
+# Headerless layouts by column count
+HEADERLESS_LAYOUTS = {
+    6: ['timestamp', 'open', 'high', 'low', 'close', 'volume'],
+    7: ['date', 'time', 'open', 'high', 'low', 'close', 'volume'],
+}
+
+
+def _parse_timestamps(values: List[str]) -> np.ndarray:
+    """Epoch microseconds from ISO / MT5 dotted dates or numeric epoch seconds/milliseconds"""
+    first = values[0].strip()
+    if first.count('.') <= 1 and first.replace('.', '', 1).isdigit():
+        numbers = np.array(values, dtype=np.float64)
+        # Millisecond epochs are > 1e11 for any date after 1973
+        scale = 1_000 if numbers[0] > 1e11 else 1_000_000
+        return (numbers * scale).astype(np.int64)
+
+    normalized = [v.strip().replace('.', '-', 2).replace(' ', 'T', 1) for v in values]
+    return np.array(normalized, dtype='datetime64[us]').astype(np.int64)
+
+
+def _detect_layout(first_row: List[str]) -> Optional[List[str]]:
+    """Column names from a header row, or None when the row is data"""
+    names = [HEADER_ALIASES.get(cell.strip().strip('<>').lower()) for cell in first_row]
+    if any(name in ('open', 'close') for name in names):
+        return [name or f"_unused{i}" for i, name in enumerate(names)]
+    return None
+
+
+def iter_history_csv(path: Union[str, Path], chunk_rows: int = 500_000) -> Iterator[BarSeries]:
+    """Parse a history CSV into BarSeries chunks"""
+    with open(path, 'r', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters='\t,;')
+        reader = csv.reader(f, dialect)
+
+        first = next(reader, None)
+        if first is None:
+            return
+        layout = _detect_layout(first)
+        pending = []
+        if layout is None:
+            layout = HEADERLESS_LAYOUTS.get(len(first))
+            if layout is None:
+                raise ValueError(f"Cannot infer columns of {path}: {len(first)} fields and no header")
+            pending.append(first)
+
+        index = {name: i for i, name in enumerate(layout)}
+        if 'timestamp' not in index and not ('date' in index and 'time' in index):
+            raise ValueError(f"{path} has no timestamp or date/time columns")
+
+        def to_series(rows: List[List[str]]) -> BarSeries:
+            columns = list(zip(*rows))
+            if 'timestamp' in index:
+                stamps = list(columns[index['timestamp']])
+            else:
+                stamps = [f"{d} {t}" for d, t in zip(columns[index['date']], columns[index['time']])]
+
+            def numeric(name: str) -> np.ndarray:
+                return np.array(columns[index[name]], dtype=np.float64)
+
+            volume_column = next((name for name in ('volume', 'real_volume', 'tick_volume') if name in index), None)
+            volume = numeric(volume_column) if volume_column else np.zeros(len(rows))
+            # MT5 exports carry both; real volume is zero for most FX feeds
+            if volume_column == 'real_volume' and 'tick_volume' in index and not volume.any():
+                volume = numeric('tick_volume')
+
+            return BarSeries(ts=_parse_timestamps(stamps), open=numeric('open'), high=numeric('high'),
+                             low=numeric('low'), close=numeric('close'), volume=volume)
+
+        for row in reader:
+            if row:
+                pending.append(row)
+            if len(pending) >= chunk_rows:
+                yield to_series(pending)
+                pending = []
+        if pending:
+            yield to_series(pending)
+
+
+def import_csv(store: BarStore, path: Union[str, Path], symbol: str, timeframe: str,
+               chunk_rows: int = 500_000) -> int:
+    """Append a CSV history export to the store; returns bars appended"""
+    appended = 0
+    for chunk in iter_history_csv(path, chunk_rows):
+        appended += store.append(symbol, timeframe, chunk)
+    logger.info(f"Imported {appended} {symbol} {timeframe} bars from {path}")
+    return appended
+
+
+def bars_from_mt5_rates(rates: np.ndarray) -> BarSeries:
+    """BarSeries from a MetaTrader5 copy_rates_* structured array (time in epoch seconds)"""
+    if rates is None or len(rates) == 0:
+        return BarSeries.empty()
+
+    volume = rates['real_volume'].astype(np.float64)
+    if not volume.any():
+        volume = rates['tick_volume'].astype(np.float64)
+    return BarSeries(
+        ts=rates['time'].astype(np.int64) * 1_000_000,
+        open=rates['open'].astype(np.float64),
+        high=rates['high'].astype(np.float64),
+        low=rates['low'].astype(np.float64),
+        close=rates['close'].astype(np.float64),
+        volume=volume
+    )
+
+
+def import_mt5_history(store: BarStore, symbol: str, timeframe: str,
+                       start: datetime, end: datetime) -> int:
+    """Pull bars from a running MetaTrader5 terminal into the store; returns bars appended"""
+    if not MT5_AVAILABLE:
+        raise RuntimeError("MetaTrader5 library not available")
+
+    mt5_timeframe = getattr(mt5, f"TIMEFRAME_{timeframe.upper()}", None)
+    if mt5_timeframe is None:
+        raise ValueError(f"MetaTrader5 has no timeframe {timeframe!r}")
+
+    rates = mt5.copy_rates_range(symbol, mt5_timeframe, start, end)
+    if rates is None:
+        raise RuntimeError(f"copy_rates_range failed for {symbol}: {mt5.last_error()}")
+
+    appended = store.append(symbol, timeframe, bars_from_mt5_rates(rates))
+    logger.info(f"Imported {appended} {symbol} {timeframe} bars from MetaTrader5")
+    return appended
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+A/B test logging and analysis: per-sample inserts against buffered flushes
+
+Logs the same stream of A/B samples three ways: one INSERT and commit per
+sample (the previous log_ab_sample), buffered log_ab_sample with bulk
+flushes, and the buffered path with a sequential test that stops once arm B's
+better score is significant. Also times the analysis at completion: reading
+every score back into lists against the running per-arm statistics.
+
+Usage: python benchmarks/bench_ab_testing.py [samples] [effect]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ai_parser"))
+
+from continuous_learning import ContinuousLearningEngine
+
+
+def make_samples(count: int, effect: float, seed: int = 17) -> list:
+    rnd = random.Random(seed)
+    return [(f"user_{i % 5000}", f"BUY EURUSD @ 1.08{i % 100:02d}", rnd.random()) for i in range(count)]
+
+
+def score_for(model: str, base: float, effect: float) -> float:
+    return min(1.0, base * 0.4 + 0.5 + (effect if model.startswith("model_b") else 0.0))
+
+
+async def log_all(engine: ContinuousLearningEngine, test_id: str, samples: list, effect: float) -> int:
+    logged = 0
+    for user_id, text, base in samples:
+        if test_id not in engine.active_tests:
+            break
+        model = engine.route_request(user_id, test_id)
+        await engine.log_ab_sample(test_id, user_id, text, {"pair": "EURUSD"}, score_for(model, base, effect))
+        logged += 1
+    return logged
+
+
+def log_per_sample(db_path: Path, test_id: str, samples: list, effect: float, engine):
+    """The previous log_ab_sample: one connection and commit per sample"""
+    for i, (user_id, text, base) in enumerate(samples):
+        model = engine.route_request(user_id, test_id)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                INSERT INTO ab_samples
+                (id, test_id, user_id, model_version, input_text, output_result, performance_score, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (f"old_{i}", test_id, user_id, model, text, json.dumps({"pair": "EURUSD"}),
+                  score_for(model, base, effect), "2024-01-01T00:00:00"))
+
+
+def analyze_from_rows(db_path: Path, test_id: str) -> float:
+    """The previous complete_ab_test analysis: every score back into Python lists"""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT model_version, performance_score, timestamp FROM ab_samples WHERE test_id = ?",
+                            (test_id,)).fetchall()
+    a = [score for model, score, _ in rows if model.startswith("model_a")]
+    b = [score for model, score, _ in rows if model.startswith("model_b")]
+    return statistics.mean(b) - statistics.mean(a) + statistics.stdev(a) + statistics.stdev(b)
+
+
+async def run(count: int, effect: float):
+    engine = ContinuousLearningEngine("models", "data")
+    samples = make_samples(count, effect)
+    print(f"{count} A/B samples, arm B better by {effect:.3f}")
+
+    # Test ids include the second they start in, so each test gets its own arm names
+    test_id = await engine.start_ab_test("model_a1", "model_b1")
+    started = time.perf_counter()
+    log_per_sample(engine.ab_db, test_id, samples, effect, engine)
+    elapsed = time.perf_counter() - started
+    print(f"  per-sample INSERT          {count / elapsed:>10,.0f} samples/s")
+    started = time.perf_counter()
+    analyze_from_rows(engine.ab_db, test_id)
+    print(f"  analysis from rows         {(time.perf_counter() - started) * 1000:>10.1f}ms")
+    await engine.complete_ab_test(test_id)
+
+    test_id = await engine.start_ab_test("model_a2", "model_b2")
+    started = time.perf_counter()
+    await log_all(engine, test_id, samples, effect)
+    await engine.flush_ab_samples()
+    elapsed = time.perf_counter() - started
+    print(f"  buffered log_ab_sample     {count / elapsed:>10,.0f} samples/s")
+    started = time.perf_counter()
+    stats = engine.get_ab_test_statistics(test_id)
+    print(f"  running statistics         {(time.perf_counter() - started) * 1000:>10.3f}ms  "
+          f"p={stats['significance']['p_value']:.2e}")
+    await engine.complete_ab_test(test_id)
+
+    test_id = await engine.start_ab_test("model_a3", "model_b3", sequential=True)
+    logged = await log_all(engine, test_id, samples, effect)
+    await asyncio.sleep(0)
+    outcome = "still running" if test_id in engine.active_tests else "stopped early, significant"
+    print(f"  sequential test            {logged:,} of {count:,} samples logged, {outcome}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    effect = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        asyncio.run(run(count, effect))
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Backtest throughput in signals per second
+
+Generates random signals against the engine's mock hourly bars, then runs the
+per-signal run_backtest loop and the vectorized run_vectorized_backtest over
+the memory-mapped bar store (in process and sharded over a process pool).
+The legacy loop is only timed at the smaller size.
+
+Usage: python benchmarks/bench_backtest.py [small] [large] [workers]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from backtest.engine import BacktestEngine, SignalBatch, US_PER_HOUR, logger
+
+
+def make_batch(engine: BacktestEngine, count: int, seed: int = 7) -> SignalBatch:
+    """Signals at random bars of random symbols, entering at the bar close with 0.5-1.5% SL and 1-3% TP"""
+    rng = np.random.default_rng(seed)
+    store = engine._get_bar_store()
+    symbols = engine.price_data.symbols
+    codes = rng.integers(0, len(symbols), count)
+    is_buy = rng.random(count) < 0.5
+    ts = np.empty(count, dtype=np.int64)
+    entry = np.empty(count)
+
+    for code, symbol in enumerate(symbols):
+        rows = np.flatnonzero(codes == code)
+        bars = store.load(symbol, engine.bar_timeframe)
+        picks = rng.integers(0, len(bars) - 24, len(rows))
+        ts[rows] = bars.ts[picks] + rng.integers(0, US_PER_HOUR, len(rows))
+        entry[rows] = bars.close[picks]
+
+    side = np.where(is_buy, 1.0, -1.0)
+    stop_loss = entry * (1 - side * rng.uniform(0.005, 0.015, count))
+    take_profit = entry * (1 + side * rng.uniform(0.01, 0.03, count))
+    return SignalBatch.from_arrays(ts, symbols, codes, is_buy, entry, stop_loss, take_profit)
+
+
+def to_signals(batch: SignalBatch):
+    """Signal dicts for run_backtest"""
+    timestamps = batch.ts.astype('datetime64[us]').astype(object)
+    return [{
+        'id': f"signal_{i + 1}",
+        'timestamp': timestamps[i].isoformat(),
+        'symbol': batch.symbols[batch.symbol_codes[i]],
+        'direction': 'BUY' if batch.is_buy[i] else 'SELL',
+        'entry_price': float(batch.entry_price[i]),
+        'stop_loss': float(batch.stop_loss[i]),
+        'take_profit': float(batch.take_profit[i])
+    } for i in range(len(batch))]
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<38} {count / elapsed:>12,.0f} signals/s  ({elapsed:.2f}s, "
+          f"final balance {result.summary['final_balance']:,.2f})")
+    return result
+
+
+def main():
+    small = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = BacktestEngine(config_file=os.path.join(tmp, "none.json"),
+                                log_file=os.path.join(tmp, "backtest.log"))
+        logger.setLevel(logging.WARNING)
+
+        batch = make_batch(engine, small)
+        signals = to_signals(batch)
+        print(f"{small} signals")
+        timed("run_backtest (per signal)", small, lambda: engine.run_backtest(signals))
+        timed("vectorized, with Trade objects", small, lambda: engine.run_vectorized_backtest(signals, workers=1))
+        timed("vectorized, arrays only", small,
+              lambda: engine.run_vectorized_backtest(batch, workers=1, materialize_trades=False))
+
+        batch = make_batch(engine, large)
+        print(f"{large} signals")
+        timed("vectorized, 1 process", large,
+              lambda: engine.run_vectorized_backtest(batch, workers=1, materialize_trades=False))
+        if workers > 1:
+            timed(f"vectorized, {workers} processes", large,
+                  lambda: engine.run_vectorized_backtest(batch, workers=workers, materialize_trades=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Dataset ingestion throughput in samples per second
+
+Builds a synthetic feedback log in which some entries are exact repeats and
+some are reposts that differ only in emoji, case or whitespace. Ingests it
+per sample with add_sample (one connection and transaction each), then in
+bulk with import_feedback_data (executemany, in-memory hash set, MinHash/LSH
+near-duplicate check). Also reports how many reposts each path let through.
+
+Usage: python benchmarks/bench_dataset_ingest.py [entries]
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ai_parser"))
+
+from dataset_manager import DatasetManager
+
+PAIRS = ['EURUSD', 'GBPUSD', 'XAUUSD', 'USDJPY', 'BTCUSD', 'US30']
+DECORATIONS = ['🔥', '🚀', '✅', '💰', '📈']
+
+
+def make_feedback(count: int, seed: int = 5) -> list:
+    rnd = random.Random(seed)
+    originals = []
+    entries = []
+    for i in range(count):
+        roll = rnd.random()
+        if originals and roll < 0.05:
+            text = rnd.choice(originals)
+        elif originals and roll < 0.25:
+            words = rnd.choice(originals).split()
+            text = f"{rnd.choice(DECORATIONS)} " + "  ".join(words) + f" {rnd.choice(DECORATIONS)}"
+            if rnd.random() < 0.5:
+                text = text.upper()
+        else:
+            price = round(rnd.uniform(1, 2000), 2)
+            text = (f"{rnd.choice(['BUY', 'SELL'])} {rnd.choice(PAIRS)} @ {price} "
+                    f"SL {round(price * 0.99, 2)} TP1 {round(price * 1.01, 2)} TP2 {round(price * 1.02, 2)} #{i}")
+            originals.append(text)
+        entries.append({'raw_text': text, 'provider': f"channel_{i % 7}",
+                        'corrected_parse': {'pair': text.split()[1], 'direction': text.split()[0]}})
+    return entries
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    entries = make_feedback(count)
+    logging.getLogger('dataset_manager').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feedback = os.path.join(tmp, "feedback.jsonl")
+        with open(feedback, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        print(f"{count} feedback entries")
+
+        manager = DatasetManager(os.path.join(tmp, "per_sample"))
+        sample = entries[:min(count, 2_000)]
+        started = time.perf_counter()
+        added = 0
+        for entry in sample:
+            if manager.add_sample(entry['raw_text'], entry['corrected_parse'], entry['provider'],
+                                  format_type="feedback", confidence=0.8):
+                added += 1
+        elapsed = time.perf_counter() - started
+        print(f"  add_sample loop        {len(sample) / elapsed:>10,.0f} samples/s  "
+              f"(~{elapsed / len(sample) * count:.1f}s for all, kept {added}/{len(sample)})")
+
+        manager = DatasetManager(os.path.join(tmp, "bulk"))
+        started = time.perf_counter()
+        imported = manager.import_feedback_data(feedback)
+        elapsed = time.perf_counter() - started
+        print(f"  import_feedback_data   {count / elapsed:>10,.0f} samples/s  "
+              f"({elapsed:.2f}s, kept {imported}/{count})")
+
+        started = time.perf_counter()
+        pairs = manager.find_near_duplicates()
+        elapsed = time.perf_counter() - started
+        print(f"  find_near_duplicates   {imported / elapsed:>10,.0f} samples/s  ({len(pairs)} pairs left)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Parser evaluation harness throughput and parser diff
+
+Writes a synthetic JSONL test set, evaluates the fallback regex parser
+sequentially and on a process pool, then diffs the regex parser (baseline)
+against the safe parser (candidate) over the same samples in one run and
+prints accuracy, latency percentiles and the regression gate.
+
+Usage: python benchmarks/bench_evaluation.py [samples] [workers]
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_parser.evaluation_metrics import EvaluationEngine
+from ai_parser.fallback_regex_parser import fallback_parser
+from ai_parser.parser_engine import parse_signal_safe
+
+TEMPLATES = [
+    "🟢 {direction} {pair} @ {entry} SL: {sl} TP1: {tp1} TP2: {tp2}",
+    "{direction} {pair} Entry: {entry} Stop Loss: {sl} TP: {tp1}, {tp2}",
+    "Signal: {pair} Direction: {direction} Entry: {entry} Stop: {sl} Target: {tp1}",
+    "{pair} {direction} now at {entry}, sl {sl}, tp {tp1} / {tp2}",
+]
+PAIRS = {'EURUSD': 1.08, 'GBPUSD': 1.27, 'XAUUSD': 2340.0, 'USDJPY': 151.2}
+
+
+def write_samples(path: str, count: int, seed: int = 11):
+    rnd = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            pair, base = rnd.choice(list(PAIRS.items()))
+            direction = rnd.choice(['BUY', 'SELL'])
+            side = 1 if direction == 'BUY' else -1
+            digits = 2 if base > 100 else 4
+            entry = round(base * rnd.uniform(0.98, 1.02), digits)
+            sl = round(entry * (1 - side * 0.004), digits)
+            tps = [round(entry * (1 + side * 0.004 * k), digits) for k in (1, 2)]
+            text = rnd.choice(TEMPLATES).format(direction=direction, pair=pair, entry=entry, sl=sl,
+                                                tp1=tps[0], tp2=tps[1])
+            f.write(json.dumps({'id': f"bench_{i}", 'raw': text,
+                                'parsed': {'pair': pair, 'direction': direction, 'entry': [entry], 'sl': sl,
+                                           'tp': tps if '{tp2}' in text or str(tps[1]) in text else tps[:1]}},
+                               ensure_ascii=False) + '\n')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = os.path.join(tmp, "test.jsonl")
+        write_samples(dataset, count)
+        engine = EvaluationEngine(evaluations_dir=os.path.join(tmp, "evaluations"))
+        print(f"{count} samples")
+
+        for label, pool in (("1 process", 1), (f"{workers} processes", workers)):
+            started = time.perf_counter()
+            metrics = engine.evaluate_parser_performance(dataset, fallback_parser, workers=pool)
+            elapsed = time.perf_counter() - started
+            p = metrics.latency_percentiles
+            print(f"  evaluate, {label:<12} {count / elapsed:>9,.0f} samples/s  accuracy {metrics.accuracy:.3f}  "
+                  f"p50 {p['p50'] * 1e6:.0f}us  p99 {p['p99'] * 1e6:.0f}us")
+            if workers == 1:
+                break
+
+        started = time.perf_counter()
+        diff = engine.compare_parsers(dataset, fallback_parser, parse_signal_safe, workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"  compare_parsers           {count / elapsed:>9,.0f} samples/s  "
+              f"accuracy delta {diff['accuracy_delta']:+.3f}, "
+              f"p95 delta {diff['latency_deltas']['p95'] * 1e6:+.0f}us, "
+              f"{diff['regressed_samples']} regressed / {diff['improved_samples']} improved, "
+              f"gate {'passed' if diff['gate']['passed'] else 'failed'}")
+        for reason in diff['gate']['reasons']:
+            print(f"    {reason}")
+
+
+if __name__ == "__main__":
+    main()
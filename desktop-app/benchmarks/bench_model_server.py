@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Model serving: routing cost, micro-batching and hot-swap under load
+
+Times route_request against re-reading models/version.json per request, then
+drives a simulated model with a fixed per-call cost (a forward pass) from
+several concurrent callers: loading the model per request, a warm model served
+one request per call, and the micro-batched server. Finally swaps versions
+repeatedly while callers are parsing and reports errors and worst latency.
+
+Usage: python benchmarks/bench_model_server.py [requests] [callers]
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ai_parser"))
+
+from continuous_learning import ContinuousLearningEngine
+from model_server import ModelServer
+
+CALL_COST = 0.002     # seconds per model call
+ITEM_COST = 0.00005   # seconds per text in a call
+LOAD_COST = 0.02      # seconds to load a model from disk
+
+
+class SimulatedModel:
+    def __init__(self, version: str):
+        self.version = version
+
+    def predict_batch(self, texts):
+        time.sleep(CALL_COST + ITEM_COST * len(texts))
+        return [{"direction": "BUY", "confidence": 0.9, "version": self.version} for _ in texts]
+
+
+def load_simulated(path):
+    time.sleep(LOAD_COST)
+    return SimulatedModel(path.name if path else "default")
+
+
+def drive(callers: int, requests: int, parse) -> tuple:
+    """Run requests spread over callers threads; returns (requests/s, p99 seconds, errors)"""
+    latencies, errors = [], []
+    per_caller = max(1, requests // callers)
+
+    def worker():
+        for i in range(per_caller):
+            started = time.perf_counter()
+            try:
+                parse(f"BUY EURUSD {i}")
+            except Exception as e:
+                errors.append(e)
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker) for _ in range(callers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[int(len(latencies) * 0.99) - 1], len(errors)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    callers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        models_dir = Path(tmp) / "models"
+        for version in ("v1", "v2"):
+            (models_dir / "versions" / version).mkdir(parents=True)
+        with open(models_dir / "version.json", 'w') as f:
+            json.dump({"current_version": "v1"}, f)
+
+        engine = ContinuousLearningEngine(str(models_dir), str(Path(tmp) / "data"))
+        server = engine.model_server
+        calls = 20_000
+        started = time.perf_counter()
+        for i in range(calls):
+            server.read_production_version()
+        disk = (time.perf_counter() - started) / calls * 1e6
+        started = time.perf_counter()
+        for i in range(calls):
+            engine.route_request(f"user_{i % 500}")
+        cached = (time.perf_counter() - started) / calls * 1e6
+        print(f"route_request to production: version.json per call {disk:.1f}us, cached {cached:.2f}us")
+
+        print(f"AI parse, {requests} requests from {callers} callers "
+              f"(model call {CALL_COST * 1000:.1f}ms + {ITEM_COST * 1e6:.0f}us/text, load {LOAD_COST * 1000:.0f}ms)")
+        lock = threading.Lock()
+
+        def cold(text):
+            # Load per request, one model call at a time
+            model = load_simulated(models_dir / "versions" / server.read_production_version())
+            with lock:
+                return model.predict_batch([text])
+
+        warm_model = SimulatedModel("v1")
+
+        def warm(text):
+            with lock:
+                return warm_model.predict_batch([text])
+
+        batched = ModelServer(models_dir, max_batch_size=32, max_wait_ms=2.0, loader=load_simulated)
+        batched.activate("v1")
+
+        cold_requests = min(requests, 200)
+        for label, parse, count in (("load per request", cold, cold_requests),
+                                    ("warm, unbatched", warm, requests),
+                                    ("model server", lambda text: batched.parse(text, timeout=1.0), requests)):
+            rate, p99, errors = drive(callers, count, parse)
+            print(f"  {label:<18} {rate:>9,.0f} req/s  p99 {p99 * 1000:>7.1f}ms  errors {errors}")
+        stats = batched.get_statistics()
+        print(f"  avg batch size {stats['avg_batch_size']:.1f}")
+
+        stop = threading.Event()
+        swaps = [0]
+
+        def swapper():
+            while not stop.is_set():
+                batched.activate("v2" if swaps[0] % 2 == 0 else "v1")
+                swaps[0] += 1
+                time.sleep(0.005)
+
+        thread = threading.Thread(target=swapper)
+        thread.start()
+        rate, p99, errors = drive(callers, requests, lambda text: batched.parse(text, timeout=1.0))
+        stop.set()
+        thread.join()
+        print(f"Hot-swap under load: {swaps[0]} swaps, {rate:,.0f} req/s, p99 {p99 * 1000:.1f}ms, "
+              f"errors {errors}, loads {batched.get_statistics()['loads']}")
+        batched.close()
+        server.close()
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
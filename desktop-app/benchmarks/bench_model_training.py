@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Model training data pipeline: full re-tokenization against the incremental path
+
+Builds HuggingFace and spaCy training splits from the bundled samples
+(data/dataset.db and data/test.jsonl, with every price rescaled per copy, since
+the bundled set has a handful of messages), then times:
+
+- the previous pipeline, which re-reads and re-tokenizes the whole split every run
+- a cold run through ModelTrainer, which fills the feature cache
+- a full retrain of the same split, served from the cache
+- an incremental run after new and corrected samples arrive, warm-started from
+  the current version, then the same with nothing changed, then a full retrain
+
+It also times JSONL loading with one worker process against one per CPU. Without
+transformers/spaCy installed the trainer's training step is the mock, the
+hashed-vocabulary featurizer stands in for the tokenizer, and the times below are
+the data pipeline; the "trained on" column is what a real training step would see.
+
+Usage: python benchmarks/bench_model_training.py [samples] [new_fraction]
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_parser.model_trainer import ModelTrainer
+from ai_parser.training_cache import HashingFeaturizer, load_records
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def load_seed_rows() -> list:
+    rows = []
+    with sqlite3.connect(DATA_DIR / "dataset.db") as conn:
+        for raw_text, parsed_json in conn.execute("SELECT raw_text, parsed_data FROM samples"):
+            rows.append((raw_text, json.loads(parsed_json)))
+    with open(DATA_DIR / "test.jsonl", 'r', encoding='utf-8') as f:
+        rows.extend((row['raw'], row['parsed']) for row in map(json.loads, filter(str.strip, f)))
+    return rows
+
+
+def replay(raw_text: str, parsed: dict, rnd: random.Random) -> tuple:
+    """The message with its prices rescaled by one random factor, and the matching parse"""
+    factor = rnd.uniform(0.9, 1.1)
+
+    def scale(value):
+        return round(float(value) * factor, 5)
+
+    text = NUMBER.sub(lambda match: f"{scale(match.group()):g}" if '.' in match.group() or len(match.group()) > 2
+                      else match.group(), raw_text)
+    prices = {key: ([scale(v) for v in value] if isinstance(value, list) else scale(value))
+              for key, value in parsed.items() if key in ('entry', 'sl', 'tp')}
+    return text, {**parsed, **prices}
+
+
+def hf_record(text: str, parsed: dict) -> dict:
+    return {"input": f"Extract trading signal from: {text}", "output": json.dumps(parsed)}
+
+
+def spacy_record(text: str, parsed: dict) -> dict:
+    entities = []
+    for label, value in (("PAIR", parsed.get('pair')), ("DIRECTION", parsed.get('direction'))):
+        start = text.upper().find(str(value).upper()) if value else -1
+        if start != -1:
+            entities.append([start, start + len(str(value)), label])
+    return {"text": text, "entities": entities}
+
+
+def write_jsonl(path: Path, records: list):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def previous_pipeline(path: Path, featurizer) -> int:
+    """Read the whole split and tokenize every sample, as each run did before"""
+    with open(path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    return len(featurizer.featurize_many(records))
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    trained = getattr(result, 'total_samples', result)
+    print(f"  {label:<40} {elapsed * 1000:>9.0f}ms   trained on {trained:>8,}")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    new_fraction = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    logging.disable(logging.WARNING)
+
+    rnd = random.Random(11)
+    seeds = load_seed_rows()
+    samples = [replay(*rnd.choice(seeds), rnd) for _ in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        data_dir = Path("data")
+        data_dir.mkdir()
+        hf_files = {split: str(data_dir / f"{split}_hf.jsonl") for split in ("train", "validation")}
+        spacy_files = {split: str(data_dir / f"{split}_spacy.jsonl") for split in ("train", "validation")}
+        validation = samples[:count // 10]
+
+        def write_splits(train):
+            write_jsonl(Path(hf_files["train"]), [hf_record(*sample) for sample in train])
+            write_jsonl(Path(spacy_files["train"]), [spacy_record(*sample) for sample in train])
+
+        write_splits(samples)
+        write_jsonl(Path(hf_files["validation"]), [hf_record(*sample) for sample in validation])
+        write_jsonl(Path(spacy_files["validation"]), [spacy_record(*sample) for sample in validation])
+
+        trainer = ModelTrainer("models", "data")
+        workers = os.cpu_count() or 1
+        print(f"{count:,} training samples from {len(seeds)} bundled messages, {workers} CPU(s)")
+
+        for label, files, train in (("LLM", hf_files, trainer.train_llm_parser),
+                                    ("spaCy NER", spacy_files, trainer.train_spacy_ner)):
+            print(f" {label}")
+            if files is hf_files:
+                timed("previous: re-read and re-tokenize all",
+                      lambda: previous_pipeline(Path(files["train"]), HashingFeaturizer()))
+            timed("cold run (fills the feature cache)", lambda: train(files))
+            timed("full retrain, cached features", lambda: train(files))
+
+        # New feedback arrives and some earlier labels are corrected
+        added = [replay(*rnd.choice(seeds), rnd) for _ in range(int(count * new_fraction))]
+        corrected = list(samples)
+        for index in rnd.sample(range(count), int(count * new_fraction / 4)):
+            text, parsed = corrected[index]
+            corrected[index] = (text, {**parsed, "direction": "SELL" if parsed['direction'] == "BUY" else "BUY"})
+        write_splits(corrected + added)
+        print(f" {len(added):,} new and {int(count * new_fraction / 4):,} corrected samples")
+
+        for label, files, train in (("LLM", hf_files, trainer.train_llm_parser),
+                                    ("spaCy NER", spacy_files, trainer.train_spacy_ner)):
+            print(f" {label}")
+            timed("incremental, warm start", lambda: train(files, incremental=True))
+            timed("incremental, nothing changed", lambda: train(files, incremental=True))
+            timed("full retrain, cached features", lambda: train(files))
+
+        print(" JSONL loading")
+        for label, worker_count in (("1 worker", 1), (f"{workers} workers", workers)):
+            timed(label, lambda: len(load_records(hf_files["train"], worker_count)))
+
+        stats = trainer.get_training_status()["feature_cache"]
+        print(f" feature cache: {sum(stats['features'].values()):,} entries, {stats['size_mb']:.1f}MB, "
+              f"hit rate {stats['hit_rate']:.0%}")
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Multi-signal aggregation: polling every processing_interval against per-symbol windows
+
+Streams signals from several providers over a handful of symbols in real time
+and reports the added latency per signal from get_statistics, first with the
+previous cadence (every symbol processed once per processing_interval, 2s by
+default) and then with a window per symbol that is processed as soon as it
+closes. Also times the per-window conflict check: rebuilding the direction
+groups for every window against the symbol book's incremental state.
+
+Usage: python benchmarks/bench_multi_signal.py [seconds] [signals_per_second]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from multi_signal_handler import IncomingSignal, MultiSignalHandler, SignalDirection, SymbolBook
+
+CONFIG = Path(__file__).resolve().parent.parent / "config.json"
+SYMBOLS = {"EURUSD": 1.0850, "GBPUSD": 1.2700, "USDJPY": 151.20, "AUDUSD": 0.6600, "USDCAD": 1.3600}
+PROVIDERS = ["premium_provider", "standard_provider", "trial_provider", "vip_provider"]
+
+
+class PollingHandler(MultiSignalHandler):
+    """The previous cadence: no windows, every symbol processed once per processing_interval"""
+
+    def _open_window(self, symbol, book):
+        pass
+
+    async def _process_pending_signals(self):
+        while self.is_processing:
+            await asyncio.sleep(self.config.get("processing_interval", 2.0))
+            for symbol, book in list(self.symbol_books.items()):
+                self._process_symbol(symbol, book)
+                if not book.signals:
+                    del self.symbol_books[symbol]
+
+
+def make_signal(rnd: random.Random, i: int) -> dict:
+    symbol = rnd.choice(list(SYMBOLS))
+    pip = 0.001 if "JPY" in symbol else 0.00001
+    return {
+        "signal_id": f"sig_{i}",
+        "symbol": symbol,
+        "direction": "buy" if rnd.random() < 0.8 else "sell",
+        "entry_price": round(SYMBOLS[symbol] + rnd.gauss(0, 3) * pip, 5),
+        "confidence": rnd.uniform(0.4, 0.95),
+        "provider_id": rnd.choice(PROVIDERS)
+    }
+
+
+async def stream(handler: MultiSignalHandler, seconds: float, rate: float, seed: int = 9) -> dict:
+    rnd = random.Random(seed)
+    deadline = time.monotonic() + seconds
+    sent = 0
+    while time.monotonic() < deadline:
+        handler.add_signal(make_signal(rnd, sent))
+        sent += 1
+        await asyncio.sleep(rnd.expovariate(rate))
+
+    # Let the last signals through
+    interval = handler.config.get("processing_interval", 2.0)
+    while handler.symbol_books and time.monotonic() < deadline + interval * 2:
+        await asyncio.sleep(0.05)
+    handler.stop_processing()
+    return handler.get_statistics()
+
+
+def incoming(handler: MultiSignalHandler, data: dict) -> IncomingSignal:
+    return IncomingSignal(
+        signal_id=data["signal_id"], symbol=data["symbol"], direction=SignalDirection(data["direction"]),
+        entry_price=data["entry_price"], stop_loss=None, take_profit=None, volume=None,
+        confidence=data["confidence"], provider_id=data["provider_id"], provider_name=data["provider_id"],
+        priority=handler._get_signal_priority(data["provider_id"], data["confidence"]), timestamp=datetime.now()
+    )
+
+
+def conflict_check_cost(handler: MultiSignalHandler, windows: int, seed: int = 4):
+    """Windows of five signals on one symbol, as a burst of providers copying one call"""
+    rnd = random.Random(seed)
+    books = []
+    for _ in range(windows):
+        book = SymbolBook(handler._conflict_tolerance("EURUSD"))
+        for j in range(5):
+            data = {**make_signal(rnd, j), "symbol": "EURUSD", "direction": "buy",
+                    "entry_price": round(SYMBOLS["EURUSD"] + rnd.gauss(0, 1) * 0.00001, 5)}
+            book.add(j, incoming(handler, data), time.monotonic())
+        books.append(book)
+
+    started = time.perf_counter()
+    rebuilt = sum(bool(handler._identify_conflicts(list(book.signals.values()))) for book in books)
+    previous = time.perf_counter() - started
+    started = time.perf_counter()
+    gated = sum(bool(handler._identify_conflicts(list(book.signals.values())))
+                for book in books if book.may_conflict())
+    incremental = time.perf_counter() - started
+    print(f" conflict check, {windows:,} windows of 5 signals")
+    print(f"  rebuild direction groups       {previous / windows * 1e6:>7.2f}us per window  ({rebuilt:,} with conflicts)")
+    print(f"  incremental book state         {incremental / windows * 1e6:>7.2f}us per window  ({gated:,} with conflicts)")
+
+
+async def run(seconds: float, rate: float):
+    print(f"{rate:.0f} signals/s for {seconds:.0f}s over {len(SYMBOLS)} symbols")
+    for label, handler_class in (("previous: poll every interval", PollingHandler),
+                                 ("per-symbol windows", MultiSignalHandler)):
+        handler = handler_class("config.json", f"logs/{handler_class.__name__}.log")
+        stats = await stream(handler, seconds, rate)
+        latency = stats["added_latency"]
+        print(f"  {label:<30} mean {latency['mean_ms']:>7.1f}ms  p95 {latency['p95_ms']:>7.1f}ms  "
+              f"max {latency['max_ms']:>7.1f}ms  ({latency['signals']:,} signals, "
+              f"{stats['processed_signals']:,} processed)")
+
+    conflict_check_cost(MultiSignalHandler("config.json", "logs/conflicts.log"), 20_000)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 6.0
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 40.0
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        with open(CONFIG, 'r') as f:
+            config = {"multi_signal_handler": json.load(f)["multi_signal_handler"]}
+        with open("config.json", 'w') as f:
+            json.dump(config, f)
+        asyncio.run(run(seconds, rate))
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep throughput in configurations per second
+
+Sweeps a risk / SL buffer / TP multiplier grid over the same random signals
+two ways: one run_backtest per configuration with adjusted signal dicts (the
+manual workflow), and ParameterOptimizer.grid_search over the shared bar store.
+The per-config loop is timed on the first few configurations only.
+
+Usage: python benchmarks/bench_optimizer.py [signals] [workers]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_backtest import make_batch, to_signals
+from backtest.engine import BacktestEngine, logger
+from backtest.optimizer import OptimizationStore, Parameter, ParameterOptimizer, apply_signal_params
+
+PARAMETERS = [
+    Parameter('risk_per_trade', values=[0.005, 0.01, 0.02]),
+    Parameter('sl_buffer_pips', values=[0, 5, 10, 20]),
+    Parameter('tp_multiplier', values=[0.5, 0.75, 1.0, 1.5])
+]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    configs = 1
+    for parameter in PARAMETERS:
+        configs *= len(parameter.values)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = BacktestEngine(config_file=os.path.join(tmp, "none.json"),
+                                log_file=os.path.join(tmp, "backtest.log"))
+        logger.setLevel(logging.WARNING)
+        logging.getLogger('backtest.optimizer').setLevel(logging.WARNING)
+        batch = make_batch(engine, count)
+        print(f"{count} signals, {configs} configurations")
+
+        sample = [{'risk_per_trade': 0.01, 'sl_buffer_pips': b, 'tp_multiplier': 1.0} for b in (0, 5, 10)]
+        started = time.perf_counter()
+        for params in sample:
+            engine.risk_per_trade = params['risk_per_trade']
+            engine.run_backtest(to_signals(apply_signal_params(batch, params)))
+        elapsed = time.perf_counter() - started
+        print(f"  run_backtest per config     {len(sample) / elapsed:>8.2f} configs/s  "
+              f"(~{elapsed / len(sample) * configs:.0f}s for the grid)")
+
+        store = OptimizationStore(os.path.join(tmp, "optimization.db"))
+        for label, pool in (("1 process", 1), (f"{workers} processes", workers)):
+            optimizer = ParameterOptimizer(engine, batch, PARAMETERS, study=label, workers=pool, store=store)
+            started = time.perf_counter()
+            ranked = optimizer.grid_search()
+            elapsed = time.perf_counter() - started
+            optimizer.close()
+            print(f"  grid_search, {label:<13} {configs / elapsed:>8.2f} configs/s  ({elapsed:.2f}s, "
+                  f"best sharpe {ranked[0]['sharpe_ratio']:.3f})")
+            if workers == 1:
+                break
+
+
+if __name__ == "__main__":
+    main()
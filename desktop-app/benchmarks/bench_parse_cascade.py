@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Parse cascade: AI-first against cheapest-first, with and without a budget
+
+Builds the same stages SafeParserEngine uses (structured fast path, regex)
+plus a simulated AI model with a fixed per-call cost, then parses a synthetic
+mix of clean one-line signals, looser formats and chatter. Runs the stages
+AI-first (the old order) and cheapest-first, then cheapest-first with a
+latency budget smaller than the AI cost, and prints throughput, accept rate
+and per-stage hit rates. Finally times SafeParserEngine.parse_signal_safe.
+
+Usage: python benchmarks/bench_parse_cascade.py [signals] [ai_ms]
+"""
+
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_parser.cascade import CascadeStage, ParseCascade
+from ai_parser.fallback_regex_parser import get_fallback_parser
+from ai_parser.parser_engine import SafeParserEngine
+
+TEMPLATES = [
+    "{direction} {pair} @ {entry}, SL: {sl}, TP: {tp}",
+    "{direction} {pair} Entry: {entry} Stop Loss: {sl} TP: {tp}",
+    "{pair} {direction} now at {entry}, sl {sl}, tp {tp}",
+    "{pair} looks interesting this week, watching {entry}",
+]
+PAIRS = {'EURUSD': 1.08, 'GBPUSD': 1.27, 'USDJPY': 151.2}
+
+
+def make_signals(count: int, seed: int = 3) -> list:
+    rnd = random.Random(seed)
+    signals = []
+    for _ in range(count):
+        pair, base = rnd.choice(list(PAIRS.items()))
+        entry = round(base * rnd.uniform(0.99, 1.01), 4)
+        signals.append(rnd.choice(TEMPLATES).format(direction='BUY', pair=pair, entry=entry,
+                                                    sl=round(entry * 0.996, 4), tp=round(entry * 1.004, 4)))
+    return signals
+
+
+def build_cascade(ai_ms: float, order: list, budget_ms: float = 0) -> ParseCascade:
+    parser = get_fallback_parser()
+
+    def simulated_ai(text):
+        time.sleep(ai_ms / 1000.0)
+        return {"pair": text.split()[0], "confidence": 0.8} if "watching" not in text else None
+
+    cascade = ParseCascade([
+        CascadeStage("structured", parser.parse_structured_signal, 0.05, 0.8),
+        CascadeStage("regex", parser.parse_signal_regex, 0.5, 0.6),
+        CascadeStage("ai", simulated_ai, ai_ms, 0.7)
+    ])
+    cascade.configure(order=order, latency_budget_ms=budget_ms)
+    return cascade
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    ai_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    logging.disable(logging.ERROR)
+    signals = make_signals(count)
+    print(f"{count} signals, simulated AI call {ai_ms:.1f}ms")
+
+    for label, order, budget in (("AI first", ["ai", "structured", "regex"], 0),
+                                 ("cheapest first", ["structured", "regex", "ai"], 0),
+                                 (f"cheapest, {ai_ms / 2:.1f}ms budget", ["structured", "regex", "ai"], ai_ms / 2)):
+        cascade = build_cascade(ai_ms, order, budget)
+        started = time.perf_counter()
+        for text in signals:
+            cascade.run(text)
+        elapsed = time.perf_counter() - started
+        stats = cascade.get_statistics()
+        hits = "  ".join(f"{name} {stage['share_of_requests']:.0%}"
+                         + (f" ({stage['budget_skips']} skipped)" if stage['budget_skips'] else "")
+                         for name, stage in stats["stages"].items())
+        print(f"  {label:<24} {count / elapsed:>9,.0f} signals/s  avg {stats['avg_ms']:.3f}ms  "
+              f"accepted {stats['accept_rate']:.0%}  [{hits}]")
+
+    engine = SafeParserEngine()
+    engine.configure_parser(enable_ai_parser=False)
+    started = time.perf_counter()
+    for text in signals:
+        engine.parse_signal_safe(text)
+    elapsed = time.perf_counter() - started
+    stats = engine.get_parser_stats()["cascade"]
+    print(f"  SafeParserEngine (no AI)  {count / elapsed:>9,.0f} signals/s  "
+          + "  ".join(f"{name} hit {stage['hit_rate']:.0%} avg {stage['avg_ms']:.3f}ms"
+                      for name, stage in stats["stages"].items() if stage["attempts"]))
+
+
+if __name__ == "__main__":
+    main()
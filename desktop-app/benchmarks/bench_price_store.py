@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Price store vs in-memory mock prices
+
+Times engine startup (generating MockPriceData vs memory-mapping the same bars
+from a BarStore), per-call get_price_at_time / get_price_range lookups, CSV
+import of an MT5-style M1 export and M1 -> H1 resampling.
+
+Usage: python benchmarks/bench_price_store.py [csv_rows] [lookups]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from backtest.bar_store import BarStore
+from backtest.engine import MockPriceData, StoredPriceData
+from backtest.price_import import import_csv
+
+
+def write_mt5_export(path: str, rows: int):
+    rng = np.random.default_rng(1)
+    stamps = np.datetime64('2020-01-01T00:00') + np.arange(rows).astype('timedelta64[m]')
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, rows))
+    with open(path, 'w') as f:
+        f.write("<DATE>\t<TIME>\t<OPEN>\t<HIGH>\t<LOW>\t<CLOSE>\t<TICKVOL>\t<VOL>\t<SPREAD>\n")
+        for stamp, price in zip(stamps.astype(str), close.tolist()):
+            f.write(f"{stamp[:10].replace('-', '.')}\t{stamp[11:16]}:00\t{price:.5f}\t{price + 2e-4:.5f}\t"
+                    f"{price - 2e-4:.5f}\t{price:.5f}\t42\t0\t5\n")
+
+
+def per_call(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    csv_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        mock = MockPriceData()
+        generate = time.perf_counter() - started
+
+        store = BarStore(os.path.join(tmp, "bars"))
+        mock.export_to_store(store, "H1")
+        started = time.perf_counter()
+        stored = StoredPriceData(BarStore(store.root), "H1")
+        for symbol in stored.symbols:
+            stored.store.load(symbol, "H1")
+        open_time = time.perf_counter() - started
+        print(f"Startup, {len(mock.symbols)} symbols x {len(mock.price_data[mock.symbols[0]])} H1 bars")
+        print(f"  MockPriceData generation   {generate * 1000:>10.1f} ms")
+        print(f"  BarStore memory-map        {open_time * 1000:>10.1f} ms")
+
+        start = mock.price_data['EURUSD']['timestamp'].iloc[0]
+        times = [start + timedelta(minutes=random.randint(0, 360 * 24 * 60)) for _ in range(lookups)]
+        print(f"Lookups ({lookups} random times)")
+        for label, source in (("MockPriceData", mock), ("StoredPriceData", stored)):
+            at = per_call(lambda i: source.get_price_at_time('EURUSD', times[i]), lookups)
+            window = per_call(lambda i: source.get_price_range('EURUSD', times[i], times[i] + timedelta(hours=24)),
+                              lookups)
+            print(f"  {label:<17} get_price_at_time {at:>8.1f} us   get_price_range(24h) {window:>8.1f} us")
+
+        path = os.path.join(tmp, "EURUSD_M1.csv")
+        write_mt5_export(path, csv_rows)
+        store = BarStore(os.path.join(tmp, "imported"))
+        started = time.perf_counter()
+        imported = import_csv(store, path, "EURUSD", "M1")
+        elapsed = time.perf_counter() - started
+        print(f"Import {imported} M1 bars from CSV   {imported / elapsed:>12,.0f} bars/s")
+
+        started = time.perf_counter()
+        store.resample("EURUSD", "M1", "H1")
+        elapsed = time.perf_counter() - started
+        print(f"Resample M1 -> H1                {imported / elapsed:>12,.0f} bars/s "
+              f"({len(store.load('EURUSD', 'H1'))} H1 bars)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Provider templates against the general regex parsers, on data/test.jsonl
+
+Learns templates from the providers in data/test.jsonl, then replays each
+provider's layout with fresh prices (the test set has one message per
+provider, so traffic is generated from those layouts) and times the general
+fallback parser (structured patterns, then the full regex set) against the
+provider's anchored template. Prints throughput and field accuracy for both,
+the same through SafeParserEngine with and without a provider, and finally
+switches one provider to a new layout to show the template being demoted.
+
+Usage: python benchmarks/bench_provider_templates.py [messages] [test.jsonl]
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_parser.fallback_regex_parser import fallback_parser
+from ai_parser.parser_engine import SafeParserEngine
+from ai_parser.provider_templates import ProviderTemplates
+
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def load_rows(path: str) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay(row: dict, rnd: random.Random) -> tuple:
+    """The row's message with every price scaled by one random factor, and the matching parse"""
+    parsed = row['parsed']
+    prices = {float(value) for value in parsed['entry'] + [parsed['sl']] + parsed['tp']}
+    factor = rnd.uniform(0.97, 1.03)
+    mapping = {}
+
+    def scale(match):
+        token = match.group()
+        if float(token) not in prices:
+            return token
+        decimals = len(token.split('.')[1]) if '.' in token else 0
+        new = f"{float(token) * factor:.{decimals}f}"
+        mapping[float(token)] = float(new)
+        return new
+
+    text = NUMBER.sub(scale, row['raw'])
+    expected = {'pair': parsed['pair'], 'direction': parsed['direction'],
+                'entry': [mapping[float(v)] for v in parsed['entry']], 'sl': mapping[float(parsed['sl'])],
+                'tp': [mapping[float(v)] for v in parsed['tp']]}
+    return row['metadata']['provider'], text, expected
+
+
+def correct(result, expected) -> bool:
+    return bool(result) and all(result.get(key) == value for key, value in expected.items())
+
+
+def run(label: str, messages: list, parse):
+    started = time.perf_counter()
+    results = [parse(provider, text) for provider, text, _ in messages]
+    elapsed = time.perf_counter() - started
+    accuracy = sum(correct(result, expected) for result, (_, _, expected) in zip(results, messages)) / len(messages)
+    print(f"  {label:<34} {len(messages) / elapsed:>10,.0f} msgs/s  "
+          f"{elapsed / len(messages) * 1e6:>7.1f}us/msg  accuracy {accuracy:.1%}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    dataset = sys.argv[2] if len(sys.argv) > 2 else str(Path(__file__).resolve().parent.parent / "data" / "test.jsonl")
+    logging.disable(logging.ERROR)
+
+    rows = load_rows(dataset)
+    rnd = random.Random(7)
+    messages = [replay(rnd.choice(rows), rnd) for _ in range(count)]
+
+    templates = ProviderTemplates(min_support=3)
+    learned = templates.learn(replay(row, rnd) for row in rows for _ in range(5))
+    print(f"{len(rows)} rows in {dataset}, {learned} templates learned, {count} replayed messages")
+
+    run("fallback_parser (general regex)", messages, lambda provider, text: fallback_parser(text))
+    run("provider template", messages, templates.extract)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        engine = SafeParserEngine()
+        engine.configure_parser(enable_ai_parser=False, log_failures=False)
+        sample = messages[:min(count, 2_000)]
+        run("SafeParserEngine, no provider", sample, lambda provider, text: engine.parse_signal_safe(text))
+        engine.templates = templates
+        run("SafeParserEngine, with provider", sample, lambda provider, text: engine.parse_signal_safe(text, provider))
+
+        # The first provider changes layout: template misses demote it after min_observations
+        provider = rows[0]['metadata']['provider']
+        drifted = [(provider, f"{expected['direction']} {expected['pair']} @ {expected['entry'][0]}, "
+                              f"SL: {expected['sl']}, TP: {expected['tp'][0]}", expected)
+                   for provider_, _, expected in messages if provider_ == provider][:100]
+        for index, (_, text, _) in enumerate(drifted, 1):
+            engine.parse_signal_safe(text, provider)
+            if not templates.is_active(provider):
+                break
+        stats = templates.get_statistics()["providers"][provider]
+        print(f"  layout change for {provider}: demoted={stats['demoted']} after {index} messages "
+              f"(recent failure rate {stats['recent_failure_rate']:.0%})")
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Signal simulator throughput in signals per second
+
+Simulates the same random parsed signals three ways: simulate_signal per
+signal (the old batch_simulate loop, timed on a sample), the vectorized
+batch_simulate in-process, and batch_simulate fanned out over a process pool.
+Result logging is enabled, so the per-signal path pays one log write per
+signal and the batch paths a single write.
+
+Usage: python benchmarks/bench_signal_simulator.py [signals] [workers]
+"""
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from signal_simulator import SignalSimulator
+
+SYMBOLS = ['EURUSD', 'GBPUSD', 'USDJPY', 'GOLD', 'XAGUSD', 'US30']
+TEXTS = ['', 'BUY now', 'use 0.5 lots', 'high risk', 'conservative entry']
+STRATEGIES = [
+    {'mode': 'risk_percent', 'account_balance': 10000.0},
+    {'mode': 'fixed'},
+    {'mode': 'pip_value', 'simulation_mode': 'shadow'},
+]
+
+
+def make_signals(count: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        buy = rnd.random() < 0.5
+        entry = round(rnd.uniform(1.0, 1.5), 5)
+        side = 1 if buy else -1
+        rows.append(({
+            'symbol': rnd.choice(SYMBOLS),
+            'direction': 'BUY' if buy else 'SELL',
+            'entry': [entry] if rnd.random() < 0.8 else [entry, entry - side * 0.001],
+            'stop_loss': entry - side * rnd.uniform(0.002, 0.01),
+            'take_profit': [entry + side * rnd.uniform(0.002, 0.02)],
+            'text': rnd.choice(TEXTS)
+        }, rnd.choice(STRATEGIES)))
+    return rows
+
+
+def make_simulator(tmp: str) -> SignalSimulator:
+    simulator = SignalSimulator(config_file=os.path.join(tmp, "config.json"))
+    simulator.config.log_file = os.path.join(tmp, "simulation.log")
+    return simulator
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    rows = make_signals(count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        simulator = make_simulator(tmp)
+        for name in ('SignalSimulator', 'LotsizeEngine', 'PipValueCalculator', 'EntryRangeHandler'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+        print(f"{count} signals")
+
+        sample = rows[:min(count, 2_000)]
+        started = time.perf_counter()
+        for parsed_signal, strategy_config in sample:
+            simulator.simulate_signal(parsed_signal, strategy_config)
+        elapsed = time.perf_counter() - started
+        print(f"  simulate_signal loop        {len(sample) / elapsed:>12,.0f} signals/s  "
+              f"(~{elapsed / len(sample) * count:.1f}s for all)")
+
+        started = time.perf_counter()
+        results = simulator.batch_simulate(rows)
+        elapsed = time.perf_counter() - started
+        valid = sum(result.valid for result in results)
+        print(f"  batch_simulate, 1 process   {count / elapsed:>12,.0f} signals/s  "
+              f"({elapsed:.2f}s, {valid} valid)")
+
+        if workers > 1:
+            started = time.perf_counter()
+            simulator.batch_simulate(rows, workers=workers, chunk_size=max(1, count // workers))
+            elapsed = time.perf_counter() - started
+            print(f"  batch_simulate, {workers} processes {count / elapsed:>10,.0f} signals/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the slot-based trade record layer
+
+Compares bytes per tracked position for the previous plain-dataclass layout
+(per-instance __dict__, datetime timestamps, per-position config objects)
+against the current trade_records layout, and times the shared serializer.
+
+Usage: python benchmarks/bench_trade_records.py [count]
+"""
+
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Callable, Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from trade_records import now_ts, record_to_dict, record_from_dict
+from trailing_stop import TrailingPosition, TrailingStopConfig, TrailingMethod, TradeDirection
+from ticket_tracker import TradeTicket, SignalSource, TradeStatus, TradeDirection as TicketDirection
+
+
+# Previous layout, reproduced for comparison
+@dataclass
+class LegacyTrailingStopConfig:
+    method: TrailingMethod
+    trail_distance: float
+    activation_threshold: float
+    step_size: float = 1.0
+    max_trail_distance: Optional[float] = None
+    use_breakeven_lock: bool = True
+
+
+@dataclass
+class LegacyTrailingPosition:
+    ticket: int
+    symbol: str
+    direction: TradeDirection
+    entry_price: float
+    original_sl: Optional[float]
+    current_sl: Optional[float]
+    lot_size: float
+    config: LegacyTrailingStopConfig
+    last_update: datetime
+    highest_profit_price: Optional[float] = None
+    trailing_active: bool = False
+    breakeven_locked: bool = False
+
+
+@dataclass
+class LegacySignalSource:
+    provider_id: str
+    provider_name: str
+    channel_name: Optional[str] = None
+    message_id: Optional[int] = None
+    signal_hash: Optional[str] = None
+
+
+@dataclass
+class LegacyTradeTicket:
+    ticket: int
+    symbol: str
+    direction: TicketDirection
+    entry_price: float
+    lot_size: float
+    stop_loss: Optional[float]
+    take_profit: Optional[float]
+    open_time: datetime
+    signal_source: LegacySignalSource
+    status: TradeStatus = TradeStatus.OPEN
+    close_time: Optional[datetime] = None
+    close_price: Optional[float] = None
+    profit: Optional[float] = None
+    commission: Optional[float] = None
+    swap: Optional[float] = None
+    comment: Optional[str] = None
+
+
+def bytes_per_record(factory: Callable[[int], Any], count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # The list holding the records is not part of the per-record cost
+    allocated -= sys.getsizeof(records)
+    return allocated / count
+
+
+def legacy_trailing(i: int) -> LegacyTrailingPosition:
+    config = LegacyTrailingStopConfig(method=TrailingMethod.FIXED_PIPS, trail_distance=10.0 + i % 7,
+                                      activation_threshold=5.0)
+    return LegacyTrailingPosition(ticket=i, symbol="EURUSD", direction=TradeDirection.BUY,
+                                  entry_price=1.1 + i * 1e-6, original_sl=1.09, current_sl=1.09,
+                                  lot_size=0.1, config=config, last_update=datetime.now(),
+                                  highest_profit_price=1.1 + i * 1e-6)
+
+
+def compact_trailing(i: int) -> TrailingPosition:
+    config = TrailingStopConfig(method=TrailingMethod.FIXED_PIPS, trail_distance=10.0 + i % 7,
+                                activation_threshold=5.0)
+    return TrailingPosition(ticket=i, symbol="EURUSD", direction=TradeDirection.BUY,
+                            entry_price=1.1 + i * 1e-6, original_sl=1.09, current_sl=1.09,
+                            lot_size=0.1, config=config, last_update=now_ts(),
+                            highest_profit_price=1.1 + i * 1e-6)
+
+
+def legacy_ticket(i: int) -> LegacyTradeTicket:
+    source = LegacySignalSource(provider_id="provider", provider_name="Provider", message_id=i)
+    return LegacyTradeTicket(ticket=i, symbol="EURUSD", direction=TicketDirection.BUY,
+                             entry_price=1.1 + i * 1e-6, lot_size=0.1, stop_loss=1.09,
+                             take_profit=1.12, open_time=datetime.now(), signal_source=source)
+
+
+def compact_ticket(i: int) -> TradeTicket:
+    source = SignalSource(provider_id="provider", provider_name="Provider", message_id=i)
+    return TradeTicket(ticket=i, symbol="EURUSD", direction=TicketDirection.BUY,
+                       entry_price=1.1 + i * 1e-6, lot_size=0.1, stop_loss=1.09,
+                       take_profit=1.12, open_time=now_ts(), signal_source=source)
+
+
+def bench_serializer(factory: Callable[[int], Any], count: int) -> None:
+    records = [factory(i) for i in range(count)]
+    started = time.perf_counter()
+    data = [record_to_dict(record) for record in records]
+    encoded = time.perf_counter() - started
+    started = time.perf_counter()
+    for entry in data:
+        record_from_dict(type(records[0]), entry)
+    decoded = time.perf_counter() - started
+    print(f"  serializer: {encoded / count * 1e6:.2f} us/record to_dict, "
+          f"{decoded / count * 1e6:.2f} us/record from_dict")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"Trade record memory benchmark ({count} records)")
+
+    for name, legacy, compact in [
+        ("TrailingPosition", legacy_trailing, compact_trailing),
+        ("TradeTicket", legacy_ticket, compact_ticket),
+    ]:
+        before = bytes_per_record(legacy, count)
+        after = bytes_per_record(compact, count)
+        print(f"{name}: {before:.0f} -> {after:.0f} bytes/position "
+              f"({(1 - after / before) * 100:.1f}% smaller)")
+        bench_serializer(compact, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,13 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass
 from enum import Enum
 import json
 import math
 
+from trade_records import (trade_record, Timestamp, now_ts, to_ts, ts_to_iso,
+                           records_to_list, records_from_list)
+
 
 class BreakEvenTrigger(Enum):
     FIXED_PIPS = "fixed_pips"
@@ -25,7 +27,7 @@ class TradeDirection(Enum):
     SELL = "sell"
 
 
-@dataclass
+@trade_record
 class BreakEvenConfig:
     trigger: BreakEvenTrigger
     threshold_value: float  # Pips, percentage, or minutes
@@ -34,23 +36,23 @@ class BreakEvenConfig:
     only_when_profitable: bool = True  # Only move SL when in profit
 
 
-@dataclass
+@trade_record
 class BreakEvenPosition:
     ticket: int
     symbol: str
     direction: TradeDirection
     entry_price: float
-    entry_time: datetime
+    entry_time: Timestamp
     original_sl: Optional[float]
     current_sl: Optional[float]
     lot_size: float
     config: BreakEvenConfig
-    last_update: datetime
+    last_update: Timestamp
     break_even_triggered: bool = False
     max_profit_achieved: float = 0.0  # Track maximum profit in pips
 
 
-@dataclass
+@trade_record
 class BreakEvenUpdate:
     ticket: int
     new_sl: float
@@ -60,7 +62,7 @@ class BreakEvenUpdate:
     profit_pips: float
     buffer_applied: float
     trigger_reason: str
-    timestamp: datetime
+    timestamp: Timestamp
 
 
 class BreakEvenEngine:
@@ -146,20 +148,7 @@ class BreakEvenEngine:
             with open(self.log_file, 'r') as f:
                 data = json.load(f)
                 # Convert back to dataclass objects
-                self.update_history = []
-                for entry in data:
-                    update = BreakEvenUpdate(
-                        ticket=entry['ticket'],
-                        new_sl=entry['new_sl'],
-                        old_sl=entry.get('old_sl'),
-                        entry_price=entry['entry_price'],
-                        trigger_price=entry['trigger_price'],
-                        profit_pips=entry['profit_pips'],
-                        buffer_applied=entry['buffer_applied'],
-                        trigger_reason=entry['trigger_reason'],
-                        timestamp=datetime.fromisoformat(entry['timestamp'])
-                    )
-                    self.update_history.append(update)
+                self.update_history = records_from_list(BreakEvenUpdate, data)
         except FileNotFoundError:
             self.update_history = []
             self._save_break_even_history()
@@ -167,19 +156,7 @@ class BreakEvenEngine:
     def _save_break_even_history(self):
         """Save break even history to log file"""
         try:
-            data = []
-            for update in self.update_history:
-                data.append({
-                    'ticket': update.ticket,
-                    'new_sl': update.new_sl,
-                    'old_sl': update.old_sl,
-                    'entry_price': update.entry_price,
-                    'trigger_price': update.trigger_price,
-                    'profit_pips': update.profit_pips,
-                    'buffer_applied': update.buffer_applied,
-                    'trigger_reason': update.trigger_reason,
-                    'timestamp': update.timestamp.isoformat()
-                })
+            data = records_to_list(self.update_history)
             
             with open(self.log_file, 'w') as f:
                 json.dump(data, f, indent=2)
@@ -215,12 +192,12 @@ class BreakEvenEngine:
                 symbol=symbol,
                 direction=direction,
                 entry_price=entry_price,
-                entry_time=entry_time,
+                entry_time=to_ts(entry_time),
                 original_sl=current_sl,
                 current_sl=current_sl,
                 lot_size=lot_size,
                 config=config,
-                last_update=datetime.now(),
+                last_update=now_ts(),
                 break_even_triggered=False,
                 max_profit_achieved=0.0
             )
@@ -285,7 +262,7 @@ class BreakEvenEngine:
                 return True, f"Percentage threshold reached: {profit_percentage:.2f}% >= {position.config.threshold_value}%"
         
         elif position.config.trigger == BreakEvenTrigger.TIME_BASED:
-            time_elapsed = (datetime.now() - position.entry_time).total_seconds() / 60  # minutes
+            time_elapsed = (now_ts() - position.entry_time) / 60  # minutes
             if time_elapsed >= position.config.threshold_value and profit_pips > 0:
                 return True, f"Time threshold reached: {time_elapsed:.1f} >= {position.config.threshold_value} minutes"
         
@@ -388,14 +365,14 @@ class BreakEvenEngine:
                         profit_pips=profit_pips,
                         buffer_applied=position.config.buffer_pips,
                         trigger_reason=reason,
-                        timestamp=datetime.now()
+                        timestamp=now_ts()
                     )
                     
                     self.update_history.append(update)
                     
                     # Update position
                     position.current_sl = new_sl
-                    position.last_update = datetime.now()
+                    position.last_update = now_ts()
                     position.break_even_triggered = True
                     
                     update_count += 1
@@ -477,7 +454,7 @@ class BreakEvenEngine:
             'symbol': position.symbol,
             'direction': position.direction.value,
             'entry_price': position.entry_price,
-            'entry_time': position.entry_time.isoformat(),
+            'entry_time': ts_to_iso(position.entry_time),
             'current_sl': position.current_sl,
             'original_sl': position.original_sl,
             'break_even_triggered': position.break_even_triggered,
@@ -485,7 +462,7 @@ class BreakEvenEngine:
             'threshold_value': position.config.threshold_value,
             'buffer_pips': position.config.buffer_pips,
             'max_profit_achieved': position.max_profit_achieved,
-            'last_update': position.last_update.isoformat()
+            'last_update': ts_to_iso(position.last_update)
         }
 
     def get_recent_updates(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -501,7 +478,7 @@ class BreakEvenEngine:
             'profit_pips': update.profit_pips,
             'buffer_applied': update.buffer_applied,
             'trigger_reason': update.trigger_reason,
-            'timestamp': update.timestamp.isoformat()
+            'timestamp': ts_to_iso(update.timestamp)
         } for update in recent_updates]
 
 
@@ -12,6 +12,8 @@ from enum import Enum
 import json
 import math
 
+from order_ladder import OrderLadderSubmitter, LadderLeg, LadderResult, bridge_cancel_method
+
 
 class EntryRangeType(Enum):
     LIMIT_RANGE = "limit_range"
@@ -58,6 +60,7 @@ class EntryRangePosition:
     range_completed: bool = False
     expired: bool = False
     last_update: datetime = None
+    ladder_result: Optional[LadderResult] = None  # Per-leg placement latency of the initial ladder
 
 
 @dataclass
@@ -101,6 +104,8 @@ class EntryRangeEngine:
                     'default_range_pips': 20.0,
                     'max_range_entries': 5,
                     'default_timeout_minutes': 60,
+                    'ladder_all_or_nothing': False,
+                    'ladder_deadline_seconds': 10.0,
                     'pip_values': {
                         'EURUSD': 0.0001,
                         'GBPUSD': 0.0001,
@@ -121,6 +126,8 @@ class EntryRangeEngine:
                 'default_range_pips': 20.0,
                 'max_range_entries': 5,
                 'default_timeout_minutes': 60,
+                'ladder_all_or_nothing': False,
+                'ladder_deadline_seconds': 10.0,
                 'pip_values': {
                     'EURUSD': 0.0001,
                     'GBPUSD': 0.0001,
@@ -189,6 +196,9 @@ class EntryRangeEngine:
 
     def inject_modules(self, mt5_bridge=None, market_data=None, signal_parser=None):
         """Inject module references for MT5 operations and market data"""
+        if (mt5_bridge is not None and self.config.get('ladder_all_or_nothing', False)
+                and bridge_cancel_method(mt5_bridge) is None):
+            raise ValueError("ladder_all_or_nothing requires an MT5 bridge with cancel_order")
         self.mt5_bridge = mt5_bridge
         self.market_data = market_data
         self.signal_parser = signal_parser
@@ -330,38 +340,12 @@ class EntryRangeEngine:
         # Handle single entry fallback
         if config.upper_bound == config.lower_bound:
             # Fallback to single entry at the only available price
-            single_price = config.upper_bound
-            ticket = await self._place_pending_order(
-                symbol=position.symbol,
-                direction=position.direction,
-                price=single_price,
-                lot_size=config.total_lot_size,
-                order_type="limit"
-            )
-            if ticket:
-                position.pending_orders.append(ticket)
+            await self._place_ladder(position, [(config.upper_bound, config.total_lot_size)], order_type="limit")
             return
         
         # Calculate average (midpoint) entry price
         average_price = (config.upper_bound + config.lower_bound) / 2.0
-        current_price = await self._get_current_price(position.symbol)
-        
-        # Determine order type
-        if position.direction == TradeDirection.BUY:
-            order_type = "limit" if average_price < current_price else "stop"
-        else:
-            order_type = "limit" if average_price > current_price else "stop"
-        
-        ticket = await self._place_pending_order(
-            symbol=position.symbol,
-            direction=position.direction,
-            price=average_price,
-            lot_size=config.total_lot_size,
-            order_type=order_type
-        )
-        
-        if ticket:
-            position.pending_orders.append(ticket)
+        await self._place_ladder(position, [(average_price, config.total_lot_size)])
 
     async def _place_best_entry_orders(self, position: EntryRangePosition):
         """Place orders for best entry strategy - lowest price for BUY, highest for SELL"""
@@ -373,24 +357,7 @@ class EntryRangeEngine:
         else:
             best_price = config.upper_bound  # Highest price for SELL
         
-        current_price = await self._get_current_price(position.symbol)
-        
-        # Determine order type
-        if position.direction == TradeDirection.BUY:
-            order_type = "limit" if best_price < current_price else "stop"
-        else:
-            order_type = "limit" if best_price > current_price else "stop"
-        
-        ticket = await self._place_pending_order(
-            symbol=position.symbol,
-            direction=position.direction,
-            price=best_price,
-            lot_size=config.total_lot_size,
-            order_type=order_type
-        )
-        
-        if ticket:
-            position.pending_orders.append(ticket)
+        await self._place_ladder(position, [(best_price, config.total_lot_size)])
 
     async def _place_second_entry_orders(self, position: EntryRangePosition):
         """Place orders for second entry strategy - second best price from sorted list"""
@@ -414,24 +381,7 @@ class EntryRangeEngine:
             price_levels.sort(reverse=True)  # For SELL, higher prices are better
             second_best_price = price_levels[1] if len(price_levels) > 1 else price_levels[0]
         
-        current_price = await self._get_current_price(position.symbol)
-        
-        # Determine order type
-        if position.direction == TradeDirection.BUY:
-            order_type = "limit" if second_best_price < current_price else "stop"
-        else:
-            order_type = "limit" if second_best_price > current_price else "stop"
-        
-        ticket = await self._place_pending_order(
-            symbol=position.symbol,
-            direction=position.direction,
-            price=second_best_price,
-            lot_size=config.total_lot_size,
-            order_type=order_type
-        )
-        
-        if ticket:
-            position.pending_orders.append(ticket)
+        await self._place_ladder(position, [(second_best_price, config.total_lot_size)])
 
     async def _place_scale_in_orders(self, position: EntryRangePosition):
         """Place orders for scale-in strategy"""
@@ -443,31 +393,69 @@ class EntryRangeEngine:
         
         price_step = (config.upper_bound - config.lower_bound) / (num_orders - 1)
         
+        levels = []
         for i in range(num_orders):
             price = config.lower_bound + (i * price_step)
             
             # Calculate scaled lot size
             weight = config.scale_factor ** i
             lot_size = (config.total_lot_size * weight) / total_weight
-            
+            levels.append((price, lot_size))
+        
+        await self._place_ladder(position, levels)
+
+    def _order_type_for(self, direction: TradeDirection, price: float, current_price: float) -> str:
+        """Limit below market for BUY / above for SELL, stop otherwise"""
+        if direction == TradeDirection.BUY:
+            return "limit" if price < current_price else "stop"
+        return "limit" if price > current_price else "stop"
+
+    async def _place_ladder(self, position: EntryRangePosition, levels: List[Tuple[float, float]],
+                            order_type: Optional[str] = None) -> LadderResult:
+        """Submit all (price, lot_size) levels of a range at once and track the placed tickets"""
+        if order_type is None:
+            # One quote for the whole ladder so every leg is classified against the same market
             current_price = await self._get_current_price(position.symbol)
-            
-            # Determine order type
-            if position.direction == TradeDirection.BUY:
-                order_type = "limit" if price < current_price else "stop"
-            else:
-                order_type = "limit" if price > current_price else "stop"
-            
-            ticket = await self._place_pending_order(
-                symbol=position.symbol,
-                direction=position.direction,
-                price=price,
-                lot_size=lot_size,
-                order_type=order_type
-            )
-            
-            if ticket:
-                position.pending_orders.append(ticket)
+        
+        legs = []
+        for i, (price, lot_size) in enumerate(levels):
+            leg_order_type = order_type or self._order_type_for(position.direction, price, current_price)
+            params = {
+                'symbol': position.symbol,
+                'direction': position.direction,
+                'price': price,
+                'lot_size': lot_size,
+                'order_type': leg_order_type
+            }
+            legs.append(LadderLeg(
+                leg_id=f"{position.signal_id}_{i}",
+                submit=lambda params=params: self._submit_ladder_leg(**params),
+                metadata={'symbol': position.symbol, 'direction': position.direction.value,
+                          'price': price, 'lot_size': lot_size, 'order_type': leg_order_type}
+            ))
+        
+        cancel_order = bridge_cancel_method(self.mt5_bridge)
+        submitter = OrderLadderSubmitter(cancel_order=cancel_order, logger=self.logger)
+        result = await submitter.submit(
+            legs,
+            # Without a bridge no leg can be placed, so there is nothing to roll back
+            all_or_nothing=self.config.get('ladder_all_or_nothing', False) and cancel_order is not None,
+            deadline_seconds=self.config.get('ladder_deadline_seconds', 10.0)
+        )
+        
+        for leg in result.placed_legs:
+            if leg.ticket:
+                position.pending_orders.append(leg.ticket)
+        position.ladder_result = result
+        
+        self.logger.info(f"Entry range ladder for signal {position.signal_id}: "
+                         f"{len(result.placed_legs)}/{len(legs)} legs placed in {result.total_latency_ms:.1f}ms")
+        return result
+
+    async def _submit_ladder_leg(self, **params) -> Dict[str, Any]:
+        """Adapt _place_pending_order to the ladder response format"""
+        ticket = await self._place_pending_order(**params)
+        return {'success': ticket is not None, 'ticket': ticket}
 
     async def _place_pending_order(self, symbol: str, direction: TradeDirection, price: float,
                                   lot_size: float, order_type: str) -> Optional[int]:
@@ -590,10 +578,11 @@ class EntryRangeEngine:
 
     async def _cancel_remaining_orders(self, position: EntryRangePosition):
         """Cancel remaining pending orders when range is completed"""
+        cancel_order = bridge_cancel_method(self.mt5_bridge)
         for ticket in position.pending_orders[:]:  # Copy list to avoid modification during iteration
             try:
-                if self.mt5_bridge and hasattr(self.mt5_bridge, 'cancel_order'):
-                    result = await self.mt5_bridge.cancel_order(ticket)
+                if cancel_order:
+                    result = await cancel_order(ticket)
                     if result.get('success'):
                         position.pending_orders.remove(ticket)
                         self.logger.info(f"Cancelled pending order {ticket}")
@@ -692,7 +681,8 @@ class EntryRangeEngine:
             'range_completed': position.range_completed,
             'expired': position.expired,
             'created_at': position.created_at.isoformat(),
-            'last_update': position.last_update.isoformat() if position.last_update else None
+            'last_update': position.last_update.isoformat() if position.last_update else None,
+            'ladder': position.ladder_result.to_dict() if position.ladder_result else None
         }
 
     def get_recent_executions(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -14,6 +14,10 @@ from enum import Enum
 import os
 import math
 
+import numpy as np
+
+from order_ladder import OrderLadderSubmitter, LadderLeg, LegStatus, bridge_cancel_method
+
 class GridDirection(Enum):
     BUY_GRID = "buy_grid"
     SELL_GRID = "sell_grid"
@@ -41,6 +45,7 @@ class GridLevel:
     order_ticket: Optional[int] = None
     fill_time: Optional[datetime] = None
     fill_price: Optional[float] = None
+    placement_latency_ms: Optional[float] = None
 
 @dataclass
 class GridConfiguration:
@@ -135,6 +140,7 @@ class GridStrategy:
         self.mt5_bridge = None
         self.margin_checker = None
         self.spread_checker = None
+        self.price_store = None
         
         # Background monitoring
         self.monitoring_task = None
@@ -209,6 +215,10 @@ class GridStrategy:
             "max_risk_percentage": 10.0,
             "enable_recovery_mode": True,
             "recovery_multiplier": 1.2,
+            "ladder_all_or_nothing": False,
+            "ladder_deadline_seconds": 10.0,
+            "price_store_dir": None,
+            "volatility_timeframe": "H1",
             "symbol_configs": {}
         }
         
@@ -282,11 +292,23 @@ class GridStrategy:
         except Exception as e:
             self.logger.error(f"Error saving grid data: {e}")
             
-    def set_dependencies(self, mt5_bridge=None, margin_checker=None, spread_checker=None):
+    def set_dependencies(self, mt5_bridge=None, margin_checker=None, spread_checker=None, price_store=None):
         """Set module dependencies"""
+        if (mt5_bridge is not None and self.config.get("ladder_all_or_nothing", False)
+                and bridge_cancel_method(mt5_bridge) is None):
+            raise ValueError("ladder_all_or_nothing requires an MT5 bridge with cancel_order")
         self.mt5_bridge = mt5_bridge
         self.margin_checker = margin_checker
         self.spread_checker = spread_checker
+        if price_store is not None:
+            self.price_store = price_store
+            
+    def _get_price_store(self):
+        """Shared bar store from config (price_store_dir), opened on first use"""
+        if self.price_store is None and self.config.get("price_store_dir"):
+            from backtest.bar_store import get_bar_store
+            self.price_store = get_bar_store(self.config["price_store_dir"])
+        return self.price_store
         
     def _get_pip_value(self, symbol: str) -> float:
         """Get pip value for symbol"""
@@ -334,10 +356,24 @@ class GridStrategy:
             return None
             
     def _calculate_volatility(self, symbol: str, periods: int = 20) -> float:
-        """Calculate market volatility for adaptive grid spacing"""
+        """
+        Calculate market volatility for adaptive grid spacing: the average true
+        range of the last `periods` bars relative to that of the last
+        10 x `periods` bars (1.0 = normal), from the price store when it holds
+        the symbol
+        """
         try:
-            # Simplified volatility calculation
-            # In production, you'd use historical price data
+            store = self._get_price_store()
+            if store is not None:
+                bars = store.latest(symbol, self.config.get("volatility_timeframe", "H1"), periods * 10 + 1)
+                if len(bars) > periods + 1:
+                    prev_close = bars.close[:-1]
+                    true_range = np.maximum(bars.high[1:], prev_close) - np.minimum(bars.low[1:], prev_close)
+                    baseline = float(true_range.mean())
+                    if baseline > 0:
+                        return float(true_range[-periods:].mean()) / baseline
+                        
+            # Static estimates when no history is stored
             if symbol == "XAUUSD":
                 return 2.5  # High volatility
             elif symbol in ["EURUSD", "GBPUSD"]:
@@ -494,6 +530,35 @@ class GridStrategy:
             self.logger.error(f"Error placing grid order {level.level_id}: {e}")
             return False
             
+    async def _place_grid_ladder(self, levels: List[GridLevel], symbol: str) -> int:
+        """Place all grid levels concurrently, returns the number of live orders"""
+        async def place_level(level: GridLevel) -> Dict[str, Any]:
+            success = await self._place_grid_order(level, symbol)
+            return {'success': success, 'ticket': level.order_ticket}
+            
+        legs = [
+            LadderLeg(leg_id=level.level_id, submit=lambda level=level: place_level(level))
+            for level in levels
+        ]
+        cancel_order = bridge_cancel_method(self.mt5_bridge)
+        submitter = OrderLadderSubmitter(cancel_order=cancel_order, logger=self.logger)
+        ladder = await submitter.submit(
+            legs,
+            # Without a bridge no leg can be placed, so there is nothing to roll back
+            all_or_nothing=self.config.get("ladder_all_or_nothing", False) and cancel_order is not None,
+            deadline_seconds=self.config.get("ladder_deadline_seconds", 10.0)
+        )
+        
+        for level, leg in zip(levels, ladder.legs):
+            level.placement_latency_ms = leg.latency_ms
+            if leg.status != LegStatus.PLACED:
+                # Timed out or rolled back legs are not live grid orders
+                level.order_ticket = None
+                
+        self.logger.info(f"Grid ladder for {symbol}: {len(ladder.placed_legs)}/{len(levels)} orders "
+                         f"live in {ladder.total_latency_ms:.1f}ms")
+        return len(ladder.placed_legs)
+            
     async def create_grid(self, symbol: str, direction: GridDirection, center_price: Optional[float] = None,
                          levels_above: int = 5, levels_below: int = 5, base_volume: float = 0.01,
                          custom_spacing: Optional[float] = None) -> Optional[str]:
@@ -558,13 +623,9 @@ class GridStrategy:
                 created_time=datetime.now()
             )
             
-            # Place initial grid orders
-            successful_orders = 0
-            for level in levels:
-                success = await self._place_grid_order(level, symbol)
-                if success:
-                    successful_orders += 1
-                    grid_instance.active_orders += 1
+            # Place initial grid orders as one concurrent ladder
+            successful_orders = await self._place_grid_ladder(levels, symbol)
+            grid_instance.active_orders += successful_orders
                     
             if successful_orders == 0:
                 self.logger.error(f"Failed to place any grid orders for {symbol}")
@@ -600,10 +661,11 @@ class GridStrategy:
             
             if close_positions and self.mt5_bridge:
                 # Cancel pending orders
+                cancel_order = bridge_cancel_method(self.mt5_bridge)
                 for level in grid.levels:
-                    if level.order_ticket and not level.is_filled:
+                    if level.order_ticket and not level.is_filled and cancel_order:
                         try:
-                            cancel_result = await self.mt5_bridge.cancel_order(level.order_ticket)
+                            cancel_result = await cancel_order(level.order_ticket)
                             if cancel_result.get('success'):
                                 self.logger.info(f"Cancelled order {level.order_ticket} for level {level.level_id}")
                         except Exception as e:
@@ -768,7 +830,8 @@ class GridStrategy:
                     "is_filled": level.is_filled,
                     "order_ticket": level.order_ticket,
                     "fill_time": level.fill_time.isoformat() if level.fill_time else None,
-                    "fill_price": level.fill_price
+                    "fill_price": level.fill_price,
+                    "placement_latency_ms": level.placement_latency_ms
                 }
                 for level in grid.levels
             ],
@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
 
+import numpy as np
+
 try:
     from pip_value_calculator import get_pip_value
 except ImportError:
@@ -326,17 +328,25 @@ class LotsizeEngine:
 
     def _extract_risk_multiplier(self, signal_text: str) -> float:
         """Extract risk multiplier from signal text keywords"""
-        if not signal_text:
+        multiplier = self._match_risk_multiplier(signal_text)
+        if multiplier is None:
             return 1.0
         
+        self.extraction_stats['risk_detected'] += 1
+        return multiplier
+
+    def _match_risk_multiplier(self, signal_text: str) -> Optional[float]:
+        """Multiplier of the first risk keyword in the text, None if there is none"""
+        if not signal_text:
+            return None
+        
         signal_text = signal_text.lower()
         
         for pattern, multiplier in self.risk_patterns.items():
             if re.search(pattern, signal_text, re.IGNORECASE):
-                self.extraction_stats['risk_detected'] += 1
                 return multiplier
         
-        return 1.0
+        return None
 
     def _get_pip_value(self, symbol: str) -> float:
         """Get pip value for symbol in USD"""
@@ -396,6 +406,88 @@ class LotsizeEngine:
         else:
             return 0.1 * risk_multiplier
 
+    def calculate_lots(self, signal_texts: List[str], risk_modes: List[str],
+                       account_balances: np.ndarray, symbols: List[str],
+                       stop_loss_pips: np.ndarray) -> np.ndarray:
+        """
+        Vectorized extract_lotsize: calculated lots for many signals at once
+        
+        Text scans run once per distinct text and pip values once per symbol;
+        the per-mode formulas of _calculate_lot_by_mode and the lot constraints
+        are applied over arrays. stop_loss_pips may hold NaN for "no stop loss".
+        """
+        count = len(signal_texts)
+        account_balances = np.asarray(account_balances, dtype=np.float64)
+        sl_pips = np.asarray(stop_loss_pips, dtype=np.float64)
+        
+        mode_cache: Dict[str, RiskMode] = {}
+        text_cache: Dict[str, Tuple[float, Optional[float]]] = {}
+        pip_cache: Dict[str, float] = {}
+        mode_codes = np.empty(count, dtype=np.int8)
+        extracted = np.empty(count)
+        matched = np.empty(count)
+        pip_values = np.empty(count)
+        modes = list(RiskMode)
+        
+        for i, (text, risk_mode, symbol) in enumerate(zip(signal_texts, risk_modes, symbols)):
+            mode = mode_cache.get(risk_mode)
+            if mode is None:
+                try:
+                    mode = RiskMode(risk_mode.lower())
+                except ValueError:
+                    mode = self.config.default_mode
+                mode_cache[risk_mode] = mode
+            mode_codes[i] = modes.index(mode)
+            
+            scanned = text_cache.get(text)
+            if scanned is None:
+                lot = self._extract_lot_from_text(text)
+                scanned = text_cache[text] = (
+                    lot['value'] if lot and lot['type'] == 'fixed_lot' else np.nan,
+                    self._match_risk_multiplier(text)
+                )
+            extracted[i] = scanned[0]
+            matched[i] = np.nan if scanned[1] is None else scanned[1]
+            
+            pip_value = pip_cache.get(symbol)
+            if pip_value is None:
+                pip_value = pip_cache[symbol] = self._get_pip_value(symbol)
+            pip_values[i] = pip_value
+        
+        multipliers = np.where(np.isnan(matched), 1.0, matched)
+        has_sl = sl_pips > 0
+        sl_value = np.where(has_sl, sl_pips, 1.0) * pip_values
+        
+        risk_amount = account_balances * (self.config.default_risk_percent / 100) * multipliers
+        balance_amount = account_balances * 0.01 * multipliers
+        cash_amount = 100 * multipliers
+        by_mode = np.select(
+            [mode_codes == modes.index(RiskMode.RISK_PERCENT),
+             mode_codes == modes.index(RiskMode.BALANCE_PERCENT),
+             mode_codes == modes.index(RiskMode.FIXED_CASH),
+             mode_codes == modes.index(RiskMode.PIP_VALUE)],
+            [np.where(has_sl, risk_amount / sl_value, account_balances * 0.0001 * multipliers),
+             np.where(has_sl, balance_amount / sl_value, balance_amount / 1000),
+             np.where(has_sl, cash_amount / sl_value, cash_amount / 1000),
+             10 * multipliers / pip_values],
+            0.1 * multipliers
+        )
+        has_lot = ~np.isnan(extracted)
+        lots = np.where(has_lot, extracted * multipliers, by_mode)
+        # Constrained per element with the scalar helper: np.round rounds the scaled
+        # value half-to-even and would disagree with round() on ties such as 0.025
+        lots = np.fromiter((self._apply_lot_constraints(lot) for lot in lots.tolist()),
+                           dtype=np.float64, count=count)
+        
+        self.extraction_stats['total_processed'] += count
+        self.extraction_stats['lots_extracted'] += int(has_lot.sum())
+        self.extraction_stats['risk_detected'] += int((~np.isnan(matched)).sum())
+        for code, used in enumerate(np.bincount(mode_codes, minlength=len(modes)).tolist()):
+            self.extraction_stats['mode_usage'][modes[code].value] += used
+        
+        self.logger.info(f"Calculated {count} lot sizes for {len(pip_cache)} symbols")
+        return lots
+
     def _apply_lot_constraints(self, lot_size: float) -> float:
         """Apply minimum/maximum lot size constraints"""
         constrained = max(self.config.min_lot_size, 
@@ -508,6 +600,15 @@ class LotsizeEngine:
             return False
 
 
+# Strategy config mode -> engine mode
+STRATEGY_MODE_MAPPING = {
+    "fixed": "fixed_lot",
+    "risk_percent": "risk_percent", 
+    "cash_per_trade": "fixed_cash",
+    "pip_value": "pip_value",
+    "text_override": "fixed_lot"  # Will extract from text
+}
+
 def calculate_lot(strategy_config: dict, signal_data: dict, account_balance: float, 
                  sl_pips: float, symbol: str) -> float:
     """
@@ -531,17 +632,8 @@ def calculate_lot(strategy_config: dict, signal_data: dict, account_balance: flo
     # Create engine instance
     engine = LotsizeEngine()
     
-    # Map strategy config mode to engine mode
-    mode_mapping = {
-        "fixed": "fixed_lot",
-        "risk_percent": "risk_percent", 
-        "cash_per_trade": "fixed_cash",
-        "pip_value": "pip_value",
-        "text_override": "fixed_lot"  # Will extract from text
-    }
-    
     # Get mode from strategy config
-    mode = mode_mapping.get(strategy_config.get('mode', 'risk_percent'), 'risk_percent')
+    mode = STRATEGY_MODE_MAPPING.get(strategy_config.get('mode', 'risk_percent'), 'risk_percent')
     
     # Get signal text
     signal_text = signal_data.get('text', '')
@@ -557,6 +649,29 @@ def calculate_lot(strategy_config: dict, signal_data: dict, account_balance: flo
     
     return result.calculated_lot
 
+def calculate_lots(strategy_configs: List[dict], signals: List[dict], account_balances: np.ndarray,
+                   sl_pips: np.ndarray, symbols: List[str]) -> np.ndarray:
+    """
+    Batch calculate_lot: one engine and one vectorized pass for many signals
+    
+    Args:
+        strategy_configs: Strategy configuration per signal (may repeat the same dict)
+        signals: Signal data per signal
+        account_balances: Account balance per signal
+        sl_pips: Stop loss distance in pips per signal
+        symbols: Trading symbol per signal
+        
+    Returns:
+        Array of calculated lot sizes
+    """
+    engine = LotsizeEngine()
+    
+    modes = [STRATEGY_MODE_MAPPING.get(config.get('mode', 'risk_percent'), 'risk_percent')
+             for config in strategy_configs]
+    texts = [signal.get('text', '') for signal in signals]
+    
+    return engine.calculate_lots(texts, modes, account_balances, symbols, sl_pips)
+
 
 # Legacy compatibility function for strategy_runtime integration
 def extract_lotsize(signal_text: str, risk_mode: str = "risk_percent", 
@@ -1,15 +1,24 @@
 """
 Multi-Signal Handler Engine for SignalOS
 Handles multiple concurrent signals for the same symbol with prioritization, merging, and conflict resolution
+
+Signals are processed per symbol as events: the first signal for a symbol opens
+an aggregation window, and the symbol is processed as soon as that window
+closes. Expiry and conflict state are kept incrementally per symbol, so a
+window without conflicts never rebuilds the direction groups.
 """
 
 import json
 import time
+import math
+import heapq
+import itertools
 import logging
 import asyncio
+from collections import Counter, deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import os
 import hashlib
@@ -111,15 +120,91 @@ class ConflictGroup:
     resolved: bool = False
     resolution_result: Optional[ProcessedSignal] = None
 
+@dataclass
+class SymbolBook:
+    """Pending signals for one symbol, with expiry and conflict state kept as they arrive"""
+    tolerance_price: float
+    signals: Dict[int, IncomingSignal] = field(default_factory=dict)  # sequence -> signal, arrival order
+    arrived_at: Dict[int, float] = field(default_factory=dict)  # sequence -> monotonic arrival time
+    expiry_heap: List[Tuple[float, int]] = field(default_factory=list)
+    direction_counts: Counter = field(default_factory=Counter)
+    price_buckets: Dict[SignalDirection, Counter] = field(
+        default_factory=lambda: {SignalDirection.BUY: Counter(), SignalDirection.SELL: Counter()})
+    timer: Optional[asyncio.TimerHandle] = None
+    
+    def _bucket(self, price: float) -> int:
+        return math.floor(price / self.tolerance_price)
+    
+    def add(self, sequence: int, signal: IncomingSignal, arrived_at: float):
+        self.signals[sequence] = signal
+        self.arrived_at[sequence] = arrived_at
+        if signal.expiry_time:
+            heapq.heappush(self.expiry_heap, (signal.expiry_time.timestamp(), sequence))
+        self.direction_counts[signal.direction] += 1
+        if signal.entry_price and signal.direction in self.price_buckets and self.tolerance_price > 0:
+            self.price_buckets[signal.direction][self._bucket(signal.entry_price)] += 1
+            
+    def remove(self, sequence: int) -> Tuple[IncomingSignal, float]:
+        """Remove a pending signal; its expiry heap entry is dropped when it surfaces"""
+        signal = self.signals.pop(sequence)
+        arrived_at = self.arrived_at.pop(sequence)
+        self.direction_counts[signal.direction] -= 1
+        if signal.entry_price and signal.direction in self.price_buckets and self.tolerance_price > 0:
+            buckets = self.price_buckets[signal.direction]
+            bucket = self._bucket(signal.entry_price)
+            buckets[bucket] -= 1
+            if not buckets[bucket]:
+                del buckets[bucket]
+        return signal, arrived_at
+        
+    def pop_expired(self, now: float) -> List[IncomingSignal]:
+        """Remove and return the signals whose expiry time has passed"""
+        expired = []
+        while self.expiry_heap and self.expiry_heap[0][0] < now:
+            _, sequence = heapq.heappop(self.expiry_heap)
+            if sequence in self.signals:
+                expired.append(self.remove(sequence)[0])
+        if not self.signals:
+            self.expiry_heap.clear()
+        return expired
+        
+    def may_conflict(self) -> bool:
+        """False when the pending signals certainly have no conflict
+        
+        Prices are bucketed by the merge tolerance. An entry price conflict
+        needs a spread of more than twice the tolerance, which is impossible
+        while the prices of one direction span fewer than three buckets.
+        """
+        if len(self.signals) < 2:
+            return False
+        if self.direction_counts[SignalDirection.BUY] and self.direction_counts[SignalDirection.SELL]:
+            return True
+        for direction, buckets in self.price_buckets.items():
+            if self.direction_counts[direction] > 1:
+                if self.tolerance_price <= 0:
+                    return True
+                if len(buckets) > 1 and max(buckets) - min(buckets) >= 2:
+                    return True
+        return False
+        
+    def sequences_of(self, signals: List[IncomingSignal]) -> List[int]:
+        """Sequence numbers of those of signals still pending"""
+        by_identity = {id(signal): sequence for sequence, signal in self.signals.items()}
+        return [by_identity[id(signal)] for signal in signals if id(signal) in by_identity]
+
+# Recent per-signal added latencies kept for percentiles in get_statistics
+LATENCY_SAMPLES = 1000
+
 class MultiSignalHandler:
     def __init__(self, config_path: str = "config.json", log_path: str = "logs/multi_signal_handler.log"):
         self.config_path = config_path
         self.log_path = log_path
-        self.config = self._load_config()
         self.logger = self._setup_logger()
+        self.config = self._load_config()
         
         # Signal processing
-        self.pending_signals: Dict[str, List[IncomingSignal]] = {}  # symbol -> signals
+        self.symbol_books: Dict[str, SymbolBook] = {}
+        self._sequence = itertools.count()
         self.processed_signals: List[ProcessedSignal] = []
         self.conflict_groups: List[ConflictGroup] = []
         
@@ -136,9 +221,16 @@ class MultiSignalHandler:
             "rejected_signals": 0
         }
         
+        # Time from a signal's arrival until it leaves the pending set processed
+        self.latency_samples = deque(maxlen=LATENCY_SAMPLES)
+        self.latency_total = 0.0
+        self.latency_count = 0
+        self.latency_max = 0.0
+        
         # Background processing
         self.processing_task = None
         self.is_processing = False
+        self.data_dirty = False
         
         # Load existing data
         self._load_signal_data()
@@ -154,6 +246,7 @@ class MultiSignalHandler:
                 config["multi_signal_handler"] = {
                     "enabled": True,
                     "processing_interval": 2.0,
+                    "aggregation_window_seconds": 0.25,
                     "signal_expiry_minutes": 30,
                     "max_signals_per_symbol": 10,
                     "conflict_resolution_method": "highest_priority",
@@ -200,6 +293,7 @@ class MultiSignalHandler:
         return {
             "enabled": True,
             "processing_interval": 2.0,
+            "aggregation_window_seconds": 0.25,
             "signal_expiry_minutes": 30,
             "max_signals_per_symbol": 10,
             "conflict_resolution_method": "highest_priority",
@@ -497,6 +591,15 @@ class MultiSignalHandler:
                 
         return merged_signal
         
+    def _conflict_tolerance(self, symbol: str) -> float:
+        """Merge tolerance as a price; same-direction entries over twice this apart conflict"""
+        symbol_settings = self.config.get("symbol_settings", {}).get(symbol, {})
+        tolerance_pips = symbol_settings.get("merge_tolerance_pips", self.config.get("merge_tolerance_pips", 5.0))
+        
+        # Simplified pip calculation
+        pip_value = 0.00001 if "JPY" not in symbol else 0.001
+        return tolerance_pips * pip_value
+        
     def _identify_conflicts(self, signals: List[IncomingSignal]) -> List[ConflictGroup]:
         """Identify conflicts among signals for the same symbol"""
         conflicts = []
@@ -526,12 +629,7 @@ class MultiSignalHandler:
                 entry_prices = [sig.entry_price for sig in direction_signals if sig.entry_price]
                 if len(entry_prices) > 1:
                     price_range = max(entry_prices) - min(entry_prices)
-                    symbol_settings = self.config.get("symbol_settings", {}).get(signals[0].symbol, {})
-                    tolerance_pips = symbol_settings.get("merge_tolerance_pips", self.config.get("merge_tolerance_pips", 5.0))
-                    
-                    # Simplified pip calculation
-                    pip_value = 0.00001 if "JPY" not in signals[0].symbol else 0.001
-                    tolerance_price = tolerance_pips * pip_value
+                    tolerance_price = self._conflict_tolerance(signals[0].symbol)
                     
                     if price_range > tolerance_price * 2:  # Significant difference
                         conflict = ConflictGroup(
@@ -650,20 +748,20 @@ class MultiSignalHandler:
                 return False
                 
             # Add to pending signals
-            if signal.symbol not in self.pending_signals:
-                self.pending_signals[signal.symbol] = []
+            book = self.symbol_books.get(signal.symbol)
+            if book is None:
+                book = self.symbol_books[signal.symbol] = SymbolBook(self._conflict_tolerance(signal.symbol))
                 
             # Check maximum signals per symbol
             symbol_settings = self.config.get("symbol_settings", {}).get(signal.symbol, {})
             max_signals = symbol_settings.get("max_concurrent_signals", self.config.get("max_signals_per_symbol", 10))
             
-            if len(self.pending_signals[signal.symbol]) >= max_signals:
+            if len(book.signals) >= max_signals:
                 # Remove oldest signal
-                oldest_signal = min(self.pending_signals[signal.symbol], key=lambda s: s.timestamp)
-                self.pending_signals[signal.symbol].remove(oldest_signal)
+                oldest_signal, _ = book.remove(next(iter(book.signals)))
                 self.logger.info(f"Removed oldest signal {oldest_signal.signal_id} due to limit")
                 
-            self.pending_signals[signal.symbol].append(signal)
+            book.add(next(self._sequence), signal, time.monotonic())
             
             # Update provider profile
             self._update_provider_profile(signal)
@@ -674,6 +772,7 @@ class MultiSignalHandler:
             # Start processing if not already running
             if not self.is_processing:
                 self.start_processing()
+            self._open_window(signal.symbol, book)
                 
             self.logger.info(f"Added signal {signal.signal_id} for {signal.symbol} from {signal.provider_id}")
             return True
@@ -682,140 +781,175 @@ class MultiSignalHandler:
             self.logger.error(f"Error adding signal: {e}")
             return False
             
-    async def _process_pending_signals(self):
-        """Process all pending signals"""
-        while self.is_processing:
-            try:
-                if not self.pending_signals:
-                    await asyncio.sleep(self.config.get("processing_interval", 2.0))
-                    continue
+    def _open_window(self, symbol: str, book: SymbolBook):
+        """Schedule the symbol's processing for when its aggregation window closes"""
+        if book.timer is not None or not self.is_processing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Picked up by start_processing once a loop is running
+            return
+        book.timer = loop.call_later(self.config.get("aggregation_window_seconds", 0.25),
+                                     self._close_window, symbol)
+        
+    def _close_window(self, symbol: str):
+        """Process a symbol whose aggregation window has closed"""
+        book = self.symbol_books.get(symbol)
+        if book is None:
+            return
+        book.timer = None
+        try:
+            self._process_symbol(symbol, book)
+        except Exception as e:
+            # Left for the housekeeping loop to retry
+            self.logger.error(f"Error processing signals for {symbol}: {e}")
+            return
+            
+        if book.signals:
+            # Signals left out of a resolved conflict get a window of their own
+            self._open_window(symbol, book)
+        elif self.symbol_books.get(symbol) is book:
+            del self.symbol_books[symbol]
+            
+    def _release(self, book: SymbolBook, signals: List[IncomingSignal]):
+        """Take processed signals off the pending set and record how long they waited"""
+        now = time.monotonic()
+        for sequence in book.sequences_of(signals):
+            _, arrived_at = book.remove(sequence)
+            latency = now - arrived_at
+            self.latency_samples.append(latency)
+            self.latency_total += latency
+            self.latency_count += 1
+            self.latency_max = max(self.latency_max, latency)
+        self.data_dirty = True
+        
+    def _process_symbol(self, symbol: str, book: SymbolBook):
+        """Expire, resolve conflicts, merge and process one symbol's pending signals"""
+        # Remove expired signals
+        for expired in book.pop_expired(time.time()):
+            self.processing_stats["expired_signals"] += 1
+            self.data_dirty = True
+            self.logger.info(f"Signal {expired.signal_id} expired")
+            
+        if not book.signals:
+            return
+            
+        signals = list(book.signals.values())
+        
+        # Check for conflicts; the book rules most windows out without grouping
+        conflicts = self._identify_conflicts(signals) if book.may_conflict() else []
+        self.conflict_groups.extend(conflicts)
+        
+        if conflicts:
+            # Resolve conflicts
+            for conflict in conflicts:
+                if not conflict.resolved:
+                    processed = self._resolve_conflict(conflict)
+                    self.processed_signals.append(processed)
+                    
+                    # Remove processed signals from pending
+                    self._release(book, conflict.signals)
+                    
+                    self.processing_stats["conflicted_signals"] += len(conflict.signals)
+                    self.processing_stats["processed_signals"] += 1
+                    
+                    self.logger.info(f"Resolved conflict for {symbol}: {processed.processing_reason}")
+                    
+        else:
+            # No conflicts, check for merging opportunities
+            if self.config.get("enable_signal_merging", True) and len(signals) > 1:
+                # Group compatible signals
+                compatible_groups = []
+                remaining_signals = signals.copy()
+                
+                while remaining_signals:
+                    current_signal = remaining_signals.pop(0)
+                    compatible_group = [current_signal]
+                    
+                    for other_signal in remaining_signals.copy():
+                        if self._check_signal_compatibility(current_signal, other_signal):
+                            compatible_group.append(other_signal)
+                            remaining_signals.remove(other_signal)
+                            
+                    compatible_groups.append(compatible_group)
                     
-                # Process each symbol's signals
-                for symbol, signals in list(self.pending_signals.items()):
-                    if not signals:
-                        continue
+                # Process each compatible group
+                for group in compatible_groups:
+                    if len(group) > 1:
+                        # Merge compatible signals
+                        merged_signal = self._merge_compatible_signals(group)
+                        processed = ProcessedSignal(
+                            original_signals=group,
+                            final_signal=merged_signal,
+                            status=SignalStatus.MERGED,
+                            processing_reason=f"Merged {len(group)} compatible signals",
+                            conflicts_resolved=[],
+                            merged_signals=[sig.signal_id for sig in group],
+                            processing_time=datetime.now(),
+                            execution_priority=self._calculate_signal_score(merged_signal)
+                        )
                         
-                    # Remove expired signals
-                    current_time = datetime.now()
-                    expired_signals = [sig for sig in signals if sig.expiry_time and current_time > sig.expiry_time]
-                    for expired in expired_signals:
-                        signals.remove(expired)
-                        self.processing_stats["expired_signals"] += 1
-                        self.logger.info(f"Signal {expired.signal_id} expired")
+                        self.processed_signals.append(processed)
+                        self.processing_stats["merged_signals"] += len(group)
+                        self.processing_stats["processed_signals"] += 1
                         
-                    if not signals:
-                        del self.pending_signals[symbol]
-                        continue
+                        self.logger.info(f"Merged {len(group)} signals for {symbol}")
                         
-                    # Check for conflicts
-                    conflicts = self._identify_conflicts(signals)
-                    self.conflict_groups.extend(conflicts)
-                    
-                    if conflicts:
-                        # Resolve conflicts
-                        for conflict in conflicts:
-                            if not conflict.resolved:
-                                processed = self._resolve_conflict(conflict)
-                                self.processed_signals.append(processed)
-                                
-                                # Remove processed signals from pending
-                                for sig in conflict.signals:
-                                    if sig in signals:
-                                        signals.remove(sig)
-                                        
-                                self.processing_stats["conflicted_signals"] += len(conflict.signals)
-                                self.processing_stats["processed_signals"] += 1
-                                
-                                self.logger.info(f"Resolved conflict for {symbol}: {processed.processing_reason}")
-                                
                     else:
-                        # No conflicts, check for merging opportunities
-                        if self.config.get("enable_signal_merging", True) and len(signals) > 1:
-                            # Group compatible signals
-                            compatible_groups = []
-                            remaining_signals = signals.copy()
-                            
-                            while remaining_signals:
-                                current_signal = remaining_signals.pop(0)
-                                compatible_group = [current_signal]
-                                
-                                for other_signal in remaining_signals.copy():
-                                    if self._check_signal_compatibility(current_signal, other_signal):
-                                        compatible_group.append(other_signal)
-                                        remaining_signals.remove(other_signal)
-                                        
-                                compatible_groups.append(compatible_group)
-                                
-                            # Process each compatible group
-                            for group in compatible_groups:
-                                if len(group) > 1:
-                                    # Merge compatible signals
-                                    merged_signal = self._merge_compatible_signals(group)
-                                    processed = ProcessedSignal(
-                                        original_signals=group,
-                                        final_signal=merged_signal,
-                                        status=SignalStatus.MERGED,
-                                        processing_reason=f"Merged {len(group)} compatible signals",
-                                        conflicts_resolved=[],
-                                        merged_signals=[sig.signal_id for sig in group],
-                                        processing_time=datetime.now(),
-                                        execution_priority=self._calculate_signal_score(merged_signal)
-                                    )
-                                    
-                                    self.processed_signals.append(processed)
-                                    self.processing_stats["merged_signals"] += len(group)
-                                    self.processing_stats["processed_signals"] += 1
-                                    
-                                    self.logger.info(f"Merged {len(group)} signals for {symbol}")
-                                    
-                                else:
-                                    # Single signal, process as-is
-                                    single_signal = group[0]
-                                    processed = ProcessedSignal(
-                                        original_signals=[single_signal],
-                                        final_signal=single_signal,
-                                        status=SignalStatus.PROCESSED,
-                                        processing_reason="Single signal processed",
-                                        conflicts_resolved=[],
-                                        merged_signals=[],
-                                        processing_time=datetime.now(),
-                                        execution_priority=self._calculate_signal_score(single_signal)
-                                    )
-                                    
-                                    self.processed_signals.append(processed)
-                                    self.processing_stats["processed_signals"] += 1
-                                    
-                            # Clear processed signals from pending
-                            self.pending_signals[symbol] = []
-                            
-                        else:
-                            # Process signals individually
-                            for signal in signals:
-                                processed = ProcessedSignal(
-                                    original_signals=[signal],
-                                    final_signal=signal,
-                                    status=SignalStatus.PROCESSED,
-                                    processing_reason="Individual signal processed",
-                                    conflicts_resolved=[],
-                                    merged_signals=[],
-                                    processing_time=datetime.now(),
-                                    execution_priority=self._calculate_signal_score(signal)
-                                )
-                                
-                                self.processed_signals.append(processed)
-                                self.processing_stats["processed_signals"] += 1
-                                
-                            self.pending_signals[symbol] = []
-                            
-                # Clean up empty symbol entries
-                self.pending_signals = {k: v for k, v in self.pending_signals.items() if v}
-                
-                # Save data periodically
-                self._save_signal_data()
-                self._save_provider_profiles()
-                
+                        # Single signal, process as-is
+                        single_signal = group[0]
+                        processed = ProcessedSignal(
+                            original_signals=[single_signal],
+                            final_signal=single_signal,
+                            status=SignalStatus.PROCESSED,
+                            processing_reason="Single signal processed",
+                            conflicts_resolved=[],
+                            merged_signals=[],
+                            processing_time=datetime.now(),
+                            execution_priority=self._calculate_signal_score(single_signal)
+                        )
+                        
+                        self.processed_signals.append(processed)
+                        self.processing_stats["processed_signals"] += 1
+                        
+            else:
+                # Process signals individually
+                for signal in signals:
+                    processed = ProcessedSignal(
+                        original_signals=[signal],
+                        final_signal=signal,
+                        status=SignalStatus.PROCESSED,
+                        processing_reason="Individual signal processed",
+                        conflicts_resolved=[],
+                        merged_signals=[],
+                        processing_time=datetime.now(),
+                        execution_priority=self._calculate_signal_score(signal)
+                    )
+                    
+                    self.processed_signals.append(processed)
+                    self.processing_stats["processed_signals"] += 1
+                    
+            # Clear processed signals from pending
+            self._release(book, signals)
+            
+    async def _process_pending_signals(self):
+        """Housekeeping between aggregation windows: expiry, stray symbols and saving"""
+        while self.is_processing:
+            try:
                 await asyncio.sleep(self.config.get("processing_interval", 2.0))
                 
+                # Symbols with pending signals but no open window, e.g. added before processing started
+                for symbol, book in list(self.symbol_books.items()):
+                    if book.timer is None:
+                        self._close_window(symbol)
+                        
+                # Save data when something changed
+                if self.data_dirty:
+                    self.data_dirty = False
+                    self._save_signal_data()
+                    self._save_provider_profiles()
+                    
             except Exception as e:
                 self.logger.error(f"Error in signal processing loop: {e}")
                 await asyncio.sleep(5)  # Prevent tight error loop
@@ -831,6 +965,8 @@ class MultiSignalHandler:
             try:
                 self.processing_task = asyncio.create_task(self._process_pending_signals())
                 self.logger.info("Signal processing started")
+                for symbol, book in self.symbol_books.items():
+                    self._open_window(symbol, book)
             except RuntimeError:
                 self.is_processing = False
                 self.logger.warning("No event loop running, cannot start processing")
@@ -841,6 +977,10 @@ class MultiSignalHandler:
             self.is_processing = False
             if self.processing_task:
                 self.processing_task.cancel()
+            for book in self.symbol_books.values():
+                if book.timer is not None:
+                    book.timer.cancel()
+                    book.timer = None
             self.logger.info("Signal processing stopped")
             
     def get_processed_signals(self, symbol: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
@@ -855,6 +995,11 @@ class MultiSignalHandler:
         
         return [signal.to_dict() for signal in recent_signals]
         
+    @property
+    def pending_signals(self) -> Dict[str, List[IncomingSignal]]:
+        """Pending signals by symbol, in arrival order"""
+        return {symbol: list(book.signals.values()) for symbol, book in self.symbol_books.items() if book.signals}
+        
     def get_pending_signals(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get current pending signals by symbol"""
         result = {}
@@ -873,14 +1018,32 @@ class MultiSignalHandler:
             ]
         return result
         
+    def get_latency_statistics(self) -> Dict[str, Any]:
+        """Added latency per processed signal, from arrival until it left the pending set"""
+        recent = sorted(self.latency_samples)
+        
+        def percentile(fraction: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * fraction))] * 1000 if recent else 0.0
+            
+        return {
+            "signals": self.latency_count,
+            "mean_ms": self.latency_total / self.latency_count * 1000 if self.latency_count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": self.latency_max * 1000
+        }
+        
     def get_statistics(self) -> Dict[str, Any]:
         """Get signal processing statistics"""
         return {
             **self.processing_stats,
-            "pending_signals": sum(len(signals) for signals in self.pending_signals.values()),
+            "pending_signals": sum(len(book.signals) for book in self.symbol_books.values()),
             "active_conflicts": len([c for c in self.conflict_groups if not c.resolved]),
             "provider_count": len(self.provider_profiles),
-            "processing_active": self.is_processing
+            "processing_active": self.is_processing,
+            "aggregation_window_seconds": self.config.get("aggregation_window_seconds", 0.25),
+            "added_latency": self.get_latency_statistics()
         }
         
     def get_provider_statistics(self) -> Dict[str, Dict[str, Any]]:
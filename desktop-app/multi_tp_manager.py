@@ -7,12 +7,13 @@ import json
 import time
 import logging
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
 from enum import Enum
 import os
 
+from trade_records import (trade_record, Timestamp, now_ts, record_to_dict, record_from_dict)
+
 class TPStatus(Enum):
     PENDING = "pending"
     HIT = "hit"
@@ -26,17 +27,17 @@ class SLShiftMode(Enum):
     PERCENTAGE = "percentage"
     NONE = "none"
 
-@dataclass
+@trade_record
 class TPLevel:
     level: int  # TP1, TP2, etc.
     price: float
     percentage: float  # Percentage of position to close (0-100)
     status: TPStatus = TPStatus.PENDING
-    hit_time: Optional[datetime] = None
+    hit_time: Optional[Timestamp] = None
     actual_close_price: Optional[float] = None
     closed_volume: Optional[float] = None
 
-@dataclass
+@trade_record
 class MultiTPConfig:
     tp_levels: List[TPLevel]
     sl_shift_mode: SLShiftMode
@@ -47,7 +48,7 @@ class MultiTPConfig:
     monitoring_interval: float = 1.0  # seconds
     expire_after_hours: int = 168  # 7 days
 
-@dataclass
+@trade_record
 class MultiTPTrade:
     ticket: int
     symbol: str
@@ -57,49 +58,16 @@ class MultiTPTrade:
     remaining_volume: float
     current_sl: Optional[float]
     config: MultiTPConfig
-    created_time: datetime
+    created_time: Timestamp
     last_tp_hit: Optional[int] = None  # Last TP level that was hit
     total_closed_volume: float = 0.0
     total_realized_profit: float = 0.0
     is_active: bool = True
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "ticket": self.ticket,
-            "symbol": self.symbol,
-            "direction": self.direction,
-            "entry_price": self.entry_price,
-            "initial_volume": self.initial_volume,
-            "remaining_volume": self.remaining_volume,
-            "current_sl": self.current_sl,
-            "config": {
-                "tp_levels": [
-                    {
-                        "level": tp.level,
-                        "price": tp.price,
-                        "percentage": tp.percentage,
-                        "status": tp.status.value,
-                        "hit_time": tp.hit_time.isoformat() if tp.hit_time else None,
-                        "actual_close_price": tp.actual_close_price,
-                        "closed_volume": tp.closed_volume
-                    } for tp in self.config.tp_levels
-                ],
-                "sl_shift_mode": self.config.sl_shift_mode.value,
-                "sl_shift_buffer_pips": self.config.sl_shift_buffer_pips,
-                "min_remaining_volume": self.config.min_remaining_volume,
-                "max_slippage_pips": self.config.max_slippage_pips,
-                "enable_auto_monitoring": self.config.enable_auto_monitoring,
-                "monitoring_interval": self.config.monitoring_interval,
-                "expire_after_hours": self.config.expire_after_hours
-            },
-            "created_time": self.created_time.isoformat(),
-            "last_tp_hit": self.last_tp_hit,
-            "total_closed_volume": self.total_closed_volume,
-            "total_realized_profit": self.total_realized_profit,
-            "is_active": self.is_active
-        }
+        return record_to_dict(self)
 
-@dataclass
+@trade_record
 class TPHitEvent:
     ticket: int
     tp_level: int
@@ -109,7 +77,7 @@ class TPHitEvent:
     remaining_volume: float
     profit: float
     new_sl: Optional[float]
-    timestamp: datetime
+    timestamp: Timestamp
     success: bool
     error_message: Optional[str] = None
 
@@ -248,48 +216,7 @@ class MultiTPManager:
                     trades_data = json.load(f)
                     
                 for trade_data in trades_data.get('multi_tp_trades', []):
-                    # Reconstruct TP levels
-                    tp_levels = []
-                    for tp_data in trade_data['config']['tp_levels']:
-                        tp_level = TPLevel(
-                            level=tp_data['level'],
-                            price=tp_data['price'],
-                            percentage=tp_data['percentage'],
-                            status=TPStatus(tp_data['status']) if isinstance(tp_data['status'], str) else tp_data['status'],
-                            hit_time=datetime.fromisoformat(tp_data['hit_time']) if tp_data.get('hit_time') else None,
-                            actual_close_price=tp_data.get('actual_close_price'),
-                            closed_volume=tp_data.get('closed_volume')
-                        )
-                        tp_levels.append(tp_level)
-                    
-                    # Reconstruct config
-                    config = MultiTPConfig(
-                        tp_levels=tp_levels,
-                        sl_shift_mode=SLShiftMode(trade_data['config']['sl_shift_mode']),
-                        sl_shift_buffer_pips=trade_data['config']['sl_shift_buffer_pips'],
-                        min_remaining_volume=trade_data['config']['min_remaining_volume'],
-                        max_slippage_pips=trade_data['config']['max_slippage_pips'],
-                        enable_auto_monitoring=trade_data['config']['enable_auto_monitoring'],
-                        monitoring_interval=trade_data['config']['monitoring_interval'],
-                        expire_after_hours=trade_data['config']['expire_after_hours']
-                    )
-                    
-                    # Reconstruct trade
-                    trade = MultiTPTrade(
-                        ticket=trade_data['ticket'],
-                        symbol=trade_data['symbol'],
-                        direction=trade_data['direction'],
-                        entry_price=trade_data['entry_price'],
-                        initial_volume=trade_data['initial_volume'],
-                        remaining_volume=trade_data['remaining_volume'],
-                        current_sl=trade_data.get('current_sl'),
-                        config=config,
-                        created_time=datetime.fromisoformat(trade_data['created_time']),
-                        last_tp_hit=trade_data.get('last_tp_hit'),
-                        total_closed_volume=trade_data.get('total_closed_volume', 0.0),
-                        total_realized_profit=trade_data.get('total_realized_profit', 0.0),
-                        is_active=trade_data.get('is_active', True)
-                    )
+                    trade = record_from_dict(MultiTPTrade, trade_data)
                     
                     if trade.is_active:
                         self.active_trades[trade.ticket] = trade
@@ -467,7 +394,7 @@ class MultiTPManager:
                 if close_result.get('success', False):
                     # Update TP level status
                     tp_level.status = TPStatus.HIT
-                    tp_level.hit_time = datetime.now()
+                    tp_level.hit_time = now_ts()
                     tp_level.actual_close_price = close_price
                     tp_level.closed_volume = volume_to_close
                     
@@ -557,7 +484,7 @@ class MultiTPManager:
                         remaining_volume=trade.remaining_volume,
                         profit=profit,
                         new_sl=new_sl,
-                        timestamp=datetime.now(),
+                        timestamp=now_ts(),
                         success=True
                     )
                     self.tp_hit_history.append(tp_hit_event)
@@ -578,7 +505,7 @@ class MultiTPManager:
                         remaining_volume=trade.remaining_volume,
                         profit=0.0,
                         new_sl=trade.current_sl,
-                        timestamp=datetime.now(),
+                        timestamp=now_ts(),
                         success=False,
                         error_message="Partial close execution failed"
                     )
@@ -617,8 +544,8 @@ class MultiTPManager:
                             
                         # Check if trade expired
                         if trade.config.expire_after_hours > 0:
-                            expiry_time = trade.created_time + timedelta(hours=trade.config.expire_after_hours)
-                            if datetime.now() > expiry_time:
+                            expiry_time = trade.created_time + trade.config.expire_after_hours * 3600
+                            if now_ts() > expiry_time:
                                 trade.is_active = False
                                 inactive_trades.append(ticket)
                                 self.logger.info(f"Trade {ticket} expired after {trade.config.expire_after_hours} hours")
@@ -733,7 +660,7 @@ class MultiTPManager:
                 remaining_volume=volume,
                 current_sl=current_sl,
                 config=config,
-                created_time=datetime.now()
+                created_time=now_ts()
             )
             
             # Add to active trades
@@ -803,7 +730,7 @@ class MultiTPManager:
     def get_recent_tp_hits(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent TP hit events"""
         recent = sorted(self.tp_hit_history, key=lambda x: x.timestamp, reverse=True)[:limit]
-        return [asdict(hit) for hit in recent]
+        return [record_to_dict(hit) for hit in recent]
 
 # Global instance for easy access
 multi_tp_manager = MultiTPManager()
\ No newline at end of file
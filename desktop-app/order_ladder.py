@@ -0,0 +1,234 @@
+"""
+Order Ladder Submitter for SignalOS
+Places multi-leg order ladders (entry ranges, grids) concurrently, with optional
+all-or-nothing rollback and a submission deadline
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+
+
+class LegStatus(Enum):
+    PLACED = "placed"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+    ROLLED_BACK = "rolled_back"
+
+
+@dataclass
+class LadderLeg:
+    """Single leg of an order ladder"""
+    leg_id: str
+    submit: Callable[[], Awaitable[Dict[str, Any]]]  # Returns {'success': bool, 'ticket': int, ...}
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class LegResult:
+    """Outcome of a single ladder leg"""
+    leg_id: str
+    status: LegStatus
+    ticket: Optional[int] = None
+    latency_ms: float = 0.0  # Time from ladder submission until the leg was acknowledged
+    response: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "leg_id": self.leg_id,
+            "status": self.status.value,
+            "ticket": self.ticket,
+            "latency_ms": self.latency_ms,
+            "error": self.error,
+            "metadata": self.metadata
+        }
+
+
+@dataclass
+class LadderResult:
+    """Outcome of a whole ladder submission"""
+    legs: List[LegResult]
+    all_or_nothing: bool = False
+    rolled_back: bool = False
+    deadline_exceeded: bool = False
+    total_latency_ms: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return bool(self.legs) and all(leg.status == LegStatus.PLACED for leg in self.legs)
+
+    @property
+    def placed_legs(self) -> List[LegResult]:
+        return [leg for leg in self.legs if leg.status == LegStatus.PLACED]
+
+    @property
+    def leg_latencies_ms(self) -> Dict[str, float]:
+        return {leg.leg_id: leg.latency_ms for leg in self.legs}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "success": self.success,
+            "all_or_nothing": self.all_or_nothing,
+            "rolled_back": self.rolled_back,
+            "deadline_exceeded": self.deadline_exceeded,
+            "total_latency_ms": self.total_latency_ms,
+            "placed": len(self.placed_legs),
+            "legs": [leg.to_dict() for leg in self.legs]
+        }
+
+
+class OrderLadderSubmitter:
+    """Submits all legs of a ladder at once instead of one await per leg"""
+
+    def __init__(self, cancel_order: Optional[Callable[[int], Awaitable[Any]]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            cancel_order: Coroutine used to roll back placed legs by ticket
+            logger: Logger of the owning module
+        """
+        self.cancel_order = cancel_order
+        self.logger = logger or logging.getLogger('OrderLadderSubmitter')
+
+    @staticmethod
+    def _leg_result(leg: LadderLeg, response: Any, latency_ms: float) -> LegResult:
+        """Normalize a bridge response into a leg result"""
+        if not isinstance(response, dict):
+            response = {"success": bool(response)}
+        ticket = response.get('ticket', response.get('order_id'))
+        if response.get('success', False):
+            return LegResult(leg_id=leg.leg_id, status=LegStatus.PLACED, ticket=ticket,
+                             latency_ms=latency_ms, response=response, metadata=leg.metadata)
+        return LegResult(leg_id=leg.leg_id, status=LegStatus.FAILED, ticket=ticket,
+                         latency_ms=latency_ms, response=response, metadata=leg.metadata,
+                         error=response.get('error') or response.get('error_message') or "Order rejected")
+
+    async def _run_leg(self, leg: LadderLeg, started: float) -> LegResult:
+        try:
+            response = await leg.submit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return LegResult(leg_id=leg.leg_id, status=LegStatus.FAILED,
+                             latency_ms=(time.perf_counter() - started) * 1000,
+                             error=str(e), metadata=leg.metadata)
+        return self._leg_result(leg, response, (time.perf_counter() - started) * 1000)
+
+    async def _submit_concurrent(self, legs: List[LadderLeg], started: float,
+                                 deadline_seconds: Optional[float]) -> Tuple[List[LegResult], bool]:
+        tasks = [asyncio.ensure_future(self._run_leg(leg, started)) for leg in legs]
+        done, pending = await asyncio.wait(tasks, timeout=deadline_seconds)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for leg, task in zip(legs, tasks):
+            if task in done and not task.cancelled():
+                results.append(task.result())
+            else:
+                # The bridge may still act on a cancelled request; it is reported, never assumed
+                # placed, and without a ticket it cannot be rolled back
+                results.append(LegResult(leg_id=leg.leg_id, status=LegStatus.TIMED_OUT,
+                                         latency_ms=(time.perf_counter() - started) * 1000,
+                                         error="Deadline exceeded", metadata=leg.metadata))
+        return results, bool(pending)
+
+    async def _rollback(self, results: List[LegResult]) -> bool:
+        """
+        Cancel every placed leg; returns True only when all cancellations
+        succeeded and no leg timed out with an unknown outcome
+        """
+        placed = [leg for leg in results if leg.status == LegStatus.PLACED]
+        timed_out = [leg for leg in results if leg.status == LegStatus.TIMED_OUT]
+        if timed_out:
+            self.logger.error(f"Cannot confirm rollback of {len(timed_out)} timed out ladder legs "
+                              f"({', '.join(leg.leg_id for leg in timed_out)}); reconcile them with the broker")
+        if not placed:
+            return not timed_out
+        if not self.cancel_order:
+            self.logger.error(f"Cannot roll back {len(placed)} ladder legs: no cancel method available")
+            return False
+
+        async def cancel(leg: LegResult) -> bool:
+            try:
+                result = await self.cancel_order(leg.ticket)
+                # Only an explicit success response counts; anything else leaves the leg live
+                return isinstance(result, dict) and result.get('success') is True
+            except Exception as e:
+                self.logger.error(f"Failed to roll back ladder leg {leg.leg_id} (ticket {leg.ticket}): {e}")
+                return False
+
+        outcomes = await asyncio.gather(*(cancel(leg) for leg in placed))
+        for leg, cancelled in zip(placed, outcomes):
+            if cancelled:
+                leg.status = LegStatus.ROLLED_BACK
+        return all(outcomes) and not timed_out
+
+    async def submit(self, legs: List[LadderLeg], all_or_nothing: bool = False,
+                     deadline_seconds: Optional[float] = None) -> LadderResult:
+        """
+        Submit all ladder legs at once
+
+        Args:
+            legs: Ladder legs to place
+            all_or_nothing: Cancel already placed legs if any leg fails or misses the deadline
+            deadline_seconds: Maximum time to wait for the whole ladder (None waits indefinitely)
+
+        Returns:
+            LadderResult with per-leg status, ticket and latency; rolled_back is
+            False when any leg timed out, since its order may still be live
+
+        Raises:
+            ValueError: all_or_nothing was requested without a cancel method to roll back with
+        """
+        if not legs:
+            return LadderResult(legs=[], all_or_nothing=all_or_nothing)
+        if all_or_nothing and self.cancel_order is None:
+            raise ValueError("All-or-nothing ladder requires a cancel method to roll back placed legs")
+
+        started = time.perf_counter()
+        results, deadline_exceeded = await self._submit_concurrent(legs, started, deadline_seconds)
+
+        ladder = LadderResult(legs=results, all_or_nothing=all_or_nothing,
+                              deadline_exceeded=deadline_exceeded)
+
+        if all_or_nothing and not ladder.success:
+            failed = len(results) - len(ladder.placed_legs)
+            self.logger.warning(f"Ladder incomplete ({failed}/{len(results)} legs not placed), rolling back")
+            ladder.rolled_back = await self._rollback(results)
+
+        ladder.total_latency_ms = (time.perf_counter() - started) * 1000
+        return ladder
+
+
+def bridge_cancel_method(bridge: Any) -> Optional[Callable[[int], Awaitable[Dict[str, Any]]]]:
+    """
+    Rollback coroutine for a bridge's cancel_order, or None when it has none
+
+    Blocking bridges returning a TradeResult run in a worker thread and their
+    result is converted to the ladder response format.
+    """
+    cancel_order = getattr(bridge, 'cancel_order', None) if bridge is not None else None
+    if cancel_order is None:
+        return None
+    if asyncio.iscoroutinefunction(cancel_order):
+        return cancel_order
+
+    async def cancel(ticket: int) -> Dict[str, Any]:
+        result = await asyncio.to_thread(cancel_order, ticket)
+        if isinstance(result, dict):
+            return result
+        return {
+            "success": getattr(result, 'success', False),
+            "order_id": getattr(result, 'order_id', None),
+            "error": getattr(result, 'error_message', None)
+        }
+    return cancel
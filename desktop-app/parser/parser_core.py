@@ -22,6 +22,8 @@ import sqlite3
 # Local imports
 from parser.multilingual_parser import MultilingualSignalParser, LanguageDetection
 from parser.ocr_engine import OCREngine
+from ai_parser.cascade import CascadeStage, ParseCascade, DEFAULT_STAGE_COSTS_MS
+from ai_parser.fallback_regex_parser import get_fallback_parser
 
 class ParsingMethod(Enum):
     """Available parsing methods"""
@@ -173,14 +175,39 @@ class ParserConfig:
     enable_caching: bool = True
     cache_ttl: int = 300
     
+    # Parse cascade: stage order, per-request latency budget (0 = none), per-stage overrides
+    cascade_order: List[str] = None
+    latency_budget_ms: float = 0.0
+    cascade_stages: Dict[str, Dict[str, Any]] = None
+    
     def __post_init__(self):
         if self.ai_model is None:
             self.ai_model = AIModelConfig()
+        if self.cascade_order is None:
+            self.cascade_order = ["structured", "regex", "multilingual", "ai", "ocr"]
+        if self.cascade_stages is None:
+            self.cascade_stages = {}
         if self.ocr_languages is None:
             self.ocr_languages = ["en", "ar", "es", "fr", "de", "ru", "zh", "ja"]
         if self.supported_languages is None:
             self.supported_languages = ["en", "ar", "es", "fr", "de", "ru", "zh", "ja"]
 
+# Parsing method and stats counter for the cascade stage that produced a result
+STAGE_METHODS = {
+    "structured": ParsingMethod.REGEX_FALLBACK,
+    "regex": ParsingMethod.REGEX_FALLBACK,
+    "multilingual": ParsingMethod.REGEX_FALLBACK,
+    "ai": ParsingMethod.AI_MODEL,
+    "ocr": ParsingMethod.OCR_FIRST
+}
+STAGE_STATS = {
+    "structured": "regex_parses",
+    "regex": "regex_parses",
+    "multilingual": "regex_parses",
+    "ai": "ai_parses",
+    "ocr": "ocr_parses"
+}
+
 class SignalParserCore:
     """Advanced AI Signal Parser Core Engine"""
     
@@ -193,6 +220,7 @@ class SignalParserCore:
         # Initialize sub-parsers
         self.multilingual_parser = MultilingualSignalParser(config_file)
         self.ocr_engine = OCREngine(config_file) if self.config.enable_ocr else None
+        self.cascade = self._build_cascade()
         
         # Initialize learning database
         self.learning_db = self._init_learning_database()
@@ -281,9 +309,10 @@ class SignalParserCore:
             self.logger.error(f"Failed to initialize learning database: {e}")
             return None
     
-    def _get_signal_hash(self, text: str) -> str:
+    def _get_signal_hash(self, signal_input: Union[str, bytes]) -> str:
         """Generate hash for signal caching"""
-        return hashlib.md5(text.encode()).hexdigest()
+        data = signal_input.encode() if isinstance(signal_input, str) else signal_input
+        return hashlib.md5(data).hexdigest()
     
     async def parse_signal(self, signal_input: Union[str, bytes], 
                           signal_type: SignalType = SignalType.TEXT,
@@ -302,66 +331,41 @@ class SignalParserCore:
         start_time = datetime.now()
         self.stats["total_parsed"] += 1
         
-        # Handle different input types
+        # Images go to the OCR stage; text goes through the text stages
         if signal_type == SignalType.IMAGE:
             if not self.ocr_engine:
                 raise ValueError("OCR engine not available for image parsing")
-            
-            # Extract text from image using OCR
-            ocr_result = await self.ocr_engine.extract_text(signal_input)
-            signal_text = ocr_result.get('text', '')
-            ocr_confidence = ocr_result.get('confidence', 0.0)
-            
-            if not signal_text or ocr_confidence < self.config.ocr_confidence_threshold:
-                return ParsedSignalAdvanced(
-                    raw_text="",
-                    ocr_text=signal_text,
-                    confidence_score=0.0,
-                    parsing_method=ParsingMethod.OCR_FIRST,
-                    parse_errors=["OCR extraction failed or low confidence"]
-                )
+            signal_text, image = "", signal_input
         else:
-            signal_text = signal_input
-            ocr_confidence = 1.0
+            signal_text, image = signal_input, None
         
         # Check cache
-        signal_hash = self._get_signal_hash(signal_text)
+        signal_hash = self._get_signal_hash(signal_input)
         if self.config.enable_caching and signal_hash in self.parse_cache:
             cached_result = self.parse_cache[signal_hash]
             if (datetime.now() - cached_result['timestamp']).seconds < self.config.cache_ttl:
                 self.stats["cached_results"] += 1
                 return cached_result['result']
         
-        # Initialize result
-        result = ParsedSignalAdvanced(
-            raw_text=signal_text,
-            ocr_text=signal_text if signal_type == SignalType.IMAGE else None,
-            provider=provider,
-            signal_id=signal_hash[:8]
-        )
-        
         try:
-            # Method 1: AI Model parsing
-            if self.config.enable_ai_parsing:
-                result = await self._parse_with_ai(signal_text, result)
-                if result.confidence_score >= self.config.confidence_threshold:
-                    self.stats["ai_parses"] += 1
-                    result.parsing_method = ParsingMethod.AI_MODEL
-                    self.logger.info(f"AI parsing successful: {result.confidence_score:.2f}")
-                    return self._finalize_result(result, start_time, signal_hash)
+            outcome = await self.cascade.run_async(signal_text, image)
+            result = outcome.result if outcome.result is not None else ParsedSignalAdvanced(raw_text=signal_text)
+            result.provider = provider
+            result.signal_id = signal_hash[:8]
+            result.parse_errors.extend(f"{stage}: {error}" for stage, error in outcome.errors.items())
             
-            # Method 2: Regex fallback
-            if self.config.ai_fallback_enabled:
-                result = await self._parse_with_regex(signal_text, result)
-                if result.confidence_score >= self.config.confidence_threshold:
-                    self.stats["regex_parses"] += 1
-                    result.parsing_method = ParsingMethod.REGEX_FALLBACK
-                    self.logger.info(f"Regex parsing successful: {result.confidence_score:.2f}")
-                    return self._finalize_result(result, start_time, signal_hash)
+            if outcome.accepted:
+                result.parsing_method = STAGE_METHODS[outcome.stage]
+                self.stats[STAGE_STATS[outcome.stage]] += 1
+                self.logger.info(f"{outcome.stage} parsing successful: {result.confidence_score:.2f} "
+                                 f"in {outcome.elapsed_ms:.1f}ms")
+                return self._finalize_result(result, start_time, signal_hash)
             
             # Failed to parse with sufficient confidence
             self.stats["failed_parses"] += 1
             result.parse_errors.append("All parsing methods failed")
+            if outcome.skipped:
+                result.parse_errors.append(f"Skipped for latency budget: {', '.join(outcome.skipped)}")
             
             # Store failed parse for learning
             if self.config.store_failed_parses:
@@ -369,11 +373,77 @@ class SignalParserCore:
             
         except Exception as e:
             self.stats["failed_parses"] += 1
+            result = ParsedSignalAdvanced(raw_text=signal_text, provider=provider, signal_id=signal_hash[:8])
             result.parse_errors.append(f"Parsing error: {str(e)}")
             self.logger.error(f"Parse error: {e}")
         
         return self._finalize_result(result, start_time, signal_hash)
     
+    def _build_cascade(self) -> ParseCascade:
+        """Parse stages in the configured order, each gated at the confidence threshold"""
+        threshold = self.config.confidence_threshold
+        stages = [
+            CascadeStage("structured", self._parse_structured, DEFAULT_STAGE_COSTS_MS["structured"], threshold,
+                         enabled=self.config.ai_fallback_enabled),
+            CascadeStage("regex", self._parse_regex, DEFAULT_STAGE_COSTS_MS["regex"], threshold,
+                         enabled=self.config.ai_fallback_enabled),
+            CascadeStage("multilingual", lambda text: self._parse_with_regex(text, ParsedSignalAdvanced(raw_text=text)),
+                         DEFAULT_STAGE_COSTS_MS["multilingual"], threshold,
+                         enabled=self.config.ai_fallback_enabled and self.config.enable_multilingual),
+            CascadeStage("ai", lambda text: self._parse_with_ai(text, ParsedSignalAdvanced(raw_text=text)),
+                         DEFAULT_STAGE_COSTS_MS["ai"], threshold,
+                         enabled=self.config.enable_ai_parsing),
+            CascadeStage("ocr", self._parse_with_ocr, DEFAULT_STAGE_COSTS_MS["ocr"], threshold,
+                         enabled=self.ocr_engine is not None, uses_image=True)
+        ]
+        cascade = ParseCascade(stages, confidence=lambda result: result.confidence_score)
+        cascade.configure(order=self.config.cascade_order, latency_budget_ms=self.config.latency_budget_ms,
+                          stages=self.config.cascade_stages)
+        return cascade
+    
+    def _from_regex_result(self, text: str, parsed: Optional[Dict[str, Any]]) -> Optional[ParsedSignalAdvanced]:
+        """Map a fallback regex parser result"""
+        if not parsed:
+            return None
+        entries = parsed.get("entry") or []
+        return ParsedSignalAdvanced(
+            symbol=parsed.get("pair"),
+            entry_price=entries[0] if len(entries) == 1 else None,
+            entry_range=(min(entries), max(entries)) if len(entries) > 1 else None,
+            stop_loss=parsed.get("sl"),
+            take_profits=list(parsed.get("tp") or []),
+            direction=parsed.get("direction"),
+            confidence_score=parsed.get("confidence", 0.0),
+            raw_text=text
+        )
+    
+    def _parse_structured(self, text: str) -> Optional[ParsedSignalAdvanced]:
+        """Structured-format fast path: one anchored pattern per known layout"""
+        return self._from_regex_result(text, get_fallback_parser().parse_structured_signal(text))
+    
+    def _parse_regex(self, text: str) -> Optional[ParsedSignalAdvanced]:
+        """Compiled regex parser"""
+        return self._from_regex_result(text, get_fallback_parser().parse_signal_regex(text))
+    
+    def _parse_with_ocr(self, image: bytes) -> ParsedSignalAdvanced:
+        """Extract text from an image and parse the signal found in it"""
+        extraction = self.ocr_engine.process_image(image)
+        ocr_text = " ".join(region.text for region in extraction.extracted_texts)
+        result = ParsedSignalAdvanced(raw_text=ocr_text, ocr_text=ocr_text)
+        
+        signal = extraction.processed_signal
+        if not signal or extraction.confidence_score < self.config.ocr_confidence_threshold:
+            result.parse_errors.append("OCR extraction failed or low confidence")
+            return result
+        
+        result.symbol = signal.get("symbol")
+        result.direction = signal.get("direction")
+        result.entry_price = signal.get("entry_price")
+        result.stop_loss = signal.get("stop_loss")
+        result.take_profits = signal.get("take_profit", [])
+        result.confidence_score = min(signal.get("confidence", 0.0), extraction.confidence_score)
+        return result
+    
     async def _parse_with_ai(self, text: str, result: ParsedSignalAdvanced) -> ParsedSignalAdvanced:
         """Parse signal using AI model (Ollama/Phi-3)"""
         try:
@@ -444,16 +514,18 @@ class SignalParserCore:
         try:
             # Use multilingual parser for regex parsing
             multilingual_result = self.multilingual_parser.parse_signal(text)
+            parsed_data = multilingual_result.parsed_data
             
             # Map multilingual parser result to advanced result
-            result.symbol = multilingual_result.get('symbol')
-            result.entry_price = multilingual_result.get('entry_price')
-            result.stop_loss = multilingual_result.get('stop_loss')
-            result.take_profits = multilingual_result.get('take_profits', [])
-            result.direction = multilingual_result.get('direction')
-            result.order_type = multilingual_result.get('order_type')
-            result.confidence_score = multilingual_result.get('confidence', 0.0)
-            result.language_detected = multilingual_result.get('language')
+            entry_prices = parsed_data.get('entry_prices') or []
+            stop_losses = parsed_data.get('stop_loss') or []
+            result.symbol = parsed_data.get('symbol')
+            result.entry_price = entry_prices[0] if entry_prices else None
+            result.stop_loss = stop_losses[0] if stop_losses else None
+            result.take_profits = parsed_data.get('take_profit') or []
+            result.direction = parsed_data.get('direction')
+            result.confidence_score = multilingual_result.confidence
+            result.language_detected = multilingual_result.detected_language
             
             # Calculate confidence based on completeness
             completeness_score = self._calculate_completeness(result)
@@ -490,6 +562,7 @@ class SignalParserCore:
         """Finalize parsing result"""
         # Calculate processing time
         result.processing_time = (datetime.now() - start_time).total_seconds()
+        result.confidence_level = result._calculate_confidence_level()
         
         # Store in cache
         if self.config.enable_caching:
@@ -600,7 +673,8 @@ class SignalParserCore:
             **self.stats,
             'success_rate': self.stats["total_parsed"] - self.stats["failed_parses"] / max(self.stats["total_parsed"], 1),
             'ai_success_rate': self.stats["ai_parses"] / max(self.stats["total_parsed"], 1),
-            'cache_hit_rate': self.stats["cached_results"] / max(self.stats["total_parsed"], 1)
+            'cache_hit_rate': self.stats["cached_results"] / max(self.stats["total_parsed"], 1),
+            'cascade': self.cascade.get_statistics()
         }
     
     def cleanup(self):
@@ -623,6 +697,9 @@ def create_default_config() -> Dict[str, Any]:
             "enable_multilingual": True,
             "enable_learning_loop": True,
             "store_failed_parses": True,
+            "cascade_order": ["structured", "regex", "multilingual", "ai", "ocr"],
+            "latency_budget_ms": 0,
+            "cascade_stages": {},
             "ai_model": {
                 "model_name": "phi3",
                 "base_url": "http://localhost:11434",
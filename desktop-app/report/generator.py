@@ -76,6 +76,65 @@ class PDFReportGenerator:
             logger.error(f"Failed to generate PDF report: {e}")
             return None
     
+    def generate_optimization_report(self, study: str, ranked: List[Dict[str, Any]],
+                                     objective: str = "sharpe_ratio", filename: str = None) -> str:
+        """
+        Generate a PDF ranking of optimizer configurations (OptimizationStore.top rows)
+        """
+        try:
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"SignalOS_Optimization_{study}_{timestamp}.pdf"
+
+            output_path = self.output_dir / filename
+            param_names = sorted({name for record in ranked for name in record['params']})
+            header = ['#'] + param_names + ['Sharpe', 'Profit F.', 'Return', 'Max DD', 'Trades']
+            rows = [header]
+            for rank, record in enumerate(ranked, 1):
+                rows.append(
+                    [f"{rank}"]
+                    + [f"{record['params'].get(name, '')}" for name in param_names]
+                    + [f"{record['sharpe_ratio']:.3f}", f"{record['profit_factor']:.2f}",
+                       f"{record['total_return']:.2f}%",
+                       f"{record['max_drawdown']:.2f}%" + (" (stopped)" if record['stopped_early'] else ""),
+                       f"{record['total_trades']}"]
+                )
+
+            title = f"SignalOS Optimization Report: {study}"
+            subtitle = f"Top {len(ranked)} configurations by {objective.replace('_', ' ')}"
+
+            if REPORTLAB_AVAILABLE:
+                doc = SimpleDocTemplate(str(output_path), pagesize=A4, rightMargin=36, leftMargin=36,
+                                        topMargin=72, bottomMargin=18)
+                styles = getSampleStyleSheet()
+                table = Table(rows, repeatRows=1)
+                table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 8),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                ]))
+                doc.build([Paragraph(title, styles['Heading1']), Paragraph(subtitle, styles['Normal']),
+                           Spacer(1, 20), table])
+            else:
+                with PdfPages(str(output_path)) as pdf:
+                    fig, ax = plt.subplots(figsize=(11, 8.5))
+                    ax.axis('off')
+                    ax.set_title(f"{title}\n{subtitle}")
+                    ax.table(cellText=rows[1:], colLabels=rows[0], loc='center')
+                    pdf.savefig(fig)
+                    plt.close(fig)
+
+            logger.info(f"Optimization report generated: {output_path}")
+            return str(output_path)
+
+        except Exception as e:
+            logger.error(f"Failed to generate optimization report: {e}")
+            return None
+
     def _generate_reportlab_pdf(self, result, output_path: Path) -> str:
         """Generate PDF using ReportLab"""
         try:
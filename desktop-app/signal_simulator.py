@@ -6,19 +6,50 @@ Simulates entry selection, lot size calculation, and SL/TP adjustment logic
 
 import json
 import logging
-from datetime import datetime
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+import numpy as np
+
 try:
-    from lotsize_engine import LotsizeEngine, calculate_lot
+    from lotsize_engine import LotsizeEngine, calculate_lot, calculate_lots
     from entry_range import EntryRangeHandler
     from symbol_mapper import normalize_symbol
 except ImportError:
     # Handle import errors gracefully
     pass
 
+try:
+    from backtest.bar_store import get_bar_store
+except ImportError:
+    get_bar_store = None
+
+# Standard pip sizes
+PIP_SIZES = {
+    'EURUSD': 0.0001, 'GBPUSD': 0.0001, 'AUDUSD': 0.0001, 'NZDUSD': 0.0001,
+    'USDCAD': 0.0001, 'USDCHF': 0.0001, 'USDJPY': 0.01,
+    'XAUUSD': 0.01, 'XAGUSD': 0.001,  # Metals
+    'US30': 1.0, 'NAS100': 1.0, 'SPX500': 1.0,  # Indices
+    'USOIL': 0.01, 'UKOIL': 0.01  # Commodities
+}
+
+# Fallback symbol normalization when symbol_mapper is unavailable
+FALLBACK_SYMBOLS = {
+    'GOLD': 'XAUUSD',
+    'SILVER': 'XAGUSD',
+    'OIL': 'USOIL',
+    'GER30': 'GER30',
+    'UK100': 'UK100',
+    'US30': 'US30',
+    'NAS100': 'NAS100',
+    'SPX500': 'SPX500'
+}
+
 @dataclass
 class SimulationResult:
     """Result of signal simulation"""
@@ -53,6 +84,8 @@ class SimulationConfig:
     validate_prices: bool = True
     apply_spread_adjustment: bool = False
     spread_buffer_pips: float = 0.5
+    price_store_dir: Optional[str] = None  # bar store used for market prices
+    price_timeframe: str = "H1"
 
 class SignalSimulator:
     """Dry-run signal execution simulator"""
@@ -67,6 +100,10 @@ class SignalSimulator:
         self.entry_handler = None
         self.market_data = None
         self.spread_checker = None
+        self.price_store = None
+        
+        # Memoized raw symbol -> normalized symbol lookups (see clear_caches)
+        self._symbol_cache: Dict[str, str] = {}
         
         # Initialize components
         self._initialize_components()
@@ -158,6 +195,9 @@ class SignalSimulator:
             self.entry_handler = EntryRangeHandler()
         except Exception:
             self.logger.warning("EntryRangeHandler not available for simulation")
+        
+        if self.config.price_store_dir and get_bar_store is not None:
+            self.price_store = get_bar_store(self.config.price_store_dir)
     
     def inject_modules(self, lotsize_engine=None, entry_handler=None, 
                       market_data=None, spread_checker=None):
@@ -171,6 +211,10 @@ class SignalSimulator:
         if spread_checker:
             self.spread_checker = spread_checker
     
+    def clear_caches(self):
+        """Forget memoized symbol lookups (e.g. after changing symbol mappings)"""
+        self._symbol_cache.clear()
+    
     def simulate_signal(self, parsed_signal: Dict[str, Any], 
                        strategy_config: Dict[str, Any]) -> SimulationResult:
         """
@@ -207,7 +251,8 @@ class SignalSimulator:
                 self.simulation_stats['mode_usage'].get(mode, 0) + 1
             
             # Simulate entry selection
-            entry = self._simulate_entry_selection(entry_prices, direction, symbol, warnings)
+            entry = self._simulate_entry_selection(entry_prices, direction, symbol, warnings,
+                                                   parsed_signal.get('timestamp'))
             
             # Simulate lot size calculation
             lot_size = self._simulate_lot_calculation(
@@ -258,45 +303,51 @@ class SignalSimulator:
             
         except Exception as e:
             self.simulation_stats['invalid_simulations'] += 1
-            error_msg = f"Simulation failed: {str(e)}"
-            self.logger.error(error_msg)
-            
-            return SimulationResult(
-                entry=0.0,
-                sl=None,
-                tp=[],
-                lot=self.config.default_lot_size,
-                mode='error',
-                valid=False,
-                symbol=symbol if 'symbol' in locals() else 'UNKNOWN',
-                direction=direction if 'direction' in locals() else 'BUY',
-                reasoning=error_msg,
-                warnings=[error_msg],
-                timestamp=datetime.now()
-            )
+            return self._error_result(e, symbol if 'symbol' in locals() else 'UNKNOWN',
+                                      direction if 'direction' in locals() else 'BUY')
+    
+    def _error_result(self, error: Exception, symbol: str, direction: str,
+                      timestamp: Optional[datetime] = None) -> SimulationResult:
+        """Result for a signal whose simulation raised"""
+        error_msg = f"Simulation failed: {str(error)}"
+        self.logger.error(error_msg)
+        
+        return SimulationResult(
+            entry=0.0,
+            sl=None,
+            tp=[],
+            lot=self.config.default_lot_size,
+            mode='error',
+            valid=False,
+            symbol=symbol,
+            direction=direction,
+            reasoning=error_msg,
+            warnings=[error_msg],
+            timestamp=timestamp or datetime.now()
+        )
     
     def _normalize_symbol(self, symbol: str) -> str:
-        """Normalize symbol using symbol mapper if available"""
-        try:
-            return normalize_symbol(symbol)
-        except:
-            # Fallback normalization
-            symbol_map = {
-                'GOLD': 'XAUUSD',
-                'SILVER': 'XAGUSD',
-                'OIL': 'USOIL',
-                'GER30': 'GER30',
-                'UK100': 'UK100',
-                'US30': 'US30',
-                'NAS100': 'NAS100',
-                'SPX500': 'SPX500'
-            }
-            return symbol_map.get(symbol.upper(), symbol.upper())
+        """Normalize symbol using symbol mapper if available (memoized)"""
+        normalized = self._symbol_cache.get(symbol)
+        if normalized is None:
+            try:
+                normalized = normalize_symbol(symbol)
+            except:
+                # Fallback normalization
+                normalized = FALLBACK_SYMBOLS.get(symbol.upper(), symbol.upper())
+            self._symbol_cache[symbol] = normalized
+        return normalized
     
     def _simulate_entry_selection(self, entry_prices: List[float], direction: str, 
-                                 symbol: str, warnings: List[str]) -> float:
+                                 symbol: str, warnings: List[str],
+                                 timestamp: Optional[Union[str, datetime]] = None) -> float:
         """Simulate entry price selection logic"""
         if not entry_prices:
+            market_price = self._get_market_price(symbol, timestamp)
+            if market_price is not None:
+                warnings.append("No entry prices provided, using market price from price store")
+                return market_price
+            
             warnings.append("No entry prices provided, using default")
             return 1.0000  # Default fallback
         
@@ -316,6 +367,66 @@ class SignalSimulator:
         else:
             return max(entry_prices)  # Best entry for SELL is highest price
     
+    def _get_market_price(self, symbol: str, 
+                          timestamp: Optional[Union[str, datetime]] = None) -> Optional[float]:
+        """Close nearest to timestamp (latest close without one) from the price store"""
+        if self.price_store is None:
+            return None
+        
+        try:
+            series = self.price_store.load(symbol, self.config.price_timeframe)
+            if series is None or len(series) == 0:
+                return None
+            
+            if timestamp is None:
+                return float(series.close[-1])
+            return float(series.close[series.nearest(self._timestamp_us(timestamp))])
+            
+        except Exception as e:
+            self.logger.warning(f"Price store lookup failed for {symbol}: {e}")
+            return None
+    
+    def _get_market_prices(self, symbols: List[str],
+                           timestamps: List[Optional[Union[str, datetime]]]) -> List[Optional[float]]:
+        """Batch _get_market_price: one load and one vectorized search per symbol"""
+        prices: List[Optional[float]] = [None] * len(symbols)
+        if self.price_store is None:
+            return prices
+        
+        positions: Dict[str, List[int]] = {}
+        for i, symbol in enumerate(symbols):
+            positions.setdefault(symbol, []).append(i)
+        
+        for symbol, rows in positions.items():
+            try:
+                series = self.price_store.load(symbol, self.config.price_timeframe)
+                if series is None or len(series) == 0:
+                    continue
+                
+                timed = [i for i in rows if timestamps[i] is not None]
+                latest = float(series.close[-1])
+                for i in rows:
+                    if timestamps[i] is None:
+                        prices[i] = latest
+                if timed:
+                    ts_us = np.array([self._timestamp_us(timestamps[i]) for i in timed], dtype=np.int64)
+                    for i, price in zip(timed, series.close[series.nearest_many(ts_us)].tolist()):
+                        prices[i] = price
+                    
+            except Exception as e:
+                self.logger.warning(f"Price store lookup failed for {symbol}: {e}")
+        
+        return prices
+    
+    @staticmethod
+    def _timestamp_us(timestamp: Union[str, datetime]) -> int:
+        """Epoch microseconds of an ISO string or datetime (aware values converted to UTC)"""
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc)
+        return int((timestamp.replace(tzinfo=None) - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+    
     def _simulate_lot_calculation(self, parsed_signal: Dict[str, Any], 
                                  strategy_config: Dict[str, Any], symbol: str,
                                  stop_loss: Optional[float], entry: float,
@@ -404,15 +515,7 @@ class SignalSimulator:
     
     def _get_pip_size(self, symbol: str) -> float:
         """Get pip size for symbol"""
-        # Standard pip sizes
-        pip_sizes = {
-            'EURUSD': 0.0001, 'GBPUSD': 0.0001, 'AUDUSD': 0.0001, 'NZDUSD': 0.0001,
-            'USDCAD': 0.0001, 'USDCHF': 0.0001, 'USDJPY': 0.01,
-            'XAUUSD': 0.01, 'XAGUSD': 0.001,  # Metals
-            'US30': 1.0, 'NAS100': 1.0, 'SPX500': 1.0,  # Indices
-            'USOIL': 0.01, 'UKOIL': 0.01  # Commodities
-        }
-        return pip_sizes.get(symbol, 0.0001)  # Default to 0.0001
+        return PIP_SIZES.get(symbol, 0.0001)  # Default to 0.0001
     
     def _get_spread_adjustment(self, symbol: str) -> float:
         """Get spread adjustment in pips for symbol"""
@@ -480,26 +583,33 @@ class SignalSimulator:
     
     def _log_simulation_result(self, result: SimulationResult):
         """Log simulation result to file"""
+        self._log_simulation_results([result])
+    
+    def _log_simulation_results(self, results: List[SimulationResult]):
+        """Log simulation results to file in a single write"""
         try:
-            log_entry = {
-                'timestamp': result.timestamp.isoformat(),
-                'symbol': result.symbol,
-                'direction': result.direction,
-                'entry': result.entry,
-                'sl': result.sl,
-                'tp': result.tp,
-                'lot': result.lot,
-                'mode': result.mode,
-                'valid': result.valid,
-                'warnings': result.warnings
-            }
+            lines = []
+            for result in results:
+                log_entry = {
+                    'timestamp': result.timestamp.isoformat(),
+                    'symbol': result.symbol,
+                    'direction': result.direction,
+                    'entry': result.entry,
+                    'sl': result.sl,
+                    'tp': result.tp,
+                    'lot': result.lot,
+                    'mode': result.mode,
+                    'valid': result.valid,
+                    'warnings': result.warnings
+                }
+                lines.append(json.dumps(log_entry) + '\n')
             
             log_path = Path(self.config.log_file)
             with open(log_path, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+                f.write(''.join(lines))
                 
         except Exception as e:
-            self.logger.warning(f"Failed to log simulation result: {e}")
+            self.logger.warning(f"Failed to log simulation results: {e}")
     
     def get_simulation_statistics(self) -> Dict[str, Any]:
         """Get simulation statistics"""
@@ -510,21 +620,275 @@ class SignalSimulator:
                 'lotsize_engine': self.lotsize_engine is not None,
                 'entry_handler': self.entry_handler is not None,
                 'market_data': self.market_data is not None,
+                'price_store': self.price_store is not None,
                 'spread_checker': self.spread_checker is not None
             }
         }
     
-    def batch_simulate(self, signals_and_configs: List[tuple]) -> List[SimulationResult]:
-        """Simulate multiple signals in batch"""
-        results = []
+    def batch_simulate(self, signals_and_configs: List[tuple], workers: int = 1,
+                       chunk_size: int = 20_000) -> List[SimulationResult]:
+        """
+        Simulate multiple signals in batch
         
-        for parsed_signal, strategy_config in signals_and_configs:
-            result = self.simulate_signal(parsed_signal, strategy_config)
-            results.append(result)
+        Produces the same results as calling simulate_signal per signal, but
+        the lot, SL/TP and validation math runs over arrays, symbol lookups are
+        memoized and all results are logged in one write. With workers > 1
+        batches larger than chunk_size are split across a process pool; the
+        workers use this simulator's configuration and symbol/spread lookups,
+        but not other injected modules.
+        """
+        signals_and_configs = list(signals_and_configs)
+        
+        if workers > 1 and len(signals_and_configs) > chunk_size:
+            results = self._batch_simulate_pool(signals_and_configs, workers, chunk_size)
+        else:
+            results, stats = self._simulate_rows(signals_and_configs)
+            self._merge_statistics(stats)
+        
+        if self.config.enable_logging:
+            self._log_simulation_results(results)
         
         self.logger.info(f"Completed batch simulation of {len(results)} signals")
         return results
     
+    def _batch_simulate_pool(self, signals_and_configs: List[tuple], workers: int,
+                             chunk_size: int) -> List[SimulationResult]:
+        """Fan batch_simulate out over a process pool in contiguous chunks"""
+        spreads = {}
+        for parsed_signal, _ in signals_and_configs:
+            try:
+                symbol = self._normalize_symbol(parsed_signal.get('symbol', 'UNKNOWN'))
+            except Exception:
+                continue  # reported as a failed simulation by the worker
+            if self.config.apply_spread_adjustment and symbol not in spreads:
+                spreads[symbol] = self._get_spread_adjustment(symbol)
+        
+        chunks = [signals_and_configs[i:i + chunk_size]
+                  for i in range(0, len(signals_and_configs), chunk_size)]
+        results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_batch_worker,
+                                 initargs=(self.config_file, asdict(self.config),
+                                           dict(self._symbol_cache))) as pool:
+            for chunk_results, stats in pool.map(_simulate_batch_chunk,
+                                                 [(chunk, spreads) for chunk in chunks]):
+                results.extend(chunk_results)
+                self._merge_statistics(stats)
+        return results
+    
+    def _simulate_rows(self, signals_and_configs: List[tuple],
+                       spreads: Optional[Dict[str, float]] = None) -> tuple:
+        """
+        Vectorized simulate_signal over many signals
+        
+        Returns (results, statistics delta). Per-signal Python work is limited
+        to unpacking the input dicts and building the result objects.
+        """
+        now = datetime.now()
+        spreads = {} if spreads is None else spreads
+        results: List[Optional[SimulationResult]] = [None] * len(signals_and_configs)
+        errors = 0
+        
+        positions, signals, configs, symbols, directions = [], [], [], [], []
+        entries, stop_losses, take_profits, overridden, modes, row_warnings = [], [], [], [], [], []
+        market_rows, market_timestamps = [], []
+        
+        for i, (parsed_signal, strategy_config) in enumerate(signals_and_configs):
+            symbol, direction, warnings = 'UNKNOWN', 'BUY', []
+            try:
+                symbol = self._normalize_symbol(parsed_signal.get('symbol', 'UNKNOWN'))
+                direction = parsed_signal.get('direction', 'BUY').upper()
+                entry_prices = parsed_signal.get('entry', [])
+                stop_loss = parsed_signal.get('stop_loss')
+                stop_loss = np.nan if stop_loss is None else float(stop_loss)
+                
+                tp_override = strategy_config.get('tp_override')
+                if tp_override:
+                    tps = tp_override if isinstance(tp_override, list) else [tp_override]
+                else:
+                    tps = parsed_signal.get('take_profit', []) or []
+                tps = [float(tp) for tp in tps]
+                
+                mode = strategy_config.get('simulation_mode', 'normal')
+                if self.config.shadow_mode:
+                    mode = 'shadow'
+                
+                if not entry_prices:
+                    entry = np.nan
+                    market_rows.append(len(positions))
+                    market_timestamps.append(parsed_signal.get('timestamp'))
+                elif len(entry_prices) == 1:
+                    entry = float(entry_prices[0])
+                else:
+                    entry = float(self._simulate_entry_selection(entry_prices, direction, symbol, warnings))
+                    
+            except Exception as e:
+                errors += 1
+                results[i] = self._error_result(e, symbol, direction, now)
+                continue
+            
+            positions.append(i)
+            signals.append(parsed_signal)
+            configs.append(strategy_config)
+            symbols.append(symbol)
+            directions.append(direction)
+            entries.append(entry)
+            stop_losses.append(stop_loss)
+            take_profits.append(tps)
+            overridden.append(bool(tp_override))
+            modes.append(mode)
+            row_warnings.append(warnings)
+        
+        count = len(positions)
+        stats = {
+            'total_simulations': len(signals_and_configs),
+            'valid_simulations': 0,
+            'invalid_simulations': errors,
+            'mode_usage': dict(Counter(modes)),
+            'symbol_frequency': dict(Counter(symbols))
+        }
+        if count == 0:
+            return results, stats
+        
+        # Entry selection: market price from the price store, else the default
+        entry = np.array(entries, dtype=np.float64)
+        for row, price in zip(market_rows, self._get_market_prices([symbols[r] for r in market_rows],
+                                                                   market_timestamps)):
+            if price is not None:
+                row_warnings[row].append("No entry prices provided, using market price from price store")
+                entry[row] = price
+            else:
+                row_warnings[row].append("No entry prices provided, using default")
+                entry[row] = 1.0000
+        
+        pip_by_symbol = {symbol: self._get_pip_size(symbol) for symbol in set(symbols)}
+        pip_size = np.fromiter((pip_by_symbol[symbol] for symbol in symbols), np.float64, count)
+        direction_array = np.array(directions)
+        is_buy = direction_array == 'BUY'
+        is_sell = direction_array == 'SELL'
+        sign = np.where(is_buy, 1.0, -1.0)
+        stop_loss = np.array(stop_losses, dtype=np.float64)
+        has_sl = ~np.isnan(stop_loss) & (stop_loss != 0)
+        
+        # Lot size
+        lots = np.full(count, self.config.default_lot_size)
+        try:
+            if 'calculate_lots' in globals():
+                sl_pips = np.where(has_sl & (entry != 0), np.abs(entry - stop_loss) / pip_size, 0.0)
+                balances = np.fromiter((config.get('account_balance', 10000.0) for config in configs),
+                                       np.float64, count)
+                lots = calculate_lots(configs, signals, balances, np.where(sl_pips > 0, sl_pips, 50.0), symbols)
+                lots = np.clip(lots, self.config.min_lot_size, self.config.max_lot_size)
+            else:
+                explicit = np.array([signal.get('lot_size') or np.nan for signal in signals], dtype=np.float64)
+                has_lot = ~np.isnan(explicit)
+                lots = np.where(has_lot, np.clip(explicit, self.config.min_lot_size, self.config.max_lot_size),
+                                lots)
+                for row in np.flatnonzero(~has_lot).tolist():
+                    row_warnings[row].append("Using default lot size")
+        except Exception as e:
+            lots = np.full(count, self.config.default_lot_size)
+            for warnings in row_warnings:
+                warnings.append(f"Lot calculation failed: {e}")
+        
+        # SL/TP: padded TP matrix, NaN past each signal's TP count
+        tp_count = np.fromiter((len(tps) for tps in take_profits), np.int64, count)
+        width = max(int(tp_count.max()), self.config.default_tp_count, 1)
+        tp = np.full((count, width), np.nan)
+        starts = np.cumsum(tp_count) - tp_count
+        tp_rows = np.repeat(np.arange(count), tp_count)
+        tp[tp_rows, np.arange(len(tp_rows)) - starts[tp_rows]] = [level for tps in take_profits for level in tps]
+        
+        if self.config.apply_spread_adjustment:
+            for symbol in pip_by_symbol:
+                if symbol not in spreads:
+                    spreads[symbol] = self._get_spread_adjustment(symbol)
+            spread_pips = [spreads[symbol] for symbol in symbols]
+            adjustment = sign * np.array(spread_pips, dtype=np.float64) * pip_size
+            stop_loss = np.where(has_sl, stop_loss - adjustment, stop_loss)
+            tp = np.where(np.array(overridden)[:, None], tp, tp + adjustment[:, None])
+            for warnings, pips in zip(row_warnings, spread_pips):
+                warnings.append(f"Applied {pips} pip spread adjustment")
+        
+        for warnings, applied in zip(row_warnings, overridden):
+            if applied:
+                warnings.append("Applied TP override from strategy")
+        
+        # Extend to default_tp_count by 20 pips per level past the last TP
+        extend = (tp_count > 0) & (tp_count < self.config.default_tp_count)
+        step = sign * 20 * pip_size
+        for level in range(1, self.config.default_tp_count):
+            fill = extend & (tp_count <= level)
+            tp[:, level] = np.where(fill, tp[:, level - 1] + step, tp[:, level])
+        final_tp_count = np.where(extend, self.config.default_tp_count, tp_count)
+        for row in np.flatnonzero(extend).tolist():
+            row_warnings[row].append(f"Extended TP levels to {self.config.default_tp_count}")
+        
+        shadow = np.array(modes) == 'shadow'
+        stop_loss[shadow] = np.nan
+        has_sl &= ~shadow
+        for row in np.flatnonzero(shadow).tolist():
+            row_warnings[row].append("SL hidden in shadow mode")
+        
+        # Validation: first failing check per signal, in simulate_signal's order
+        valid = np.ones(count, dtype=bool)
+        if self.config.validate_prices:
+            bad_tp = np.where(is_buy[:, None], tp <= entry[:, None],
+                              is_sell[:, None] & (tp >= entry[:, None]))
+            first_bad_tp = np.argmax(bad_tp, axis=1)
+            failure = np.zeros(count, dtype=np.int8)
+            failure[bad_tp.any(axis=1)] = 5
+            failure[has_sl & is_sell & (stop_loss <= entry)] = 4
+            failure[has_sl & is_buy & (stop_loss >= entry)] = 3
+            failure[lots <= 0] = 2
+            failure[entry <= 0] = 1
+            valid = failure == 0
+            
+            messages = {1: "Invalid entry price", 2: "Invalid lot size",
+                        3: "BUY signal: SL should be below entry", 4: "SELL signal: SL should be above entry"}
+            for row in np.flatnonzero(failure).tolist():
+                code = failure[row]
+                if code == 5:
+                    side = 'above' if is_buy[row] else 'below'
+                    row_warnings[row].append(f"{directions[row]} signal: TP{first_bad_tp[row] + 1} "
+                                             f"should be {side} entry")
+                else:
+                    row_warnings[row].append(messages[code])
+        
+        stats['valid_simulations'] = int(valid.sum())
+        stats['invalid_simulations'] += count - stats['valid_simulations']
+        
+        entry_values = entry.tolist()
+        lot_values = lots.tolist()
+        sl_values = [None if np.isnan(sl) else sl for sl in stop_loss.tolist()]
+        for row, (tps, levels) in enumerate(zip(tp.tolist(), final_tp_count.tolist())):
+            results[positions[row]] = SimulationResult(
+                entry=entry_values[row],
+                sl=sl_values[row],
+                tp=tps[:levels],
+                lot=lot_values[row],
+                mode=modes[row],
+                valid=bool(valid[row]),
+                symbol=symbols[row],
+                direction=directions[row],
+                reasoning=f"Simulated {directions[row]} {symbols[row]} at {entry_values[row]} "
+                          f"with {lot_values[row]} lots",
+                warnings=row_warnings[row],
+                timestamp=now
+            )
+        
+        return results, stats
+    
+    def _merge_statistics(self, stats: Dict[str, Any]):
+        """Add a statistics delta from _simulate_rows"""
+        for key in ('total_simulations', 'valid_simulations', 'invalid_simulations'):
+            self.simulation_stats[key] += stats[key]
+        for key in ('mode_usage', 'symbol_frequency'):
+            totals = self.simulation_stats[key]
+            for name, count in stats[key].items():
+                totals[name] = totals.get(name, 0) + count
+    
     def clear_statistics(self):
         """Clear simulation statistics"""
         self.simulation_stats = {
@@ -537,6 +901,22 @@ class SignalSimulator:
         self.logger.info("Simulation statistics cleared")
 
 
+# Per-process simulator for batch_simulate pool workers
+_batch_worker = None
+
+def _init_batch_worker(config_file: str, config: Dict[str, Any], symbol_cache: Dict[str, str]):
+    global _batch_worker
+    _batch_worker = SignalSimulator(config_file)
+    _batch_worker.config = SimulationConfig(**config)
+    if _batch_worker.config.price_store_dir and get_bar_store is not None:
+        _batch_worker.price_store = get_bar_store(_batch_worker.config.price_store_dir)
+    _batch_worker._symbol_cache.update(symbol_cache)
+
+def _simulate_batch_chunk(args: tuple) -> tuple:
+    signals_and_configs, spreads = args
+    return _batch_worker._simulate_rows(signals_and_configs, spreads)
+
+
 # Global instance for easy access
 _signal_simulator = None
 
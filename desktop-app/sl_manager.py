@@ -7,11 +7,14 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, field
+from dataclasses import field
 from enum import Enum
 import json
 import math
 
+from trade_records import (trade_record, Timestamp, now_ts, ts_to_datetime, ts_to_iso,
+                           records_to_list, records_from_list)
+
 
 class SLStrategy(Enum):
     FIXED = "fixed"
@@ -46,7 +49,7 @@ class TradeDirection(Enum):
     SELL = "sell"
 
 
-@dataclass
+@trade_record
 class SLRule:
     strategy: SLStrategy
     trigger: SLTrigger
@@ -59,7 +62,7 @@ class SLRule:
     min_distance_pips: float = 5.0  # Minimum distance from current price
 
 
-@dataclass
+@trade_record
 class SLConfiguration:
     rules: List[SLRule] = field(default_factory=list)
     auto_adjust: bool = True
@@ -72,28 +75,28 @@ class SLConfiguration:
     time_decay_hours: int = 24  # Time-based SL decay
 
 
-@dataclass
+@trade_record
 class SLManagedPosition:
     ticket: int
     symbol: str
     direction: TradeDirection
     entry_price: float
-    entry_time: datetime
+    entry_time: Timestamp
     lot_size: float
     original_sl: Optional[float]
     current_sl: Optional[float]
     config: SLConfiguration = field(default_factory=SLConfiguration)
-    last_sl_update: datetime = field(default_factory=datetime.now)
+    last_sl_update: Timestamp = field(default_factory=now_ts)
     sl_adjustments_count: int = 0
     sl_moves_today: int = 0
     best_price_achieved: Optional[float] = None
     last_atr_value: Optional[float] = None
-    created_at: datetime = field(default_factory=datetime.now)
+    created_at: Timestamp = field(default_factory=now_ts)
     tp_levels_hit: List[int] = field(default_factory=list)
     breakeven_triggered: bool = False
 
 
-@dataclass
+@trade_record
 class SLAdjustment:
     ticket: int
     old_sl: Optional[float]
@@ -103,7 +106,7 @@ class SLAdjustment:
     action_taken: SLAction
     market_price: float
     profit_pips: float
-    timestamp: datetime
+    timestamp: Timestamp
     rule_applied: Optional[SLRule] = None
 
 
@@ -232,20 +235,7 @@ class SLManager:
         try:
             with open(self.log_file, 'r') as f:
                 data = json.load(f)
-                self.adjustment_history = []
-                for entry in data:
-                    adjustment = SLAdjustment(
-                        ticket=entry['ticket'],
-                        old_sl=entry.get('old_sl'),
-                        new_sl=entry['new_sl'],
-                        adjustment_reason=entry['adjustment_reason'],
-                        strategy_used=SLStrategy(entry['strategy_used']),
-                        action_taken=SLAction(entry['action_taken']),
-                        market_price=entry['market_price'],
-                        profit_pips=entry['profit_pips'],
-                        timestamp=datetime.fromisoformat(entry['timestamp'])
-                    )
-                    self.adjustment_history.append(adjustment)
+                self.adjustment_history = records_from_list(SLAdjustment, data)
         except FileNotFoundError:
             self.adjustment_history = []
             self._save_sl_history()
@@ -253,19 +243,7 @@ class SLManager:
     def _save_sl_history(self):
         """Save SL adjustment history to log file"""
         try:
-            data = []
-            for adjustment in self.adjustment_history:
-                data.append({
-                    'ticket': adjustment.ticket,
-                    'old_sl': adjustment.old_sl,
-                    'new_sl': adjustment.new_sl,
-                    'adjustment_reason': adjustment.adjustment_reason,
-                    'strategy_used': adjustment.strategy_used.value,
-                    'action_taken': adjustment.action_taken.value,
-                    'market_price': adjustment.market_price,
-                    'profit_pips': adjustment.profit_pips,
-                    'timestamp': adjustment.timestamp.isoformat()
-                })
+            data = records_to_list(self.adjustment_history)
             
             with open(self.log_file, 'w') as f:
                 json.dump(data, f, indent=2)
@@ -435,7 +413,7 @@ class SLManager:
                 symbol=symbol,
                 direction=direction,
                 entry_price=entry_price,
-                entry_time=datetime.now(),
+                entry_time=now_ts(),
                 lot_size=lot_size,
                 original_sl=current_sl,
                 current_sl=current_sl,
@@ -647,7 +625,7 @@ class SLManager:
                 # Update position
                 old_sl = position.current_sl
                 position.current_sl = new_sl
-                position.last_sl_update = datetime.now()
+                position.last_sl_update = now_ts()
                 position.sl_adjustments_count += 1
                 position.sl_moves_today += 1
                 
@@ -668,7 +646,7 @@ class SLManager:
                     action_taken=rule.action,
                     market_price=current_price,
                     profit_pips=profit_pips,
-                    timestamp=datetime.now(),
+                    timestamp=now_ts(),
                     rule_applied=rule
                 )
                 self.adjustment_history.append(adjustment)
@@ -752,7 +730,7 @@ class SLManager:
                 await self.process_sl_rules(position, current_price)
                 
                 # Reset daily counters if new day
-                if position.last_sl_update.date() < datetime.now().date():
+                if ts_to_datetime(position.last_sl_update).date() < datetime.now().date():
                     position.sl_moves_today = 0
                 
             except Exception as e:
@@ -850,8 +828,8 @@ class SLManager:
             'tp_levels_hit': position.tp_levels_hit,
             'breakeven_triggered': position.breakeven_triggered,
             'rules': rules_status,
-            'created_at': position.created_at.isoformat(),
-            'last_sl_update': position.last_sl_update.isoformat()
+            'created_at': ts_to_iso(position.created_at),
+            'last_sl_update': ts_to_iso(position.last_sl_update)
         }
 
     def get_recent_adjustments(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -867,7 +845,7 @@ class SLManager:
             'action_taken': adjustment.action_taken.value,
             'market_price': adjustment.market_price,
             'profit_pips': adjustment.profit_pips,
-            'timestamp': adjustment.timestamp.isoformat()
+            'timestamp': ts_to_iso(adjustment.timestamp)
         } for adjustment in recent_adjustments]
 
 
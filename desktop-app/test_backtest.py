@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests that the vectorized backtest reproduces the per-signal backtest
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backtest.engine import BacktestEngine, _datetime_to_us
+
+SUMMARY_KEYS = ("final_balance", "total_return", "total_trades", "win_rate", "profit_factor",
+                "max_drawdown", "sharpe_ratio", "backtest_period")
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("backtest")
+    return BacktestEngine(config_file=str(tmp_path / "missing.json"), log_file=str(tmp_path / "backtest.log"))
+
+
+@pytest.fixture(scope="module")
+def signals(engine):
+    random.seed(37)
+    return engine.generate_sample_signals(300)
+
+
+@pytest.fixture(scope="module")
+def expected(engine, signals):
+    return engine.run_backtest(signals)
+
+
+def assert_same_summary(result, expected):
+    for key in SUMMARY_KEYS:
+        assert result.summary[key] == pytest.approx(expected.summary[key]), key
+
+
+def test_vectorized_backtest_matches_run_backtest(engine, signals, expected):
+    result = engine.run_vectorized_backtest(signals, workers=1)
+
+    assert_same_summary(result, expected)
+    for key in ("total_trades", "winning_trades", "losing_trades", "total_pnl", "total_pips", "average_win",
+                "average_loss", "profit_factor"):
+        assert result.statistics[key] == pytest.approx(expected.statistics[key]), key
+
+    assert len(result.trades) == len(expected.trades)
+    for trade, reference in zip(result.trades, expected.trades):
+        assert (trade.symbol, trade.direction, trade.entry_time, trade.exit_time) == \
+               (reference.symbol, reference.direction, reference.entry_time, reference.exit_time)
+        assert trade.exit_price == pytest.approx(reference.exit_price)
+        assert trade.lot_size == pytest.approx(reference.lot_size)
+        assert trade.pnl == pytest.approx(reference.pnl)
+
+    assert [point["balance"] for point in result.equity_curve] == \
+           pytest.approx([point["balance"] for point in expected.equity_curve])
+    assert [(m["month"], m["trades"]) for m in result.monthly_returns] == \
+           [(m["month"], m["trades"]) for m in expected.monthly_returns]
+
+
+def test_array_only_run_keeps_the_summary(engine, signals, expected):
+    result = engine.run_vectorized_backtest(signals, workers=1, materialize_trades=False)
+
+    assert_same_summary(result, expected)
+    assert result.trades == [] and result.equity_curve == []
+
+
+def test_process_pool_matches_single_process(engine, signals, expected, monkeypatch):
+    monkeypatch.setattr(engine, "min_signals_per_worker", 50)
+    result = engine.run_vectorized_backtest(signals, workers=2)
+
+    assert_same_summary(result, expected)
+    assert [trade.pnl for trade in result.trades] == pytest.approx([trade.pnl for trade in expected.trades])
+
+
+def test_drawdown_stop_cuts_the_run_short(engine, signals, expected):
+    limit = expected.summary["max_drawdown"] / 2
+    result = engine.run_vectorized_backtest(signals, workers=1, max_drawdown_stop=limit)
+
+    assert result.summary["stopped_early"] is True
+    trades = result.summary["total_trades"]
+    assert 0 < trades < len(expected.trades)
+    # Identical to the full run up to and including the trade that crossed the limit
+    assert result.summary["final_balance"] == pytest.approx(expected.equity_curve[trades - 1]["balance"])
+    assert expected.equity_curve[trades - 1]["drawdown"] > limit
+
+
+def test_aware_timestamps_are_converted_to_utc():
+    naive = datetime(2024, 3, 1, 12, 30)
+    eastern = datetime(2024, 3, 1, 7, 30, tzinfo=timezone(timedelta(hours=-5)))
+
+    assert _datetime_to_us(naive) == _datetime_to_us(naive.replace(tzinfo=timezone.utc))
+    assert _datetime_to_us(eastern) == _datetime_to_us(naive)
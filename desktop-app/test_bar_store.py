@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar bar store: resuming after an interrupted append and
+re-importing overlapping CSV exports
+"""
+
+import numpy as np
+
+from backtest.bar_store import BAR_COLUMNS, BarSeries, BarStore, column_file
+from backtest.price_import import import_csv
+
+MINUTE_US = 60_000_000
+START_US = 1_704_067_200_000_000  # 2024-01-01 00:00 UTC
+
+
+def make_bars(start, count):
+    ts = START_US + np.arange(start, start + count, dtype=np.int64) * MINUTE_US
+    close = 1.1 + np.arange(start, start + count) * 0.0001
+    return BarSeries(ts=ts, open=close - 0.00005, high=close + 0.0002, low=close - 0.0002,
+                     close=close, volume=np.full(count, 10.0))
+
+
+def write_csv(path, start, count):
+    bars = make_bars(start, count)
+    # MT5 export style: dotted dates, minute resolution
+    stamps = np.asarray(bars.ts).astype('datetime64[us]').astype('datetime64[m]').astype(str)
+    lines = ["timestamp,open,high,low,close,volume"]
+    for i, stamp in enumerate(stamps):
+        lines.append(f"{stamp.replace('-', '.').replace('T', ' ')},{bars.open[i]:.5f},{bars.high[i]:.5f},"
+                     f"{bars.low[i]:.5f},{bars.close[i]:.5f},{bars.volume[i]:.0f}")
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_append_resumes_after_interrupted_write(tmp_path):
+    store = BarStore(tmp_path)
+    assert store.append("EURUSD", "M1", make_bars(0, 10)) == 10
+
+    # An append cut off before ts was written leaves the other columns longer
+    directory = store.series_dir("EURUSD", "M1")
+    for name in BAR_COLUMNS[1:]:
+        with open(directory / column_file(name), 'ab') as f:
+            np.full(3, 99.0).tofile(f)
+
+    reopened = BarStore(tmp_path)
+    stored = reopened.load("EURUSD", "M1")
+    assert len(stored) == 10
+    np.testing.assert_array_equal(stored.close, make_bars(0, 10).close)
+
+    assert reopened.append("EURUSD", "M1", make_bars(10, 5)) == 5
+    stored = reopened.load("EURUSD", "M1")
+    expected = make_bars(0, 15)
+    for name in BAR_COLUMNS:
+        np.testing.assert_array_equal(getattr(stored, name), getattr(expected, name))
+    for name in BAR_COLUMNS:
+        assert (directory / column_file(name)).stat().st_size == 15 * 8
+
+
+def test_append_skips_duplicates_and_stored_bars(tmp_path):
+    store = BarStore(tmp_path)
+    store.append("EURUSD", "M1", make_bars(0, 5))
+
+    overlap = BarSeries.concat([make_bars(6, 2), make_bars(3, 5)])
+    assert store.append("EURUSD", "M1", overlap) == 3
+
+    np.testing.assert_array_equal(store.load("EURUSD", "M1").ts, make_bars(0, 8).ts)
+
+
+def test_reimporting_an_overlapping_csv_adds_only_new_bars(tmp_path):
+    store = BarStore(tmp_path / "bars")
+    first = write_csv(tmp_path / "first.csv", 0, 20)
+    overlapping = write_csv(tmp_path / "overlapping.csv", 10, 20)
+
+    assert import_csv(store, first, "EURUSD", "M1") == 20
+    assert import_csv(store, first, "EURUSD", "M1") == 0
+    assert import_csv(store, overlapping, "EURUSD", "M1", chunk_rows=7) == 10
+
+    stored = store.load("EURUSD", "M1")
+    np.testing.assert_array_equal(stored.ts, make_bars(0, 30).ts)
+    np.testing.assert_allclose(stored.close, make_bars(0, 30).close)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for A/B testing in the continuous learning engine: streaming arm
+statistics, buffered sample logging and the sequential (mSPRT) early stop
+"""
+
+import asyncio
+import random
+import sqlite3
+import statistics
+
+import pytest
+
+import ai_parser.model_server as model_server
+from ai_parser.continuous_learning import ArmStats, ContinuousLearningEngine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(model_server, "_servers", {})
+    engine = ContinuousLearningEngine(models_dir="models", data_dir=str(tmp_path / "data"))
+    engine.deployed = []
+
+    async def deploy(winning_model, result):
+        engine.deployed.append(winning_model)
+
+    monkeypatch.setattr(engine, "_auto_deploy_winner", deploy)
+    return engine
+
+
+def stored_samples(engine, test_id):
+    with sqlite3.connect(engine.ab_db) as conn:
+        return conn.execute("SELECT COUNT(*) FROM ab_samples WHERE test_id = ?", (test_id,)).fetchone()[0]
+
+
+def users_per_arm(engine, test_id):
+    users = {}
+    for i in range(200):
+        users.setdefault(engine.route_request(f"user_{i}", test_id), f"user_{i}")
+    return users
+
+
+def test_arm_stats_match_batch_statistics():
+    rnd = random.Random(46)
+    scores = [0.2 + 0.6 * rnd.random() ** 2 for _ in range(50)]
+    arm = ArmStats()
+    for score in scores:
+        arm.add(score)
+
+    assert arm.count == len(scores)
+    assert arm.mean == pytest.approx(statistics.mean(scores))
+    assert arm.variance == pytest.approx(statistics.variance(scores))
+    assert (arm.min, arm.max) == (min(scores), max(scores))
+
+    summed = ArmStats.from_sums(len(scores), sum(scores), sum(s * s for s in scores), min(scores), max(scores))
+    assert summed.mean == pytest.approx(arm.mean)
+    assert summed.variance == pytest.approx(arm.variance)
+    assert ArmStats.from_sums(0, 0.0, 0.0, None, None).to_metrics() == {"mean": 0.0, "std": 0.0, "count": 0}
+
+
+def test_samples_are_buffered_until_batch_is_full(engine):
+    engine.config.update(ab_flush_batch_size=5, ab_flush_interval=3600)
+
+    async def scenario():
+        test_id = await engine.start_ab_test("v1", "v2")
+        users = users_per_arm(engine, test_id)
+        for i in range(4):
+            await engine.log_ab_sample(test_id, users["v1"], f"signal {i}", {}, 0.5)
+        assert stored_samples(engine, test_id) == 0
+        assert engine.get_ab_test_statistics(test_id)["total_samples"] == 4
+
+        await engine.log_ab_sample(test_id, users["v2"], "signal 4", {}, 0.7)
+        assert stored_samples(engine, test_id) == 5
+
+        await engine.log_ab_sample(test_id, users["v2"], "signal 5", {}, 0.7)
+        assert stored_samples(engine, test_id) == 5
+        result = await engine.complete_ab_test(test_id)
+        assert stored_samples(engine, test_id) == 6
+        return result
+
+    result = asyncio.run(scenario())
+    assert result.total_samples == 6
+    assert result.model_a_performance["count"] == 4
+
+
+def test_sequential_test_stops_early_once(engine):
+    engine.config.update(sequential_check_every=20)
+    rnd = random.Random(46)
+
+    async def scenario():
+        test_id = await engine.start_ab_test("v1", "v2", sequential=True)
+        engine.active_tests[test_id].min_samples = 20
+        users = users_per_arm(engine, test_id)
+        logged = 0
+        while test_id in engine.active_tests and logged < 2000:
+            model = ("v1", "v2")[logged % 2]
+            score = rnd.gauss(0.5 if model == "v1" else 0.7, 0.05)
+            await engine.log_ab_sample(test_id, users[model], "signal", {}, score)
+            logged += 1
+            await asyncio.sleep(0)
+
+        # The early stop runs in a tracked task; a second completion finds nothing to do
+        with pytest.raises(ValueError):
+            await engine.complete_ab_test(test_id)
+        await asyncio.gather(*[task for task in engine._background_tasks
+                               if task.get_coro().__name__ == "complete_ab_test"])
+        return test_id, logged
+
+    test_id, logged = asyncio.run(scenario())
+    assert logged < 2000
+    assert test_id not in engine.active_tests and test_id not in engine.ab_state
+    assert engine.deployed == ["v2"]
+    with sqlite3.connect(engine.ab_db) as conn:
+        status = conn.execute("SELECT status FROM ab_tests WHERE test_id = ?", (test_id,)).fetchone()[0]
+    assert status == "completed"
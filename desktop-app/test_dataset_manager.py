@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for dataset ingestion: exact and MinHash near-duplicate rejection,
+bulk feedback import and near-duplicate cleaning
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from ai_parser.dataset_manager import DatasetManager, MinHashLSH, normalize_signal_text
+
+ORIGINALS = [
+    "BUY EURUSD @ 1.0850 SL 1.0800 TP1 1.0900 TP2 1.0950",
+    "SELL XAUUSD Entry: 2345 SL: 2350 TP1: 2339 TP2: 2333",
+    "GBPJPY long now, stop 187.20, target 189.50",
+]
+# The first two originals reposted with emoji, other case and extra spaces
+REPOSTS = [
+    "🔥🔥 buy   eurusd @ 1.0850 SL 1.0800 TP1 1.0900 TP2 1.0950 🚀",
+    "✅ SELL XAUUSD ENTRY: 2345 SL: 2350 TP1: 2339 TP2: 2333",
+]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DatasetManager(data_dir=str(tmp_path / "data"))
+
+
+def make_sample(text, provider="channel_1"):
+    return {"raw_text": text, "parsed_data": {"pair": text.split()[1]}, "provider": provider}
+
+
+def stored_texts(manager):
+    with sqlite3.connect(manager.db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT raw_text FROM samples")}
+
+
+def test_reposts_normalize_to_the_original():
+    assert normalize_signal_text(REPOSTS[0]) == normalize_signal_text(ORIGINALS[0])
+    assert normalize_signal_text("BUY EURUSD\n@ 1.0850") == "buy eurusd @ 1.0850"
+
+
+def test_lsh_matches_reposts_but_not_other_signals():
+    lsh = MinHashLSH(threshold=0.9)
+    for i, text in enumerate(ORIGINALS):
+        lsh.add(str(i), lsh.signature(text))
+
+    for i, text in enumerate(REPOSTS):
+        [(key, similarity)] = lsh.query(lsh.signature(text))
+        assert key == str(i) and similarity == 1.0
+
+    assert lsh.query(lsh.signature("BUY USDJPY @ 151.20 SL 150.70 TP1 151.90")) == []
+    # Batched signatures are the per-text signatures
+    batch = lsh.signatures(ORIGINALS + REPOSTS, chunk_size=2)
+    assert (batch[1] == lsh.signature(ORIGINALS[1])).all()
+
+
+def test_lsh_rejects_bands_that_do_not_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHashLSH(num_perm=100, bands=16)
+
+
+def test_add_samples_rejects_exact_and_near_duplicates(manager):
+    added = manager.add_samples([make_sample(text) for text in ORIGINALS])
+    assert len(added) == 3
+
+    again = manager.add_samples([make_sample(text) for text in ORIGINALS + REPOSTS]
+                                + [make_sample("SELL USDCAD 1.3650 SL 1.3700 TP 1.3550")])
+    assert len(again) == 1
+    assert stored_texts(manager) == set(ORIGINALS) | {"SELL USDCAD 1.3650 SL 1.3700 TP 1.3550"}
+
+    # A fresh manager rebuilds its indexes from the database
+    reopened = DatasetManager(data_dir=str(manager.data_dir))
+    assert reopened.add_samples([make_sample(REPOSTS[1])]) == []
+    assert reopened.add_sample(ORIGINALS[2], {"pair": "GBPJPY"}, "channel_2") is None
+
+
+def test_import_feedback_rejects_reposts_across_batches(manager, tmp_path):
+    manager.config["insert_batch_size"] = 2
+    entries = [{"raw_text": text, "provider": "channel_1", "corrected_parse": {"pair": text.split()[1]}}
+               for text in ORIGINALS + REPOSTS + [ORIGINALS[0]]]
+    feedback = tmp_path / "feedback.jsonl"
+    feedback.write_text("\n".join(json.dumps(entry) for entry in entries) + "\nnot json\n", encoding="utf-8")
+
+    assert manager.import_feedback_data(str(feedback)) == 3
+    assert stored_texts(manager) == set(ORIGINALS)
+
+
+def test_clean_dataset_drops_the_newer_near_duplicate(manager):
+    manager.add_samples([make_sample(text) for text in ORIGINALS])
+    # Augmentation-style inserts skip the near-duplicate check
+    manager.add_samples([make_sample(text) for text in REPOSTS], near_duplicates=False)
+    assert len(stored_texts(manager)) == 5
+
+    pairs = manager.find_near_duplicates()
+    with sqlite3.connect(manager.db_path) as conn:
+        text_of = dict(conn.execute("SELECT id, raw_text FROM samples"))
+    assert sorted((text_of[kept], text_of[duplicate]) for kept, duplicate, _ in pairs) == \
+           sorted(zip(ORIGINALS[:2], REPOSTS))
+
+    assert manager.clean_dataset(remove_near_duplicates=True, quality_threshold=0.0) == 2
+    assert stored_texts(manager) == set(ORIGINALS)
+    assert manager.find_near_duplicates() == []
+    assert manager.add_samples([make_sample(REPOSTS[0])]) == []
+
+
+def test_limit_caps_added_samples(manager):
+    texts = [f"BUY {pair} now" for pair in ("EURUSD", "GBPUSD", "AUDUSD", "NZDUSD")]
+    added = manager.add_samples([make_sample(text) for text in texts], near_duplicates=False, limit=3, batch_size=2)
+
+    assert len(added) == 3
+    assert stored_texts(manager) == set(texts[:3])
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for parser evaluation: side-by-side ordering, process-pool parity,
+latency percentiles and the comparison gate
+"""
+
+import json
+import time
+
+import pytest
+
+from ai_parser.evaluation_metrics import EvaluationEngine
+
+PAIRS = ["EURUSD", "GBPUSD", "XAUUSD", "USDJPY"]
+
+
+# Module-level parsers, so process pool workers can unpickle them
+def split_parser(raw_text):
+    direction, pair, entry, _, sl, _, tp = raw_text.split()
+    return {"pair": pair, "direction": direction.lower(), "entry": float(entry), "sl": float(sl), "tp": float(tp)}
+
+
+def lossy_parser(raw_text):
+    result = split_parser(raw_text)
+    if result["pair"] == "XAUUSD":
+        del result["pair"]
+    return result
+
+
+def slow_parser(raw_text):
+    time.sleep(0.002)
+    return split_parser(raw_text)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return EvaluationEngine(evaluations_dir=str(tmp_path / "evaluations"))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    lines = []
+    for i in range(40):
+        pair = PAIRS[i % len(PAIRS)]
+        entry = 1.08 + i * 0.001
+        expected = {"pair": pair, "direction": "buy", "entry": entry, "sl": entry - 0.005, "tp": entry + 0.01}
+        raw = f"BUY {pair} {entry} SL {entry - 0.005} TP {entry + 0.01}"
+        lines.append(json.dumps({"id": f"s{i}", "raw": raw, "parsed": expected}))
+    path = tmp_path / "test.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_evaluate_chunk_alternates_which_parser_runs_first(engine):
+    calls = []
+
+    def make_parser(name):
+        def parse(raw_text):
+            calls.append((name, raw_text))
+            return {"pair": "EURUSD"}
+        return parse
+
+    samples = [{"id": f"s{i}", "raw": f"signal {i}", "parsed": {"pair": "EURUSD"}} for i in range(4)]
+    baseline, candidate = engine._evaluate_chunk(samples, [make_parser("baseline"), make_parser("candidate")])
+
+    first_per_sample = [calls[i][0] for i in range(0, len(calls), 2)]
+    assert first_per_sample == ["baseline", "candidate", "baseline", "candidate"]
+    # Evaluations stay with their parser and in sample order
+    assert [evaluation.sample_id for evaluation in baseline] == ["s0", "s1", "s2", "s3"]
+    assert [evaluation.sample_id for evaluation in candidate] == ["s0", "s1", "s2", "s3"]
+    assert sorted(name for name, raw in calls if raw == "signal 1") == ["baseline", "candidate"]
+
+
+def test_process_pool_matches_single_process(engine, dataset):
+    serial = engine._run_parsers(dataset, [split_parser, lossy_parser], workers=1, chunk_size=7)
+    pooled = engine._run_parsers(dataset, [split_parser, lossy_parser], workers=2, chunk_size=7)
+
+    for serial_evals, pooled_evals in zip(serial, pooled):
+        assert [e.sample_id for e in pooled_evals] == [e.sample_id for e in serial_evals]
+        assert [e.predicted_result for e in pooled_evals] == [e.predicted_result for e in serial_evals]
+        assert [e.field_scores for e in pooled_evals] == [e.field_scores for e in serial_evals]
+
+    metrics = engine.evaluate_parser_performance(dataset, lossy_parser, workers=2, chunk_size=7)
+    assert metrics.accuracy == pytest.approx(engine._calculate_metrics(serial[1]).accuracy)
+
+
+def test_latency_percentiles_interpolate(engine):
+    assert engine._latency_percentiles([float(i) for i in range(101, 0, -1)]) == \
+           {"p50": 51.0, "p90": 91.0, "p95": 96.0, "p99": 100.0, "max": 101.0}
+
+    percentiles = engine._latency_percentiles([0.0, 10.0])
+    assert percentiles["p50"] == pytest.approx(5.0)
+    assert percentiles["p99"] == pytest.approx(9.9)
+    assert engine._latency_percentiles([0.25]) == {"p50": 0.25, "p90": 0.25, "p95": 0.25, "p99": 0.25, "max": 0.25}
+
+
+def test_compare_parsers_gate(engine, dataset):
+    same = engine.compare_parsers(dataset, split_parser, split_parser, max_latency_increase=100.0)
+    assert same["gate"] == {"passed": True, "reasons": []}
+    assert same["accuracy_delta"] == 0 and same["regressed_samples"] == 0
+
+    worse = engine.compare_parsers(dataset, split_parser, lossy_parser, max_latency_increase=100.0,
+                                   output_file="comparison")
+    assert not worse["gate"]["passed"]
+    assert worse["gate"]["reasons"][0].startswith("Accuracy dropped")
+    assert worse["regressed_samples"] == 10
+    assert {change["sample_id"] for change in worse["regressions"]} == {f"s{i}" for i in range(2, 40, 4)}
+    assert worse["field_deltas"]["pair"] == pytest.approx(-0.25)
+    assert len(list(engine.evaluations_dir.glob("comparison_*.json"))) == 1
+
+    # A tolerated accuracy drop passes
+    assert engine.compare_parsers(dataset, split_parser, lossy_parser, max_accuracy_drop=0.1,
+                                  max_latency_increase=100.0)["gate"]["passed"]
+
+    slower = engine.compare_parsers(dataset, split_parser, slow_parser, max_latency_increase=0.2)
+    assert slower["accuracy_delta"] == 0
+    assert not slower["gate"]["passed"]
+    assert [reason.split(" from ")[0] for reason in slower["gate"]["reasons"]] == ["p95 latency rose"]
+    assert slower["latency_deltas"]["p95"] > 0
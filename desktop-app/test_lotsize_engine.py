@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests that the vectorized lot calculation matches the scalar path
+"""
+
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from lotsize_engine import STRATEGY_MODE_MAPPING, calculate_lot, calculate_lots
+from signal_simulator import SignalSimulator
+
+SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD", "GBPJPY", "AUDUSD"]
+TEXTS = ["", "BUY EURUSD now", "use 0.5 lots", "lot: 1.25 lots high risk", "conservative entry",
+         "aggressive scalp", "max risk, use 2 lots", "low confidence setup", "risk 2%"]
+
+
+@pytest.fixture(autouse=True)
+def desktop_app_dir(monkeypatch):
+    # The engines read config.json relative to the working directory
+    monkeypatch.chdir(Path(__file__).parent)
+
+
+def test_calculate_lots_matches_calculate_lot():
+    rnd = random.Random(40)
+    rows = []
+    for _ in range(300):
+        rows.append(({'mode': rnd.choice(list(STRATEGY_MODE_MAPPING))},
+                     {'text': rnd.choice(TEXTS)},
+                     rnd.choice([1000.0, 5000.0, 10000.0, round(rnd.uniform(500, 50000), 2)]),
+                     rnd.choice([400.0, 250.0, 40.0, round(rnd.uniform(5, 600), 1)]),
+                     rnd.choice(SYMBOLS)))
+
+    expected = [calculate_lot(config, signal, balance, sl, symbol)
+                for config, signal, balance, sl, symbol in rows]
+    lots = calculate_lots([row[0] for row in rows], [row[1] for row in rows],
+                          np.array([row[2] for row in rows]), np.array([row[3] for row in rows]),
+                          [row[4] for row in rows])
+
+    assert lots.tolist() == expected
+
+
+def test_rounding_tie_matches_scalar_path():
+    # 0.025 lots: np.round gives 0.02, round() gives 0.03
+    scalar = calculate_lot({'mode': 'risk_percent'}, {'text': ''}, 10000, 400, 'XAUUSD')
+    batch = calculate_lots([{'mode': 'risk_percent'}], [{'text': ''}], np.array([10000.0]),
+                           np.array([400.0]), ['XAUUSD'])
+    assert batch.tolist() == [scalar]
+
+
+def test_batch_simulate_lots_match_simulate_signal():
+    rnd = random.Random(41)
+    simulator = SignalSimulator()
+    simulator.config.enable_logging = False
+    rows = []
+    for _ in range(100):
+        symbol = rnd.choice(SYMBOLS)
+        entry = round(rnd.uniform(100, 200) if "JPY" in symbol else rnd.uniform(1, 2), 3)
+        rows.append(({'symbol': symbol, 'direction': 'BUY', 'entry': [entry],
+                      'stop_loss': round(entry - rnd.uniform(0.01, 0.5), 3), 'take_profit': [entry + 0.5],
+                      'text': rnd.choice(TEXTS)},
+                     {'mode': rnd.choice(list(STRATEGY_MODE_MAPPING)),
+                      'account_balance': rnd.choice([1000.0, 10000.0, 25000.0])}))
+
+    expected = [simulator.simulate_signal(signal, config).lot for signal, config in rows]
+    assert [result.lot for result in simulator.batch_simulate(rows)] == expected
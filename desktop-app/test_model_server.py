@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the AI model server wiring: one shared server per process, updater
+hot-swaps, warm start and the bounded A/B routing cache
+"""
+
+import pytest
+
+import ai_parser.continuous_learning as continuous_learning
+import ai_parser.model_server as model_server
+from ai_parser.continuous_learning import ABTestConfig, ContinuousLearningEngine
+from ai_parser.parser_engine import SafeParserEngine
+from updater import model_updater
+
+
+class FakeUpdater:
+    def __init__(self):
+        self.listeners = []
+
+    def add_model_listener(self, callback):
+        self.listeners.append(callback)
+
+    def extract_model(self, version, model_dir):
+        for callback in self.listeners:
+            callback(version, model_dir)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(model_server, "_servers", {})
+    return tmp_path
+
+
+def test_learning_engine_and_parser_share_one_server(workdir):
+    assert continuous_learning.get_model_server is model_server.get_model_server
+
+    parser = SafeParserEngine(config_path=str(workdir / "missing.json"))
+    engine = ContinuousLearningEngine(models_dir="models", data_dir=str(workdir / "data"))
+    assert engine.model_server is parser.model_server
+
+    # An auto-deployed A/B winner reaches the server the parser reads from
+    engine.model_server.activate("v2")
+    assert parser.model_server.active().version == "v2"
+
+
+def test_parser_loads_model_before_first_parse(workdir):
+    parser = SafeParserEngine(config_path=str(workdir / "missing.json"))
+    stats = parser.model_server.get_statistics()
+    assert stats["loads"] == 1
+    assert stats["active_version"] is not None
+
+
+def test_attach_updater_hot_swaps_once_per_updater(workdir):
+    server = model_server.get_model_server("models")
+    updater = FakeUpdater()
+    server.attach_updater(updater)
+    server.attach_updater(updater)
+    assert len(updater.listeners) == 1
+
+    updater.extract_model("v3", workdir / "models" / "current_model")
+    assert server.active().version == "v3"
+    assert server.production_version() == "v3"
+
+
+def test_parser_follows_updates_without_creating_the_updater(workdir, monkeypatch):
+    monkeypatch.setattr(model_updater, "_model_updater", None)
+    monkeypatch.setattr(model_updater, "_pending_model_listeners", [])
+
+    parser = SafeParserEngine(config_path=str(workdir / "missing.json"))
+    SafeParserEngine(config_path=str(workdir / "missing.json"))
+    assert model_updater._model_updater is None
+    assert not (workdir / "models" / "current_model").exists()
+    assert not (workdir / "logs" / "model_updater.log").exists()
+
+    # The first real user of the updater picks up the pending listener, once
+    updater = model_updater.get_model_updater()
+    assert updater._model_listeners == [parser.model_server.activate]
+    updater._notify_model_listeners("v4")
+    assert parser.model_server.active().version == "v4"
+
+
+def test_route_cache_is_bounded(workdir, monkeypatch):
+    monkeypatch.setattr(continuous_learning, "ROUTE_CACHE_SIZE", 8)
+    engine = ContinuousLearningEngine(models_dir="models", data_dir=str(workdir / "data"))
+    engine.active_tests["t1"] = ABTestConfig(
+        test_id="t1", model_a="a", model_b="b", traffic_split=0.5, duration_hours=1,
+        success_metric="accuracy", significance_threshold=0.05, min_samples=10
+    )
+
+    routes = {f"user_{i}": engine.route_request(f"user_{i}", "t1") for i in range(50)}
+
+    assert len(engine._route_cache) == 8
+    # Evicted users are routed to the same arm again
+    assert all(engine.route_request(user, "t1") == model for user, model in routes.items())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-signal handler: the incremental conflict pre-check, lazy
+expiry, aggregation window scheduling and added-latency statistics
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from multi_signal_handler import (IncomingSignal, MultiSignalHandler, SignalDirection,
+                                  SignalPriority, SignalStatus, SymbolBook)
+
+WINDOW = 0.05
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = MultiSignalHandler(config_path=str(tmp_path / "missing.json"),
+                                 log_path=str(tmp_path / "logs" / "multi_signal_handler.log"))
+    handler.config.update(aggregation_window_seconds=WINDOW, processing_interval=60)
+    return handler
+
+
+def make_signal(signal_id, direction, entry_price, expiry_time=None, symbol="EURUSD"):
+    return IncomingSignal(
+        signal_id=signal_id, symbol=symbol, direction=direction, entry_price=entry_price,
+        stop_loss=None, take_profit=None, volume=None, confidence=0.8, provider_id="p1",
+        provider_name="Provider 1", priority=SignalPriority.MEDIUM, timestamp=datetime.now(),
+        expiry_time=expiry_time
+    )
+
+
+def make_book(handler, signals):
+    book = SymbolBook(handler._conflict_tolerance("EURUSD"))
+    for sequence, signal in enumerate(signals):
+        book.add(sequence, signal, time.monotonic())
+    return book
+
+
+def test_may_conflict_never_skips_a_real_conflict(handler):
+    tolerance = handler._conflict_tolerance("EURUSD")
+
+    # Adjacent buckets are under twice the tolerance apart; two buckets apart may be over it
+    near = [make_signal("a", SignalDirection.BUY, 1.08500), make_signal("b", SignalDirection.BUY, 1.08509)]
+    far = [make_signal("a", SignalDirection.BUY, 1.08500), make_signal("b", SignalDirection.BUY, 1.08511)]
+    assert not make_book(handler, near).may_conflict()
+    assert not handler._identify_conflicts(near)
+    assert make_book(handler, far).may_conflict()
+    assert [c.conflict_type for c in handler._identify_conflicts(far)] == ["entry_price_conflict"]
+
+    rnd = random.Random(50)
+    for _ in range(2000):
+        base = round(rnd.uniform(1.0, 1.2), 5)
+        signals = [make_signal(str(i), SignalDirection.BUY, round(base + rnd.uniform(0, 3 * tolerance), 5))
+                   for i in range(rnd.randint(2, 4))]
+        if handler._identify_conflicts(signals):
+            assert make_book(handler, signals).may_conflict(), [s.entry_price for s in signals]
+
+
+def test_pop_expired_skips_signals_already_removed():
+    now = datetime.now()
+    book = SymbolBook(0.00005)
+    for sequence, minutes in enumerate([-2, -1, 10]):
+        book.add(sequence, make_signal(f"s{sequence}", SignalDirection.BUY, 1.085,
+                                       expiry_time=now + timedelta(minutes=minutes)), time.monotonic())
+
+    # Removing a signal leaves its heap entry behind until it surfaces
+    book.remove(0)
+    assert len(book.expiry_heap) == 3
+
+    assert [s.signal_id for s in book.pop_expired(now.timestamp())] == ["s1"]
+    assert list(book.signals) == [2]
+    assert len(book.expiry_heap) == 1
+    assert book.direction_counts[SignalDirection.BUY] == 1
+
+    assert [s.signal_id for s in book.pop_expired((now + timedelta(minutes=11)).timestamp())] == ["s2"]
+    assert not book.signals and not book.expiry_heap
+
+
+def test_window_processes_conflict_then_leftovers(handler):
+    async def scenario():
+        assert handler.add_signal({"signal_id": "buy", "symbol": "EURUSD", "direction": "buy", "entry_price": 1.085})
+        book = handler.symbol_books["EURUSD"]
+        timer = book.timer
+        assert timer is not None
+
+        # Later signals join the open window instead of scheduling their own
+        assert handler.add_signal({"signal_id": "sell", "symbol": "EURUSD", "direction": "sell", "entry_price": 1.085})
+        assert handler.add_signal({"signal_id": "hold", "symbol": "EURUSD", "direction": "hold"})
+        assert book.timer is timer
+        assert len(handler.pending_signals["EURUSD"]) == 3
+
+        await asyncio.sleep(WINDOW * 1.5)
+        # The conflict was resolved; the signal outside it waits for a window of its own
+        assert [s.signal_id for s in handler.pending_signals["EURUSD"]] == ["hold"]
+        assert book.timer is not None and book.timer is not timer
+        assert handler.processed_signals[0].conflicts_resolved == ["directional_conflict"]
+
+        await asyncio.sleep(WINDOW * 1.5)
+        assert "EURUSD" not in handler.symbol_books
+        handler.stop_processing()
+
+    asyncio.run(scenario())
+
+    winner, leftover = handler.processed_signals
+    assert winner.final_signal.signal_id in ("buy", "sell")
+    assert leftover.final_signal.signal_id == "hold"
+    assert all(p.status == SignalStatus.PROCESSED for p in handler.processed_signals)
+    assert handler.processing_stats["conflicted_signals"] == 2
+
+
+def test_statistics_report_added_latency(handler):
+    assert handler.get_statistics()["added_latency"]["signals"] == 0
+
+    async def scenario():
+        for i in range(4):
+            handler.add_signal({"signal_id": f"s{i}", "symbol": "GBPUSD", "direction": "buy",
+                                "entry_price": 1.27 + i * 0.01})
+        await asyncio.sleep(WINDOW * 2)
+        handler.stop_processing()
+
+    asyncio.run(scenario())
+
+    latency = handler.get_statistics()["added_latency"]
+    assert latency["signals"] == 4
+    assert latency["p50_ms"] >= WINDOW * 1000 * 0.9
+    assert latency["p50_ms"] <= latency["p95_ms"] <= latency["p99_ms"] <= latency["max_ms"]
+    assert latency["mean_ms"] <= latency["max_ms"]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the order ladder submitter: all-or-nothing rollback and the submission deadline
+"""
+
+import asyncio
+
+import pytest
+
+from order_ladder import OrderLadderSubmitter, LadderLeg, LegStatus, bridge_cancel_method
+
+
+def make_leg(index, response, delay=0.0, metadata=None):
+    async def submit():
+        await asyncio.sleep(delay)
+        return response
+    return LadderLeg(leg_id=f"leg_{index}", submit=submit, metadata=metadata or {})
+
+
+class RecordingCanceller:
+    """Cancel method returning a fixed response per ticket"""
+
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.cancelled = []
+
+    async def __call__(self, ticket):
+        self.cancelled.append(ticket)
+        return self.responses.get(ticket, {'success': True})
+
+
+def test_rollback_cancels_placed_legs():
+    canceller = RecordingCanceller()
+    legs = [make_leg(1, {'success': True, 'ticket': 101}),
+            make_leg(2, {'success': True, 'ticket': 102}),
+            make_leg(3, {'success': False, 'error': 'Invalid price'})]
+
+    ladder = asyncio.run(OrderLadderSubmitter(cancel_order=canceller).submit(legs, all_or_nothing=True))
+
+    assert ladder.rolled_back
+    assert sorted(canceller.cancelled) == [101, 102]
+    assert [leg.status for leg in ladder.legs] == [LegStatus.ROLLED_BACK, LegStatus.ROLLED_BACK, LegStatus.FAILED]
+    assert not ladder.placed_legs
+
+
+def test_rollback_counts_only_explicit_success():
+    # A truthy non-dict or a dict without success=True must not be taken as a cancel
+    canceller = RecordingCanceller({101: True, 102: {'ticket': 102}, 103: {'success': True}})
+    legs = [make_leg(1, {'success': True, 'ticket': 101}),
+            make_leg(2, {'success': True, 'ticket': 102}),
+            make_leg(3, {'success': True, 'ticket': 103}),
+            make_leg(4, {'success': False})]
+
+    ladder = asyncio.run(OrderLadderSubmitter(cancel_order=canceller).submit(legs, all_or_nothing=True))
+
+    assert not ladder.rolled_back
+    assert [leg.ticket for leg in ladder.placed_legs] == [101, 102]
+    assert ladder.legs[2].status == LegStatus.ROLLED_BACK
+
+
+def test_all_or_nothing_without_cancel_method_fails_before_placing():
+    submitted = []
+
+    async def submit():
+        submitted.append(True)
+        return {'success': True, 'ticket': 1}
+
+    with pytest.raises(ValueError):
+        asyncio.run(OrderLadderSubmitter().submit([LadderLeg(leg_id="leg", submit=submit)], all_or_nothing=True))
+    assert not submitted
+
+
+def test_deadline_times_out_slow_legs():
+    legs = [make_leg(1, {'success': True, 'ticket': 101}),
+            make_leg(2, {'success': True, 'ticket': 102}, delay=5.0)]
+
+    ladder = asyncio.run(OrderLadderSubmitter().submit(legs, deadline_seconds=0.05))
+
+    assert ladder.deadline_exceeded
+    assert [leg.status for leg in ladder.legs] == [LegStatus.PLACED, LegStatus.TIMED_OUT]
+    assert ladder.total_latency_ms < 1000
+
+
+def test_deadline_rolls_back_placed_legs_but_not_timed_out_ones():
+    canceller = RecordingCanceller()
+    legs = [make_leg(1, {'success': True, 'ticket': 101}),
+            make_leg(2, {'success': True, 'ticket': 102}, delay=5.0, metadata={'price': 1.0850})]
+
+    ladder = asyncio.run(OrderLadderSubmitter(cancel_order=canceller).submit(
+        legs, all_or_nothing=True, deadline_seconds=0.05))
+
+    assert ladder.deadline_exceeded
+    assert canceller.cancelled == [101]
+    assert [leg.status for leg in ladder.legs] == [LegStatus.ROLLED_BACK, LegStatus.TIMED_OUT]
+    # The timed out order may still be live at the broker, so the ladder is not reported as rolled back
+    assert not ladder.rolled_back
+    assert ladder.legs[1].metadata == {'price': 1.0850}
+
+
+def test_bridge_cancel_method_wraps_blocking_bridge():
+    from trade.mt5_socket_bridge import TradeResult
+
+    class BlockingBridge:
+        def __init__(self):
+            self.cancelled = []
+
+        def cancel_order(self, ticket):
+            self.cancelled.append(ticket)
+            return TradeResult(success=ticket != 13, order_id=ticket, error_message="" if ticket != 13 else "Rejected")
+
+    bridge = BlockingBridge()
+    cancel = bridge_cancel_method(bridge)
+
+    assert asyncio.run(cancel(12))['success'] is True
+    assert asyncio.run(cancel(13)) == {'success': False, 'order_id': 13, 'error': "Rejected"}
+    assert bridge.cancelled == [12, 13]
+    assert bridge_cancel_method(object()) is None
+    assert bridge_cancel_method(None) is None
+
+
+def test_all_or_nothing_config_rejects_bridge_without_cancel(monkeypatch):
+    from pathlib import Path
+    from entry_range import EntryRangeEngine
+    from trade.mt5_socket_bridge import MT5SocketBridge
+
+    monkeypatch.chdir(Path(__file__).parent)
+    engine = EntryRangeEngine()
+    engine.config['ladder_all_or_nothing'] = True
+
+    with pytest.raises(ValueError):
+        engine.inject_modules(mt5_bridge=object())
+    assert callable(getattr(MT5SocketBridge, 'cancel_order', None))
+
+
+def test_range_entry_rollback_closes_positions_through_bridge():
+    from trade.mt5_socket_bridge import MT5SocketBridge, TradeResult
+    from trade_executor import TradeExecutor
+
+    assert callable(getattr(MT5SocketBridge, 'close_position', None))
+
+    class FakeBridge:
+        def __init__(self):
+            self.closed = []
+
+        def close_position(self, ticket):
+            self.closed.append(ticket)
+            return TradeResult(success=ticket != 13, order_id=ticket)
+
+    executor = TradeExecutor.__new__(TradeExecutor)
+    executor.mt5_bridge = FakeBridge()
+
+    assert asyncio.run(executor._close_range_leg(12))['success'] is True
+    assert asyncio.run(executor._close_range_leg(13))['success'] is False
+    assert executor.mt5_bridge.closed == [12, 13]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for direction normalization in the parser utilities
+"""
+
+import pytest
+
+from ai_parser.parser_utils import normalize_direction
+
+
+@pytest.mark.parametrize("direction, expected", [
+    ("buy", "BUY"),
+    ("Sell", "SELL"),
+    ("B", "BUY"),
+    ("L", "BUY"),
+    ("S", "SELL"),
+    ("BUY LIMIT", "BUY"),
+    ("BUY STOP", "BUY"),
+    ("SELL LIMIT", "SELL"),
+    ("SELL STOP", "SELL"),
+    ("STRONG SELL", "SELL"),
+    ("STRONG BUY", "BUY"),
+    ("GO SHORT", "SELL"),
+    ("LONG NOW", "BUY"),
+    ("BUYLIMIT", "BUY"),
+    ("SELLSTOP", "SELL"),
+    ("", ""),
+])
+def test_normalize_direction(direction, expected):
+    assert normalize_direction(direction) == expected
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests that the parser records exactly one provider template outcome per message
+"""
+
+import pytest
+
+from ai_parser.parser_engine import SafeParserEngine
+
+SIGNAL = "BUY EURUSD @ 1.0850\nSL 1.0800\nTP 1.0900"
+
+
+class RecordingTemplates:
+    """Active templates returning a fixed extraction and recording outcomes"""
+
+    def __init__(self, extraction):
+        self.extraction = extraction
+        self.outcomes = []
+
+    def is_active(self, provider):
+        return True
+
+    def extract(self, provider, text):
+        return self.extraction
+
+    def record(self, provider, outcome):
+        self.outcomes.append(outcome)
+
+
+@pytest.fixture
+def parser(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return SafeParserEngine(config_path=str(tmp_path / "missing.json"))
+
+
+@pytest.mark.parametrize("extraction, expected", [
+    (None, ["miss"]),
+    ({"pair": "EURUSD"}, ["invalid"]),
+    ({"pair": "EURUSD", "direction": "BUY", "entry": [1.085], "sl": 1.08, "tp": [1.09]}, ["hit"]),
+])
+def test_one_template_outcome_per_message(parser, extraction, expected):
+    templates = parser.templates = RecordingTemplates(extraction)
+
+    assert parser.parse_signal_safe(SIGNAL, provider="channel_a") is not None
+    assert templates.outcomes == expected
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the ticket tracker: statistics across restarts, index lookups,
+recent trades and the closed-ticket archive
+"""
+
+import json
+
+import ticket_tracker
+from ticket_tracker import RECENT_TRADES_KEPT, TicketTracker, TradeDirection, TradeStatus
+
+
+def make_tracker(tmp_path):
+    config = tmp_path / "config.json"
+    if not config.exists():
+        config.write_text(json.dumps({"ticket_tracker": {}}), encoding="utf-8")
+    return TicketTracker(config_file=str(config), log_file=str(tmp_path / "ticket_log.json"))
+
+
+def test_recent_updates_survive_restart(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.register_trade_ticket(1, "EURUSD", TradeDirection.BUY, 1.085, 0.1, 1.08, 1.09, "p1", "Provider 1")
+    tracker.register_trade_ticket(2, "GBPUSD", TradeDirection.SELL, 1.27, 0.2, 1.28, 1.26, "p2", "Provider 2")
+    tracker.modify_ticket(1, "stop_loss", 1.08, 1.082)
+    tracker.update_ticket_status(2, TradeStatus.CLOSED, close_price=1.26, profit=20.0)
+
+    before = tracker.get_tracking_statistics()
+    before_p1 = tracker.get_windowed_statistics(hours=24, provider_id="p1")
+    assert before["recent_updates_24h"] == 2
+
+    restarted = make_tracker(tmp_path)
+    assert restarted.get_tracking_statistics()["recent_updates_24h"] == before["recent_updates_24h"]
+    assert restarted.get_windowed_statistics(hours=24, provider_id="p1") == before_p1
+    assert restarted.get_windowed_statistics(hours=24) == tracker.get_windowed_statistics(hours=24)
+
+
+def make_archiving_tracker(tmp_path):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"ticket_tracker": {
+        "archive_closed_tickets": True, "archive_db_file": str(tmp_path / "archive.db")
+    }}), encoding="utf-8")
+    return TicketTracker(config_file=str(config), log_file=str(tmp_path / "ticket_log.json"))
+
+
+def test_index_lookups_follow_status_and_reregistration(tmp_path, monkeypatch):
+    clock = iter(range(1_700_000_000, 1_700_100_000, 10))
+    monkeypatch.setattr(ticket_tracker, "now_ts", lambda: float(next(clock)))
+    tracker = make_tracker(tmp_path)
+    tracker.register_trade_ticket(1, "EURUSD", TradeDirection.BUY, 1.085, 0.1, 1.08, 1.09, "p1", "Provider 1",
+                                  signal_content="BUY EURUSD")
+    tracker.register_trade_ticket(2, "EURUSD", TradeDirection.BUY, 1.086, 0.1, 1.08, 1.09, "p1", "Provider 1",
+                                  signal_content="BUY EURUSD")
+    tracker.register_trade_ticket(3, "EURUSD", TradeDirection.SELL, 1.084, 0.1, 1.09, 1.08, "p2", "Provider 2")
+    signal_hash = tracker.tracked_tickets[1].signal_source.signal_hash
+
+    assert [t.ticket for t in tracker.find_tickets_by_signal_hash(signal_hash)] == [1, 2]
+    assert [t.ticket for t in tracker.find_tickets_by_provider("p1")] == [1, 2]
+    assert tracker.find_ticket_by_context("EURUSD", "p1", TradeDirection.BUY).ticket == 2
+    assert tracker.find_ticket_by_context("EURUSD", "p2").ticket == 3
+    assert tracker.find_ticket_by_context("EURUSD", "p1", TradeDirection.SELL) is None
+
+    # Closed tickets stay findable by hash and provider, but not by open context
+    tracker.update_ticket_status(2, TradeStatus.CLOSED, close_price=1.09, profit=40.0)
+    assert tracker.find_ticket_by_context("EURUSD", "p1", TradeDirection.BUY).ticket == 1
+    assert [t.ticket for t in tracker.find_tickets_by_provider("p1")] == [1, 2]
+
+    # Re-registering a ticket number moves it to its new signal and provider
+    tracker.register_trade_ticket(1, "GBPUSD", TradeDirection.SELL, 1.27, 0.1, 1.28, 1.26, "p2", "Provider 2")
+    assert [t.ticket for t in tracker.find_tickets_by_signal_hash(signal_hash)] == [2]
+    assert [t.ticket for t in tracker.find_tickets_by_provider("p1")] == [2]
+    assert [t.ticket for t in tracker.find_tickets_by_provider("p2")] == [3, 1]
+    assert tracker.find_ticket_by_context("EURUSD", "p1", TradeDirection.BUY) is None
+
+
+def test_recent_trades_keep_the_newest_per_provider(tmp_path, monkeypatch):
+    clock = iter(range(1_700_000_000, 1_700_100_000, 10))
+    monkeypatch.setattr(ticket_tracker, "now_ts", lambda: float(next(clock)))
+    tracker = make_tracker(tmp_path)
+    for ticket in range(1, RECENT_TRADES_KEPT + 3):
+        tracker.register_trade_ticket(ticket, "EURUSD", TradeDirection.BUY, 1.085, 0.1, 1.08, 1.09, "p1", "Provider 1")
+
+    recent = tracker.get_provider_summary("p1")["recent_trades"]
+    assert [t["ticket"] for t in recent] == list(range(RECENT_TRADES_KEPT + 2, 2, -1))
+
+    tracker.register_trade_ticket(RECENT_TRADES_KEPT + 2, "EURUSD", TradeDirection.BUY, 1.085, 0.1, 1.08, 1.09,
+                                  "p2", "Provider 2")
+    recent = tracker.get_provider_summary("p1")["recent_trades"]
+    assert RECENT_TRADES_KEPT + 2 not in [t["ticket"] for t in recent]
+    assert tracker.get_provider_summary("p1")["total_trades"] == RECENT_TRADES_KEPT + 1
+
+
+def test_closed_tickets_move_to_the_archive(tmp_path):
+    tracker = make_archiving_tracker(tmp_path)
+    tracker.register_trade_ticket(1, "EURUSD", TradeDirection.BUY, 1.085, 0.1, 1.08, 1.09, "p1", "Provider 1",
+                                  signal_content="BUY EURUSD")
+    tracker.register_trade_ticket(2, "EURUSD", TradeDirection.BUY, 1.086, 0.1, 1.08, 1.09, "p1", "Provider 1")
+    signal_hash = tracker.tracked_tickets[1].signal_source.signal_hash
+    tracker.update_ticket_status(1, TradeStatus.CLOSED, close_price=1.09, profit=50.0)
+
+    assert 1 not in tracker.tracked_tickets
+    assert tracker.get_ticket_info(1).profit == 50.0
+    assert [t.ticket for t in tracker.find_tickets_by_provider("p1")] == [1, 2]
+    assert [t.ticket for t in tracker.find_tickets_by_signal_hash(signal_hash)] == [1]
+    assert tracker.find_ticket_by_context("EURUSD", "p1", TradeDirection.BUY).ticket == 2
+    summary = tracker.get_provider_summary("p1")
+    tracker.closed_store.close()
+
+    restarted = make_archiving_tracker(tmp_path)
+    assert restarted.get_ticket_info(1).status == TradeStatus.CLOSED
+    restarted_summary = restarted.get_provider_summary("p1")
+    for key in ("total_trades", "open_trades", "closed_trades", "winning_trades", "total_profit"):
+        assert restarted_summary[key] == summary[key]
+    restarted.closed_store.close()
+
+
+def test_closed_tickets_in_history_are_migrated_to_the_archive(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.register_trade_ticket(1, "EURUSD", TradeDirection.BUY, 1.085, 0.1, 1.08, 1.09, "p1", "Provider 1")
+    tracker.register_trade_ticket(2, "EURUSD", TradeDirection.BUY, 1.086, 0.1, 1.08, 1.09, "p1", "Provider 1")
+    tracker.update_ticket_status(1, TradeStatus.CLOSED, close_price=1.09, profit=50.0)
+
+    archiving = make_archiving_tracker(tmp_path)
+    assert list(archiving.tracked_tickets) == [2]
+    assert archiving.closed_store.count() == 1
+    assert archiving.get_provider_summary("p1")["total_profit"] == 50.0
+    archiving.closed_store.close()
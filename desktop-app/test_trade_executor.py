@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for sharded trade execution: per-symbol ordering and requests queued before start
+"""
+
+import asyncio
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from trade_executor import ExecutionMode, TradeExecutor
+
+SYMBOLS = ["EURUSD", "GBPUSD", "XAUUSD", "USDJPY"]
+
+
+class FakeBridge:
+    async def connect(self):
+        return True
+
+    async def disconnect(self):
+        pass
+
+
+@pytest.fixture
+def executor(tmp_path, monkeypatch):
+    # Symbol maps and logs are read relative to the working directory
+    monkeypatch.chdir(Path(__file__).parent)
+    config = TradeExecutor(config_file=str(tmp_path / "missing.json")).config
+    config.update({"execution_mode": "sharded", "max_concurrent_executions": 3})
+    config_file = tmp_path / "trade_executor.json"
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+
+    executor = TradeExecutor(config_file=str(config_file))
+    executor.mt5_bridge = FakeBridge()
+    executor.executed = []
+    executor.overlaps = 0
+    running = set()
+    rnd = random.Random(27)
+
+    async def map_symbol(symbol):
+        return symbol
+
+    async def position_size(signal, params):
+        return 0.01
+
+    async def handle(request):
+        if request.symbol in running:
+            executor.overlaps += 1
+        running.add(request.symbol)
+        await asyncio.sleep(rnd.uniform(0, 0.005))
+        running.discard(request.symbol)
+        executor.executed.append(request.signal_id)
+        executor.active_executions.pop(request.request_id, None)
+
+    # SymbolMapper has no async map_symbol yet; execute_signal awaits one
+    monkeypatch.setattr(executor.symbol_mapper, "map_symbol", map_symbol, raising=False)
+    monkeypatch.setattr(executor, "_calculate_position_size", position_size)
+    monkeypatch.setattr(executor, "_handle_execution_request", handle)
+    return executor
+
+
+def make_signal(symbol, index):
+    return {"pair": symbol, "direction": "buy", "entry": [1.0], "signal_id": f"{symbol}_{index}"}
+
+
+async def drain(executor, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while executor.active_executions and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_requests_queued_before_start_are_executed(executor):
+    async def scenario():
+        assert executor.execution_mode == ExecutionMode.SHARDED
+        for i in range(6):
+            await executor.execute_signal(make_signal(SYMBOLS[i % 2], i))
+        assert executor.get_status()["queue_depth"] == 6
+
+        assert await executor.start()
+        await drain(executor)
+        await executor.stop()
+
+    asyncio.run(scenario())
+
+    assert not executor.active_executions
+    assert sorted(executor.executed) == sorted(f"{SYMBOLS[i % 2]}_{i}" for i in range(6))
+
+
+def test_sharded_execution_keeps_per_symbol_order(executor):
+    rnd = random.Random(7)
+    submitted = [make_signal(rnd.choice(SYMBOLS), i) for i in range(60)]
+
+    async def scenario():
+        assert await executor.start()
+        for signal in submitted:
+            await executor.execute_signal(signal)
+            if rnd.random() < 0.3:
+                await asyncio.sleep(0.001)
+        await drain(executor)
+        await executor.stop()
+
+    asyncio.run(scenario())
+
+    assert len(executor.executed) == len(submitted)
+    assert executor.overlaps == 0
+    for symbol in SYMBOLS:
+        expected = [signal["signal_id"] for signal in submitted if signal["pair"] == symbol]
+        assert [signal_id for signal_id in executor.executed if signal_id.startswith(symbol)] == expected
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests that cached causal LM features batch through the language modeling collator
+"""
+
+import json
+
+import pytest
+
+from ai_parser import training_cache
+from ai_parser.training_cache import FeatureCache, HashingFeaturizer, TokenizerFeaturizer, load_records
+
+RECORDS = [
+    {"input": "BUY EURUSD @ 1.0850", "output": '{"pair": "EURUSD"}'},
+    {"input": "SELL XAUUSD Entry: 2345 SL: 2350 TP1: 2339 TP2: 2333", "output": '{"pair": "XAUUSD", "sl": 2350}'},
+    {"input": "GBPUSD long", "output": "{}"},
+]
+
+
+class FakeTokenizer:
+    """Word-level tokenizer with the padding behaviour of a HuggingFace tokenizer"""
+
+    pad_token = "<pad>"
+    pad_token_id = 0
+    mask_token = None
+    padding_side = "right"
+
+    def __init__(self):
+        self.vocab = {}
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        input_ids = [[self.vocab.setdefault(word, len(self.vocab) + 1) for word in text.split()][:max_length]
+                     for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, examples, return_tensors=None, pad_to_multiple_of=None, **kwargs):
+        import torch
+        longest = max(len(example["input_ids"]) for example in examples)
+        batch = {}
+        for key in examples[0]:
+            # Like the real tokenizer, only input_ids and attention_mask are padded
+            pad_value = {"input_ids": self.pad_token_id, "attention_mask": 0}.get(key)
+            rows = [list(example[key]) + ([pad_value] * (longest - len(example[key])) if pad_value is not None else [])
+                    for example in examples]
+            batch[key] = torch.tensor(rows)
+        return batch
+
+
+def make_records(tmp_path):
+    path = tmp_path / "train.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in RECORDS), encoding="utf-8")
+    return load_records(str(path))
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    fake = FakeTokenizer()
+    monkeypatch.setitem(training_cache._tokenizers, "fake", fake)
+    return fake
+
+
+@pytest.mark.parametrize("make_featurizer", [lambda: TokenizerFeaturizer("fake"), lambda: HashingFeaturizer()])
+def test_cached_features_leave_labels_to_the_collator(tmp_path, tokenizer, make_featurizer):
+    cache = FeatureCache(tmp_path / "features.db")
+    featurizer = make_featurizer()
+
+    fresh = cache.featurize(make_records(tmp_path), featurizer)
+    cached = cache.featurize(make_records(tmp_path), featurizer)
+
+    assert cache.hits == len(RECORDS)
+    assert fresh == cached
+    assert all(set(features) == {"input_ids", "attention_mask"} for features in cached)
+
+
+def test_cached_features_pad_through_language_modeling_collator(tmp_path, tokenizer):
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    cache = FeatureCache(tmp_path / "features.db")
+    cache.featurize(make_records(tmp_path), TokenizerFeaturizer("fake"))
+    features = cache.featurize(make_records(tmp_path), TokenizerFeaturizer("fake"))
+
+    collator = transformers.DataCollatorForLanguageModeling(tokenizer=tokenizer, mlm=False, return_tensors="pt")
+    batch = collator(features)
+
+    lengths = [len(f["input_ids"]) for f in features]
+    assert batch["input_ids"].shape == batch["labels"].shape == (len(features), max(lengths))
+    for row, length in enumerate(lengths):
+        assert batch["labels"][row, :length].tolist() == features[row]["input_ids"]
+        assert (batch["labels"][row, length:] == -100).all()
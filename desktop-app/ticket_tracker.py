@@ -4,14 +4,20 @@ Tracks MT5 trade tickets and links them to their originating signal messages or
 """
 
 import asyncio
+import heapq
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, field
+import sqlite3
+import threading
+from dataclasses import field, replace
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator
 from enum import Enum
 import json
 import hashlib
 
+from trade_records import (trade_record, Timestamp, now_ts, ts_to_iso,
+                           record_to_dict, record_from_dict)
+
 
 class TradeStatus(Enum):
     PENDING = "pending"
@@ -26,7 +32,7 @@ class TradeDirection(Enum):
     SELL = "sell"
 
 
-@dataclass
+@trade_record
 class SignalSource:
     provider_id: str
     provider_name: str
@@ -35,7 +41,7 @@ class SignalSource:
     signal_hash: Optional[str] = None
 
 
-@dataclass
+@trade_record
 class TradeTicket:
     ticket: int
     symbol: str
@@ -44,10 +50,10 @@ class TradeTicket:
     lot_size: float
     stop_loss: Optional[float]
     take_profit: Optional[float]
-    open_time: datetime
+    open_time: Timestamp
     signal_source: SignalSource
     status: TradeStatus = TradeStatus.OPEN
-    close_time: Optional[datetime] = None
+    close_time: Optional[Timestamp] = None
     close_price: Optional[float] = None
     profit: Optional[float] = None
     commission: Optional[float] = None
@@ -55,28 +61,164 @@ class TradeTicket:
     comment: Optional[str] = None
 
 
-@dataclass
+@trade_record
 class TicketUpdate:
     ticket: int
     update_type: str
     old_value: Any
     new_value: Any
-    update_time: datetime
+    update_time: Timestamp
     reason: str
 
 
-@dataclass
+@trade_record
 class ProviderStats:
     provider_id: str
+    provider_name: Optional[str] = None
     total_trades: int = 0
     open_trades: int = 0
     closed_trades: int = 0
+    cancelled_trades: int = 0
     winning_trades: int = 0
     losing_trades: int = 0
     total_profit: float = 0.0
     total_volume: float = 0.0
-    first_trade_time: Optional[datetime] = None
-    last_trade_time: Optional[datetime] = None
+    first_trade_time: Optional[Timestamp] = None
+    last_trade_time: Optional[Timestamp] = None
+    open_symbols: Dict[str, int] = field(default_factory=dict)  # symbol -> open ticket count
+    recent_trades: List[TradeTicket] = field(default_factory=list)  # newest first, bounded
+
+
+@trade_record
+class SymbolStats:
+    symbol: str
+    total_trades: int = 0
+    open_trades: int = 0
+    closed_trades: int = 0
+    cancelled_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    total_profit: float = 0.0
+    total_volume: float = 0.0
+
+
+@trade_record
+class StatsBucket:
+    """Hour or day rollup: opens are bucketed by open time, closes by close time"""
+    bucket_start: Timestamp
+    opened_trades: int = 0
+    closed_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    total_profit: float = 0.0
+    total_volume: float = 0.0
+    updates: int = 0
+
+
+OPEN_STATUSES = (TradeStatus.OPEN, TradeStatus.MODIFIED)
+FINAL_STATUSES = (TradeStatus.CLOSED, TradeStatus.CANCELLED)
+
+# (symbol, provider_id, direction) key of the open-ticket context index
+ContextKey = Tuple[str, str, TradeDirection]
+
+# Rollup scope covering every provider
+ALL_PROVIDERS = "*"
+ROLLUP_RESOLUTIONS = {"hour": 3600, "day": 86400}
+RECENT_TRADES_KEPT = 5
+
+
+class ClosedTicketStore:
+    """SQLite archive for closed tickets so they can leave memory but stay queryable"""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS closed_tickets (
+                    ticket INTEGER PRIMARY KEY,
+                    provider_id TEXT NOT NULL,
+                    signal_hash TEXT,
+                    symbol TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    open_time REAL NOT NULL,
+                    close_time REAL,
+                    data TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_closed_provider ON closed_tickets(provider_id, open_time)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_closed_hash ON closed_tickets(signal_hash)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_closed_time ON closed_tickets(close_time)')
+            self._conn.commit()
+
+    def archive(self, tickets: List[TradeTicket]):
+        """Insert or replace closed tickets in one transaction"""
+        rows = [
+            (t.ticket, t.signal_source.provider_id, t.signal_source.signal_hash, t.symbol,
+             t.status.value, t.open_time, t.close_time, json.dumps(record_to_dict(t)))
+            for t in tickets
+        ]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO closed_tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.commit()
+
+    def _select(self, where: str, params: tuple) -> List[TradeTicket]:
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT data FROM closed_tickets WHERE {where} ORDER BY open_time', params).fetchall()
+        return [record_from_dict(TradeTicket, json.loads(row[0])) for row in rows]
+
+    def get(self, ticket: int) -> Optional[TradeTicket]:
+        tickets = self._select('ticket = ?', (ticket,))
+        return tickets[0] if tickets else None
+
+    def by_provider(self, provider_id: str) -> List[TradeTicket]:
+        return self._select('provider_id = ?', (provider_id,))
+
+    def by_signal_hash(self, signal_hash: str) -> List[TradeTicket]:
+        return self._select('signal_hash = ?', (signal_hash,))
+
+    def count(self, status: Optional[TradeStatus] = None) -> int:
+        with self._lock:
+            if status is None:
+                return self._conn.execute('SELECT COUNT(*) FROM closed_tickets').fetchone()[0]
+            return self._conn.execute('SELECT COUNT(*) FROM closed_tickets WHERE status = ?',
+                                      (status.value,)).fetchone()[0]
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[TradeTicket]:
+        """Stream every archived ticket in batches"""
+        last_ticket = None
+        while True:
+            with self._lock:
+                if last_ticket is None:
+                    rows = self._conn.execute('SELECT ticket, data FROM closed_tickets ORDER BY ticket LIMIT ?',
+                                              (batch_size,)).fetchall()
+                else:
+                    rows = self._conn.execute('SELECT ticket, data FROM closed_tickets WHERE ticket > ? '
+                                              'ORDER BY ticket LIMIT ?', (last_ticket, batch_size)).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield record_from_dict(TradeTicket, json.loads(data))
+            last_ticket = rows[-1][0]
+
+    def delete_closed_before(self, cutoff: float) -> List[TradeTicket]:
+        """Delete archived tickets closed before cutoff; returns the removed tickets"""
+        removed = self._select('status = ? AND close_time < ?', (TradeStatus.CLOSED.value, cutoff))
+        with self._lock:
+            self._conn.execute('DELETE FROM closed_tickets WHERE status = ? AND close_time < ?',
+                               (TradeStatus.CLOSED.value, cutoff))
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
 
 class TicketTracker:
@@ -87,23 +229,44 @@ class TicketTracker:
         
         # Core tracking data
         self.tracked_tickets: Dict[int, TradeTicket] = {}
-        self.signal_to_tickets: Dict[str, List[int]] = {}  # signal_hash -> ticket_list
-        self.provider_tickets: Dict[str, List[int]] = {}  # provider_id -> ticket_list
         self.ticket_updates: List[TicketUpdate] = []
         
+        # Secondary indexes over tracked_tickets (insertion-ordered ticket -> record maps)
+        self.signal_to_tickets: Dict[str, Dict[int, TradeTicket]] = {}  # signal_hash -> tickets
+        self.provider_tickets: Dict[str, Dict[int, TradeTicket]] = {}  # provider_id -> tickets
+        self.open_context_tickets: Dict[ContextKey, Dict[int, TradeTicket]] = {}  # open tickets only
+        
+        # Optional SQLite archive for closed tickets
+        self.closed_store: Optional[ClosedTicketStore] = None
+        
         # Module dependencies
         self.mt5_bridge = None
         self.copilot_bot = None
         self.strategy_runtime = None
         
-        # Statistics cache
+        # Running aggregates, updated incrementally by _update_provider_stats
         self.provider_stats: Dict[str, ProviderStats] = {}
+        self.symbol_stats: Dict[str, SymbolStats] = {}
+        self.overall_stats = ProviderStats(provider_id=ALL_PROVIDERS)
+        self.rollups: Dict[str, Dict[Tuple[str, int], StatsBucket]] = {
+            resolution: {} for resolution in ROLLUP_RESOLUTIONS
+        }  # resolution -> (provider_id or ALL_PROVIDERS, bucket_start) -> bucket
+        self.archived_count = 0
+        
+        # In-memory closed tickets ordered by close time, for cleanup (lazy deletion)
+        self._close_heap: List[Tuple[float, int]] = []
         
         # Setup logging
         self._setup_logging()
         
+        if self.config.get('archive_closed_tickets', False):
+            self.closed_store = ClosedTicketStore(self.config.get('archive_db_file', 'logs/ticket_archive.db'))
+        
         # Load existing data
         self._load_ticket_history()
+        self._load_archived_stats()
+        self._load_update_rollups()
+        self._prune_rollups()
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from JSON file"""
@@ -125,7 +288,11 @@ class TicketTracker:
                 "enable_telegram_notifications": True,
                 "track_modifications": True,
                 "backup_interval_hours": 24,
-                "signal_hash_algorithm": "md5"
+                "signal_hash_algorithm": "md5",
+                "archive_closed_tickets": False,
+                "archive_db_file": "logs/ticket_archive.db",
+                "hourly_rollup_retention_days": 7,
+                "daily_rollup_retention_days": 365
             }
         }
         
@@ -157,61 +324,31 @@ class TicketTracker:
                 history_data = json.load(f)
                 
                 # Load tracked tickets
+                to_archive = []
                 for ticket_data in history_data.get('tracked_tickets', []):
                     try:
-                        signal_source = SignalSource(
-                            provider_id=ticket_data['signal_source']['provider_id'],
-                            provider_name=ticket_data['signal_source']['provider_name'],
-                            channel_name=ticket_data['signal_source'].get('channel_name'),
-                            message_id=ticket_data['signal_source'].get('message_id'),
-                            signal_hash=ticket_data['signal_source'].get('signal_hash')
-                        )
+                        ticket = record_from_dict(TradeTicket, ticket_data)
                         
-                        ticket = TradeTicket(
-                            ticket=ticket_data['ticket'],
-                            symbol=ticket_data['symbol'],
-                            direction=TradeDirection(ticket_data['direction']),
-                            entry_price=ticket_data['entry_price'],
-                            lot_size=ticket_data['lot_size'],
-                            stop_loss=ticket_data.get('stop_loss'),
-                            take_profit=ticket_data.get('take_profit'),
-                            open_time=datetime.fromisoformat(ticket_data['open_time']),
-                            signal_source=signal_source,
-                            status=TradeStatus(ticket_data.get('status', 'open')),
-                            close_time=datetime.fromisoformat(ticket_data['close_time']) if ticket_data.get('close_time') else None,
-                            close_price=ticket_data.get('close_price'),
-                            profit=ticket_data.get('profit'),
-                            commission=ticket_data.get('commission'),
-                            swap=ticket_data.get('swap'),
-                            comment=ticket_data.get('comment')
-                        )
+                        if self.closed_store and ticket.status in FINAL_STATUSES:
+                            to_archive.append(ticket)
+                            continue
                         
                         self.tracked_tickets[ticket.ticket] = ticket
-                        
-                        # Rebuild mappings
-                        if signal_source.signal_hash:
-                            if signal_source.signal_hash not in self.signal_to_tickets:
-                                self.signal_to_tickets[signal_source.signal_hash] = []
-                            self.signal_to_tickets[signal_source.signal_hash].append(ticket.ticket)
-                        
-                        if signal_source.provider_id not in self.provider_tickets:
-                            self.provider_tickets[signal_source.provider_id] = []
-                        self.provider_tickets[signal_source.provider_id].append(ticket.ticket)
+                        self._index_ticket(ticket)
+                        self._track_close(ticket)
+                        self._update_provider_stats(ticket.signal_source.provider_id, 'open_trade', ticket)
                         
                     except Exception as e:
                         self.logger.error(f"Failed to load ticket data: {e}")
                 
+                # Move closed tickets from older history files into the archive
+                if to_archive:
+                    self.closed_store.archive(to_archive)
+                
                 # Load ticket updates
                 for update_data in history_data.get('ticket_updates', []):
                     try:
-                        update = TicketUpdate(
-                            ticket=update_data['ticket'],
-                            update_type=update_data['update_type'],
-                            old_value=update_data['old_value'],
-                            new_value=update_data['new_value'],
-                            update_time=datetime.fromisoformat(update_data['update_time']),
-                            reason=update_data['reason']
-                        )
+                        update = record_from_dict(TicketUpdate, update_data)
                         self.ticket_updates.append(update)
                     except Exception as e:
                         self.logger.error(f"Failed to load ticket update: {e}")
@@ -221,61 +358,101 @@ class TicketTracker:
         except Exception as e:
             self.logger.error(f"Failed to load ticket history: {e}")
     
+    def _load_archived_stats(self):
+        """Fold archived tickets into the running aggregates once at startup"""
+        if not self.closed_store:
+            return
+        try:
+            for ticket in self.closed_store.iter_all():
+                self._update_provider_stats(ticket.signal_source.provider_id, 'open_trade', ticket)
+                self.archived_count += 1
+        except Exception as e:
+            self.logger.error(f"Failed to load archived ticket stats: {e}")
+    
+    def _load_update_rollups(self):
+        """Replay loaded ticket updates into the rollup update counts, by update time"""
+        for update in self.ticket_updates:
+            try:
+                ticket = self.tracked_tickets.get(update.ticket)
+                if ticket is None and self.closed_store:
+                    ticket = self.closed_store.get(update.ticket)
+                # Updates of tickets no longer on record only count towards all providers
+                provider_id = ticket.signal_source.provider_id if ticket is not None else ALL_PROVIDERS
+                for bucket in self._rollup_buckets(provider_id, update.update_time, create=True):
+                    bucket.updates += 1
+            except Exception as e:
+                self.logger.error(f"Failed to replay ticket update: {e}")
+    
     def _save_ticket_history(self):
         """Save ticket tracking data to log file"""
         try:
+            # Save tracked tickets and recent ticket updates (keep last 1000)
             history_data = {
-                'tracked_tickets': [],
-                'ticket_updates': []
+                'tracked_tickets': [record_to_dict(ticket) for ticket in self.tracked_tickets.values()],
+                'ticket_updates': [record_to_dict(update) for update in self.ticket_updates[-1000:]]
             }
             
-            # Save tracked tickets
-            for ticket in self.tracked_tickets.values():
-                ticket_data = {
-                    'ticket': ticket.ticket,
-                    'symbol': ticket.symbol,
-                    'direction': ticket.direction.value,
-                    'entry_price': ticket.entry_price,
-                    'lot_size': ticket.lot_size,
-                    'stop_loss': ticket.stop_loss,
-                    'take_profit': ticket.take_profit,
-                    'open_time': ticket.open_time.isoformat(),
-                    'signal_source': {
-                        'provider_id': ticket.signal_source.provider_id,
-                        'provider_name': ticket.signal_source.provider_name,
-                        'channel_name': ticket.signal_source.channel_name,
-                        'message_id': ticket.signal_source.message_id,
-                        'signal_hash': ticket.signal_source.signal_hash
-                    },
-                    'status': ticket.status.value,
-                    'close_time': ticket.close_time.isoformat() if ticket.close_time else None,
-                    'close_price': ticket.close_price,
-                    'profit': ticket.profit,
-                    'commission': ticket.commission,
-                    'swap': ticket.swap,
-                    'comment': ticket.comment
-                }
-                history_data['tracked_tickets'].append(ticket_data)
-            
-            # Save recent ticket updates (keep last 1000)
-            recent_updates = self.ticket_updates[-1000:]
-            for update in recent_updates:
-                update_data = {
-                    'ticket': update.ticket,
-                    'update_type': update.update_type,
-                    'old_value': update.old_value,
-                    'new_value': update.new_value,
-                    'update_time': update.update_time.isoformat(),
-                    'reason': update.reason
-                }
-                history_data['ticket_updates'].append(update_data)
-            
             with open(self.log_file, 'w') as f:
                 json.dump(history_data, f, indent=2)
                 
         except Exception as e:
             self.logger.error(f"Failed to save ticket history: {e}")
     
+    def _index_ticket(self, ticket: TradeTicket):
+        """Add a ticket to the hash, provider and open-context indexes"""
+        signal_source = ticket.signal_source
+        if signal_source.signal_hash:
+            self.signal_to_tickets.setdefault(signal_source.signal_hash, {})[ticket.ticket] = ticket
+        self.provider_tickets.setdefault(signal_source.provider_id, {})[ticket.ticket] = ticket
+        self._update_open_context(ticket)
+    
+    def _unindex_ticket(self, ticket: TradeTicket):
+        """Remove a ticket from every secondary index"""
+        signal_source = ticket.signal_source
+        if signal_source.signal_hash:
+            signal_tickets = self.signal_to_tickets.get(signal_source.signal_hash)
+            if signal_tickets is not None:
+                signal_tickets.pop(ticket.ticket, None)
+                if not signal_tickets:
+                    del self.signal_to_tickets[signal_source.signal_hash]
+        
+        provider_tickets = self.provider_tickets.get(signal_source.provider_id)
+        if provider_tickets is not None:
+            provider_tickets.pop(ticket.ticket, None)
+        
+        self._remove_open_context(ticket)
+    
+    @staticmethod
+    def _context_key(ticket: TradeTicket) -> ContextKey:
+        return (ticket.symbol, ticket.signal_source.provider_id, ticket.direction)
+    
+    def _update_open_context(self, ticket: TradeTicket):
+        """Keep the open-context index in line with the ticket status"""
+        if ticket.status in OPEN_STATUSES:
+            self.open_context_tickets.setdefault(self._context_key(ticket), {})[ticket.ticket] = ticket
+        else:
+            self._remove_open_context(ticket)
+    
+    def _remove_open_context(self, ticket: TradeTicket):
+        key = self._context_key(ticket)
+        context_tickets = self.open_context_tickets.get(key)
+        if context_tickets is not None:
+            context_tickets.pop(ticket.ticket, None)
+            if not context_tickets:
+                del self.open_context_tickets[key]
+    
+    def _archive_ticket(self, ticket: TradeTicket):
+        """Move a closed ticket out of memory into the SQLite archive"""
+        self.closed_store.archive([ticket])
+        self._unindex_ticket(ticket)
+        self.tracked_tickets.pop(ticket.ticket, None)
+        self.archived_count += 1
+    
+    def _track_close(self, ticket: TradeTicket):
+        """Queue an in-memory closed ticket for age-based cleanup"""
+        if ticket.status == TradeStatus.CLOSED and ticket.close_time is not None:
+            heapq.heappush(self._close_heap, (ticket.close_time, ticket.ticket))
+    
     def inject_modules(self, mt5_bridge=None, copilot_bot=None, strategy_runtime=None):
         """Inject module dependencies"""
         self.mt5_bridge = mt5_bridge
@@ -329,24 +506,21 @@ class TicketTracker:
                 lot_size=lot_size,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
-                open_time=datetime.now(),
+                open_time=now_ts(),
                 signal_source=signal_source,
                 status=TradeStatus.OPEN,
                 comment=comment
             )
             
-            # Store ticket
+            # Store ticket; re-registering a ticket number replaces its index entries
+            previous = self.tracked_tickets.get(ticket)
+            if previous is not None:
+                self._unindex_ticket(previous)
+                self._update_provider_stats(previous.signal_source.provider_id, 'remove_trade', previous)
             self.tracked_tickets[ticket] = trade_ticket
             
             # Update mappings
-            if signal_hash:
-                if signal_hash not in self.signal_to_tickets:
-                    self.signal_to_tickets[signal_hash] = []
-                self.signal_to_tickets[signal_hash].append(ticket)
-            
-            if provider_id not in self.provider_tickets:
-                self.provider_tickets[provider_id] = []
-            self.provider_tickets[provider_id].append(ticket)
+            self._index_ticket(trade_ticket)
             
             # Update provider stats
             self._update_provider_stats(provider_id, 'open_trade', trade_ticket)
@@ -382,11 +556,12 @@ class TicketTracker:
             
             trade_ticket = self.tracked_tickets[ticket]
             old_status = trade_ticket.status
+            previous = replace(trade_ticket)
             
             # Update ticket
             trade_ticket.status = status
             if status in [TradeStatus.CLOSED, TradeStatus.CANCELLED]:
-                trade_ticket.close_time = datetime.now()
+                trade_ticket.close_time = now_ts()
                 trade_ticket.close_price = close_price
                 trade_ticket.profit = profit
                 trade_ticket.commission = commission
@@ -398,13 +573,20 @@ class TicketTracker:
                 update_type="status_change",
                 old_value=old_status.value,
                 new_value=status.value,
-                update_time=datetime.now(),
+                update_time=now_ts(),
                 reason=reason
             )
             self.ticket_updates.append(update)
             
-            # Update provider stats
-            self._update_provider_stats(trade_ticket.signal_source.provider_id, 'status_change', trade_ticket)
+            # Update provider stats and indexes
+            self._update_provider_stats(trade_ticket.signal_source.provider_id, 'status_change',
+                                        trade_ticket, previous)
+            self._update_open_context(trade_ticket)
+            
+            if self.closed_store and status in FINAL_STATUSES:
+                self._archive_ticket(trade_ticket)
+            else:
+                self._track_close(trade_ticket)
             
             # Save data
             self._save_ticket_history()
@@ -430,6 +612,7 @@ class TicketTracker:
                 return False
             
             trade_ticket = self.tracked_tickets[ticket]
+            previous = replace(trade_ticket)
             
             # Apply modification to ticket object
             if modification_type == "stop_loss":
@@ -445,7 +628,7 @@ class TicketTracker:
                 update_type=modification_type,
                 old_value=old_value,
                 new_value=new_value,
-                update_time=datetime.now(),
+                update_time=now_ts(),
                 reason=reason
             )
             self.ticket_updates.append(update)
@@ -454,6 +637,8 @@ class TicketTracker:
             if trade_ticket.status == TradeStatus.OPEN:
                 trade_ticket.status = TradeStatus.MODIFIED
             
+            self._update_provider_stats(trade_ticket.signal_source.provider_id, 'modify', trade_ticket, previous)
+            
             # Save data
             self._save_ticket_history()
             
@@ -467,8 +652,10 @@ class TicketTracker:
     def find_tickets_by_signal_hash(self, signal_hash: str) -> List[TradeTicket]:
         """Find all tickets associated with a signal hash"""
         try:
-            ticket_numbers = self.signal_to_tickets.get(signal_hash, [])
-            return [self.tracked_tickets[ticket] for ticket in ticket_numbers if ticket in self.tracked_tickets]
+            tickets = list(self.signal_to_tickets.get(signal_hash, {}).values())
+            if self.closed_store:
+                tickets = self.closed_store.by_signal_hash(signal_hash) + tickets
+            return tickets
         except Exception as e:
             self.logger.error(f"Failed to find tickets by signal hash: {e}")
             return []
@@ -476,30 +663,33 @@ class TicketTracker:
     def find_tickets_by_provider(self, provider_id: str) -> List[TradeTicket]:
         """Find all tickets from a specific provider"""
         try:
-            ticket_numbers = self.provider_tickets.get(provider_id, [])
-            return [self.tracked_tickets[ticket] for ticket in ticket_numbers if ticket in self.tracked_tickets]
+            tickets = list(self.provider_tickets.get(provider_id, {}).values())
+            if self.closed_store:
+                tickets = self.closed_store.by_provider(provider_id) + tickets
+            return tickets
         except Exception as e:
             self.logger.error(f"Failed to find tickets by provider: {e}")
             return []
     
     def get_ticket_info(self, ticket: int) -> Optional[TradeTicket]:
         """Get complete information about a specific ticket"""
-        return self.tracked_tickets.get(ticket)
+        trade_ticket = self.tracked_tickets.get(ticket)
+        if trade_ticket is None and self.closed_store:
+            trade_ticket = self.closed_store.get(ticket)
+        return trade_ticket
     
     def find_ticket_by_context(self, symbol: str, provider_id: str, direction: Optional[TradeDirection] = None,
                               recent_minutes: int = 60) -> Optional[TradeTicket]:
         """Find ticket by trading context (for command matching)"""
         try:
-            provider_tickets = self.find_tickets_by_provider(provider_id)
-            cutoff_time = datetime.now() - timedelta(minutes=recent_minutes)
+            directions = [direction] if direction is not None else list(TradeDirection)
+            cutoff_time = now_ts() - recent_minutes * 60
             
-            # Filter by context
+            # Only open tickets of this symbol/provider/direction are indexed
             candidates = []
-            for ticket in provider_tickets:
-                if ticket.symbol == symbol and ticket.open_time > cutoff_time:
-                    if direction is None or ticket.direction == direction:
-                        if ticket.status in [TradeStatus.OPEN, TradeStatus.MODIFIED]:
-                            candidates.append(ticket)
+            for trade_direction in directions:
+                context_tickets = self.open_context_tickets.get((symbol, provider_id, trade_direction), {})
+                candidates.extend(t for t in context_tickets.values() if t.open_time > cutoff_time)
             
             # Return most recent if multiple candidates
             if candidates:
@@ -514,9 +704,9 @@ class TicketTracker:
     def get_provider_summary(self, provider_id: str) -> Dict[str, Any]:
         """Get summary information about a provider's trades"""
         try:
-            tickets = self.find_tickets_by_provider(provider_id)
+            stats = self.provider_stats.get(provider_id)
             
-            if not tickets:
+            if stats is None or stats.total_trades <= 0:
                 return {
                     'provider_id': provider_id,
                     'total_trades': 0,
@@ -526,35 +716,25 @@ class TicketTracker:
                     'recent_trades': []
                 }
             
-            # Calculate stats
-            open_trades = [t for t in tickets if t.status in [TradeStatus.OPEN, TradeStatus.MODIFIED]]
-            closed_trades = [t for t in tickets if t.status == TradeStatus.CLOSED]
-            
-            active_symbols = list(set(t.symbol for t in open_trades))
-            recent_trades = sorted(tickets, key=lambda t: t.open_time, reverse=True)[:5]
-            
-            total_profit = sum(t.profit for t in closed_trades if t.profit is not None)
-            winning_trades = len([t for t in closed_trades if t.profit and t.profit > 0])
-            
             return {
                 'provider_id': provider_id,
-                'provider_name': tickets[0].signal_source.provider_name if tickets else "Unknown",
-                'total_trades': len(tickets),
-                'open_trades': len(open_trades),
-                'closed_trades': len(closed_trades),
-                'winning_trades': winning_trades,
-                'total_profit': total_profit,
-                'win_rate': (winning_trades / len(closed_trades) * 100) if closed_trades else 0,
-                'active_symbols': active_symbols,
+                'provider_name': stats.provider_name or "Unknown",
+                'total_trades': stats.total_trades,
+                'open_trades': stats.open_trades,
+                'closed_trades': stats.closed_trades,
+                'winning_trades': stats.winning_trades,
+                'total_profit': stats.total_profit,
+                'win_rate': (stats.winning_trades / stats.closed_trades * 100) if stats.closed_trades else 0,
+                'active_symbols': list(stats.open_symbols),
                 'recent_trades': [
                     {
                         'ticket': t.ticket,
                         'symbol': t.symbol,
                         'direction': t.direction.value,
                         'status': t.status.value,
-                        'open_time': t.open_time.isoformat(),
+                        'open_time': ts_to_iso(t.open_time),
                         'profit': t.profit
-                    } for t in recent_trades
+                    } for t in stats.recent_trades
                 ]
             }
             
@@ -562,8 +742,122 @@ class TicketTracker:
             self.logger.error(f"Failed to get provider summary: {e}")
             return {}
     
-    def _update_provider_stats(self, provider_id: str, event_type: str, ticket: TradeTicket):
-        """Update provider statistics"""
+    def get_symbol_summary(self, symbol: str) -> Dict[str, Any]:
+        """Get running totals for a symbol across all providers"""
+        stats = self.symbol_stats.get(symbol) or SymbolStats(symbol=symbol)
+        summary = record_to_dict(stats)
+        summary['win_rate'] = (stats.winning_trades / stats.closed_trades * 100) if stats.closed_trades else 0
+        return summary
+    
+    def get_windowed_statistics(self, hours: int = 24, provider_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Trade activity over the last `hours`, summed from hour/day rollups
+        Windows are aligned to bucket boundaries, so the oldest bucket may be partial
+        """
+        hourly_days = self.config.get('hourly_rollup_retention_days', 7)
+        resolution = "hour" if hours <= hourly_days * 24 else "day"
+        size = ROLLUP_RESOLUTIONS[resolution]
+        scope = provider_id or ALL_PROVIDERS
+        rollup = self.rollups[resolution]
+        
+        current = int(now_ts() // size) * size
+        first = int((now_ts() - hours * 3600) // size) * size
+        
+        totals = StatsBucket(bucket_start=Timestamp(first))
+        for bucket_start in range(first, current + size, size):
+            bucket = rollup.get((scope, bucket_start))
+            if bucket is None:
+                continue
+            totals.opened_trades += bucket.opened_trades
+            totals.closed_trades += bucket.closed_trades
+            totals.winning_trades += bucket.winning_trades
+            totals.losing_trades += bucket.losing_trades
+            totals.total_profit += bucket.total_profit
+            totals.total_volume += bucket.total_volume
+            totals.updates += bucket.updates
+        
+        result = record_to_dict(totals)
+        result.update({
+            'provider_id': provider_id,
+            'window_hours': hours,
+            'resolution': resolution,
+            'window_start': ts_to_iso(first),
+            'win_rate': (totals.winning_trades / totals.closed_trades * 100) if totals.closed_trades else 0
+        })
+        return result
+    
+    def _rollup_buckets(self, provider_id: str, when: float, create: bool) -> List[StatsBucket]:
+        """Hour and day buckets covering `when` for the provider and for all providers"""
+        buckets = []
+        for resolution, size in ROLLUP_RESOLUTIONS.items():
+            bucket_start = int(when // size) * size
+            rollup = self.rollups[resolution]
+            for scope in dict.fromkeys((provider_id, ALL_PROVIDERS)):
+                key = (scope, bucket_start)
+                bucket = rollup.get(key)
+                if bucket is None and create:
+                    bucket = rollup[key] = StatsBucket(bucket_start=Timestamp(bucket_start))
+                if bucket is not None:
+                    buckets.append(bucket)
+        return buckets
+    
+    def _apply_contribution(self, provider_id: str, ticket: TradeTicket, sign: int):
+        """Add (sign=1) or remove (sign=-1) one ticket's contribution to every aggregate"""
+        stats = self.provider_stats[provider_id]
+        symbol_stats = self.symbol_stats.get(ticket.symbol)
+        if symbol_stats is None:
+            symbol_stats = self.symbol_stats[ticket.symbol] = SymbolStats(symbol=ticket.symbol)
+        
+        is_closed = ticket.status == TradeStatus.CLOSED
+        has_profit = is_closed and ticket.profit is not None
+        for aggregate in (stats, symbol_stats, self.overall_stats):
+            aggregate.total_trades += sign
+            aggregate.total_volume += sign * ticket.lot_size
+            if ticket.status in OPEN_STATUSES:
+                aggregate.open_trades += sign
+            elif is_closed:
+                aggregate.closed_trades += sign
+            elif ticket.status == TradeStatus.CANCELLED:
+                aggregate.cancelled_trades += sign
+            if has_profit:
+                aggregate.total_profit += sign * ticket.profit
+                if ticket.profit > 0:
+                    aggregate.winning_trades += sign
+                else:
+                    aggregate.losing_trades += sign
+        
+        if ticket.status in OPEN_STATUSES:
+            count = stats.open_symbols.get(ticket.symbol, 0) + sign
+            if count > 0:
+                stats.open_symbols[ticket.symbol] = count
+            else:
+                stats.open_symbols.pop(ticket.symbol, None)
+        
+        # Buckets that were already pruned are not recreated when removing
+        for bucket in self._rollup_buckets(provider_id, ticket.open_time, create=sign > 0):
+            bucket.opened_trades += sign
+            bucket.total_volume += sign * ticket.lot_size
+        if is_closed and ticket.close_time is not None:
+            for bucket in self._rollup_buckets(provider_id, ticket.close_time, create=sign > 0):
+                bucket.closed_trades += sign
+                if has_profit:
+                    bucket.total_profit += sign * ticket.profit
+                    if ticket.profit > 0:
+                        bucket.winning_trades += sign
+                    else:
+                        bucket.losing_trades += sign
+    
+    def _update_provider_stats(self, provider_id: str, event_type: str, ticket: TradeTicket,
+                               previous: Optional[TradeTicket] = None):
+        """
+        Update running provider, symbol and time-bucket aggregates
+        
+        Args:
+            provider_id: Provider owning the ticket
+            event_type: 'open_trade', 'status_change', 'modify' or 'remove_trade'
+            ticket: Ticket after the event
+            previous: Copy of the ticket before a status change or modification
+        """
         try:
             if provider_id not in self.provider_stats:
                 self.provider_stats[provider_id] = ProviderStats(provider_id=provider_id)
@@ -571,24 +865,29 @@ class TicketTracker:
             stats = self.provider_stats[provider_id]
             
             if event_type == 'open_trade':
-                stats.total_trades += 1
-                stats.open_trades += 1
-                stats.total_volume += ticket.lot_size
+                self._apply_contribution(provider_id, ticket, 1)
                 
-                if stats.first_trade_time is None:
+                if stats.provider_name is None:
+                    stats.provider_name = ticket.signal_source.provider_name
+                if stats.first_trade_time is None or ticket.open_time < stats.first_trade_time:
                     stats.first_trade_time = ticket.open_time
-                stats.last_trade_time = ticket.open_time
-            
-            elif event_type == 'status_change' and ticket.status == TradeStatus.CLOSED:
-                stats.open_trades = max(0, stats.open_trades - 1)
-                stats.closed_trades += 1
+                if stats.last_trade_time is None or ticket.open_time > stats.last_trade_time:
+                    stats.last_trade_time = ticket.open_time
                 
-                if ticket.profit is not None:
-                    stats.total_profit += ticket.profit
-                    if ticket.profit > 0:
-                        stats.winning_trades += 1
-                    else:
-                        stats.losing_trades += 1
+                stats.recent_trades.append(ticket)
+                stats.recent_trades.sort(key=lambda t: t.open_time, reverse=True)
+                del stats.recent_trades[RECENT_TRADES_KEPT:]
+            
+            elif event_type in ('status_change', 'modify'):
+                if previous is not None:
+                    self._apply_contribution(provider_id, previous, -1)
+                self._apply_contribution(provider_id, ticket, 1)
+                for bucket in self._rollup_buckets(provider_id, now_ts(), create=True):
+                    bucket.updates += 1
+            
+            elif event_type == 'remove_trade':
+                self._apply_contribution(provider_id, ticket, -1)
+                stats.recent_trades = [t for t in stats.recent_trades if t.ticket != ticket.ticket]
             
         except Exception as e:
             self.logger.error(f"Failed to update provider stats: {e}")
@@ -616,22 +915,17 @@ class TicketTracker:
     def get_tracking_statistics(self) -> Dict[str, Any]:
         """Get overall tracking statistics"""
         try:
-            total_tickets = len(self.tracked_tickets)
-            open_tickets = len([t for t in self.tracked_tickets.values() if t.status in [TradeStatus.OPEN, TradeStatus.MODIFIED]])
-            closed_tickets = len([t for t in self.tracked_tickets.values() if t.status == TradeStatus.CLOSED])
-            
-            provider_count = len(self.provider_tickets)
-            signal_count = len(self.signal_to_tickets)
-            
-            recent_updates = len([u for u in self.ticket_updates if u.update_time > datetime.now() - timedelta(hours=24)])
+            overall = self.overall_stats
+            recent = self.get_windowed_statistics(hours=24)
             
             return {
-                'total_tracked_tickets': total_tickets,
-                'open_tickets': open_tickets,
-                'closed_tickets': closed_tickets,
-                'tracked_providers': provider_count,
-                'unique_signals': signal_count,
-                'recent_updates_24h': recent_updates,
+                'total_tracked_tickets': overall.total_trades,
+                'open_tickets': overall.open_trades,
+                'closed_tickets': overall.closed_trades,
+                'archived_tickets': self.archived_count,
+                'tracked_providers': len([s for s in self.provider_stats.values() if s.total_trades > 0]),
+                'unique_signals': len(self.signal_to_tickets),
+                'recent_updates_24h': recent['updates'],
                 'tracking_enabled': self.config.get('enable_tracking', True),
                 'last_cleanup': datetime.now().isoformat()
             }
@@ -640,44 +934,49 @@ class TicketTracker:
             self.logger.error(f"Error getting tracking statistics: {e}")
             return {}
     
+    def _prune_rollups(self):
+        """Drop hour/day buckets older than their retention window"""
+        for resolution, retention_key, default_days in (("hour", 'hourly_rollup_retention_days', 7),
+                                                        ("day", 'daily_rollup_retention_days', 365)):
+            cutoff = now_ts() - self.config.get(retention_key, default_days) * 86400
+            rollup = self.rollups[resolution]
+            for key in [key for key in rollup if key[1] < cutoff]:
+                del rollup[key]
+    
     async def cleanup_old_tickets(self):
         """Clean up old closed tickets based on configuration"""
         try:
             cleanup_days = self.config.get('auto_cleanup_days', 30)
-            cutoff_date = datetime.now() - timedelta(days=cleanup_days)
-            
-            tickets_to_remove = []
-            for ticket_id, ticket in self.tracked_tickets.items():
-                if (ticket.status == TradeStatus.CLOSED and 
-                    ticket.close_time and 
-                    ticket.close_time < cutoff_date):
-                    tickets_to_remove.append(ticket_id)
-            
-            # Remove old tickets
-            for ticket_id in tickets_to_remove:
-                ticket = self.tracked_tickets[ticket_id]
-                
-                # Remove from mappings
-                if ticket.signal_source.signal_hash:
-                    signal_tickets = self.signal_to_tickets.get(ticket.signal_source.signal_hash, [])
-                    if ticket_id in signal_tickets:
-                        signal_tickets.remove(ticket_id)
-                
-                provider_tickets = self.provider_tickets.get(ticket.signal_source.provider_id, [])
-                if ticket_id in provider_tickets:
-                    provider_tickets.remove(ticket_id)
+            cutoff_date = now_ts() - cleanup_days * 86400
+            
+            # Pop closed tickets in close-time order; stale heap entries are skipped
+            removed = 0
+            while self._close_heap and self._close_heap[0][0] < cutoff_date:
+                close_time, ticket_id = heapq.heappop(self._close_heap)
+                ticket = self.tracked_tickets.get(ticket_id)
+                if ticket is None or ticket.status != TradeStatus.CLOSED or ticket.close_time != close_time:
+                    continue
                 
-                # Remove ticket
                 del self.tracked_tickets[ticket_id]
+                self._unindex_ticket(ticket)
+                self._update_provider_stats(ticket.signal_source.provider_id, 'remove_trade', ticket)
+                removed += 1
             
-            if tickets_to_remove:
-                self.logger.info(f"Cleaned up {len(tickets_to_remove)} old tickets")
+            if self.closed_store:
+                for ticket in self.closed_store.delete_closed_before(cutoff_date):
+                    self._update_provider_stats(ticket.signal_source.provider_id, 'remove_trade', ticket)
+                    self.archived_count -= 1
+                    removed += 1
+            
+            self._prune_rollups()
+            
+            if removed:
+                self.logger.info(f"Cleaned up {removed} old tickets")
                 self._save_ticket_history()
             
         except Exception as e:
             self.logger.error(f"Error during ticket cleanup: {e}")
 
-
 async def main():
     """Example usage of Ticket Tracker Engine"""
     
@@ -5,13 +5,15 @@ Implements advanced take profit management with multiple TP levels and automated
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, field
+from dataclasses import field
 from enum import Enum
 import json
 import math
 
+from trade_records import (trade_record, Timestamp, now_ts, ts_to_iso,
+                           records_to_list, records_from_list)
+
 
 class TPHitAction(Enum):
     PARTIAL_CLOSE = "partial_close"
@@ -32,19 +34,19 @@ class TradeDirection(Enum):
     SELL = "sell"
 
 
-@dataclass
+@trade_record
 class TPLevel:
     level: int  # TP1, TP2, TP3, etc.
     price: float
     close_percentage: float  # What % of position to close (0.0-1.0)
     action: TPHitAction = TPHitAction.PARTIAL_CLOSE
     status: TPStatus = TPStatus.PENDING
-    hit_time: Optional[datetime] = None
+    hit_time: Optional[Timestamp] = None
     executed_lots: float = 0.0
     move_sl_to: Optional[float] = None  # New SL when this TP is hit
 
 
-@dataclass
+@trade_record
 class TPConfiguration:
     auto_partial_close: bool = True
     move_sl_on_tp1: bool = True  # Move SL to breakeven on TP1
@@ -55,27 +57,27 @@ class TPConfiguration:
     tp_buffer_pips: float = 2.0  # Buffer before TP level
 
 
-@dataclass
+@trade_record
 class TPManagedPosition:
     ticket: int
     symbol: str
     direction: TradeDirection
     entry_price: float
-    entry_time: datetime
+    entry_time: Timestamp
     original_lot_size: float
     current_lot_size: float
     original_sl: Optional[float]
     current_sl: Optional[float]
     tp_levels: List[TPLevel] = field(default_factory=list)
     config: TPConfiguration = field(default_factory=TPConfiguration)
-    last_price_check: datetime = field(default_factory=datetime.now)
+    last_price_check: Timestamp = field(default_factory=now_ts)
     position_closed: bool = False
     total_closed_lots: float = 0.0
     realized_profit: float = 0.0
-    created_at: datetime = field(default_factory=datetime.now)
+    created_at: Timestamp = field(default_factory=now_ts)
 
 
-@dataclass
+@trade_record
 class TPExecution:
     ticket: int
     tp_level: int
@@ -84,7 +86,7 @@ class TPExecution:
     remaining_lots: float
     profit_pips: float
     profit_amount: float
-    execution_time: datetime
+    execution_time: Timestamp
     action_taken: TPHitAction
     new_sl: Optional[float] = None
 
@@ -177,21 +179,7 @@ class TPManager:
         try:
             with open(self.log_file, 'r') as f:
                 data = json.load(f)
-                self.execution_history = []
-                for entry in data:
-                    execution = TPExecution(
-                        ticket=entry['ticket'],
-                        tp_level=entry['tp_level'],
-                        execution_price=entry['execution_price'],
-                        closed_lots=entry['closed_lots'],
-                        remaining_lots=entry['remaining_lots'],
-                        profit_pips=entry['profit_pips'],
-                        profit_amount=entry['profit_amount'],
-                        execution_time=datetime.fromisoformat(entry['execution_time']),
-                        action_taken=TPHitAction(entry['action_taken']),
-                        new_sl=entry.get('new_sl')
-                    )
-                    self.execution_history.append(execution)
+                self.execution_history = records_from_list(TPExecution, data)
         except FileNotFoundError:
             self.execution_history = []
             self._save_tp_history()
@@ -199,20 +187,7 @@ class TPManager:
     def _save_tp_history(self):
         """Save TP execution history to log file"""
         try:
-            data = []
-            for execution in self.execution_history:
-                data.append({
-                    'ticket': execution.ticket,
-                    'tp_level': execution.tp_level,
-                    'execution_price': execution.execution_price,
-                    'closed_lots': execution.closed_lots,
-                    'remaining_lots': execution.remaining_lots,
-                    'profit_pips': execution.profit_pips,
-                    'profit_amount': execution.profit_amount,
-                    'execution_time': execution.execution_time.isoformat(),
-                    'action_taken': execution.action_taken.value,
-                    'new_sl': execution.new_sl
-                })
+            data = records_to_list(self.execution_history)
             
             with open(self.log_file, 'w') as f:
                 json.dump(data, f, indent=2)
@@ -354,7 +329,7 @@ class TPManager:
                 symbol=symbol,
                 direction=direction,
                 entry_price=entry_price,
-                entry_time=datetime.now(),
+                entry_time=now_ts(),
                 original_lot_size=lot_size,
                 current_lot_size=lot_size,
                 original_sl=current_sl,
@@ -411,7 +386,7 @@ class TPManager:
             
             if tp_hit:
                 tp_level.status = TPStatus.HIT
-                tp_level.hit_time = datetime.now()
+                tp_level.hit_time = now_ts()
                 hit_tp_levels.append(tp_level)
                 
                 self.logger.info(f"TP{tp_level.level} hit for position {position.ticket} at {current_price}")
@@ -488,7 +463,7 @@ class TPManager:
                 remaining_lots=remaining_lots,
                 profit_pips=profit_pips,
                 profit_amount=profit_amount,
-                execution_time=datetime.now(),
+                execution_time=now_ts(),
                 action_taken=TPHitAction.PARTIAL_CLOSE
             )
             self.execution_history.append(execution)
@@ -534,7 +509,7 @@ class TPManager:
                 remaining_lots=position.current_lot_size,
                 profit_pips=self.calculate_pips(position.symbol, current_price - position.entry_price, position.direction),
                 profit_amount=0.0,
-                execution_time=datetime.now(),
+                execution_time=now_ts(),
                 action_taken=TPHitAction.MOVE_SL,
                 new_sl=new_sl
             )
@@ -566,7 +541,7 @@ class TPManager:
                 remaining_lots=0.0,
                 profit_pips=profit_pips,
                 profit_amount=profit_amount,
-                execution_time=datetime.now(),
+                execution_time=now_ts(),
                 action_taken=TPHitAction.CLOSE_ALL
             )
             self.execution_history.append(execution)
@@ -634,7 +609,7 @@ class TPManager:
                 if current_price is None:
                     continue
                 
-                position.last_price_check = datetime.now()
+                position.last_price_check = now_ts()
                 
                 # Check for TP hits
                 hit_tp_levels = await self.check_tp_levels(position, current_price)
@@ -725,7 +700,7 @@ class TPManager:
                 'price': tp_level.price,
                 'close_percentage': tp_level.close_percentage * 100,
                 'status': tp_level.status.value,
-                'hit_time': tp_level.hit_time.isoformat() if tp_level.hit_time else None,
+                'hit_time': ts_to_iso(tp_level.hit_time),
                 'executed_lots': tp_level.executed_lots
             })
         
@@ -741,8 +716,8 @@ class TPManager:
             'position_closed': position.position_closed,
             'realized_profit': position.realized_profit,
             'tp_levels': tp_levels_status,
-            'created_at': position.created_at.isoformat(),
-            'last_price_check': position.last_price_check.isoformat()
+            'created_at': ts_to_iso(position.created_at),
+            'last_price_check': ts_to_iso(position.last_price_check)
         }
 
     def get_recent_executions(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -757,7 +732,7 @@ class TPManager:
             'remaining_lots': execution.remaining_lots,
             'profit_pips': execution.profit_pips,
             'profit_amount': execution.profit_amount,
-            'execution_time': execution.execution_time.isoformat(),
+            'execution_time': ts_to_iso(execution.execution_time),
             'action_taken': execution.action_taken.value,
             'new_sl': execution.new_sl
         } for execution in recent_executions]
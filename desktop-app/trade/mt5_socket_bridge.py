@@ -435,6 +435,117 @@ class MT5SocketBridge:
                 execution_time=datetime.now()
             )
     
+    def close_position(self, ticket: int) -> TradeResult:
+        """Close an open position with an opposite deal"""
+        if not self.check_connection():
+            return TradeResult(
+                success=False,
+                error_code=-1,
+                error_message="Not connected to MT5"
+            )
+        
+        try:
+            positions = mt5.positions_get(ticket=ticket)
+            if not positions:
+                return TradeResult(
+                    success=False,
+                    error_code=-1,
+                    error_message=f"Position not found: {ticket}",
+                    execution_time=datetime.now()
+                )
+            
+            pos = positions[0]
+            close_request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": pos.symbol,
+                "volume": pos.volume,
+                "type": mt5.ORDER_TYPE_SELL if pos.type == 0 else mt5.ORDER_TYPE_BUY,
+                "position": ticket,
+                "deviation": 10,
+                "magic": pos.magic,
+                "comment": f"Close #{ticket}",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+            
+            result = mt5.order_send(close_request)
+            
+            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                self.logger.info(f"Position closed: #{ticket} {pos.volume} {pos.symbol} at {result.price}")
+                return TradeResult(
+                    success=True,
+                    order_id=result.order,
+                    deal_id=result.deal,
+                    position_id=ticket,
+                    volume=result.volume,
+                    price=result.price,
+                    execution_time=datetime.now()
+                )
+            
+            error_code = result.retcode if result else -1
+            error_msg = f"Close failed: {result.comment if result else 'No result'}"
+            self.logger.error(f"Failed to close position #{ticket}: {error_code} - {error_msg}")
+            return TradeResult(
+                success=False,
+                error_code=error_code,
+                error_message=error_msg,
+                execution_time=datetime.now()
+            )
+            
+        except Exception as e:
+            error_msg = f"Close position error: {e}"
+            self.logger.error(error_msg)
+            return TradeResult(
+                success=False,
+                error_code=-1,
+                error_message=error_msg,
+                execution_time=datetime.now()
+            )
+    
+    def cancel_order(self, ticket: int) -> TradeResult:
+        """Delete a pending order"""
+        if not self.check_connection():
+            return TradeResult(
+                success=False,
+                error_code=-1,
+                error_message="Not connected to MT5"
+            )
+        
+        try:
+            result = mt5.order_send({
+                "action": mt5.TRADE_ACTION_REMOVE,
+                "order": ticket,
+                "comment": f"Cancel #{ticket}"
+            })
+            
+            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                self.logger.info(f"Pending order cancelled: #{ticket}")
+                return TradeResult(
+                    success=True,
+                    order_id=ticket,
+                    execution_time=datetime.now()
+                )
+            
+            error_code = result.retcode if result else -1
+            error_msg = f"Cancel failed: {result.comment if result else 'No result'}"
+            self.logger.error(f"Failed to cancel order #{ticket}: {error_code} - {error_msg}")
+            return TradeResult(
+                success=False,
+                error_code=error_code,
+                error_message=error_msg,
+                execution_time=datetime.now()
+            )
+            
+        except Exception as e:
+            error_msg = f"Cancel order error: {e}"
+            self.logger.error(error_msg)
+            return TradeResult(
+                success=False,
+                error_code=-1,
+                error_message=error_msg,
+                execution_time=datetime.now()
+            )
+    
     def get_positions(self) -> List[Dict[str, Any]]:
         """Get open positions"""
         if not self.check_connection():
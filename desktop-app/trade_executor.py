@@ -7,15 +7,19 @@ Async parallel execution with comprehensive trade management
 import asyncio
 import json
 import logging
+import time
+import zlib
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple, Deque, Set
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 
 from trade.mt5_socket_bridge import MT5SocketBridge, TradeRequest, TradeResult
 from symbol_mapper import SymbolMapper
 from retry_engine import RetryEngine
+from order_ladder import OrderLadderSubmitter, LadderLeg, LegStatus
 
 class ExecutionStatus(Enum):
     PENDING = "pending"
@@ -25,6 +29,10 @@ class ExecutionStatus(Enum):
     CANCELLED = "cancelled"
     PARTIAL = "partial"
 
+class ExecutionMode(Enum):
+    SHARED = "shared"    # All workers consume one queue
+    SHARDED = "sharded"  # Requests routed by symbol/account to per-worker queues
+
 class OrderType(Enum):
     MARKET = "market"
     LIMIT = "limit"
@@ -52,11 +60,17 @@ class ExecutionRequest:
     # Range entry handling
     is_range_entry: bool = False
     range_split_count: int = 1
+    range_all_or_nothing: bool = False  # Roll back placed legs if any range leg fails
+    range_deadline_seconds: Optional[float] = None
     
     # Advanced features
     breakeven_enabled: bool = True
     trailing_stop_enabled: bool = False
     partial_close_levels: List[float] = None
+    
+    # Routing and latency tracking
+    account_id: Optional[str] = None
+    received_at: Optional[float] = None  # time.perf_counter() when the signal was accepted
 
 @dataclass
 class ExecutionResult:
@@ -73,6 +87,24 @@ class ExecutionResult:
     # Performance metrics
     latency_ms: float = 0.0
     slippage_pips: float = 0.0
+    leg_latencies_ms: List[float] = None  # Per-leg fill latency for range entries
+
+@dataclass
+class ExecutionShard:
+    """Dedicated FIFO queue served by one worker in sharded mode"""
+    shard_id: int
+    queue: Deque[ExecutionRequest] = field(default_factory=deque)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    executed: int = 0
+    stolen: int = 0  # Requests from this shard executed by another worker
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, int(round(percentile / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
 
 class TradeExecutor:
     """Advanced trade execution engine with parallel processing"""
@@ -97,6 +129,16 @@ class TradeExecutor:
         self.execution_workers: List[asyncio.Task] = []
         self.is_running = False
         
+        # Sharded execution: one FIFO per worker, keyed by symbol/account
+        self.execution_mode = ExecutionMode(self.config.get('execution_mode', ExecutionMode.SHARED.value))
+        self.shards: List[ExecutionShard] = []
+        if self.execution_mode == ExecutionMode.SHARDED:
+            # Created up front so requests queued before start() wait in their shard
+            self.shards = [ExecutionShard(shard_id=i) for i in range(self.max_concurrent_executions)]
+        self.in_flight_keys: Set[str] = set()
+        self.steal_scan_depth = self.config.get('sharding', {}).get('steal_scan_depth', 32)
+        self.idle_steal_interval = self.config.get('sharding', {}).get('idle_steal_interval_seconds', 0.05)
+        
         # Statistics
         self.stats = {
             "total_requests": 0,
@@ -121,6 +163,12 @@ class TradeExecutor:
         return {
             "enabled": True,
             "max_concurrent_executions": 5,
+            "execution_mode": "shared",  # shared, sharded
+            "sharding": {
+                "shard_by_account": False,
+                "steal_scan_depth": 32,
+                "idle_steal_interval_seconds": 0.05
+            },
             "max_retry_attempts": 3,
             "retry_delay_seconds": 1.0,
             "execution_timeout_seconds": 30,
@@ -138,6 +186,10 @@ class TradeExecutor:
                 "partial_close_enabled": True,
                 "range_entry_enabled": True
             },
+            "range_entry": {
+                "all_or_nothing": False,
+                "deadline_seconds": 10.0
+            },
             "symbol_mapping": {
                 "auto_detect_suffix": True,
                 "broker_suffixes": ["m", "pro", "ecn", ""]
@@ -174,12 +226,19 @@ class TradeExecutor:
             
             # Start execution workers
             self.is_running = True
-            self.execution_workers = [
-                asyncio.create_task(self._execution_worker(i))
-                for i in range(self.max_concurrent_executions)
-            ]
+            if self.execution_mode == ExecutionMode.SHARDED:
+                self.execution_workers = [
+                    asyncio.create_task(self._sharded_execution_worker(shard))
+                    for shard in self.shards
+                ]
+            else:
+                self.execution_workers = [
+                    asyncio.create_task(self._execution_worker(i))
+                    for i in range(self.max_concurrent_executions)
+                ]
             
-            self.logger.info(f"Trade execution engine started with {self.max_concurrent_executions} workers")
+            self.logger.info(f"Trade execution engine started with {self.max_concurrent_executions} "
+                             f"{self.execution_mode.value} workers")
             return True
             
         except Exception as e:
@@ -215,6 +274,8 @@ class TradeExecutor:
         Returns:
             Request ID for tracking
         """
+        received_at = time.perf_counter()
+        
         try:
             # Generate request ID
             request_id = f"exec_{int(datetime.now().timestamp())}_{self.stats['total_requests']}"
@@ -247,14 +308,21 @@ class TradeExecutor:
                 risk_percentage=execution_params.get('risk_percentage', 2.0) if execution_params else 2.0,
                 is_range_entry=len(entry_prices) > 1,
                 range_split_count=len(entry_prices) if len(entry_prices) > 1 else 1,
+                range_all_or_nothing=self.config.get('range_entry', {}).get('all_or_nothing', False),
+                range_deadline_seconds=self.config.get('range_entry', {}).get('deadline_seconds', 10.0),
                 breakeven_enabled=self.config['advanced_features']['breakeven_enabled'],
                 trailing_stop_enabled=self.config['advanced_features']['trailing_stop_enabled'],
-                partial_close_levels=signal.get('partial_close_levels', [])
+                partial_close_levels=signal.get('partial_close_levels', []),
+                account_id=execution_params.get('account_id') if execution_params else None,
+                received_at=received_at
             )
             
             # Add to execution queue
-            await self.execution_queue.put(execution_request)
             self.active_executions[request_id] = execution_request
+            if self.execution_mode == ExecutionMode.SHARDED:
+                self._enqueue_sharded(execution_request)
+            else:
+                await self.execution_queue.put(execution_request)
             
             self.stats['total_requests'] += 1
             
@@ -279,18 +347,7 @@ class TradeExecutor:
                         timeout=1.0
                     )
                     
-                    # Process the execution
-                    result = await self._process_execution(execution_request)
-                    
-                    # Update statistics
-                    await self._update_execution_stats(result)
-                    
-                    # Log result
-                    await self._log_execution_result(result)
-                    
-                    # Clean up
-                    if execution_request.request_id in self.active_executions:
-                        del self.active_executions[execution_request.request_id]
+                    await self._handle_execution_request(execution_request)
                     
                 except asyncio.TimeoutError:
                     continue
@@ -302,6 +359,119 @@ class TradeExecutor:
         except Exception as e:
             self.logger.error(f"Execution worker {worker_id} fatal error: {e}")
     
+    async def _handle_execution_request(self, execution_request: ExecutionRequest) -> ExecutionResult:
+        """Process, record and clean up a single dequeued request"""
+        try:
+            # Process the execution
+            result = await self._process_execution(execution_request)
+            
+            # Update statistics
+            await self._update_execution_stats(result)
+            
+            # Log result
+            await self._log_execution_result(result)
+            
+            return result
+        finally:
+            # Clean up
+            if execution_request.request_id in self.active_executions:
+                del self.active_executions[execution_request.request_id]
+    
+    def _shard_key(self, request: ExecutionRequest) -> str:
+        """Ordering key: requests with the same key always execute in arrival order"""
+        if self.config.get('sharding', {}).get('shard_by_account', False) and request.account_id:
+            return f"{request.account_id}:{request.symbol}"
+        return request.symbol
+    
+    def _shard_for(self, request: ExecutionRequest) -> ExecutionShard:
+        """Home shard of a request, by a stable hash of its ordering key"""
+        return self.shards[zlib.crc32(self._shard_key(request).encode('utf-8')) % len(self.shards)]
+    
+    def _enqueue_sharded(self, request: ExecutionRequest):
+        """Append a request to its home shard"""
+        shard = self._shard_for(request)
+        shard.queue.append(request)
+        shard.wakeup.set()
+        
+        # Let idle workers know there may be work to steal
+        for other in self.shards:
+            if other is not shard and not other.queue:
+                other.wakeup.set()
+    
+    def _take_next(self, shard: ExecutionShard) -> Optional[ExecutionRequest]:
+        """
+        Take the oldest request in a shard whose key is neither running nor
+        preceded by an earlier request with the same key
+        """
+        blocked_keys = set()
+        for index, request in enumerate(shard.queue):
+            if index >= self.steal_scan_depth:
+                break
+            key = self._shard_key(request)
+            if key in self.in_flight_keys or key in blocked_keys:
+                blocked_keys.add(key)
+                continue
+            del shard.queue[index]
+            return request
+        return None
+    
+    def _steal_work(self, thief: ExecutionShard) -> Optional[ExecutionRequest]:
+        """Take runnable work from the deepest other shard"""
+        victims = sorted(
+            (shard for shard in self.shards if shard is not thief and shard.queue),
+            key=lambda shard: len(shard.queue),
+            reverse=True
+        )
+        for victim in victims:
+            request = self._take_next(victim)
+            if request:
+                victim.stolen += 1
+                return request
+        return None
+    
+    async def _sharded_execution_worker(self, shard: ExecutionShard):
+        """Worker serving its own shard first and stealing when idle"""
+        self.logger.info(f"Sharded execution worker {shard.shard_id} started")
+        
+        try:
+            while self.is_running:
+                try:
+                    request = self._take_next(shard)
+                    owner = shard
+                    if request is None:
+                        request = self._steal_work(shard)
+                        if request is not None:
+                            owner = self._shard_for(request)
+                    
+                    if request is None:
+                        shard.wakeup.clear()
+                        try:
+                            await asyncio.wait_for(shard.wakeup.wait(), timeout=self.idle_steal_interval)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    
+                    key = self._shard_key(request)
+                    self.in_flight_keys.add(key)
+                    try:
+                        await self._handle_execution_request(request)
+                    finally:
+                        self.in_flight_keys.discard(key)
+                        # The owner may be holding back the next request for this key
+                        owner.wakeup.set()
+                    
+                    owner.executed += 1
+                    if request.received_at is not None:
+                        owner.latencies_ms.append((time.perf_counter() - request.received_at) * 1000)
+                    
+                except Exception as e:
+                    self.logger.error(f"Sharded execution worker {shard.shard_id} error: {e}")
+                    
+        except asyncio.CancelledError:
+            self.logger.info(f"Sharded execution worker {shard.shard_id} cancelled")
+        except Exception as e:
+            self.logger.error(f"Sharded execution worker {shard.shard_id} fatal error: {e}")
+    
     async def _process_execution(self, request: ExecutionRequest) -> ExecutionResult:
         """Process a single execution request"""
         start_time = datetime.now()
@@ -331,6 +501,8 @@ class TradeExecutor:
                 orders = await self._execute_single_entry(request)
             
             result.orders = orders
+            if request.is_range_entry:
+                result.leg_latencies_ms = [order.get('latency_ms', 0.0) for order in orders]
             
             # Calculate execution metrics
             if orders:
@@ -431,11 +603,27 @@ class TradeExecutor:
             return []
     
     async def _execute_range_entry(self, request: ExecutionRequest) -> List[Dict[str, Any]]:
-        """Execute range entry orders"""
+        """Execute range entry orders concurrently as one ladder"""
         try:
-            orders = []
             volume_per_order = request.volume / request.range_split_count
             
+            async def execute_leg(trade_request: TradeRequest) -> Dict[str, Any]:
+                trade_result = await self.retry_engine.execute_with_retry(
+                    self.mt5_bridge.execute_trade,
+                    trade_request,
+                    max_attempts=2,  # Reduced retries for range entries
+                    delay=0.5
+                )
+                return {
+                    "success": trade_result.success,
+                    "order_id": trade_result.order_id,
+                    "volume": trade_result.volume,
+                    "price": trade_result.price,
+                    "error_code": trade_result.error_code,
+                    "error_message": trade_result.error_message
+                }
+            
+            legs = []
             for i, entry_price in enumerate(request.entry_prices):
                 trade_request = TradeRequest(
                     action="buy" if request.direction == "BUY" else "sell",
@@ -448,29 +636,40 @@ class TradeExecutor:
                     magic=request.magic_number,
                     comment=f"{request.comment} - Range {i+1}/{request.range_split_count}"
                 )
-                
-                # Execute with retry
-                trade_result = await self.retry_engine.execute_with_retry(
-                    self.mt5_bridge.execute_trade,
-                    trade_request,
-                    max_attempts=2,  # Reduced retries for range entries
-                    delay=0.5
-                )
-                
+                legs.append(LadderLeg(
+                    leg_id=f"{request.request_id}_{i}",
+                    submit=lambda trade_request=trade_request: execute_leg(trade_request),
+                    metadata={"range_index": i}
+                ))
+            
+            # Range legs are market deals, so rolling one back closes its position
+            submitter = OrderLadderSubmitter(cancel_order=self._close_range_leg, logger=self.logger)
+            ladder = await submitter.submit(
+                legs,
+                all_or_nothing=request.range_all_or_nothing,
+                deadline_seconds=request.range_deadline_seconds
+            )
+            
+            orders = []
+            for leg in ladder.legs:
                 order_result = {
-                    "success": trade_result.success,
-                    "order_id": trade_result.order_id,
-                    "volume": trade_result.volume,
-                    "price": trade_result.price,
-                    "error_code": trade_result.error_code,
-                    "error_message": trade_result.error_message,
-                    "range_index": i
+                    "success": leg.status == LegStatus.PLACED,
+                    "order_id": leg.ticket,
+                    "volume": leg.response.get("volume", 0.0),
+                    "price": leg.response.get("price", 0.0),
+                    "error_code": leg.response.get("error_code", 0),
+                    "error_message": leg.error or leg.response.get("error_message", ""),
+                    "range_index": leg.metadata["range_index"],
+                    "leg_status": leg.status.value,
+                    "latency_ms": leg.latency_ms
                 }
-                
+                if leg.status != LegStatus.PLACED:
+                    # Rolled back or unfilled legs contribute no volume to the result
+                    order_result["volume"] = 0.0
                 orders.append(order_result)
-                
-                # Small delay between range orders
-                await asyncio.sleep(0.1)
+            
+            if ladder.rolled_back:
+                self.logger.warning(f"Range entry {request.request_id} rolled back: not all legs filled")
             
             return orders
             
@@ -478,6 +677,16 @@ class TradeExecutor:
             self.logger.error(f"Range entry execution error: {e}")
             return []
     
+    async def _close_range_leg(self, ticket: int) -> Dict[str, Any]:
+        """Close the position opened by a range leg during an all-or-nothing rollback"""
+        trade_result = await asyncio.to_thread(self.mt5_bridge.close_position, ticket)
+        return {
+            "success": trade_result.success,
+            "order_id": trade_result.order_id,
+            "error_code": trade_result.error_code,
+            "error_message": trade_result.error_message
+        }
+    
     async def _calculate_position_size(self, signal: Dict[str, Any], params: Optional[Dict[str, Any]]) -> float:
         """Calculate appropriate position size"""
         try:
@@ -567,6 +776,7 @@ class TradeExecutor:
                     "average_price": result.average_price,
                     "latency_ms": result.latency_ms,
                     "orders_count": len(result.orders),
+                    "leg_latencies_ms": result.leg_latencies_ms,
                     "error_message": result.error_message
                 }
                 f.write(json.dumps(log_entry) + "\n")
@@ -581,6 +791,20 @@ class TradeExecutor:
             "running": self.is_running,
             "active_executions": len(self.active_executions),
             "worker_count": len(self.execution_workers),
+            "execution_mode": self.execution_mode.value,
+            "queue_depth": (sum(len(shard.queue) for shard in self.shards)
+                            if self.execution_mode == ExecutionMode.SHARDED else self.execution_queue.qsize()),
+            "shards": [
+                {
+                    "shard_id": shard.shard_id,
+                    "queue_depth": len(shard.queue),
+                    "executed": shard.executed,
+                    "stolen": shard.stolen,
+                    "p50_latency_ms": shard.latency_percentile(50),
+                    "p99_latency_ms": shard.latency_percentile(99)
+                }
+                for shard in self.shards
+            ],
             "statistics": self.stats,
             "uptime": (datetime.now() - self.stats["start_time"]).total_seconds()
         }
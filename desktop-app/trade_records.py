@@ -0,0 +1,161 @@
+"""
+Trade Record Layer for SignalOS
+Compact, slot-based records for hot trade-management state (positions, tickets,
+pending orders) with epoch-float timestamps and one shared serializer used by
+every manager's save/load path
+"""
+
+import time
+import typing
+from dataclasses import dataclass, fields
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, Optional, List, Tuple, Type, TypeVar, NewType, Union
+
+# Seconds since the epoch; stored as a plain float instead of a datetime object
+Timestamp = NewType('Timestamp', float)
+
+R = TypeVar('R')
+
+# Field kinds used by the per-class (de)serialization plans
+_PLAIN = 0
+_ENUM = 1
+_RECORD = 2
+_RECORD_LIST = 3
+_TIMESTAMP = 4
+
+_RECORD_CLASSES = set()
+_PLANS: Dict[type, Tuple[Tuple[str, int, Optional[type]], ...]] = {}
+
+
+def trade_record(cls: Type[R]) -> Type[R]:
+    """Class decorator: slotted dataclass registered with the shared serializer"""
+    record_cls = dataclass(slots=True)(cls)
+    _RECORD_CLASSES.add(record_cls)
+    return record_cls
+
+
+def now_ts() -> Timestamp:
+    """Current time as an epoch-float timestamp"""
+    return Timestamp(time.time())
+
+
+def to_ts(value: Union[None, float, int, str, datetime]) -> Optional[Timestamp]:
+    """Coerce a datetime, ISO string or number into an epoch-float timestamp"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return Timestamp(value.timestamp())
+    if isinstance(value, str):
+        return Timestamp(datetime.fromisoformat(value).timestamp())
+    return Timestamp(float(value))
+
+
+def ts_to_datetime(ts: Optional[float]) -> Optional[datetime]:
+    """Epoch-float timestamp to a local datetime"""
+    return datetime.fromtimestamp(ts) if ts is not None else None
+
+
+def ts_to_iso(ts: Optional[float]) -> Optional[str]:
+    """Epoch-float timestamp to an ISO string for display and status payloads"""
+    return datetime.fromtimestamp(ts).isoformat() if ts is not None else None
+
+
+def _unwrap_optional(hint: Any) -> Any:
+    if typing.get_origin(hint) is Union:
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return hint
+
+
+def _classify(hint: Any) -> Tuple[int, Optional[type]]:
+    hint = _unwrap_optional(hint)
+    if hint is Timestamp:
+        return _TIMESTAMP, None
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return _ENUM, hint
+    if isinstance(hint, type) and hint in _RECORD_CLASSES:
+        return _RECORD, hint
+    if typing.get_origin(hint) in (list, List):
+        args = typing.get_args(hint)
+        if args and isinstance(args[0], type) and args[0] in _RECORD_CLASSES:
+            return _RECORD_LIST, args[0]
+    return _PLAIN, None
+
+
+def _plan(cls: type) -> Tuple[Tuple[str, int, Optional[type]], ...]:
+    """Field plan computed once per record class"""
+    plan = _PLANS.get(cls)
+    if plan is None:
+        hints = typing.get_type_hints(cls)
+        plan = tuple((f.name, *_classify(hints[f.name])) for f in fields(cls))
+        _PLANS[cls] = plan
+    return plan
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if type(value) in _RECORD_CLASSES:
+        return record_to_dict(value)
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def record_to_dict(record: Any) -> Dict[str, Any]:
+    """Serialize a trade record (and nested records) to JSON-ready primitives"""
+    data = {}
+    for name, kind, _ in _plan(type(record)):
+        value = getattr(record, name)
+        if value is None or kind == _PLAIN and isinstance(value, (int, float, str, bool)):
+            data[name] = value
+        elif kind == _ENUM:
+            data[name] = value.value
+        elif kind == _RECORD:
+            data[name] = record_to_dict(value)
+        elif kind == _RECORD_LIST:
+            data[name] = [record_to_dict(item) for item in value]
+        else:
+            data[name] = _encode(value)
+    return data
+
+
+def record_from_dict(cls: Type[R], data: Dict[str, Any]) -> R:
+    """
+    Rebuild a trade record from record_to_dict output. Missing keys fall back
+    to field defaults; timestamps also accept the legacy ISO string format.
+    """
+    kwargs = {}
+    for name, kind, target in _plan(cls):
+        if name not in data:
+            continue
+        value = data[name]
+        if value is None:
+            kwargs[name] = None
+        elif kind == _TIMESTAMP:
+            kwargs[name] = to_ts(value)
+        elif kind == _ENUM:
+            kwargs[name] = target(value)
+        elif kind == _RECORD:
+            kwargs[name] = record_from_dict(target, value)
+        elif kind == _RECORD_LIST:
+            kwargs[name] = [record_from_dict(target, item) for item in value]
+        else:
+            kwargs[name] = value
+    return cls(**kwargs)
+
+
+def records_to_list(records: List[Any]) -> List[Dict[str, Any]]:
+    """Serialize a sequence of records for a history/log file"""
+    return [record_to_dict(record) for record in records]
+
+
+def records_from_list(cls: Type[R], data: List[Dict[str, Any]]) -> List[R]:
+    """Rebuild a sequence of records from a history/log file"""
+    return [record_from_dict(cls, entry) for entry in data]
@@ -5,13 +5,14 @@ Implements dynamic trailing stop loss functionality with multiple trailing metho
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass
 from enum import Enum
 import json
 import math
 
+from trade_records import (trade_record, Timestamp, now_ts, ts_to_iso,
+                           records_to_list, records_from_list)
+
 
 class TrailingMethod(Enum):
     FIXED_PIPS = "fixed_pips"
@@ -25,7 +26,7 @@ class TradeDirection(Enum):
     SELL = "sell"
 
 
-@dataclass
+@trade_record
 class TrailingStopConfig:
     method: TrailingMethod
     trail_distance: float  # Pips, percentage, or ATR multiplier
@@ -35,7 +36,7 @@ class TrailingStopConfig:
     use_breakeven_lock: bool = True  # Lock in breakeven when possible
 
 
-@dataclass
+@trade_record
 class TrailingPosition:
     ticket: int
     symbol: str
@@ -45,13 +46,13 @@ class TrailingPosition:
     current_sl: Optional[float]
     lot_size: float
     config: TrailingStopConfig
-    last_update: datetime
+    last_update: Timestamp
     highest_profit_price: Optional[float] = None  # Best price achieved
     trailing_active: bool = False
     breakeven_locked: bool = False
 
 
-@dataclass
+@trade_record
 class TrailingUpdate:
     ticket: int
     new_sl: float
@@ -60,7 +61,7 @@ class TrailingUpdate:
     profit_pips: float
     trailing_distance: float
     reason: str
-    timestamp: datetime
+    timestamp: Timestamp
 
 
 class TrailingStopEngine:
@@ -144,19 +145,7 @@ class TrailingStopEngine:
             with open(self.log_file, 'r') as f:
                 data = json.load(f)
                 # Convert back to dataclass objects
-                self.update_history = []
-                for entry in data:
-                    update = TrailingUpdate(
-                        ticket=entry['ticket'],
-                        new_sl=entry['new_sl'],
-                        old_sl=entry.get('old_sl'),
-                        current_price=entry['current_price'],
-                        profit_pips=entry['profit_pips'],
-                        trailing_distance=entry['trailing_distance'],
-                        reason=entry['reason'],
-                        timestamp=datetime.fromisoformat(entry['timestamp'])
-                    )
-                    self.update_history.append(update)
+                self.update_history = records_from_list(TrailingUpdate, data)
         except FileNotFoundError:
             self.update_history = []
             self._save_trailing_history()
@@ -164,18 +153,7 @@ class TrailingStopEngine:
     def _save_trailing_history(self):
         """Save trailing history to log file"""
         try:
-            data = []
-            for update in self.update_history:
-                data.append({
-                    'ticket': update.ticket,
-                    'new_sl': update.new_sl,
-                    'old_sl': update.old_sl,
-                    'current_price': update.current_price,
-                    'profit_pips': update.profit_pips,
-                    'trailing_distance': update.trailing_distance,
-                    'reason': update.reason,
-                    'timestamp': update.timestamp.isoformat()
-                })
+            data = records_to_list(self.update_history)
             
             with open(self.log_file, 'w') as f:
                 json.dump(data, f, indent=2)
@@ -215,7 +193,7 @@ class TrailingStopEngine:
                 current_sl=current_sl,
                 lot_size=lot_size,
                 config=config,
-                last_update=datetime.now(),
+                last_update=now_ts(),
                 highest_profit_price=entry_price,
                 trailing_active=False,
                 breakeven_locked=False
@@ -385,14 +363,14 @@ class TrailingStopEngine:
                         profit_pips=profit_pips,
                         trailing_distance=position.config.trail_distance,
                         reason=f"Trailing {position.config.method.value}",
-                        timestamp=datetime.now()
+                        timestamp=now_ts()
                     )
                     
                     self.update_history.append(update)
                     
                     # Update position
                     position.current_sl = new_sl
-                    position.last_update = datetime.now()
+                    position.last_update = now_ts()
                     position.trailing_active = True
                     
                     # Check breakeven lock
@@ -486,7 +464,7 @@ class TrailingStopEngine:
             'trail_distance': position.config.trail_distance,
             'trailing_active': position.trailing_active,
             'breakeven_locked': position.breakeven_locked,
-            'last_update': position.last_update.isoformat(),
+            'last_update': ts_to_iso(position.last_update),
             'highest_profit_price': position.highest_profit_price
         }
 
@@ -502,7 +480,7 @@ class TrailingStopEngine:
             'profit_pips': update.profit_pips,
             'trailing_distance': update.trailing_distance,
             'reason': update.reason,
-            'timestamp': update.timestamp.isoformat()
+            'timestamp': ts_to_iso(update.timestamp)
         } for update in recent_updates]
 
 
@@ -7,12 +7,13 @@ import json
 import time
 import logging
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
 from enum import Enum
 import os
 
+from trade_records import trade_record, Timestamp, now_ts, record_to_dict, record_from_dict
+
 class OrderType(Enum):
     BUY_LIMIT = "buy_limit"
     SELL_LIMIT = "sell_limit"
@@ -31,7 +32,7 @@ class TriggerMode(Enum):
     MANUAL = "manual"
     DISABLED = "disabled"
 
-@dataclass
+@trade_record
 class PendingOrder:
     order_id: str
     signal_id: str
@@ -42,43 +43,22 @@ class PendingOrder:
     stop_loss: Optional[float]
     take_profit: Optional[float]
     slippage_pips: float
-    expiry_time: Optional[datetime]
+    expiry_time: Optional[Timestamp]
     status: OrderStatus
-    created_time: datetime
+    created_time: Timestamp
     provider_id: Optional[str] = None
     provider_name: Optional[str] = None
     comment: Optional[str] = None
-    triggered_time: Optional[datetime] = None
+    triggered_time: Optional[Timestamp] = None
     triggered_price: Optional[float] = None
     mt5_ticket: Optional[int] = None
     attempts: int = 0
     last_error: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "order_id": self.order_id,
-            "signal_id": self.signal_id,
-            "symbol": self.symbol,
-            "order_type": self.order_type.value,
-            "trigger_price": self.trigger_price,
-            "volume": self.volume,
-            "stop_loss": self.stop_loss,
-            "take_profit": self.take_profit,
-            "slippage_pips": self.slippage_pips,
-            "expiry_time": self.expiry_time.isoformat() if self.expiry_time else None,
-            "status": self.status.value,
-            "created_time": self.created_time.isoformat(),
-            "provider_id": self.provider_id,
-            "provider_name": self.provider_name,
-            "comment": self.comment,
-            "triggered_time": self.triggered_time.isoformat() if self.triggered_time else None,
-            "triggered_price": self.triggered_price,
-            "mt5_ticket": self.mt5_ticket,
-            "attempts": self.attempts,
-            "last_error": self.last_error
-        }
+        return record_to_dict(self)
 
-@dataclass
+@trade_record
 class TriggerEvent:
     order_id: str
     signal_id: str
@@ -86,7 +66,7 @@ class TriggerEvent:
     trigger_price: float
     market_price: float
     slippage_pips: float
-    execution_time: datetime
+    execution_time: Timestamp
     success: bool
     mt5_ticket: Optional[int] = None
     error_message: Optional[str] = None
@@ -221,28 +201,7 @@ class TriggerPendingOrder:
                     orders_data = json.load(f)
                     
                 for order_data in orders_data.get('pending_orders', []):
-                    order = PendingOrder(
-                        order_id=order_data['order_id'],
-                        signal_id=order_data['signal_id'],
-                        symbol=order_data['symbol'],
-                        order_type=OrderType(order_data['order_type']),
-                        trigger_price=order_data['trigger_price'],
-                        volume=order_data['volume'],
-                        stop_loss=order_data.get('stop_loss'),
-                        take_profit=order_data.get('take_profit'),
-                        slippage_pips=order_data['slippage_pips'],
-                        expiry_time=datetime.fromisoformat(order_data['expiry_time']) if order_data.get('expiry_time') else None,
-                        status=OrderStatus(order_data['status']),
-                        created_time=datetime.fromisoformat(order_data['created_time']),
-                        provider_id=order_data.get('provider_id'),
-                        provider_name=order_data.get('provider_name'),
-                        comment=order_data.get('comment'),
-                        triggered_time=datetime.fromisoformat(order_data['triggered_time']) if order_data.get('triggered_time') else None,
-                        triggered_price=order_data.get('triggered_price'),
-                        mt5_ticket=order_data.get('mt5_ticket'),
-                        attempts=order_data.get('attempts', 0),
-                        last_error=order_data.get('last_error')
-                    )
+                    order = record_from_dict(PendingOrder, order_data)
                     self.pending_orders[order.order_id] = order
                     
                 self.logger.info(f"Loaded {len(self.pending_orders)} pending orders from storage")
@@ -324,7 +283,7 @@ class TriggerPendingOrder:
             return False, "No price data available"
             
         # Check if order is expired
-        if order.expiry_time and datetime.now() > order.expiry_time:
+        if order.expiry_time and now_ts() > order.expiry_time:
             return False, "Order expired"
             
         # Get appropriate price for comparison
@@ -399,7 +358,7 @@ class TriggerPendingOrder:
             if result.get('success', False):
                 # Update order status
                 order.status = OrderStatus.TRIGGERED
-                order.triggered_time = datetime.now()
+                order.triggered_time = now_ts()
                 order.triggered_price = trigger_price
                 order.mt5_ticket = result.get('ticket')
                 
@@ -426,7 +385,7 @@ class TriggerPendingOrder:
                     trigger_price=order.trigger_price,
                     market_price=trigger_price,
                     slippage_pips=order.slippage_pips,
-                    execution_time=datetime.now(),
+                    execution_time=now_ts(),
                     success=True,
                     mt5_ticket=order.mt5_ticket
                 )
@@ -448,7 +407,7 @@ class TriggerPendingOrder:
                     trigger_price=order.trigger_price,
                     market_price=trigger_price,
                     slippage_pips=order.slippage_pips,
-                    execution_time=datetime.now(),
+                    execution_time=now_ts(),
                     success=False,
                     error_message=error_msg
                 )
@@ -528,7 +487,7 @@ class TriggerPendingOrder:
                 
     def _cleanup_expired_orders(self):
         """Clean up expired orders"""
-        now = datetime.now()
+        now = now_ts()
         expired_orders = []
         
         for order_id, order in self.pending_orders.items():
@@ -583,7 +542,7 @@ class TriggerPendingOrder:
             if expiry_hours is None:
                 expiry_hours = self.config.get('order_expiry_hours', 168)
                 
-            expiry_time = datetime.now() + timedelta(hours=expiry_hours) if expiry_hours > 0 else None
+            expiry_time = now_ts() + expiry_hours * 3600 if expiry_hours > 0 else None
             
             # Create pending order
             order = PendingOrder(
@@ -598,7 +557,7 @@ class TriggerPendingOrder:
                 slippage_pips=slippage_pips,
                 expiry_time=expiry_time,
                 status=OrderStatus.PENDING,
-                created_time=datetime.now(),
+                created_time=now_ts(),
                 provider_id=provider_id,
                 provider_name=provider_name,
                 comment=comment
@@ -13,7 +13,7 @@ import shutil
 import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import tempfile
 
@@ -38,6 +38,9 @@ class ModelUpdater:
         self.backup_old_models = self.config.get("backup_old_models", True)
         self.max_retries = self.config.get("max_retries", 3)
         
+        # Called with (version, model_dir) after a new model is in place
+        self._model_listeners: List[Callable[[str, Path], Any]] = []
+        
         # Ensure directories exist
         self.models_dir.mkdir(parents=True, exist_ok=True)
         self.current_model_dir.mkdir(parents=True, exist_ok=True)
@@ -300,22 +303,40 @@ class ModelUpdater:
         except Exception as e:
             self.logger.warning(f"Backup cleanup failed: {e}")
             
-    def extract_model(self, model_file: Path) -> bool:
+    def add_model_listener(self, callback: Callable[[str, Path], Any]):
+        """Register callback(version, model_dir), called after each successful extract_model"""
+        if callback not in self._model_listeners:
+            self._model_listeners.append(callback)
+        
+    def extract_model(self, model_file: Path, version: Optional[str] = None) -> bool:
         """
         Extract downloaded model to current_model directory
         Returns True if successful
+        
+        The archive is extracted next to current_model and swapped in by
+        renaming, so readers never see a partially extracted model. Model
+        listeners are notified once the new directory is in place.
         """
+        staging_dir = self.models_dir / "current_model.new"
+        previous_dir = self.models_dir / "current_model.old"
+        
         try:
             self.logger.info(f"Extracting model: {model_file}")
             
-            # Clear current model directory
-            if self.current_model_dir.exists():
-                shutil.rmtree(self.current_model_dir)
-            self.current_model_dir.mkdir(parents=True, exist_ok=True)
+            for leftover in (staging_dir, previous_dir):
+                if leftover.exists():
+                    shutil.rmtree(leftover)
+            staging_dir.mkdir(parents=True)
             
             # Extract tar.gz file
             with tarfile.open(model_file, 'r:gz') as tar:
-                tar.extractall(path=self.current_model_dir)
+                tar.extractall(path=staging_dir)
+                
+            # Swap directories
+            if self.current_model_dir.exists():
+                self.current_model_dir.rename(previous_dir)
+            staging_dir.rename(self.current_model_dir)
+            shutil.rmtree(previous_dir, ignore_errors=True)
                 
             self.logger.info(f"Model extracted to: {self.current_model_dir}")
             
@@ -323,12 +344,24 @@ class ModelUpdater:
             temp_dir = model_file.parent
             shutil.rmtree(temp_dir, ignore_errors=True)
             
+            self._notify_model_listeners(version or "unknown")
             return True
             
         except Exception as e:
             self.logger.error(f"Model extraction failed: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if previous_dir.exists() and not self.current_model_dir.exists():
+                previous_dir.rename(self.current_model_dir)
             return False
             
+    def _notify_model_listeners(self, version: str):
+        """Tell listeners (e.g. the model server) that a new model is in place"""
+        for callback in self._model_listeners:
+            try:
+                callback(version, self.current_model_dir)
+            except Exception as e:
+                self.logger.warning(f"Model listener failed for version {version}: {e}")
+            
     async def perform_update(self, remote_version_data: Dict[str, Any]) -> bool:
         """
         Perform complete model update process
@@ -354,7 +387,7 @@ class ModelUpdater:
                 return False
                 
             # Extract new model
-            if not self.extract_model(downloaded_file):
+            if not self.extract_model(downloaded_file, remote_version_data.get('version')):
                 self.logger.error("Failed to extract new model")
                 return False
                 
@@ -454,6 +487,35 @@ class ModelUpdater:
         }
 
 
+# Shared updater, so listeners such as the model server hear about every extracted model
+_model_updater: Optional[ModelUpdater] = None
+# Listeners registered before the shared updater was created
+_pending_model_listeners: List[Callable[[str, Path], Any]] = []
+
+
+def get_model_updater() -> ModelUpdater:
+    """Get the process-wide model updater"""
+    global _model_updater
+    if _model_updater is None:
+        _model_updater = ModelUpdater()
+        for callback in _pending_model_listeners:
+            _model_updater.add_model_listener(callback)
+        _pending_model_listeners.clear()
+    return _model_updater
+
+
+def on_model_update(callback: Callable[[str, Path], Any]):
+    """
+    Register callback(version, model_dir) on the shared updater without
+    creating it (creating one sets up its config, model and log directories);
+    the callback is attached when something first calls get_model_updater()
+    """
+    if _model_updater is not None:
+        _model_updater.add_model_listener(callback)
+    elif callback not in _pending_model_listeners:
+        _pending_model_listeners.append(callback)
+
+
 # Helper functions for external use
 async def check_model_updates() -> Tuple[bool, Optional[Dict[str, Any]]]:
     """Convenience function to check for model updates"""
@@ -463,7 +525,7 @@ async def check_model_updates() -> Tuple[bool, Optional[Dict[str, Any]]]:
 
 async def download_model_update(model_url: str, expected_checksum: str = None) -> bool:
     """Convenience function to download and install model update"""
-    updater = ModelUpdater()
+    updater = get_model_updater()
     
     # Create mock remote version data
     remote_version_data = {
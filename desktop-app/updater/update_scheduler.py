@@ -11,7 +11,7 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 import json
 
-from .model_updater import ModelUpdater
+from .model_updater import get_model_updater
 from .notification_handler import NotificationHandler, NotificationType
 
 
@@ -24,7 +24,7 @@ class UpdateScheduler:
         self.setup_logging()
         
         # Initialize components
-        self.model_updater = ModelUpdater()
+        self.model_updater = get_model_updater()
         self.notification_handler = NotificationHandler()
         
         # Scheduling configuration